@@ -0,0 +1,94 @@
+# benchmarks/bench_busca.py
+#
+# Latência do índice de busca (controllers/indice_busca.py) com catálogos sintéticos de
+# 1k, 10k e 100k produtos: tempo de construção e p50/p95 por tipo de consulta.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_busca
+
+import random
+import statistics
+import time
+
+from controllers.indice_busca import IndiceBusca
+
+TAMANHOS = (1_000, 10_000, 100_000)
+REPETICOES = 200
+
+TIPOS = ['Ração', 'Petisco', 'Brinquedo', 'Higiene', 'Acessório', 'Farmácia', 'Areia', 'Cama']
+MARCAS = ['Golden', 'Premier', 'Royal Canin', 'Pedigree', 'Whiskas', 'Frontline', 'Seresto', 'Chalesco',
+          'Bravecto', 'Pipicat', 'Kong', 'Zee.Dog']
+TAMANHOS_MEDIDA = ['1kg', '3kg', '10kg', '15kg', '100g', '500ml', 'P', 'M', 'G', 'Único']
+PALAVRAS = ('cães gatos filhotes adultos sênior frango carne salmão cordeiro natural premium especial '
+            'coleira antipulgas shampoo hipoalergênico osso mordedor bolinha arranhador tapete higiênico '
+            'sachê úmida seca light castrados pequeno porte médio grande raças').split()
+
+CONSULTAS = {
+    'termo comum': 'ração',
+    'dois termos': 'ração frango',
+    'prefixo curto': 'pe',
+    'prefixo longo': 'antipul',
+    'termo + facetas': ('cães', {'marca': ['Golden', 'Premier'], 'tipo_produto': ['Ração']}),
+    'só facetas+preço': ('', {'tipo_produto': ['Petisco']}),
+}
+
+
+SILABAS = 'ba be bi bo ca ce co da de do fa fe fi la le li lo ma me mi mo na ne no pa pe po ra re ri ro ta te to va vi'.split()
+
+
+def gerar_produtos(quantidade: int, semente: int = 42):
+    rnd = random.Random(semente)
+    # Nomes de linha/modelo inventados: o vocabulário cresce com o catálogo, como num real
+    linhas = [''.join(rnd.choices(SILABAS, k=3)) for _ in range(max(50, quantidade // 20))]
+    produtos = []
+    for i in range(1, quantidade + 1):
+        tipo = rnd.choice(TIPOS)
+        marca = rnd.choice(MARCAS)
+        nome = f"{tipo} {marca} {rnd.choice(linhas)} {' '.join(rnd.sample(PALAVRAS, 3))}"
+        produtos.append({
+            'id_produto': i,
+            'nome_produto': nome,
+            'descricao': ' '.join(rnd.sample(PALAVRAS, 8) + rnd.sample(linhas, 2)),
+            'marca': marca,
+            'tipo_produto': tipo,
+            'tamanho_medida': rnd.choice(TAMANHOS_MEDIDA),
+            'preco': round(rnd.uniform(5, 400), 2),
+            'preco_promocional': None,
+            'quantidade_estoque': rnd.randint(0, 200),
+            'url_imagem': f'produto_{i}.png',
+        })
+    return produtos
+
+
+def medir(indice: IndiceBusca, consulta):
+    texto, filtros = consulta if isinstance(consulta, tuple) else (consulta, {})
+    preco_max = 100.0 if not texto else None
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = indice.buscar(texto, filtros=filtros, preco_max=preco_max, por_pagina=24)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1], resultado['total']
+
+
+def main():
+    for tamanho in TAMANHOS:
+        produtos = gerar_produtos(tamanho)
+        inicio = time.perf_counter()
+        indice = IndiceBusca(produtos)
+        construcao = (time.perf_counter() - inicio) * 1000
+        indice.buscar('aquecer')  # ordena vocabulário/preços fora da medição
+        print(f"\n{tamanho:>7} produtos | construção {construcao:8.1f} ms | {len(indice.postagens)} termos")
+        for nome, consulta in CONSULTAS.items():
+            p50, p95, total = medir(indice, consulta)
+            print(f"    {nome:<18} p50 {p50:8.3f} ms   p95 {p95:8.3f} ms   ({total} resultados)")
+
+        inicio = time.perf_counter()
+        for produto in produtos[:100]:
+            indice.adicionar(dict(produto, nome_produto=produto['nome_produto'] + ' atualizado'))
+        print(f"    100 atualizações incrementais: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+# benchmarks/bench_carga.py
+#
+# Carga e latência de ponta a ponta (rota Flask -> controller -> cliente), contra o
+# substituto em memória do Supabase (benchmarks/supabase_memoria.py) com latência injetada
+# em cada execute(). Cada cenário roda primeiro com 1 thread (latência sem disputa) e depois
+# com THREADS threads, cada uma com o seu test client, durante DURACAO_SEGUNDOS:
+#   - horarios:   GET /api/horarios-disponiveis (loja, serviço e dia aleatórios)
+#   - agendar:    POST /api/agendar (201 ou 409 quando o horário lota; os dois contam como ok)
+#   - feeds:      GET /api/ecommerce/ofertas | novidades | mais-vendidos | home
+#   - admin_crud: POST, GET, PUT e DELETE de /api/admin/produtos[/<id>] e a listagem paginada
+# Relata req/s, p50/p95/p99 (ms) e erros (status inesperado). Os caches em memória ficam
+# ligados, como em produção: após o aquecimento, o que se mede é o regime estável.
+#
+# O gerador de carga roda no mesmo processo do app: com latência 0 o resultado é limitado
+# pela CPU (GIL compartilhado); com latência > 0 mede a concorrência de I/O das threads.
+#
+# Para acompanhar regressões, salve o resultado e compare numa rodada posterior:
+#     SAIDA=base.json python -m benchmarks.bench_carga
+#     BASE=base.json python -m benchmarks.bench_carga
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_carga
+#     LATENCIA_MS=40 THREADS=16 DURACAO_SEGUNDOS=10 CENARIOS=horarios,agendar python -m benchmarks.bench_carga
+
+import contextlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks.supabase_memoria import SupabaseEmMemoria, popular
+from db import cliente
+
+LATENCIA_MS = float(os.getenv('LATENCIA_MS', '20'))
+JITTER_MS = float(os.getenv('JITTER_MS', '5'))
+THREADS = int(os.getenv('THREADS', '8'))
+DURACAO_SEGUNDOS = float(os.getenv('DURACAO_SEGUNDOS', '3'))
+AQUECIMENTO = int(os.getenv('AQUECIMENTO', '20'))
+SAIDA = os.getenv('SAIDA')
+BASE = os.getenv('BASE')
+
+FEEDS = ('/api/ecommerce/ofertas', '/api/ecommerce/novidades', '/api/ecommerce/mais-vendidos', '/api/ecommerce/home')
+
+
+# --- Cenários: cada chamada faz UMA requisição e devolve (status, aceito) ---
+
+def _horarios(http, rnd, dados):
+    dia = dados['inicio'] + timedelta(days=rnd.randrange(dados['dias']))
+    resposta = http.get('/api/horarios-disponiveis', query_string={
+        'loja_id': rnd.choice(dados['lojas']), 'servico_id': rnd.choice(dados['servicos']), 'data': dia.isoformat()})
+    return resposta.status_code, resposta.status_code == 200
+
+
+def _agendar(http, rnd, dados):
+    dia = dados['inicio'] + timedelta(days=rnd.randrange(dados['dias']))
+    resposta = http.post('/api/agendar', json={
+        'id_cliente': rnd.choice(dados['clientes']), 'id_loja': rnd.choice(dados['lojas']),
+        'id_servico': rnd.choice(dados['servicos']),
+        'data_hora_inicio': f"{dia.isoformat()}T{9 + rnd.randrange(8):02d}:{rnd.choice((0, 30)):02d}:00"})
+    return resposta.status_code, resposta.status_code in (201, 409)
+
+
+def _feeds(http, rnd, _dados):
+    resposta = http.get(rnd.choice(FEEDS))
+    return resposta.status_code, resposta.status_code == 200
+
+
+def _admin_crud(http, rnd, _dados, _estado=threading.local()):
+    """Ciclo por thread: cria, lê, altera, lista e apaga o produto da própria thread."""
+    passo = getattr(_estado, 'passo', 0)
+    _estado.passo = (passo + 1) % 5
+    if passo == 0:
+        resposta = http.post('/api/admin/produtos', json={
+            'nome_produto': f'Carga {rnd.random():.6f}', 'preco': 19.9, 'marca': 'Bench',
+            'tipo_produto': 'Petisco', 'quantidade_estoque': 10})
+        corpo = resposta.get_json() or {}
+        _estado.id_produto = (corpo[0] if isinstance(corpo, list) else corpo).get('id_produto')
+        return resposta.status_code, resposta.status_code == 201
+    if passo == 1:
+        resposta = http.get(f'/api/admin/produtos/{_estado.id_produto}')
+        return resposta.status_code, resposta.status_code == 200
+    if passo == 2:
+        resposta = http.put(f'/api/admin/produtos/{_estado.id_produto}', json={'preco': 17.9})
+        return resposta.status_code, resposta.status_code == 200
+    if passo == 3:
+        resposta = http.get('/api/admin/produtos', query_string={'limit': 50})
+        return resposta.status_code, resposta.status_code == 200
+    resposta = http.delete(f'/api/admin/produtos/{_estado.id_produto}')
+    return resposta.status_code, resposta.status_code in (200, 204)
+
+
+CENARIOS = {'horarios': _horarios, 'agendar': _agendar, 'feeds': _feeds, 'admin_crud': _admin_crud}
+
+
+# --- Gerador de carga ---
+
+def _percentil(ordenados: list, p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def rodar(aplicacao, cenario, dados: dict, threads: int, duracao: float) -> dict:
+    """Dispara 'cenario' em 'threads' threads por 'duracao' segundos; latências em ms."""
+    latencias, erros, status = [], [], {}
+    lock = threading.Lock()
+    largada = threading.Barrier(threads + 1)
+
+    def trabalhador(semente):
+        http, rnd = aplicacao.test_client(), random.Random(semente)
+        for _ in range(AQUECIMENTO):
+            cenario(http, rnd, dados)
+        locais, falhas, contagem = [], 0, {}
+        largada.wait()
+        fim = time.perf_counter() + duracao
+        while (agora := time.perf_counter()) < fim:
+            codigo, aceito = cenario(http, rnd, dados)
+            locais.append((time.perf_counter() - agora) * 1000)
+            falhas += not aceito
+            contagem[codigo] = contagem.get(codigo, 0) + 1
+        with lock:
+            latencias.extend(locais)
+            erros.append(falhas)
+            for codigo, n in contagem.items():
+                status[codigo] = status.get(codigo, 0) + n
+
+    trabalhadores = [threading.Thread(target=trabalhador, args=(s,)) for s in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    largada.wait()
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'requisicoes': len(latencias), 'req_s': round(len(latencias) / decorrido, 1),
+        'p50': round(_percentil(latencias, 50), 2), 'p95': round(_percentil(latencias, 95), 2),
+        'p99': round(_percentil(latencias, 99), 2), 'erros': sum(erros),
+        'status': {str(c): n for c, n in sorted(status.items())},
+    }
+
+
+def _comparacao(atual: dict, base: dict) -> str:
+    if not base:
+        return ''
+    variacao = lambda chave: (atual[chave] - base[chave]) / base[chave] * 100 if base[chave] else 0.0
+    return f"   vs base: req/s {variacao('req_s'):+5.0f}%  p95 {variacao('p95'):+5.0f}%"
+
+
+def main():
+    nomes = [n.strip() for n in os.getenv('CENARIOS', ','.join(CENARIOS)).split(',') if n.strip()]
+    base = json.load(open(BASE)) if BASE else {}
+
+    supabase = SupabaseEmMemoria(latencia_ms=LATENCIA_MS, jitter_ms=JITTER_MS, semente=1)
+    dados = popular(supabase)
+    cliente.definir_supabase(supabase)
+    import app
+    aplicacao = app.create_app(precarregar=[])
+
+    print(f"Latência simulada: {LATENCIA_MS:g} ms (+ até {JITTER_MS:g} ms) por consulta | "
+          f"{DURACAO_SEGUNDOS:g} s por rodada | {len(dados['produtos'])} produtos, "
+          f"{len(supabase.tabela('agendamentos'))} agendamentos\n")
+    print(f"    {'cenário':<12} {'threads':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    resultados = {}
+    for nome in nomes:
+        for threads in sorted({1, THREADS}):
+            chave = f'{nome}@{threads}'
+            # Os logs das rotas (ex.: 409 de horário lotado) poluiriam a tabela
+            with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+                r = rodar(aplicacao, CENARIOS[nome], dados, threads, DURACAO_SEGUNDOS)
+            resultados[chave] = r
+            print(f"    {nome:<12} {threads:>7} {r['req_s']:>8.1f} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+                  f"{r['p99']:>8.2f} {r['erros']:>6}{_comparacao(r, base.get(chave))}")
+            if r['erros']:
+                print(f"        status: {r['status']}")
+
+    consultas = sorted(supabase.chamadas.items(), key=lambda item: -item[1])[:8]
+    print("\nConsultas mais frequentes (tabela, operação): "
+          + ', '.join(f'{t}/{o}={n}' for (t, o), n in consultas))
+    if SAIDA:
+        with open(SAIDA, 'w') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"Resultados salvos em {SAIDA}")
+
+
+if __name__ == '__main__':
+    main()
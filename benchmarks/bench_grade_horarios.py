@@ -0,0 +1,88 @@
+# benchmarks/bench_grade_horarios.py
+#
+# Compara o laço antigo (slot x agendamento, com fromisoformat/astimezone a cada iteração)
+# com o caminho atual das rotas: grade do ModeloSemana (horário padrão 09:00-18:00, o mesmo
+# do laço antigo) + varredura de grade_horarios.livres_na_grade.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_grade_horarios
+
+import random
+import timeit
+from datetime import date, datetime, timedelta, timezone
+
+from controllers.grade_horarios import HORA_FIM_PADRAO, HORA_INICIO_PADRAO, INTERVALO_SLOT_MINUTOS, livres_na_grade
+from controllers.horarios_funcionamento import EXPEDIENTE_PADRAO, ModeloSemana
+
+DATA = date(2030, 1, 15)
+DURACAO_SERVICO = 60
+TAMANHOS = (10, 100, 1000)
+MODELO = ModeloSemana(0, (EXPEDIENTE_PADRAO,) * 7)  # Loja sem horário cadastrado
+
+
+def laco_antigo(data_selecionada, duracao_servico, capacidade, agendamentos_existentes):
+    """Cópia fiel do cálculo original de calcular_horarios_disponiveis (referência)."""
+    horarios_disponiveis = []
+    hora_atual = datetime.combine(data_selecionada, HORA_INICIO_PADRAO)
+    hora_fim_dia = datetime.combine(data_selecionada, HORA_FIM_PADRAO)
+    while hora_atual < hora_fim_dia:
+        slot_inicio_local = hora_atual
+        slot_fim_local = hora_atual + timedelta(minutes=duracao_servico)
+        if slot_fim_local.time() > HORA_FIM_PADRAO:
+            break
+        agendamentos_conflitantes = 0
+        for ag in agendamentos_existentes:
+            inicio_ag_utc = datetime.fromisoformat(ag['data_hora_inicio'])
+            fim_ag_utc = datetime.fromisoformat(ag['data_hora_fim'])
+            slot_inicio_utc = slot_inicio_local.astimezone(timezone.utc)
+            slot_fim_utc = slot_fim_local.astimezone(timezone.utc)
+            if slot_inicio_utc < fim_ag_utc and slot_fim_utc > inicio_ag_utc:
+                agendamentos_conflitantes += 1
+        if agendamentos_conflitantes < capacidade:
+            horarios_disponiveis.append(slot_inicio_local.strftime('%H:%M'))
+        hora_atual += timedelta(minutes=INTERVALO_SLOT_MINUTOS)
+    return horarios_disponiveis
+
+
+def gerar_agendamentos(quantidade, seed=42):
+    """Agendamentos sintéticos distribuídos pelo horário comercial do dia (em UTC)."""
+    rnd = random.Random(seed)
+    abertura = datetime.combine(DATA, HORA_INICIO_PADRAO).astimezone(timezone.utc)
+    agendamentos = []
+    for _ in range(quantidade):
+        inicio = abertura + timedelta(minutes=INTERVALO_SLOT_MINUTOS * rnd.randrange(18))
+        fim = inicio + timedelta(minutes=rnd.choice((30, 60, 90, 120)))
+        agendamentos.append({'data_hora_inicio': inicio.isoformat(), 'data_hora_fim': fim.isoformat()})
+    return agendamentos
+
+
+def grade_atual(data_selecionada, duracao_servico, capacidade, agendamentos_existentes):
+    """Como agendamento_controller._calcular_slots_livres monta a resposta."""
+    return livres_na_grade(MODELO.slots(data_selecionada, duracao_servico), capacidade, agendamentos_existentes)
+
+
+def medir(func, repeticoes):
+    melhor = min(timeit.repeat(func, number=repeticoes, repeat=3))
+    return melhor / repeticoes * 1000  # ms por chamada
+
+
+def main():
+    print(f"{'agendamentos':>12} | {'laço antigo (ms)':>16} | {'varredura (ms)':>14} | {'ganho':>7}")
+    print('-' * 60)
+    for quantidade in TAMANHOS:
+        agendamentos = gerar_agendamentos(quantidade)
+        # Capacidade proporcional ao volume, como em day care/hotel
+        capacidade = max(1, quantidade // 12)
+
+        esperado = laco_antigo(DATA, DURACAO_SERVICO, capacidade, agendamentos)
+        obtido = grade_atual(DATA, DURACAO_SERVICO, capacidade, agendamentos)
+        assert esperado == obtido, f"Resultados divergentes com {quantidade} agendamentos"
+
+        repeticoes = max(1, 2000 // quantidade)
+        t_antigo = medir(lambda: laco_antigo(DATA, DURACAO_SERVICO, capacidade, agendamentos), repeticoes)
+        t_novo = medir(lambda: grade_atual(DATA, DURACAO_SERVICO, capacidade, agendamentos), repeticoes)
+        print(f"{quantidade:>12} | {t_antigo:>16.3f} | {t_novo:>14.3f} | {t_antigo / t_novo:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
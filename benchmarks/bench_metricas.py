@@ -0,0 +1,93 @@
+# benchmarks/bench_metricas.py
+#
+# Custo da instrumentação de utils/metricas.py, para decidir se pode ficar ligada em produção:
+#   - observar() + incrementar() por chamada, em 1 thread e em 8 threads ao mesmo tempo
+#     (agregação por thread: sem lock no caminho quente, o custo não deve subir com threads)
+#   - uma consulta encadeada (table().select().eq().order().limit().execute()) contra um stub
+#     sem latência, com e sem o proxy de ClienteInstrumentado
+#   - geração do texto de /metrics
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_metricas
+
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+
+from utils import metricas
+
+CHAMADAS = 200_000
+CONSULTAS = 50_000
+THREADS = 8
+
+
+class _ConsultaStub:
+    def __getattr__(self, _nome):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[{'id_produto': 1}], count=None)
+
+
+class _ClienteStub:
+    def table(self, _tabela):
+        return _ConsultaStub()
+
+
+def _registrar(vezes: int) -> None:
+    labels = ('/api/ecommerce/busca', 'GET')
+    for i in range(vezes):
+        metricas.observar('http_requisicao_duracao_segundos', labels, (i % 100) / 1000)
+        metricas.incrementar('http_requisicoes_total', labels + (200,))
+
+
+def ns_por_chamada_em_threads(threads: int) -> float:
+    trabalhadores = [threading.Thread(target=_registrar, args=(CHAMADAS,)) for _ in range(threads)]
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    # Com o GIL as threads se revezam: tempo total / total de chamadas = custo por chamada
+    return (time.perf_counter() - inicio) / (CHAMADAS * threads) * 1e9
+
+
+def us_por_consulta(cliente) -> float:
+    inicio = time.perf_counter()
+    for i in range(CONSULTAS):
+        cliente.table('produtos').select('*').eq('id_produto', i).order('nome_produto').limit(5).execute()
+    return (time.perf_counter() - inicio) / CONSULTAS * 1e6
+
+
+def main():
+    print("Registro de uma requisição (observar + incrementar):")
+    for threads in (1, THREADS):
+        metricas.zerar()
+        amostras = [ns_por_chamada_em_threads(threads) for _ in range(3)]
+        print(f"    {threads} thread(s): {statistics.median(amostras):7.0f} ns por requisição")
+
+    print("\nConsulta encadeada contra stub sem latência:")
+    puro = statistics.median(us_por_consulta(_ClienteStub()) for _ in range(3))
+    instrumentado = statistics.median(
+        us_por_consulta(metricas.ClienteInstrumentado(_ClienteStub())) for _ in range(3))
+    print(f"    sem proxy:      {puro:6.2f} µs")
+    print(f"    com proxy:      {instrumentado:6.2f} µs   (+{instrumentado - puro:.2f} µs por consulta)")
+
+    # Uma série por rota/tabela realista: ~40 rotas x 3 status, ~15 tabelas x 5 operações
+    metricas.zerar()
+    for r in range(40):
+        for status in (200, 400, 500):
+            metricas.observar('http_requisicao_duracao_segundos', (f'/rota/{r}', 'GET'), 0.01)
+            metricas.incrementar('http_requisicoes_total', (f'/rota/{r}', 'GET', status))
+    for t in range(15):
+        for operacao in metricas.OPERACOES:
+            metricas.observar('db_consulta_duracao_segundos', (f'tabela_{t}', operacao), 0.02)
+            metricas.incrementar('db_linhas_total', (f'tabela_{t}', operacao), 10)
+    inicio = time.perf_counter()
+    texto = metricas.texto_prometheus()
+    print(f"\n/metrics com {texto.count(chr(10))} linhas: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/bench_modelos.py
+#
+# Decodificação de 10k linhas do PostgREST (dicts com timestamps ISO e UUIDs em texto):
+# tempo e memória retida pelo resultado, comparando as classes antigas (sem __slots__,
+# fromisoformat + UUID() por linha) com os models atuais, o decodificador em lote e a forma
+# colunar.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_modelos
+
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+import uuid as uuid_mod
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from models import conversores
+from models.agendamento import Agendamento, AgendamentosColunares
+from models.pet import Pet
+
+LINHAS = 10_000
+REPETICOES = 7
+
+
+# --- Classes como eram antes (referência) ---
+
+class AgendamentoAntigo:
+    def __init__(self, id_agendamento, id_cliente, id_pet, id_loja, id_servico, data_hora_inicio,
+                 data_hora_fim, status='pendente', observacoes_cliente=None, data_criacao=None):
+        self.id_agendamento = id_agendamento
+        self.id_cliente = id_cliente
+        self.id_pet = id_pet
+        self.id_loja = id_loja
+        self.id_servico = id_servico
+        self.data_hora_inicio = data_hora_inicio
+        self.data_hora_fim = data_hora_fim
+        self.status = status
+        self.observacoes_cliente = observacoes_cliente
+        self.data_criacao = data_criacao
+
+    @classmethod
+    def from_supabase(cls, data):
+        return cls(
+            id_agendamento=data.get('id_agendamento'),
+            id_cliente=UUID(data['id_cliente']),
+            id_pet=data.get('id_pet'),
+            id_loja=data['id_loja'],
+            id_servico=data['id_servico'],
+            data_hora_inicio=datetime.fromisoformat(data['data_hora_inicio'].replace('Z', '+00:00')),
+            data_hora_fim=datetime.fromisoformat(data['data_hora_fim'].replace('Z', '+00:00')),
+            status=data['status'],
+            observacoes_cliente=data.get('observacoes_cliente'),
+            data_criacao=datetime.fromisoformat(data['data_criacao'].replace('Z', '+00:00')) if data.get('data_criacao') else None
+        )
+
+
+class PetAntigo:
+    def __init__(self, id_pet, id_tutor, nome_pet, especie, raca, porte=None, data_nascimento=None, observacoes=None):
+        self.id_pet = id_pet
+        self.id_tutor = id_tutor
+        self.nome_pet = nome_pet
+        self.especie = especie
+        self.raca = raca
+        self.porte = porte
+        self.data_nascimento = data_nascimento
+        self.observacoes = observacoes
+
+    @classmethod
+    def from_supabase(cls, data):
+        return cls(id_pet=data.get('id_pet'), id_tutor=UUID(data['id_tutor']), nome_pet=data['nome_pet'],
+                   especie=data['especie'], raca=data['raca'], porte=data.get('porte'),
+                   data_nascimento=data.get('data_nascimento'), observacoes=data.get('observacoes'))
+
+
+# --- Dados sintéticos (como o PostgREST devolve) ---
+
+def gerar_agendamentos(quantidade: int, semente: int = 7):
+    rnd = random.Random(semente)
+    clientes = [str(uuid_mod.UUID(int=rnd.getrandbits(128))) for _ in range(quantidade // 10)]
+    base = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+    criado = datetime(2029, 12, 1, tzinfo=timezone.utc)
+    linhas = []
+    for i in range(1, quantidade + 1):
+        inicio = base + timedelta(days=rnd.randrange(60), minutes=30 * rnd.randrange(18))
+        linhas.append({
+            'id_agendamento': i, 'id_cliente': rnd.choice(clientes), 'id_pet': rnd.randrange(1, 5000),
+            'id_loja': rnd.randrange(1, 5), 'id_servico': rnd.randrange(1, 8),
+            'data_hora_inicio': inicio.isoformat(), 'data_hora_fim': (inicio + timedelta(minutes=60)).isoformat(),
+            'status': rnd.choice(('pendente', 'confirmado', 'finalizado', 'cancelado')),
+            'observacoes_cliente': None,
+            'data_criacao': (criado + timedelta(seconds=rnd.randrange(2_000_000), microseconds=i)).isoformat(),
+        })
+    return linhas
+
+
+def gerar_pets(quantidade: int, semente: int = 7):
+    rnd = random.Random(semente)
+    tutores = [str(uuid_mod.UUID(int=rnd.getrandbits(128))) for _ in range(quantidade // 3)]
+    return [{'id_pet': i, 'id_tutor': rnd.choice(tutores), 'nome_pet': f'Pet {i}', 'especie': 'Cão',
+             'raca': 'SRD', 'porte': 'M', 'data_nascimento': '2020-01-01', 'observacoes': None}
+            for i in range(1, quantidade + 1)]
+
+
+def _limpar_caches():
+    for funcao in (conversores.data_hora, conversores.epoch, conversores.uuid):
+        funcao.cache_clear()
+
+
+def medir(decodificar, linhas):
+    tempos = []
+    for _ in range(REPETICOES):
+        _limpar_caches()  # cada repetição começa com o cache de conversão vazio
+        gc.collect()
+        inicio = time.perf_counter()
+        decodificar(linhas)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    _limpar_caches()
+    gc.collect()
+    tracemalloc.start()
+    resultado = decodificar(linhas)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return statistics.median(tempos), memoria / 1024
+
+
+def main():
+    agendamentos = gerar_agendamentos(LINHAS)
+    pets = gerar_pets(LINHAS)
+    casos = {
+        'Agendamento (antigo)': (lambda ls: [AgendamentoAntigo.from_supabase(l) for l in ls], agendamentos),
+        'Agendamento.from_supabase': (lambda ls: [Agendamento.from_supabase(l) for l in ls], agendamentos),
+        'Agendamento.lista_de_supabase': (Agendamento.lista_de_supabase, agendamentos),
+        'AgendamentosColunares': (AgendamentosColunares, agendamentos),
+        'Pet (antigo)': (lambda ls: [PetAntigo.from_supabase(l) for l in ls], pets),
+        'Pet.lista_de_supabase': (Pet.lista_de_supabase, pets),
+    }
+    print(f"{LINHAS} linhas | mediana de {REPETICOES} repetições | memória retida pelo resultado\n")
+    for nome, (decodificar, linhas) in casos.items():
+        tempo, memoria_kb = medir(decodificar, linhas)
+        print(f"    {nome:<32} {tempo:8.1f} ms   {memoria_kb:9.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_paralelismo.py
+#
+# Latência dos caminhos convertidos para utils.concorrencia (consultas independentes em
+# paralelo), antes (em série) e depois, contra um stub do cliente Supabase que espera
+# LATENCIA_MS em cada execute() para simular a ida e volta HTTPS até o PostgREST.
+# Os caches em memória são limpos a cada repetição: mede o pior caso (tudo vindo do banco).
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_paralelismo
+#     LATENCIA_MS=80 REPETICOES=10 python -m benchmarks.bench_paralelismo
+
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+from controllers import (
+    agendamento_controller, dados_referencia, horarios_funcionamento, indice_ocupacao, recomendacao_controller,
+)
+from utils import concorrencia
+
+LATENCIA_MS = float(os.getenv('LATENCIA_MS', '40'))
+REPETICOES = int(os.getenv('REPETICOES', '20'))
+
+PRODUTOS = [
+    {'id_produto': i, 'nome_produto': f'Produto {i}', 'url_imagem': '', 'preco': 10.0 + i,
+     'preco_promocional': None, 'data_cadastro': '2025-01-01T00:00:00+00:00', 'quantidade_estoque': i}
+    for i in range(12)
+]
+RESPOSTAS = {
+    'servicos_loja_regras': {'capacidade_simultanea': 2, 'ativo': True},
+    'servicos': {'duracao_media_minutos': 60},
+    'dias_bloqueados': [],
+    'horarios_funcionamento': [],
+    'agendamentos': [],
+    'produtos': PRODUTOS,
+}
+
+
+class _ConsultaStub:
+    """Aceita qualquer encadeamento do PostgREST (filtros, ordem...) e responde com dados fixos."""
+
+    def __init__(self, tabela: str):
+        self.tabela = tabela
+
+    def __getattr__(self, _nome):
+        return lambda *args, **kwargs: self
+
+    @property
+    def not_(self):
+        return self
+
+    def execute(self):
+        time.sleep(LATENCIA_MS / 1000)
+        return SimpleNamespace(data=RESPOSTAS[self.tabela], count=None)
+
+
+class _RpcStub:
+    def __init__(self, parametros: dict):
+        self.parametros = parametros
+
+    def execute(self):
+        time.sleep(LATENCIA_MS / 1000)
+        agendamento = {'id_agendamento': 1, 'status': 'confirmado', 'id_loja': self.parametros['p_id_loja'],
+                       'data_hora_inicio': self.parametros['p_data_hora_inicio'],
+                       'data_hora_fim': self.parametros['p_data_hora_fim']}
+        return SimpleNamespace(data={'status': 'ok', 'agendamento': agendamento})
+
+
+class SupabaseComLatencia:
+    def table(self, tabela: str):
+        return _ConsultaStub(tabela)
+
+    def rpc(self, _nome: str, parametros: dict):
+        return _RpcStub(parametros)
+
+
+def _limpar_caches():
+    dados_referencia.invalidar_tudo()
+    horarios_funcionamento.invalidar()
+    indice_ocupacao.invalidar()
+    recomendacao_controller.invalidar_feed_home()
+
+
+CAMINHOS = {
+    'horários do dia': lambda sb: agendamento_controller.calcular_horarios_disponiveis(sb, 1, 1, '2030-01-15'),
+    'horários do mês': lambda sb: agendamento_controller.calcular_disponibilidade_periodo(
+        sb, 1, 1, '2030-01-01', '2030-01-31'),
+    'novo agendamento': lambda sb: agendamento_controller.criar_novo_agendamento(sb, {
+        'id_cliente': '00000000-0000-0000-0000-000000000001', 'id_pet': 1, 'id_loja': 1, 'id_servico': 1,
+        'data_hora_inicio': '2030-01-15T10:00:00'}),
+    'feed da Home': lambda sb: recomendacao_controller.montar_feed_home(sb),
+}
+
+
+def medir(caminho, supabase) -> float:
+    tempos = []
+    for _ in range(REPETICOES):
+        _limpar_caches()
+        inicio = time.perf_counter()
+        caminho(supabase)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    supabase = SupabaseComLatencia()
+    print(f"Latência simulada por consulta: {LATENCIA_MS:g} ms | {REPETICOES} repetições (mediana)\n")
+    print(f"    {'caminho':<18} {'em série':>12} {'paralelo':>12}")
+    for nome, caminho in CAMINHOS.items():
+        with concorrencia.em_serie():
+            serie = medir(caminho, supabase)
+        paralelo = medir(caminho, supabase)
+        print(f"    {nome:<18} {serie:9.1f} ms {paralelo:9.1f} ms   ({serie / paralelo:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_recomendacao.py
+#
+# Índice de recomendação (controllers/indice_recomendacao.py) com os catálogos sintéticos do
+# bench_busca (1k, 5k e 10k produtos): tempo da construção completa (vetores + k vizinhos
+# de todos), p50/p95 de "semelhantes" e da lista por favoritos, e o custo de uma alteração
+# incremental de produto comparado a reconstruir tudo.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_recomendacao
+#     TAMANHOS=1000,5000 python -m benchmarks.bench_recomendacao
+
+import os
+import random
+import statistics
+import time
+
+from benchmarks.bench_busca import gerar_produtos
+from controllers.indice_recomendacao import IndiceRecomendacao
+
+TAMANHOS = tuple(int(t) for t in os.getenv('TAMANHOS', '1000,5000,10000').split(','))
+REPETICOES = 500
+ALTERACOES = 50
+
+
+def _percentis_us(funcao, repeticoes: int = REPETICOES):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    tempos.sort()
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1]
+
+
+def main():
+    print(f"    {'produtos':>9} {'colunas':>8} {'construção':>11} {'semelhantes p50/p95':>21} "
+          f"{'favoritos p50/p95':>19} {'alteração':>10}")
+    for tamanho in TAMANHOS:
+        produtos = gerar_produtos(tamanho)
+        rnd = random.Random(tamanho)
+        inicio = time.perf_counter()
+        indice = IndiceRecomendacao(produtos)
+        construcao_ms = (time.perf_counter() - inicio) * 1000
+
+        semelhantes = _percentis_us(lambda: indice.similares(rnd.randint(1, tamanho), 8))
+        favoritos = _percentis_us(lambda: indice.personalizados([rnd.randint(1, tamanho) for _ in range(10)], 8))
+
+        inicio = time.perf_counter()
+        for _ in range(ALTERACOES):
+            produto = dict(rnd.choice(produtos), preco=round(rnd.uniform(5, 400), 2))
+            indice.atualizar([produto])
+        alteracao_ms = (time.perf_counter() - inicio) * 1000 / ALTERACOES
+
+        print(f"    {tamanho:>9} {len(indice.colunas):>8} {construcao_ms:>8.0f} ms "
+              f"{semelhantes[0]:>9.1f} / {semelhantes[1]:>6.1f} us {favoritos[0]:>7.1f} / {favoritos[1]:>6.1f} us "
+              f"{alteracao_ms:>7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/concorrencia_agendamento.py
+#
+# Dispara muitas reservas em paralelo para o MESMO horário de um serviço com capacidade 1
+# e confere que exatamente uma é aceita pela função criar_agendamento_atomico.
+# Para comparação, roda também o fluxo antigo (conta conflitos e depois insere).
+#
+# Precisa de um Postgres local (as tabelas são criadas num schema temporário e removidas no fim):
+#     DATABASE_URL=postgresql://postgres@localhost/postgres python -m benchmarks.concorrencia_agendamento
+
+import os
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+import psycopg2
+
+MIGRACOES = [Path(__file__).resolve().parent.parent / 'db' / 'migrations' / nome
+             for nome in ('001_criar_agendamento_atomico.sql', '004_agendamento_dia_bloqueado.sql')]
+SCHEMA = 'teste_concorrencia_agendamento'
+TENTATIVAS = int(os.getenv('TENTATIVAS', '50'))
+INICIO, FIM = '2030-01-15T13:00:00+00:00', '2030-01-15T14:00:00+00:00'
+
+ESQUEMA_MINIMO = f"""
+drop schema if exists {SCHEMA} cascade;
+create schema {SCHEMA};
+set search_path to {SCHEMA};
+create table servicos_loja_regras (
+    id_regra serial primary key,
+    id_loja bigint not null,
+    id_servico bigint not null,
+    capacidade_simultanea integer not null,
+    ativo boolean not null default true
+);
+create table agendamentos (
+    id_agendamento bigserial primary key,
+    id_cliente uuid not null,
+    id_pet bigint,
+    id_loja bigint not null,
+    id_servico bigint not null,
+    data_hora_inicio timestamptz not null,
+    data_hora_fim timestamptz not null,
+    status text not null default 'pendente',
+    observacoes_cliente text,
+    data_criacao timestamptz default now()
+);
+create table dias_bloqueados (
+    id_bloqueio serial primary key,
+    id_loja bigint,
+    data_bloqueada date not null,
+    motivo text
+);
+insert into servicos_loja_regras (id_loja, id_servico, capacidade_simultanea) values (1, 1, 1);
+"""
+
+
+def conectar(dsn):
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f'set search_path to {SCHEMA}')
+    return conn
+
+
+def reserva_atomica(cur):
+    cur.execute(
+        "select criar_agendamento_atomico(%s, null, 1, 1, %s, %s)",
+        (str(uuid.uuid4()), INICIO, FIM),
+    )
+    return cur.fetchone()[0]['status'] == 'ok'
+
+
+def reserva_antiga(cur):
+    """O fluxo anterior: contagem e INSERT em chamadas separadas."""
+    cur.execute(
+        "select count(*) from agendamentos where id_loja = 1 and data_hora_inicio < %s "
+        "and data_hora_fim > %s and status <> 'cancelado'",
+        (FIM, INICIO),
+    )
+    if cur.fetchone()[0] >= 1:
+        return False
+    cur.execute(
+        "insert into agendamentos (id_cliente, id_loja, id_servico, data_hora_inicio, data_hora_fim, status) "
+        "values (%s, 1, 1, %s, %s, 'confirmado')",
+        (str(uuid.uuid4()), INICIO, FIM),
+    )
+    return True
+
+
+def disparar(dsn, reserva):
+    conexoes = [conectar(dsn) for _ in range(TENTATIVAS)]
+    with conexoes[0].cursor() as cur:
+        cur.execute('truncate agendamentos')
+    largada = threading.Barrier(TENTATIVAS)
+    sucessos = []
+
+    def cliente(conn):
+        with conn.cursor() as cur:
+            largada.wait()
+            if reserva(cur):
+                sucessos.append(1)
+
+    threads = [threading.Thread(target=cliente, args=(conn,)) for conn in conexoes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with conexoes[0].cursor() as cur:
+        cur.execute("select count(*) from agendamentos where status <> 'cancelado'")
+        gravados = cur.fetchone()[0]
+    for conn in conexoes:
+        conn.close()
+    return len(sucessos), gravados
+
+
+def main():
+    dsn = os.getenv('DATABASE_URL')
+    if not dsn:
+        sys.exit('Defina DATABASE_URL apontando para um Postgres local.')
+
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(ESQUEMA_MINIMO)
+        for migracao in MIGRACOES:
+            cur.execute(migracao.read_text(encoding='utf-8'))
+
+    try:
+        aceitas, gravadas = disparar(dsn, reserva_antiga)
+        print(f"Fluxo antigo (conta + insere): {aceitas}/{TENTATIVAS} aceitas, {gravadas} gravadas (capacidade 1)")
+
+        aceitas, gravadas = disparar(dsn, reserva_atomica)
+        print(f"criar_agendamento_atomico:     {aceitas}/{TENTATIVAS} aceitas, {gravadas} gravadas (capacidade 1)")
+        if aceitas != 1 or gravadas != 1:
+            sys.exit('FALHA: a reserva atômica deveria aceitar exatamente uma reserva.')
+        print('OK: exatamente uma reserva aceita.')
+    finally:
+        with admin.cursor() as cur:
+            cur.execute(f'drop schema if exists {SCHEMA} cascade')
+        admin.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+# benchmarks/paridade_repositorio.py
+#
+# Confere que DB_BACKEND=postgres devolve o mesmo que DB_BACKEND=supabase: roda cada função de
+# db/repositorio.py pelos dois backends sobre os mesmos dados e compara as linhas (valores e
+# tipos, no formato JSON do PostgREST). O lado Supabase usa o substituto em memória
+# (benchmarks/supabase_memoria.py); o lado Postgres usa o PoolPostgres de db/postgres_client.py
+# num banco temporário. Cobre também o pool: statement_timeout, espera por conexão livre e a
+# troca de conexões derrubadas pelo servidor (com e sem o SELECT 1 de verificação).
+#
+# Precisa de um Postgres local com permissão de CREATE DATABASE (o banco é criado e removido
+# no fim; um schema não serve porque o pool define as próprias 'options' de conexão):
+#     DATABASE_URL=postgresql://postgres@localhost/postgres python -m benchmarks.paridade_repositorio
+#
+# No banco temporário, nome_produto usa a collation "C" (a ordem de texto do substituto) e o
+# fuso das sessões é UTC (o do Supabase).
+
+import os
+import sys
+import uuid
+
+import psycopg2
+from psycopg2.extensions import make_dsn
+
+from benchmarks.supabase_memoria import SupabaseEmMemoria
+from db import postgres_client, repositorio
+from models.pet import Pet
+
+BANCO = 'teste_paridade_repositorio'
+TUTOR_A, TUTOR_B = '0f6f0a5e-3c3b-4d0e-9a55-6a0b7f6c2a11', 'b2d4c1e0-77aa-4c3e-8f00-1d2e3f4a5b6c'
+
+ESQUEMA = """
+create table agendamentos (
+    id_agendamento bigserial primary key,
+    id_cliente uuid,
+    id_pet bigint,
+    id_loja bigint not null,
+    id_servico bigint not null,
+    data_hora_inicio timestamptz not null,
+    data_hora_fim timestamptz not null,
+    status text not null,
+    observacoes_cliente text,
+    data_criacao timestamptz not null
+);
+create table produtos (
+    id_produto bigserial primary key,
+    nome_produto text collate "C" not null,
+    descricao text,
+    marca text,
+    tipo_produto text,
+    tamanho_medida text,
+    preco numeric(10, 2) not null,
+    preco_promocional numeric(10, 2),
+    quantidade_estoque integer,
+    url_imagem text,
+    data_cadastro timestamptz
+);
+create table pets (
+    id_pet bigserial primary key,
+    id_tutor uuid not null,
+    nome_pet text not null,
+    especie text not null,
+    raca text not null,
+    porte text,
+    data_nascimento date,
+    observacoes text,
+    cor text
+);
+"""
+
+STATUS = ('pendente', 'confirmado', 'concluido', 'cancelado')
+
+
+def _agendamentos():
+    """Várias lojas e serviços, inícios repetidos (desempate por id) e frações de segundo."""
+    linhas = []
+    for n in range(1, 41):
+        minuto = (n // 3) * 30  # três agendamentos por início
+        hora, minuto = 9 + minuto // 60, minuto % 60
+        fracao = '.5' if n % 7 == 0 else ''
+        linhas.append({
+            'id_agendamento': n, 'id_cliente': TUTOR_A if n % 2 else TUTOR_B, 'id_pet': None,
+            'id_loja': n % 3 + 1, 'id_servico': n % 4 + 1,
+            'data_hora_inicio': f'2030-01-{15 + n % 2}T{hora:02d}:{minuto:02d}:00{fracao}+00:00',
+            'data_hora_fim': f'2030-01-{15 + n % 2}T{hora + 1:02d}:{minuto:02d}:00{fracao}+00:00',
+            'status': STATUS[n % 4], 'observacoes_cliente': None if n % 5 else f'Obs {n}',
+            'data_criacao': f'2029-12-{1 + n % 28:02d}T10:00:00+00:00',
+        })
+    return linhas
+
+
+def _produtos():
+    """Nomes repetidos (desempate por id) e com vírgula, aspas e parênteses (literais do or=)."""
+    nomes = ['Ração', 'Ração', 'Ração', 'Petisco, frango', 'Bola "grande"', 'Coleira (P)',
+             'Areia', 'Areia', 'Shampoo', 'Brinquedo']
+    return [{
+        'id_produto': n, 'nome_produto': nomes[n % len(nomes)], 'descricao': None, 'marca': 'Golden',
+        'tipo_produto': 'Ração', 'tamanho_medida': '1kg', 'preco': round(9.9 + n * 1.25, 2),
+        'preco_promocional': None if n % 3 else 5.5, 'quantidade_estoque': n * 3, 'url_imagem': '',
+        'data_cadastro': f'2025-01-01T{n % 24:02d}:00:00+00:00',
+    } for n in range(1, 26)]
+
+
+def _pets():
+    return [{
+        'id_pet': n, 'id_tutor': TUTOR_A if n <= 3 else TUTOR_B, 'nome_pet': f'Pet {chr(68 - n % 4)}{n}',
+        'especie': 'Cão', 'raca': 'SRD', 'porte': None if n == 2 else 'M',
+        'data_nascimento': '2020-05-17' if n % 2 else None, 'observacoes': None, 'cor': 'caramelo',
+    } for n in range(1, 6)]
+
+
+DADOS = {'agendamentos': _agendamentos(), 'produtos': _produtos(), 'pets': _pets()}
+
+
+def preparar_postgres(dsn_admin: str) -> str:
+    admin = psycopg2.connect(dsn_admin)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f'drop database if exists {BANCO}')
+        cur.execute(f'create database {BANCO}')
+        cur.execute(f"alter database {BANCO} set timezone to 'UTC'")
+    admin.close()
+
+    dsn = make_dsn(dsn_admin, dbname=BANCO)
+    conn = psycopg2.connect(dsn)
+    with conn, conn.cursor() as cur:
+        cur.execute(ESQUEMA)
+        for tabela, linhas in DADOS.items():
+            colunas = list(linhas[0])
+            cur.executemany(
+                f"insert into {tabela} ({', '.join(colunas)}) values ({', '.join(['%s'] * len(colunas))})",
+                [tuple(linha[c] for c in colunas) for linha in linhas])
+            chave = 'id_' + {'agendamentos': 'agendamento', 'produtos': 'produto', 'pets': 'pet'}[tabela]
+            cur.execute(f"select setval(pg_get_serial_sequence('{tabela}', '{chave}'), (select max({chave}) from {tabela}))")
+    conn.close()
+    return dsn
+
+
+def remover_postgres(dsn_admin: str) -> None:
+    admin = psycopg2.connect(dsn_admin)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f'drop database if exists {BANCO}')
+    admin.close()
+
+
+# --- Comparação ---
+
+falhas = []
+
+
+def _tipado(valor):
+    # Em Python True == 1 e '1' != 1, mas 10 == 10.0: o tipo entra na comparação, com int e
+    # float juntos (números no JSON, como o PostgREST devolve numeric)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return 'numero', valor
+    return type(valor).__name__, valor
+
+
+def _linha_tipada(linha: dict) -> dict:
+    return {coluna: _tipado(valor) for coluna, valor in linha.items()}
+
+
+def conferir(nome: str, supabase_resultado, postgres_resultado, ordenado: bool = True, chave=None) -> None:
+    if isinstance(supabase_resultado, list) and supabase_resultado and isinstance(supabase_resultado[0], dict):
+        if not ordenado:
+            supabase_resultado = sorted(supabase_resultado, key=chave)
+            postgres_resultado = sorted(postgres_resultado, key=chave)
+        iguais = [_linha_tipada(l) for l in supabase_resultado] == [_linha_tipada(l) for l in postgres_resultado]
+    else:
+        iguais = supabase_resultado == postgres_resultado
+    print(f"{'ok   ' if iguais else 'FALHA'} {nome}")
+    if not iguais:
+        falhas.append(nome)
+        print(f"      supabase: {supabase_resultado!r}"[:2000])
+        print(f"      postgres: {postgres_resultado!r}"[:2000])
+
+
+def pelos_dois(funcao, *args, **kwargs):
+    """(resultado com DB_BACKEND=supabase, resultado com DB_BACKEND=postgres)."""
+    resultados = []
+    for backend in ('supabase', 'postgres'):
+        repositorio.DB_BACKEND = backend
+        resultados.append(funcao(SUPABASE, *args, **kwargs))
+    return resultados
+
+
+def _pet(pet):
+    return None if pet is None else (pet.id_pet, pet.to_dict())
+
+
+def _todas_as_paginas(funcao, colunas, limite, chave_cursor) -> list:
+    """Linhas de todas as páginas de uma listagem por chave, seguindo o cursor da última linha."""
+    linhas, apos = [], None
+    while True:
+        pagina = funcao(SUPABASE, colunas, limite, apos)
+        linhas.extend(pagina)
+        if len(pagina) < limite:
+            return linhas
+        apos = chave_cursor(pagina[-1])
+
+
+def paginas_pelos_dois(funcao, colunas, limite, chave_cursor):
+    resultados = []
+    for backend in ('supabase', 'postgres'):
+        repositorio.DB_BACKEND = backend
+        resultados.append(_todas_as_paginas(funcao, colunas, limite, chave_cursor))
+    return resultados
+
+
+def conferir_repositorio() -> None:
+    por_id = lambda l: l['id_agendamento']
+
+    inicio, fim = '2030-01-15T00:00:00+00:00', '2030-01-15T12:00:00+00:00'
+    for loja in (1, 2, 3, 99):
+        conferir(f'listar_agendamentos_ativos loja={loja}',
+                 *pelos_dois(repositorio.listar_agendamentos_ativos, loja, inicio, fim), ordenado=False, chave=por_id)
+    for lojas in ([1, 2], [3], [], [1, 2, 3]):
+        conferir(f'listar_agendamentos_ativos_lojas lojas={lojas}',
+                 *pelos_dois(repositorio.listar_agendamentos_ativos_lojas, lojas, inicio, '2030-01-16T23:00:00+00:00'),
+                 ordenado=False, chave=por_id)
+    conferir('listar_agendamentos_criados_desde',
+             *pelos_dois(repositorio.listar_agendamentos_criados_desde, '2029-12-15T00:00:00+00:00'),
+             ordenado=False, chave=por_id)
+
+    colunas = ['id_agendamento', 'id_loja', 'id_servico', 'status', 'data_hora_inicio', 'data_hora_fim',
+               'observacoes_cliente', 'id_cliente']
+    cursor = lambda l: (l['data_hora_inicio'], l['id_agendamento'])
+    for filtros in ({}, {'id_loja': 1}, {'id_servico': 2}, {'status': ['pendente', 'confirmado']},
+                    {'inicio_utc': '2030-01-15T10:00:00+00:00', 'fim_utc': '2030-01-16T12:00:00+00:00'},
+                    {'id_loja': 2, 'status': ['cancelado'], 'inicio_utc': '2030-01-15T00:00:00+00:00'}):
+        for limite in (1, 4, 50):
+            conferir(f'listar_agendamentos_pagina filtros={filtros} limite={limite}', *paginas_pelos_dois(
+                lambda sb, col, lim, apos: repositorio.listar_agendamentos_pagina(sb, col, filtros, lim, apos),
+                colunas, limite, cursor))
+
+    por_nome_id = lambda l: (l['nome_produto'], l['id_produto'])
+    conferir('listar_produtos', *pelos_dois(repositorio.listar_produtos), ordenado=False, chave=por_nome_id)
+    for limite in (1, 3, 100):
+        conferir(f'listar_produtos_pagina limite={limite}', *paginas_pelos_dois(
+            repositorio.listar_produtos_pagina, ['id_produto', 'nome_produto', 'preco', 'preco_promocional',
+                                                 'data_cadastro'], limite, por_nome_id))
+
+    for pet_id in (1, 2, 999):
+        conferir(f'get_pet_by_id {pet_id}', *[_pet(p) for p in pelos_dois(repositorio.get_pet_by_id, pet_id)])
+    for tutor in (TUTOR_A, TUTOR_B, str(uuid.UUID(int=1))):
+        conferir(f'listar_linhas_pets_por_tutor {tutor}',
+                 *pelos_dois(repositorio.listar_linhas_pets_por_tutor, uuid.UUID(tutor)))
+        conferir(f'listar_pets_por_tutor {tutor}',
+                 *[[_pet(p) for p in pets] for pets in pelos_dois(repositorio.listar_pets_por_tutor, uuid.UUID(tutor))])
+
+    # Inserts: o substituto não preenche as colunas omitidas com NULL; comparam-se as enviadas
+    dados = {'id_tutor': TUTOR_B, 'nome_pet': 'Novo', 'especie': 'Gato', 'raca': 'Persa', 'cor': 'branco'}
+    supabase_linhas, postgres_linhas = pelos_dois(repositorio.inserir_linha_pet, dados)
+    conferir('inserir_linha_pet (colunas enviadas)',
+             [{c: l[c] for c in dados} for l in supabase_linhas], [{c: l[c] for c in dados} for l in postgres_linhas])
+    conferir('inserir_linha_pet (id da sequência)',
+             [type(l['id_pet']) for l in supabase_linhas], [type(l['id_pet']) for l in postgres_linhas])
+    pet = Pet(None, uuid.UUID(TUTOR_A), 'Outro', 'Cão', 'SRD', 'G', '2021-02-03')
+    conferir('salvar_novo_pet', *[p.to_dict() for p in pelos_dois(repositorio.salvar_novo_pet, pet)])
+
+
+# --- Pool ---
+
+def _conferir(nome: str, condicao: bool, detalhe: str = '') -> None:
+    print(f"{'ok   ' if condicao else 'FALHA'} {nome}{' - ' + detalhe if detalhe and not condicao else ''}")
+    if not condicao:
+        falhas.append(nome)
+
+
+def _derrubar(dsn: str, pid: int) -> None:
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute('select pg_terminate_backend(%s)', (pid,))
+    admin.close()
+
+
+def conferir_pool(dsn: str) -> None:
+    pool = postgres_client.PoolPostgres(dsn, minimo=1, maximo=1, statement_timeout_ms=200, timeout_segundos=0.2)
+    try:
+        ajuste = pool.consultar('show statement_timeout')[0]['statement_timeout']
+        _conferir('statement_timeout aplicado na conexão', ajuste == '200ms', ajuste)
+        try:
+            pool.consultar('select pg_sleep(2)')
+            _conferir('consulta longa cancelada pelo statement_timeout', False, 'não levantou')
+        except psycopg2.errors.QueryCanceled:
+            _conferir('consulta longa cancelada pelo statement_timeout', True)
+        _conferir('conexão reaproveitada após o cancelamento',
+                  pool.consultar('select 1 as ok') == [{'ok': 1}] and pool.conexoes_descartadas == 0)
+
+        with pool.conexao():
+            try:
+                pool.consultar('select 1 as ok')
+                _conferir('espera limitada por conexão livre', False, 'não levantou')
+            except TimeoutError:
+                _conferir('espera limitada por conexão livre', True)
+
+        saude = pool.verificar_saude()
+        _conferir('verificar_saude', saude.get('status') == 'OK', repr(saude))
+    finally:
+        pool.fechar()
+
+    # Sem o SELECT 1 (conexão usada há pouco): a consulta falha e a conexão é descartada
+    pool = postgres_client.PoolPostgres(dsn, minimo=1, maximo=1, healthcheck_segundos=3600)
+    try:
+        pool.consultar('select 1 as ok')
+        _derrubar(dsn, pool.consultar('select pg_backend_pid() as pid')[0]['pid'])
+        try:
+            pool.consultar('select 1 as ok')
+            _conferir('conexão derrubada sem verificação: erro na consulta', False, 'não levantou')
+        except psycopg2.Error:
+            _conferir('conexão derrubada sem verificação: erro na consulta', True)
+        _conferir('conexão derrubada sem verificação: descartada e reaberta',
+                  pool.conexoes_descartadas == 1 and pool.consultar('select 1 as ok') == [{'ok': 1}],
+                  f'descartadas={pool.conexoes_descartadas}')
+    finally:
+        pool.fechar()
+
+    # Com o SELECT 1 (toda conexão ociosa é testada): a troca é transparente
+    pool = postgres_client.PoolPostgres(dsn, minimo=1, maximo=1, healthcheck_segundos=0)
+    try:
+        _derrubar(dsn, pool.consultar('select pg_backend_pid() as pid')[0]['pid'])
+        _conferir('conexão derrubada com verificação: troca transparente',
+                  pool.consultar('select 1 as ok') == [{'ok': 1}] and pool.conexoes_descartadas == 1,
+                  f'descartadas={pool.conexoes_descartadas}')
+    finally:
+        pool.fechar()
+
+    repositorio.DB_BACKEND = 'postgres'
+    saude = repositorio.verificar_saude()
+    _conferir('repositorio.verificar_saude', saude.get('backend') == 'postgres' and saude.get('status') == 'OK',
+              repr(saude))
+
+
+SUPABASE = SupabaseEmMemoria()
+
+
+def main():
+    dsn_admin = os.getenv('DATABASE_URL')
+    if not dsn_admin:
+        sys.exit('Defina DATABASE_URL apontando para um Postgres local.')
+
+    for tabela, linhas in DADOS.items():
+        SUPABASE.carregar(tabela, linhas)
+    dsn = preparar_postgres(dsn_admin)
+    postgres_client._pool_padrao = postgres_client.PoolPostgres(dsn, minimo=1, maximo=4)
+    try:
+        conferir_repositorio()
+        conferir_pool(dsn)
+    finally:
+        repositorio.DB_BACKEND = 'supabase'
+        postgres_client.fechar_pool()
+        remover_postgres(dsn_admin)
+
+    if falhas:
+        sys.exit(f'FALHA: {len(falhas)} verificação(ões) divergiram: {", ".join(falhas)}')
+    print('OK: os dois backends devolvem as mesmas linhas.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,648 @@
+# benchmarks/supabase_memoria.py
+#
+# Substituto em memória do Client do Supabase para benchmarks e testes de carga (sem rede e
+# sem banco). Implementa o subconjunto do query builder do PostgREST que o projeto usa:
+#
+#   table(t).select(colunas, count='exact', head=True)
+#           .eq/.neq/.gt/.gte/.lt/.lte/.in_/.is_/.not_.is_/.or_(...)  (or_ com and(...) aninhado)
+#           .order(coluna, desc=False).limit(n).range(a, b).single().maybe_single()
+#           .execute()
+#   table(t).insert(linha|linhas) / .update(dados) / .upsert(linhas, on_conflict=...) / .delete()
+#   rpc('criar_agendamento_atomico', {...})   (mesma regra da função em db/migrations/001)
+#   rpc('atualizar_status_agendamentos' | 'bloquear_periodo', {...})   (db/migrations/003)
+#   escritas em dias_bloqueados/servicos_loja_regras/servicos/lojas/horarios_funcionamento
+#   incrementam versoes_cache (os triggers de db/migrations/005 e 006)
+#
+# Semântica seguida do PostgREST: timestamps comparados como instantes (não como texto),
+# ORDER BY com NULLs por último (asc) / primeiro (desc), single() sem exatamente uma linha
+# levanta ErroPostgrest (PGRST116), maybe_single() sem linhas devolve None (como o
+# postgrest-py 2.x), violação de chave única levanta ErroPostgrest com code '23505'.
+# Um select devolve no máximo max_linhas (1000, o db-max-rows do Supabase), cortando sem
+# avisar: leituras que não paginam perdem linhas aqui como perderiam em produção.
+#
+# Latência: cada execute() espera latencia_ms (+ até jitter_ms aleatórios), fora do lock dos
+# dados, como uma ida e volta HTTPS ao PostgREST. latencia_por_tabela sobrepõe o valor por
+# tabela (ou 'rpc:nome'). As escritas e a RPC rodam sob um lock único (a RPC é atômica).
+#
+#   supabase = SupabaseEmMemoria(latencia_ms=20, jitter_ms=5)
+#   popular(supabase)                      # lojas, serviços, regras, produtos, agendamentos...
+#   cliente.definir_supabase(supabase)     # db/cliente.py: as rotas passam a usar o substituto
+
+import copy
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+CHAVES_PRIMARIAS = {
+    'agendamentos': 'id_agendamento',
+    'produtos': 'id_produto',
+    'dias_bloqueados': 'id_bloqueio',
+    'pets': 'id_pet',
+    'servicos_loja_regras': 'id_regra',
+    'servicos': 'id_servico',
+    'lojas': 'id_loja',
+    'conteudo_cms': 'nome_componente',
+    'perfis': 'id',
+    'versoes_cache': 'escopo',
+}
+
+# Tabelas com trigger de versão (db/migrations/005): tabela -> escopo em versoes_cache
+VERSOES_POR_TABELA = {
+    'dias_bloqueados': 'referencia_agendamento',
+    'servicos_loja_regras': 'referencia_agendamento',
+    'servicos': 'referencia_agendamento',
+    'lojas': 'referencia_agendamento',
+    'horarios_funcionamento': 'referencia_agendamento',
+}
+
+# Restrições UNIQUE (além da chave primária)
+CHAVES_UNICAS = {
+    'dias_bloqueados': [('data_bloqueada', 'id_loja')],
+    'servicos_loja_regras': [('id_loja', 'id_servico')],
+}
+
+
+def _agora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Valores DEFAULT das colunas (aplicados no insert quando a coluna não vem)
+PADROES: Dict[str, Dict[str, Callable[[], object]]] = {
+    'agendamentos': {'data_criacao': _agora_iso, 'status': lambda: 'pendente'},
+    'produtos': {'data_cadastro': _agora_iso},
+}
+
+
+class ErroPostgrest(Exception):
+    """Como postgrest.exceptions.APIError: tem .code (SQLSTATE ou PGRSTxxx) e .message."""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+# --- Comparação de valores (tipos do Postgres a partir de texto) ---
+
+_DATA_ISO = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+
+@lru_cache(maxsize=16384)
+def _instante(texto: str):
+    """Texto ISO -> datetime com fuso (timestamptz) ou date; None se não for data."""
+    try:
+        if len(texto) == 10:
+            return date.fromisoformat(texto)
+        valor = datetime.fromisoformat(texto.replace('Z', '+00:00'))
+        return valor if valor.tzinfo else valor.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _normalizar(valor_coluna, valor_filtro):
+    """Converte o par (valor da linha, valor do filtro) para tipos comparáveis."""
+    if isinstance(valor_coluna, bool) or isinstance(valor_filtro, bool):
+        return str(valor_coluna).lower(), str(valor_filtro).lower()
+    if isinstance(valor_coluna, (int, float)):
+        try:
+            return valor_coluna, float(valor_filtro)
+        except (TypeError, ValueError):
+            return str(valor_coluna), str(valor_filtro)
+    coluna, filtro = str(valor_coluna), str(valor_filtro)
+    if _DATA_ISO.match(coluna) and _DATA_ISO.match(filtro):
+        a, b = _instante(coluna), _instante(filtro)
+        if a is not None and b is not None:
+            if isinstance(a, datetime) != isinstance(b, datetime):  # date x timestamptz
+                a, b = (a if isinstance(a, datetime) else datetime(a.year, a.month, a.day, tzinfo=timezone.utc),
+                        b if isinstance(b, datetime) else datetime(b.year, b.month, b.day, tzinfo=timezone.utc))
+            return a, b
+    return coluna, filtro
+
+
+_OPERADORES = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+
+def _condicao(coluna: str, operador: str, valor) -> Callable[[dict], bool]:
+    if operador == 'is':
+        esperado = None if str(valor).lower() == 'null' else str(valor).lower() == 'true'
+        return lambda linha: linha.get(coluna) is esperado if esperado is None else linha.get(coluna) == esperado
+    if operador == 'in':  # sintaxe do or_(): coluna.in.(a,b,c)
+        condicoes = [_condicao(coluna, 'eq', v.strip().strip('"')) for v in str(valor).strip('()').split(',')]
+        return lambda linha: any(c(linha) for c in condicoes)
+    comparar = _OPERADORES[operador]
+
+    def condicao(linha):
+        atual = linha.get(coluna)
+        if atual is None:
+            return False  # NULL não satisfaz comparações (nem neq)
+        return comparar(*_normalizar(atual, valor))
+    return condicao
+
+
+def _dividir_topo(expressao: str) -> List[str]:
+    """
+    Separa 'a.eq.1,and(b.gt.2,c.lt.3)' nas vírgulas de primeiro nível (respeitando aspas).
+    As aspas e os escapes ficam nas partes: um and(...) aninhado é dividido de novo depois.
+    """
+    partes, atual, profundidade, aspas = [], [], 0, False
+    i = 0
+    while i < len(expressao):
+        caractere = expressao[i]
+        if aspas and caractere == '\\' and i + 1 < len(expressao):
+            atual.append(expressao[i:i + 2])
+            i += 2
+            continue
+        if caractere == '"':
+            aspas = not aspas
+            atual.append(caractere)
+        elif not aspas and caractere == '(':
+            profundidade += 1
+            atual.append(caractere)
+        elif not aspas and caractere == ')':
+            profundidade -= 1
+            atual.append(caractere)
+        elif not aspas and caractere == ',' and profundidade == 0:
+            partes.append(''.join(atual))
+            atual = []
+        else:
+            atual.append(caractere)
+        i += 1
+    partes.append(''.join(atual))
+    return [p.strip() for p in partes if p.strip()]
+
+
+def _expressao_logica(expressao: str) -> Callable[[dict], bool]:
+    """Uma condição da sintaxe do or_(): 'coluna.op.valor', 'and(...)', 'or(...)' ou 'not.' ."""
+    for prefixo, combinar in (('and(', all), ('or(', any)):
+        if expressao.startswith(prefixo) and expressao.endswith(')'):
+            filhas = [_expressao_logica(p) for p in _dividir_topo(expressao[len(prefixo):-1])]
+            return lambda linha: combinar(f(linha) for f in filhas)
+    coluna, operador, valor = expressao.split('.', 2)
+    if operador == 'not':
+        operador, valor = valor.split('.', 1)
+        interna = _condicao(coluna, operador, _sem_aspas(valor))
+        return lambda linha: not interna(linha)
+    return _condicao(coluna, operador, _sem_aspas(valor))
+
+
+def _sem_aspas(valor: str) -> str:
+    """Valor entre aspas do or_() ("a,b" ou "x \\"y\\"") -> texto literal."""
+    if len(valor) >= 2 and valor[0] == valor[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', valor[1:-1])
+    return valor
+
+
+# --- Query builder ---
+
+def _copiar(linha: dict, colunas: Optional[List[str]]) -> dict:
+    itens = linha.items() if colunas is None else ((c, linha.get(c)) for c in colunas)
+    return {c: copy.deepcopy(v) if isinstance(v, (dict, list)) else v for c, v in itens}
+
+
+class _Negacao:
+    """.not_ : a próxima condição é negada."""
+
+    def __init__(self, consulta: 'ConsultaEmMemoria'):
+        self._consulta = consulta
+
+    def __getattr__(self, operador):
+        metodo = getattr(self._consulta, operador)
+
+        def negada(*args, **kwargs):
+            antes = len(self._consulta._filtros)
+            metodo(*args, **kwargs)
+            interna = self._consulta._filtros.pop()
+            assert len(self._consulta._filtros) == antes
+            self._consulta._filtros.append(lambda linha: not interna(linha))
+            return self._consulta
+        return negada
+
+
+class ConsultaEmMemoria:
+    def __init__(self, banco: 'SupabaseEmMemoria', tabela: str):
+        self._banco = banco
+        self._tabela = tabela
+        self._operacao = 'select'
+        self._colunas: Optional[List[str]] = None
+        self._dados = None
+        self._conflito: Optional[List[str]] = None
+        self._filtros: List[Callable[[dict], bool]] = []
+        self._ordem: List[tuple] = []
+        self._limite: Optional[int] = None
+        self._faixa: Optional[tuple] = None
+        self._contar = False
+        self._so_cabecalho = False
+        self._unico: Optional[str] = None  # 'single' | 'maybe_single'
+
+    # Operações
+    def select(self, *colunas: str, count: Optional[str] = None, head: Optional[bool] = None):
+        texto = ','.join(colunas) if colunas else '*'
+        nomes = [c.strip() for c in texto.split(',') if c.strip()]
+        self._colunas = None if '*' in nomes else nomes
+        self._contar = count is not None
+        self._so_cabecalho = bool(head)
+        return self
+
+    def insert(self, dados, **_opcoes):
+        self._operacao, self._dados = 'insert', dados
+        return self
+
+    def upsert(self, dados, on_conflict: Optional[str] = None, **_opcoes):
+        self._operacao, self._dados = 'upsert', dados
+        self._conflito = [c.strip() for c in on_conflict.split(',')] if on_conflict else None
+        return self
+
+    def update(self, dados: dict, **_opcoes):
+        self._operacao, self._dados = 'update', dados
+        return self
+
+    def delete(self, **_opcoes):
+        self._operacao = 'delete'
+        return self
+
+    # Filtros
+    def _filtro(self, condicao):
+        self._filtros.append(condicao)
+        return self
+
+    def eq(self, coluna, valor): return self._filtro(_condicao(coluna, 'eq', valor))
+    def neq(self, coluna, valor): return self._filtro(_condicao(coluna, 'neq', valor))
+    def gt(self, coluna, valor): return self._filtro(_condicao(coluna, 'gt', valor))
+    def gte(self, coluna, valor): return self._filtro(_condicao(coluna, 'gte', valor))
+    def lt(self, coluna, valor): return self._filtro(_condicao(coluna, 'lt', valor))
+    def lte(self, coluna, valor): return self._filtro(_condicao(coluna, 'lte', valor))
+    def is_(self, coluna, valor): return self._filtro(_condicao(coluna, 'is', valor))
+
+    def in_(self, coluna, valores):
+        condicoes = [_condicao(coluna, 'eq', v) for v in valores]
+        return self._filtro(lambda linha: any(c(linha) for c in condicoes))
+
+    def or_(self, expressao: str, **_opcoes):
+        condicoes = [_expressao_logica(p) for p in _dividir_topo(expressao)]
+        return self._filtro(lambda linha: any(c(linha) for c in condicoes))
+
+    @property
+    def not_(self):
+        return _Negacao(self)
+
+    # Modificadores
+    def order(self, coluna: str, desc: bool = False, **_opcoes):
+        self._ordem.append((coluna, desc))
+        return self
+
+    def limit(self, quantidade: int, **_opcoes):
+        self._limite = quantidade
+        return self
+
+    def range(self, inicio: int, fim: int, **_opcoes):
+        self._faixa = (inicio, fim)
+        return self
+
+    def single(self):
+        self._unico = 'single'
+        return self
+
+    def maybe_single(self):
+        self._unico = 'maybe_single'
+        return self
+
+    def execute(self):
+        self._banco._esperar(self._tabela)
+        with self._banco._lock:
+            self._banco._contar_chamada(self._tabela, self._operacao)
+            resposta = getattr(self, f'_executar_{self._operacao}')()
+            if self._operacao != 'select':
+                self._banco._incrementar_versao(self._tabela)
+            return resposta
+
+    # Execução (sob o lock do banco)
+    def _selecionadas(self, linhas: List[dict]) -> List[dict]:
+        return [linha for linha in linhas if all(f(linha) for f in self._filtros)]
+
+    def _resposta(self, linhas: List[dict], contagem: Optional[int] = None):
+        linhas = [_copiar(linha, self._colunas) for linha in linhas]
+        if self._unico:
+            if len(linhas) == 1:
+                return SimpleNamespace(data=linhas[0], count=contagem)
+            if self._unico == 'maybe_single' and not linhas:
+                return None
+            raise ErroPostgrest(f"JSON object requested, multiple (or no) rows returned ({len(linhas)})", 'PGRST116')
+        return SimpleNamespace(data=linhas, count=contagem)
+
+    def _executar_select(self):
+        linhas = self._selecionadas(self._banco.tabela(self._tabela))
+        for coluna, desc in reversed(self._ordem):
+            # Postgres: NULLs por último em ASC e primeiro em DESC
+            nulas = [l for l in linhas if l.get(coluna) is None]
+            valores = [l for l in linhas if l.get(coluna) is not None]
+            valores.sort(key=lambda l: _normalizar(l[coluna], l[coluna])[0], reverse=desc)
+            linhas = nulas + valores if desc else valores + nulas
+        contagem = len(linhas) if self._contar else None
+        if self._faixa:
+            linhas = linhas[self._faixa[0]:self._faixa[1] + 1]
+        if self._limite is not None:
+            linhas = linhas[:self._limite]
+        linhas = linhas[:self._banco.max_linhas]
+        if self._so_cabecalho:
+            return SimpleNamespace(data=[], count=contagem)
+        return self._resposta(linhas, contagem)
+
+    def _executar_insert(self):
+        novas = [self._banco._inserir(self._tabela, dict(d))
+                 for d in (self._dados if isinstance(self._dados, list) else [self._dados])]
+        return self._resposta(novas)
+
+    def _executar_upsert(self):
+        tabela = self._banco.tabela(self._tabela)
+        chave = self._conflito or [CHAVES_PRIMARIAS.get(self._tabela)]
+        resultado = []
+        for dados in (self._dados if isinstance(self._dados, list) else [self._dados]):
+            existente = next((l for l in tabela if all(l.get(c) == dados.get(c) for c in chave)), None)
+            if existente is not None:
+                existente.update(dados)
+                resultado.append(existente)
+            else:
+                resultado.append(self._banco._inserir(self._tabela, dict(dados)))
+        return self._resposta(resultado)
+
+    def _executar_update(self):
+        alteradas = self._selecionadas(self._banco.tabela(self._tabela))
+        for linha in alteradas:
+            linha.update(self._dados)
+        return self._resposta(alteradas)
+
+    def _executar_delete(self):
+        tabela = self._banco.tabela(self._tabela)
+        removidas = self._selecionadas(tabela)
+        ids = {id(l) for l in removidas}
+        tabela[:] = [l for l in tabela if id(l) not in ids]
+        return self._resposta(removidas)
+
+
+class _RpcEmMemoria:
+    def __init__(self, banco: 'SupabaseEmMemoria', nome: str, parametros: dict):
+        self._banco = banco
+        self._nome = nome
+        self._parametros = parametros
+
+    def execute(self):
+        funcao = self._banco.funcoes.get(self._nome)
+        if funcao is None:
+            raise ErroPostgrest(f"Could not find the function public.{self._nome}", 'PGRST202')
+        self._banco._esperar(f'rpc:{self._nome}')
+        with self._banco._lock:
+            self._banco._contar_chamada(f'rpc:{self._nome}', 'rpc')
+            return SimpleNamespace(data=funcao(self._banco, self._parametros), count=None)
+
+
+# --- Funções Postgres (RPC) ---
+
+def _criar_agendamento_atomico(banco: 'SupabaseEmMemoria', p: dict) -> dict:
+    """Mesma regra de db/migrations/001 e 004 (o lock do banco é o advisory lock)."""
+    dia = p.get('p_data_local') or _instante(p['p_data_hora_inicio']).astimezone(timezone.utc).date().isoformat()
+    if any(b['data_bloqueada'] == dia and b.get('id_loja') in (None, int(p['p_id_loja']))
+           for b in banco.tabela('dias_bloqueados')):
+        return {'status': 'bloqueado'}
+    regra = next((r for r in banco.tabela('servicos_loja_regras')
+                  if r['id_loja'] == int(p['p_id_loja']) and r['id_servico'] == int(p['p_id_servico'])), None)
+    if regra is None or not regra.get('ativo'):
+        return {'status': 'indisponivel'}
+    inicio, fim = _instante(p['p_data_hora_inicio']), _instante(p['p_data_hora_fim'])
+    conflitos = sum(
+        1 for a in banco.tabela('agendamentos')
+        if a['id_loja'] == int(p['p_id_loja']) and a.get('status') != 'cancelado'
+        and _instante(a['data_hora_inicio']) < fim and _instante(a['data_hora_fim']) > inicio
+    )
+    if conflitos >= regra['capacidade_simultanea']:
+        return {'status': 'conflito', 'conflitos': conflitos, 'capacidade': regra['capacidade_simultanea']}
+    agendamento = banco._inserir('agendamentos', {
+        'id_cliente': p['p_id_cliente'], 'id_pet': p.get('p_id_pet'), 'id_loja': int(p['p_id_loja']),
+        'id_servico': int(p['p_id_servico']), 'data_hora_inicio': p['p_data_hora_inicio'],
+        'data_hora_fim': p['p_data_hora_fim'], 'status': p.get('p_status') or 'confirmado',
+        'observacoes_cliente': p.get('p_observacoes_cliente'),
+    })
+    return {'status': 'ok', 'agendamento': dict(agendamento)}
+
+
+def _atualizar_status_agendamentos(banco: 'SupabaseEmMemoria', p: dict) -> list:
+    """Mesma regra de atualizar_status_agendamentos (db/migrations/003)."""
+    status, origem = p['p_status'], p.get('p_status_origem')
+    por_id = {a['id_agendamento']: a for a in banco.tabela('agendamentos')}
+    itens = []
+    for id_agendamento in p['p_ids']:
+        linha = por_id.get(int(id_agendamento))
+        item = {'id_agendamento': int(id_agendamento), 'resultado': 'nao_encontrado', 'status_anterior': None,
+                'status': None, 'id_loja': None, 'data_hora_inicio': None, 'data_hora_fim': None}
+        if linha is not None:
+            item['status_anterior'] = item['status'] = linha.get('status')
+            if linha.get('status') == status:
+                item['resultado'] = 'inalterado'
+            elif origem is not None and linha.get('status') not in origem:
+                item['resultado'] = 'ignorado'
+            else:
+                linha['status'] = status
+                item.update(resultado='atualizado', status=status, id_loja=linha['id_loja'],
+                            data_hora_inicio=linha['data_hora_inicio'], data_hora_fim=linha['data_hora_fim'])
+        itens.append(item)
+    return itens
+
+
+def _bloquear_periodo(banco: 'SupabaseEmMemoria', p: dict) -> list:
+    """Mesma regra de bloquear_periodo (db/migrations/003)."""
+    inicio, fim = date.fromisoformat(p['p_data_inicio']), date.fromisoformat(p['p_data_fim'])
+    existentes = {(b.get('id_loja'), b['data_bloqueada']) for b in banco.tabela('dias_bloqueados')}
+    itens = []
+    for id_loja in sorted(int(l) for l in p['p_lojas']) if p.get('p_lojas') else [None]:
+        for i in range((fim - inicio).days + 1):
+            dia = (inicio + timedelta(days=i)).isoformat()
+            item = {'id_loja': id_loja, 'data_bloqueada': dia, 'resultado': 'ja_bloqueado', 'id_bloqueio': None}
+            if (id_loja, dia) not in existentes:
+                linha = banco._inserir('dias_bloqueados', {'id_loja': id_loja, 'data_bloqueada': dia,
+                                                           'motivo': p.get('p_motivo')})
+                item.update(resultado='bloqueado', id_bloqueio=linha['id_bloqueio'])
+            itens.append(item)
+    if any(item['resultado'] == 'bloqueado' for item in itens):
+        banco._incrementar_versao('dias_bloqueados')
+    return itens
+
+
+FUNCOES = {
+    'criar_agendamento_atomico': _criar_agendamento_atomico,
+    'atualizar_status_agendamentos': _atualizar_status_agendamentos,
+    'bloquear_periodo': _bloquear_periodo,
+}
+
+
+# --- Cliente ---
+
+class SupabaseEmMemoria:
+    """Substituto do Client: table(), rpc() e o contador de chamadas por tabela/operação."""
+
+    def __init__(self, latencia_ms: float = 0.0, jitter_ms: float = 0.0,
+                 latencia_por_tabela: Optional[Dict[str, float]] = None, semente: Optional[int] = None,
+                 max_linhas: int = 1000):
+        self.latencia_ms = latencia_ms
+        self.max_linhas = max_linhas
+        self.jitter_ms = jitter_ms
+        self.latencia_por_tabela = dict(latencia_por_tabela or {})
+        self.tabelas: Dict[str, List[dict]] = {}
+        self.funcoes = dict(FUNCOES)
+        self.chamadas: Counter = Counter()  # (tabela, operação) -> execute()s
+        self._sequencias: Counter = Counter()
+        self._lock = threading.RLock()
+        self._aleatorio = random.Random(semente)
+
+    def table(self, nome: str) -> ConsultaEmMemoria:
+        return ConsultaEmMemoria(self, nome)
+
+    def from_(self, nome: str) -> ConsultaEmMemoria:
+        return self.table(nome)
+
+    def rpc(self, nome: str, parametros: Optional[dict] = None, **_opcoes) -> _RpcEmMemoria:
+        return _RpcEmMemoria(self, nome, parametros or {})
+
+    def tabela(self, nome: str) -> List[dict]:
+        return self.tabelas.setdefault(nome, [])
+
+    def carregar(self, nome: str, linhas: List[dict]) -> None:
+        """Substitui o conteúdo da tabela (sem latência; ajusta a sequência da chave primária)."""
+        with self._lock:
+            self.tabelas[nome] = [dict(l) for l in linhas]
+            chave = CHAVES_PRIMARIAS.get(nome)
+            ids = [l[chave] for l in linhas if isinstance(l.get(chave), int)]
+            self._sequencias[nome] = max(ids, default=0)
+
+    @property
+    def total_chamadas(self) -> int:
+        return sum(self.chamadas.values())
+
+    def _contar_chamada(self, tabela: str, operacao: str) -> None:
+        self.chamadas[(tabela, operacao)] += 1
+
+    def _esperar(self, tabela: str) -> None:
+        latencia = self.latencia_por_tabela.get(tabela, self.latencia_ms)
+        if self.jitter_ms:
+            latencia += self._aleatorio.uniform(0, self.jitter_ms)
+        if latencia > 0:
+            time.sleep(latencia / 1000)
+
+    def _incrementar_versao(self, tabela: str) -> None:
+        """Trigger de versão (por instrução) das tabelas de referência."""
+        escopo = VERSOES_POR_TABELA.get(tabela)
+        if escopo is None:
+            return
+        for linha in self.tabela('versoes_cache'):
+            if linha['escopo'] == escopo:
+                linha['versao'] += 1
+                linha['alterado_em'] = _agora_iso()
+
+    def _inserir(self, nome: str, linha: dict) -> dict:
+        """INSERT com DEFAULTs, sequência da chave primária e checagem de UNIQUE (sob o lock)."""
+        tabela = self.tabela(nome)
+        for coluna, padrao in PADROES.get(nome, {}).items():
+            if linha.get(coluna) is None:
+                linha[coluna] = padrao()
+        chave = CHAVES_PRIMARIAS.get(nome)
+        if chave and linha.get(chave) is None:
+            self._sequencias[nome] += 1
+            linha[chave] = self._sequencias[nome]
+        for colunas in ([(chave,)] if chave else []) + CHAVES_UNICAS.get(nome, []):
+            valores = tuple(linha.get(c) for c in colunas)
+            if None in valores:
+                continue  # NULLs são distintos entre si em UNIQUE (padrão do Postgres)
+            if any(tuple(l.get(c) for c in colunas) == valores for l in tabela):
+                raise ErroPostgrest(f'duplicate key value violates unique constraint on {nome} {colunas}', '23505')
+        tabela.append(linha)
+        return linha
+
+
+# --- Dados sintéticos ---
+
+def popular(supabase: SupabaseEmMemoria, lojas: int = 4, servicos: int = 5, produtos: int = 500,
+            clientes: int = 200, agendamentos: int = 2000, dias: int = 30, semente: int = 7,
+            inicio: Optional[date] = None) -> dict:
+    """
+    Carrega um cenário realista: lojas em SP, serviços com duração, regras por loja x serviço,
+    horário de funcionamento (a loja 1 fecha no domingo e tem pausa de almoço; as demais
+    usam o padrão), dias bloqueados, catálogo, perfis, pets, componentes do CMS e agendamentos nos próximos
+    'dias' dias (grade de 30 min, 09:00-18:00 no horário local). Retorna os ids gerados.
+    """
+    rnd = random.Random(semente)
+    inicio = inicio or date.today() + timedelta(days=1)
+    fuso_local = datetime.now().astimezone().tzinfo
+
+    supabase.carregar('lojas', [
+        {'id_loja': i, 'nome_loja': f'Loja {i}', 'latitude': -23.55 + rnd.uniform(-0.2, 0.2),
+         'longitude': -46.63 + rnd.uniform(-0.2, 0.2)} for i in range(1, lojas + 1)])
+    duracoes = {i: rnd.choice((30, 60, 90)) for i in range(1, servicos + 1)}
+    supabase.carregar('servicos', [
+        {'id_servico': i, 'nome_servico': f'Serviço {i}', 'duracao_media_minutos': d} for i, d in duracoes.items()])
+    supabase.carregar('servicos_loja_regras', [
+        {'id_regra': (l - 1) * servicos + s, 'id_loja': l, 'id_servico': s,
+         'capacidade_simultanea': rnd.randint(2, 4), 'ativo': True}
+        for l in range(1, lojas + 1) for s in range(1, servicos + 1)])
+    supabase.carregar('horarios_funcionamento', [
+        {'id_loja': 1, 'dia_semana': dia, 'ativo': dia != 0,
+         'hora_abertura': '09:00:00' if dia else None, 'hora_fechamento': '18:00:00' if dia else None,
+         'hora_inicio_pausa': '12:00:00' if dia else None, 'hora_fim_pausa': '13:00:00' if dia else None}
+        for dia in range(7)])
+    supabase.carregar('dias_bloqueados', [
+        {'id_bloqueio': 1, 'id_loja': None, 'data_bloqueada': (inicio + timedelta(days=6)).isoformat(), 'motivo': 'Feriado'},
+        {'id_bloqueio': 2, 'id_loja': 1, 'data_bloqueada': (inicio + timedelta(days=3)).isoformat(), 'motivo': 'Reforma'},
+    ])
+    supabase.carregar('versoes_cache', [{'escopo': 'referencia_agendamento', 'versao': 0, 'alterado_em': _agora_iso()}])
+
+    marcas = ('Golden', 'Premier', 'Royal Canin', 'Pedigree', 'Whiskas')
+    tipos = ('Ração', 'Petisco', 'Brinquedo', 'Higiene', 'Acessório')
+    supabase.carregar('produtos', [
+        {'id_produto': i, 'nome_produto': f'{rnd.choice(tipos)} {rnd.choice(marcas)} {i}',
+         'descricao': 'Produto para cães e gatos', 'marca': rnd.choice(marcas), 'tipo_produto': rnd.choice(tipos),
+         'tamanho_medida': rnd.choice(('1kg', '3kg', '10kg', 'P', 'M', 'G')),
+         'preco': round(rnd.uniform(10, 300), 2),
+         'preco_promocional': round(rnd.uniform(5, 250), 2) if rnd.random() < 0.2 else None,
+         'quantidade_estoque': rnd.randint(0, 500), 'url_imagem': '',
+         'data_cadastro': (datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)).isoformat()}
+        for i in range(1, produtos + 1)])
+
+    ids_clientes = [str(UUID(int=rnd.getrandbits(128))) for _ in range(clientes)]
+    supabase.carregar('perfis', [{'id': str(UUID(int=0)), 'role': 'admin', 'nome_completo': 'Admin'}] + [
+        {'id': c, 'role': 'cliente', 'nome_completo': f'Cliente {n}'} for n, c in enumerate(ids_clientes, 1)])
+    supabase.carregar('pets', [
+        {'id_pet': n, 'id_tutor': c, 'nome_pet': f'Pet {n}', 'especie': rnd.choice(('Cão', 'Gato')),
+         'raca': 'SRD', 'porte': rnd.choice(('P', 'M', 'G'))} for n, c in enumerate(ids_clientes, 1)])
+    supabase.carregar('conteudo_cms', [
+        {'nome_componente': nome, 'conteudo_json': {'titulo': nome.title(), 'itens': []}}
+        for nome in ('banner', 'rodape', 'destaques', 'faq')])
+
+    linhas = []
+    for n in range(1, agendamentos + 1):
+        dia = inicio + timedelta(days=rnd.randrange(dias))
+        servico = rnd.randint(1, servicos)
+        local = datetime.combine(dia, datetime.min.time()).replace(tzinfo=fuso_local) \
+            + timedelta(hours=9, minutes=30 * rnd.randrange(16))
+        linhas.append({
+            'id_agendamento': n, 'id_cliente': rnd.choice(ids_clientes), 'id_pet': None,
+            'id_loja': rnd.randint(1, lojas), 'id_servico': servico,
+            'data_hora_inicio': local.astimezone(timezone.utc).isoformat(),
+            'data_hora_fim': (local + timedelta(minutes=duracoes[servico])).astimezone(timezone.utc).isoformat(),
+            'status': rnd.choices(('confirmado', 'pendente', 'finalizado', 'cancelado'), (6, 2, 1, 1))[0],
+            'observacoes_cliente': None,
+            'data_criacao': (datetime.now(timezone.utc) - timedelta(days=rnd.randrange(45))).isoformat(),
+        })
+    supabase.carregar('agendamentos', linhas)
+    return {'lojas': list(range(1, lojas + 1)), 'servicos': list(range(1, servicos + 1)),
+            'clientes': ids_clientes, 'produtos': list(range(1, produtos + 1)), 'inicio': inicio, 'dias': dias}
@@ -0,0 +1,173 @@
+# backend/controllers/admin_agendamento_controller.py
+#
+# Listagem de agendamentos do Painel ADM: paginada por chave (data_hora_inicio desc,
+# id_agendamento desc), com filtros de loja, serviço, status e período (índices em
+# db/migrations/002). Os nomes de loja e serviço vêm das tabelas de referência em cache
+# (dados_referencia); os de cliente e pet são buscados em lote só para os ids da página e
+# guardados num cache curto. Nenhum join por linha.
+
+import base64
+import json
+import os
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Optional
+
+from supabase import Client
+
+from db import repositorio
+from models.agendamento import STATUS_AGENDAMENTO
+from utils.cache import CacheTTL
+from utils.concorrencia import em_paralelo
+from .dados_referencia import nomes_lojas, nomes_servicos
+
+CAMPOS_AGENDAMENTO = ('id_agendamento', 'id_cliente', 'id_pet', 'id_loja', 'id_servico', 'data_hora_inicio',
+                      'data_hora_fim', 'status', 'observacoes_cliente', 'data_criacao')
+# Formato compacto: só o necessário para a grade, em arrays (nomes enviados uma vez por página)
+CAMPOS_COMPACTOS = ('id_agendamento', 'id_cliente', 'id_pet', 'id_loja', 'id_servico', 'data_hora_inicio', 'status')
+FORMATOS = ('completo', 'compacto')
+LIMITE_PAGINA_PADRAO = 50
+LIMITE_PAGINA_MAXIMO = 500
+
+TTL_CACHE_NOMES = float(os.getenv('CACHE_NOMES_AGENDA_TTL', '300'))
+TAMANHO_CACHE_NOMES = int(os.getenv('CACHE_NOMES_AGENDA_TAMANHO', '8192'))
+
+_AUSENTE = object()
+
+# Chaves: ('cliente', id) | ('pet', id_pet)
+cache_nomes = CacheTTL('nomes_agenda_admin', TTL_CACHE_NOMES, TAMANHO_CACHE_NOMES)
+
+
+# --- Cursor ---
+
+def codificar_cursor(agendamento: dict) -> str:
+    """Cursor opaco com a chave do último agendamento da página."""
+    chave = json.dumps([agendamento['data_hora_inicio'], agendamento['id_agendamento']])
+    return base64.urlsafe_b64encode(chave.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> tuple:
+    """Inverso de codificar_cursor. ValueError se o cursor for inválido."""
+    try:
+        inicio, id_agendamento = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8'))
+        datetime.fromisoformat(str(inicio).replace('Z', '+00:00'))
+        return str(inicio), int(id_agendamento)
+    except Exception:
+        raise ValueError("Cursor inválido.")
+
+
+# --- Filtros ---
+
+def _dia_local_utc(valor: str, nome: str, dias_depois: int = 0) -> str:
+    """'YYYY-MM-DD' (dia local) -> meia-noite em UTC, no formato ISO do Supabase."""
+    try:
+        dia = datetime.strptime(valor, '%Y-%m-%d').date() + timedelta(days=dias_depois)
+    except (TypeError, ValueError):
+        raise ValueError(f"Formato de '{nome}' inválido. Use YYYY-MM-DD.")
+    return datetime.combine(dia, time.min).astimezone(timezone.utc).isoformat()
+
+
+def montar_filtros(id_loja=None, id_servico=None, status=None, inicio: Optional[str] = None,
+                   fim: Optional[str] = None) -> dict:
+    """
+    Valida os filtros da tela e converte para o formato do repositório.
+    status: lista de status; inicio/fim: dias locais 'YYYY-MM-DD' (fim inclusivo).
+    ValueError para valores inválidos.
+    """
+    filtros = {}
+    try:
+        if id_loja not in (None, ''):
+            filtros['id_loja'] = int(id_loja)
+        if id_servico not in (None, ''):
+            filtros['id_servico'] = int(id_servico)
+    except (TypeError, ValueError):
+        raise ValueError("'loja_id' e 'servico_id' devem ser numéricos.")
+    if status:
+        invalidos = [s for s in status if s not in STATUS_AGENDAMENTO]
+        if invalidos:
+            raise ValueError(f"Status inválido: {', '.join(invalidos)}. Use: {', '.join(STATUS_AGENDAMENTO)}.")
+        filtros['status'] = list(dict.fromkeys(status))
+    if inicio:
+        filtros['inicio_utc'] = _dia_local_utc(inicio, 'inicio')
+    if fim:
+        filtros['fim_utc'] = _dia_local_utc(fim, 'fim', dias_depois=1)
+    if inicio and fim and filtros['fim_utc'] <= filtros['inicio_utc']:
+        raise ValueError("A data final deve ser igual ou posterior à data inicial.")
+    return filtros
+
+
+# --- Nomes de clientes e pets (em lote, por página) ---
+
+def _nomes_em_lote(supabase: Client, tipo: str, tabela: str, coluna_id: str, coluna_nome: str,
+                   ids) -> Dict:
+    """{id: nome} para os ids pedidos; os que faltam no cache vêm em uma consulta."""
+    nomes, faltantes = {}, []
+    for id_ in dict.fromkeys(i for i in ids if i is not None):
+        nome = cache_nomes.get((tipo, id_), _AUSENTE)
+        if nome is _AUSENTE:
+            faltantes.append(id_)
+        else:
+            nomes[id_] = nome
+    if faltantes:
+        res = supabase.table(tabela).select(f'{coluna_id}, {coluna_nome}').in_(coluna_id, faltantes).execute()
+        encontrados = {linha[coluna_id]: linha.get(coluna_nome) for linha in (res.data or [])}
+        for id_ in faltantes:
+            nomes[id_] = encontrados.get(id_)
+            cache_nomes.set((tipo, id_), nomes[id_])
+    return nomes
+
+
+def invalidar_nomes() -> int:
+    return cache_nomes.limpar()
+
+
+# --- Listagem ---
+
+def listar_agendamentos_pagina(supabase: Client, filtros: dict, limite: int = LIMITE_PAGINA_PADRAO,
+                               cursor: Optional[str] = None, formato: str = 'completo') -> dict:
+    """
+    Uma página da listagem do admin, do agendamento mais recente para o mais antigo.
+    completo: {'agendamentos': [{...colunas, nome_loja, nome_servico, nome_cliente, nome_pet}], 'proximo_cursor'}
+    compacto: {'colunas': [...], 'linhas': [[...]], 'lojas': {id: nome}, 'servicos': {...},
+               'clientes': {...}, 'pets': {...}, 'proximo_cursor'}  (nomes só dos ids da página)
+    Lê limite + 1 linhas para saber se existe próxima página sem uma consulta de contagem.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido. Use: {', '.join(FORMATOS)}.")
+    limite = min(max(1, limite), LIMITE_PAGINA_MAXIMO)
+    apos = decodificar_cursor(cursor) if cursor else None
+    colunas = list(CAMPOS_COMPACTOS if formato == 'compacto' else CAMPOS_AGENDAMENTO)
+
+    linhas = repositorio.listar_agendamentos_pagina(supabase, colunas, filtros, limite + 1, apos)
+    tem_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+    proximo_cursor = codificar_cursor(linhas[-1]) if tem_mais else None
+
+    lojas, servicos, clientes, pets = em_paralelo(
+        lambda: nomes_lojas(supabase),
+        lambda: nomes_servicos(supabase),
+        lambda: _nomes_em_lote(supabase, 'cliente', 'perfis', 'id', 'nome_completo', (l['id_cliente'] for l in linhas)),
+        lambda: _nomes_em_lote(supabase, 'pet', 'pets', 'id_pet', 'nome_pet', (l['id_pet'] for l in linhas)),
+    )
+
+    if formato == 'compacto':
+        pagina = lambda mapa, coluna: {str(l[coluna]): mapa.get(l[coluna]) for l in linhas if l[coluna] is not None}
+        return {
+            'colunas': colunas,
+            'linhas': [[linha.get(c) for c in colunas] for linha in linhas],
+            'lojas': pagina(lojas, 'id_loja'),
+            'servicos': pagina(servicos, 'id_servico'),
+            'clientes': pagina(clientes, 'id_cliente'),
+            'pets': pagina(pets, 'id_pet'),
+            'proximo_cursor': proximo_cursor,
+        }
+
+    for linha in linhas:
+        linha['nome_loja'] = lojas.get(linha['id_loja'])
+        linha['nome_servico'] = servicos.get(linha['id_servico'])
+        linha['nome_cliente'] = clientes.get(linha['id_cliente'])
+        linha['nome_pet'] = pets.get(linha['id_pet'])
+    return {'agendamentos': linhas, 'proximo_cursor': proximo_cursor}
+
+
+def estatisticas() -> dict:
+    return cache_nomes.estatisticas()
@@ -0,0 +1,126 @@
+# backend/controllers/agenda_lote.py
+#
+# Operações em lote do Painel ADM sobre a agenda:
+#   - troca de status de vários agendamentos (lista de ids ou os filtros da listagem do admin)
+#   - bloqueio de um período em uma ou várias lojas
+# Cada lote é uma única chamada às funções de db/migrations/003_operacoes_em_lote.sql (uma
+# instrução SQL sobre o conjunto), que devolvem o resultado por item. Os caches afetados
+# (ocupação, estatísticas, dias bloqueados) são atualizados uma vez, ao final do lote.
+
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+from supabase import Client
+
+from db import repositorio
+from models.agendamento import STATUS_AGENDAMENTO
+from . import dados_referencia, estatisticas_controller, indice_ocupacao
+
+LOTE_MAXIMO = 1000          # ids por troca de status
+DIAS_BLOQUEIO_MAXIMO = 366  # dias por bloqueio de período
+
+
+def _resumo(itens: List[dict]) -> dict:
+    """Contagem por resultado ('atualizado': 3, 'nao_encontrado': 1...)."""
+    contagem = {}
+    for item in itens:
+        contagem[item['resultado']] = contagem.get(item['resultado'], 0) + 1
+    return contagem
+
+
+# --- Status ---
+
+def _validar_status(status, campo: str) -> str:
+    status = status.strip().lower() if isinstance(status, str) else None
+    if status not in STATUS_AGENDAMENTO:
+        raise ValueError(f"'{campo}' inválido. Use: {', '.join(STATUS_AGENDAMENTO)}.")
+    return status
+
+
+def ids_por_filtro(supabase: Client, filtros: dict) -> List[int]:
+    """Ids dos agendamentos que atendem os filtros da listagem (ValueError se passar de LOTE_MAXIMO)."""
+    if not filtros:
+        raise ValueError("Informe ao menos um filtro (loja, serviço, status ou período).")
+    linhas = repositorio.listar_agendamentos_pagina(supabase, ['id_agendamento'], filtros, LOTE_MAXIMO + 1)
+    if len(linhas) > LOTE_MAXIMO:
+        raise ValueError(f"O filtro seleciona mais de {LOTE_MAXIMO} agendamentos. Refine o período.")
+    return [int(l['id_agendamento']) for l in linhas]
+
+
+def atualizar_status(supabase: Client, ids: Iterable, status: str,
+                     status_origem: Optional[List[str]] = None) -> dict:
+    """
+    Troca o status de todos os 'ids' em uma instrução. Com 'status_origem', só altera os que
+    estão em um desses status (os demais voltam como 'ignorado').
+    Retorna {'status', 'resumo': {resultado: n}, 'itens': [...por id, na ordem recebida]}.
+    Levanta ValueError para dados inválidos.
+    """
+    status = _validar_status(status, 'status')
+    if status_origem is not None and not isinstance(status_origem, list):
+        raise ValueError("'status_origem' deve ser uma lista de status.")
+    origem = [_validar_status(s, 'status_origem') for s in status_origem] if status_origem else None
+    try:
+        ids = list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        raise ValueError("'ids' deve ser uma lista de ids numéricos.")
+    if not ids:  # Filtro sem resultados
+        return {'status': status, 'resumo': {}, 'itens': []}
+    if len(ids) > LOTE_MAXIMO:
+        raise ValueError(f"Envie no máximo {LOTE_MAXIMO} agendamentos por lote.")
+
+    res = supabase.rpc('atualizar_status_agendamentos', {
+        'p_ids': ids, 'p_status': status, 'p_status_origem': origem,
+    }).execute()
+    itens = res.data or []
+
+    alterados = [item for item in itens if item['resultado'] == 'atualizado']
+    # Só cancelar/reativar muda a ocupação; os demais agendamentos continuam ocupando o slot
+    indice_ocupacao.registrar_agendamentos(
+        item for item in alterados if (item['status_anterior'] == 'cancelado') != (item['status'] == 'cancelado')
+    )
+    for item in alterados:
+        estatisticas_controller.registrar_mudanca_status(item, item['status_anterior'])
+    return {'status': status, 'resumo': _resumo(itens), 'itens': itens}
+
+
+# --- Dias bloqueados ---
+
+def _data(valor, campo: str) -> date:
+    try:
+        return datetime.strptime(valor or '', '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Formato de '{campo}' inválido. Use YYYY-MM-DD.")
+
+
+def bloquear_periodo(supabase: Client, data_inicio: str, data_fim: Optional[str] = None,
+                     lojas_ids: Optional[Iterable] = None, motivo: Optional[str] = None) -> dict:
+    """
+    Bloqueia os dias de data_inicio a data_fim (inclusivo) nas lojas pedidas, ou em todas as
+    lojas (bloqueio geral, id_loja nulo) se 'lojas_ids' for vazio.
+    Retorna {'resumo': {'bloqueado': n, 'ja_bloqueado': m}, 'itens': [...por loja x dia]}.
+    Levanta ValueError para dados inválidos.
+    """
+    inicio = _data(data_inicio, 'data_inicio')
+    fim = _data(data_fim, 'data_fim') if data_fim else inicio
+    if fim < inicio:
+        raise ValueError("A data final deve ser igual ou posterior à data inicial.")
+    if (fim - inicio).days + 1 > DIAS_BLOQUEIO_MAXIMO:
+        raise ValueError(f"Bloqueie no máximo {DIAS_BLOQUEIO_MAXIMO} dias por vez.")
+    if lojas_ids and isinstance(lojas_ids, (str, bytes)):
+        raise ValueError("'lojas' deve ser uma lista de ids numéricos.")
+    try:
+        lojas = list(dict.fromkeys(int(l) for l in lojas_ids)) if lojas_ids else None
+    except (TypeError, ValueError):
+        raise ValueError("'lojas' deve ser uma lista de ids numéricos.")
+    if motivo is not None and not isinstance(motivo, str):
+        raise ValueError("'motivo' deve ser um texto.")
+
+    res = supabase.rpc('bloquear_periodo', {
+        'p_lojas': lojas, 'p_data_inicio': inicio.isoformat(), 'p_data_fim': fim.isoformat(),
+        'p_motivo': motivo or None,
+    }).execute()
+    itens = res.data or []
+    if any(item['resultado'] == 'bloqueado' for item in itens):
+        dados_referencia.invalidar_bloqueios_periodo(inicio, fim, lojas)
+    return {'resumo': _resumo(itens), 'itens': itens}
+
@@ -1,10 +1,20 @@
-from datetime import datetime, time, timedelta, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from supabase import Client
 
+from utils.concorrencia import em_paralelo
+from . import estatisticas_controller, horarios_funcionamento, indice_ocupacao
+from .dados_referencia import (
+    dia_bloqueado, dias_bloqueados, dias_bloqueados_lojas, obter_duracao_servico, obter_regra, regras_do_servico,
+)
+from .grade_horarios import INTERVALO_SLOT_MINUTOS, livres_na_grade
+
 # --- Constantes e Configurações ---
-HORA_INICIO_PADRAO = time(9, 0)  # 09:00
-HORA_FIM_PADRAO = time(18, 0)    # 18:00
-INTERVALO_SLOT_MINUTOS = 30      # A "grade" do calendário (slots de 30 em 30 min)
+# Abertura, fechamento e pausas vêm de 'horarios_funcionamento' (controllers/horarios_funcionamento.py)
+MAX_DIAS_PERIODO = 62            # Limite da consulta por período (dois meses de calendário)
+DIAS_BUSCA_PROXIMO = 14          # Horizonte padrão da busca do próximo horário
+JANELA_BUSCA_PROXIMO = 7         # Dias carregados por rodada de consultas em lote
+LIMITE_PROXIMOS_MAXIMO = 50
 
 def calcular_horarios_disponiveis(supabase: Client, loja_id: int, servico_id: int, data_str: str):
     """
@@ -15,103 +25,177 @@ def calcular_horarios_disponiveis(supabase: Client, loja_id: int, servico_id: in
     except ValueError:
         raise ValueError("Formato de data inválido. Use YYYY-MM-DD.")
 
-    # 1. Verificar Bloqueios para o Dia (Tabela: dias_bloqueados)
-    # Verifica se a loja específica (loja_id) ou TODAS as lojas (id_loja is null) estão bloqueadas
-    bloqueio_res = supabase.table('dias_bloqueados') \
-        .select('id_bloqueio, motivo') \
-        .eq('data_bloqueada', data_str) \
-        .or_(f'id_loja.eq.{loja_id},id_loja.is.null') \
-        .execute()
-
-    if bloqueio_res.data:
+    # 1-5. Bloqueio do dia, regra de capacidade, duração do serviço, horário de funcionamento e
+    # ocupação do dia são independentes: as consultas (quando não estão em cache) rodam em paralelo.
+    bloqueado, regra, duracao_servico, modelo, ocupacao = em_paralelo(
+        # Verifica se a loja específica (loja_id) ou TODAS as lojas (id_loja is null) estão bloqueadas
+        lambda: dia_bloqueado(supabase, loja_id, data_str),
+        lambda: obter_regra(supabase, loja_id, servico_id),
+        lambda: obter_duracao_servico(supabase, servico_id),
+        lambda: horarios_funcionamento.obter_modelo(supabase, loja_id),
+        lambda: indice_ocupacao.obter_ocupacao(supabase, loja_id, data_selecionada),
+    )
+
+    if bloqueado:
         print(f"[Controller] Dia {data_str} bloqueado.")
         return []
 
-    # 2. Buscar Regra de Capacidade (Tabela: servicos_loja_regras)
-    regra_res = supabase.table('servicos_loja_regras') \
-        .select('capacidade_simultanea, ativo') \
-        .eq('id_loja', loja_id) \
-        .eq('id_servico', servico_id) \
-        .maybe_single() \
-        .execute()
+    if not modelo.aberto(data_selecionada):
+        print(f"[Controller] Loja {loja_id} fechada em {data_str}.")
+        return []
 
-    regra = regra_res.data
     if not regra or not regra.get('ativo'):
         print(f"[Controller] Serviço {servico_id} inativo ou sem regra na loja {loja_id}.")
         return []
 
     capacidade = regra['capacidade_simultanea']
 
-    # 3. Buscar Duração do Serviço (Tabela: servicos)
-    servico_res = supabase.table('servicos') \
-        .select('duracao_media_minutos') \
-        .eq('id_servico', servico_id) \
-        .single() \
-        .execute()
-    
-    duracao_servico = servico_res.data.get('duracao_media_minutos')
     if not duracao_servico or duracao_servico <= 0:
         print(f"[Controller] Duração do serviço inválida. Usando {INTERVALO_SLOT_MINUTOS} min.")
         duracao_servico = INTERVALO_SLOT_MINUTOS
 
     print(f"[Controller] Regra: Capacidade={capacidade}, Duração={duracao_servico} min")
+    print(f"[Controller] {len(ocupacao)} agendamentos ativos no dia.")
 
-    # 4. Buscar Agendamentos Existentes (Tabela: agendamentos)
-    # Converte a data selecionada para o início e fim do dia em UTC
-    # Isso garante que peguemos todos os agendamentos do dia, independente do fuso
-    inicio_dia_utc = datetime.combine(data_selecionada, time.min, tzinfo=timezone.utc).isoformat()
-    fim_dia_utc = datetime.combine(data_selecionada, time.max, tzinfo=timezone.utc).isoformat()
-
-    agendamentos_res = supabase.table('agendamentos') \
-        .select('data_hora_inicio, data_hora_fim') \
-        .eq('id_loja', loja_id) \
-        .gte('data_hora_inicio', inicio_dia_utc) \
-        .lte('data_hora_inicio', fim_dia_utc) \
-        .neq('status', 'cancelado') \
-        .execute()
-
-    agendamentos_existentes = agendamentos_res.data or []
-    print(f"[Controller] {len(agendamentos_existentes)} agendamentos encontrados para o dia.")
-
-    # 5. Calcular Slots Livres (Lógica de verificação de capacidade)
-    horarios_disponiveis = []
-    hora_atual = datetime.combine(data_selecionada, HORA_INICIO_PADRAO)
-    hora_fim_dia = datetime.combine(data_selecionada, HORA_FIM_PADRAO)
-
-    while hora_atual < hora_fim_dia:
-        slot_inicio_local = hora_atual
-        slot_fim_local = hora_atual + timedelta(minutes=duracao_servico)
-
-        # Não permite agendar se o serviço terminar depois do horário de fechamento
-        if slot_fim_local.time() > HORA_FIM_PADRAO:
-            break
-
-        agendamentos_conflitantes = 0
-        for ag in agendamentos_existentes:
-            try:
-                # Converte os horários do BD (que estão em UTC) para objetos datetime
-                inicio_ag_utc = datetime.fromisoformat(ag['data_hora_inicio'])
-                fim_ag_utc = datetime.fromisoformat(ag['data_hora_fim'])
-
-                # Converte os horários do slot (que estão locais) para UTC para comparar
-                slot_inicio_utc = slot_inicio_local.astimezone(timezone.utc)
-                slot_fim_utc = slot_fim_local.astimezone(timezone.utc)
-
-                # Verifica sobreposição: (InicioA < FimB) e (FimA > InicioB)
-                if slot_inicio_utc < fim_ag_utc and slot_fim_utc > inicio_ag_utc:
-                    agendamentos_conflitantes += 1
-            
-            except Exception as e_conv:
-                print(f"[Controller] Erro ao processar agendamento existente: {e_conv}")
+    # 6. Calcular Slots Livres (Lógica de verificação de capacidade)
+    return _calcular_slots_livres(data_selecionada, duracao_servico, capacidade, ocupacao, modelo)
+
+
+def _calcular_slots_livres(data_selecionada, duracao_servico: int, capacidade: int, ocupacao, modelo):
+    """
+    Retorna os horários ('HH:MM') do dia com capacidade livre, dentro da grade compilada do
+    horário de funcionamento da loja ('modelo', um ModeloSemana).
+    'ocupacao' é um OcupacaoDia, uma LinhaDoTempo ou a lista crua de agendamentos do dia.
+    """
+    return livres_na_grade(modelo.slots(data_selecionada, duracao_servico), capacidade, ocupacao)
+
+
+def calcular_disponibilidade_periodo(supabase: Client, loja_id: int, servico_id: int, inicio_str: str, fim_str: str):
+    """
+    Calcula os horários disponíveis de todos os dias de um período (ex: o mês do calendário).
+    Lê cada tabela uma única vez para o período inteiro, em vez de repetir as consultas dia a dia.
+    Retorna {'YYYY-MM-DD': {'horarios': [...], 'disponivel': bool}} para cada dia do período.
+    """
+    try:
+        data_inicio = datetime.strptime(inicio_str, '%Y-%m-%d').date()
+        data_fim = datetime.strptime(fim_str, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("Formato de data inválido. Use YYYY-MM-DD.")
+
+    if data_fim < data_inicio:
+        raise ValueError("A data final deve ser igual ou posterior à data inicial.")
+    total_dias = (data_fim - data_inicio).days + 1
+    if total_dias > MAX_DIAS_PERIODO:
+        raise ValueError(f"Período muito longo. Máximo de {MAX_DIAS_PERIODO} dias por consulta.")
+
+    dias = [data_inicio + timedelta(days=i) for i in range(total_dias)]
+    vazio = {dia.isoformat(): {'horarios': [], 'disponivel': False} for dia in dias}
+
+    # 1-5. Dias bloqueados no período, regra, duração, horário de funcionamento e ocupação de
+    # cada dia (os dias fora do índice são carregados em uma única consulta), em paralelo
+    bloqueados, regra, duracao_servico, modelo, ocupacao_por_dia = em_paralelo(
+        lambda: dias_bloqueados(supabase, loja_id, data_inicio, data_fim),
+        lambda: obter_regra(supabase, loja_id, servico_id),
+        lambda: obter_duracao_servico(supabase, servico_id),
+        lambda: horarios_funcionamento.obter_modelo(supabase, loja_id),
+        lambda: indice_ocupacao.obter_ocupacao_periodo(supabase, loja_id, data_inicio, data_fim),
+    )
+
+    if not regra or not regra.get('ativo'):
+        print(f"[Controller] Serviço {servico_id} inativo ou sem regra na loja {loja_id}.")
+        return vazio
+
+    capacidade = regra['capacidade_simultanea']
+
+    if not duracao_servico or duracao_servico <= 0:
+        duracao_servico = INTERVALO_SLOT_MINUTOS
+
+    total_agendamentos = sum(len(ocupacao) for ocupacao in ocupacao_por_dia.values())
+    print(f"[Controller] Período {inicio_str}..{fim_str}: {total_agendamentos} agendamentos, {len(bloqueados)} dias bloqueados.")
+
+    # 6. Slots livres de cada dia
+    resultado = {}
+    for dia in dias:
+        chave = dia.isoformat()
+        if chave in bloqueados:
+            resultado[chave] = {'horarios': [], 'disponivel': False}
+            continue
+        horarios = _calcular_slots_livres(dia, duracao_servico, capacidade, ocupacao_por_dia[dia], modelo)
+        resultado[chave] = {'horarios': horarios, 'disponivel': bool(horarios)}
 
-        # Se o número de agendamentos conflitantes for MENOR que a capacidade, o slot está livre
-        if agendamentos_conflitantes < capacidade:
-            horarios_disponiveis.append(slot_inicio_local.strftime('%H:%M'))
+    return resultado
+
+
+def _parse_a_partir_de(valor) -> datetime:
+    """'YYYY-MM-DD' ou 'YYYY-MM-DDTHH:MM' (horário local); nunca antes de agora."""
+    agora = datetime.now().replace(second=0, microsecond=0)
+    if not valor:
+        return agora
+    try:
+        inicio = datetime.fromisoformat(valor)
+    except ValueError:
+        raise ValueError("Formato de 'a_partir_de' inválido. Use YYYY-MM-DD ou YYYY-MM-DDTHH:MM.")
+    if inicio.tzinfo is not None:
+        inicio = inicio.astimezone().replace(tzinfo=None)
+    return max(inicio, agora)
 
-        # Avança para o próximo slot da "grade"
-        hora_atual += timedelta(minutes=INTERVALO_SLOT_MINUTOS)
 
-    return horarios_disponiveis
+def encontrar_proximos_horarios(supabase: Client, servico_id: int, lojas_ids=None, a_partir_de=None,
+                                limite: int = 5, dias: int = DIAS_BUSCA_PROXIMO):
+    """
+    Primeiros 'limite' horários livres do serviço, em ordem cronológica, procurando em várias
+    lojas (todas com o serviço ativo, se 'lojas_ids' vier vazio) por até 'dias' dias.
+    Os dados vêm em lote: regras e duração uma vez, e para cada janela de JANELA_BUSCA_PROXIMO
+    dias uma consulta de bloqueios e uma de ocupação cobrindo todas as lojas (a busca para
+    na primeira janela que completar o limite).
+    Retorna [{'id_loja', 'data', 'horario', 'data_hora_inicio'}].
+    """
+    if not 1 <= limite <= LIMITE_PROXIMOS_MAXIMO:
+        raise ValueError(f"'limite' deve estar entre 1 e {LIMITE_PROXIMOS_MAXIMO}.")
+    if not 1 <= dias <= MAX_DIAS_PERIODO:
+        raise ValueError(f"'dias' deve estar entre 1 e {MAX_DIAS_PERIODO}.")
+    inicio = _parse_a_partir_de(a_partir_de)
+
+    regras, duracao_servico = em_paralelo(
+        lambda: regras_do_servico(supabase, servico_id),
+        lambda: obter_duracao_servico(supabase, servico_id),
+    )
+    lojas = [int(l) for l in lojas_ids] if lojas_ids else sorted(regras)
+    lojas = [l for l in dict.fromkeys(lojas) if l in regras]
+    if not lojas:
+        print(f"[Controller] Serviço {servico_id} sem regra ativa nas lojas pedidas.")
+        return []
+    if not duracao_servico or duracao_servico <= 0:
+        duracao_servico = INTERVALO_SLOT_MINUTOS
+
+    encontrados = []
+    ultimo_dia = inicio.date() + timedelta(days=dias - 1)
+    janela_inicio = inicio.date()
+    while janela_inicio <= ultimo_dia and len(encontrados) < limite:
+        janela_fim = min(janela_inicio + timedelta(days=JANELA_BUSCA_PROXIMO - 1), ultimo_dia)
+        # Os horários de funcionamento só são consultados na primeira janela (depois, cache)
+        bloqueios, modelos, ocupacao = em_paralelo(
+            lambda: dias_bloqueados_lojas(supabase, lojas, janela_inicio, janela_fim),
+            lambda: horarios_funcionamento.obter_modelos(supabase, lojas),
+            lambda: indice_ocupacao.obter_ocupacao_lojas(supabase, lojas, janela_inicio, janela_fim),
+        )
+        dia = janela_inicio
+        while dia <= janela_fim and len(encontrados) < limite:
+            chave = dia.isoformat()
+            minimo = inicio.strftime('%H:%M') if dia == inicio.date() else ''
+            candidatos = []
+            for loja_id in lojas:
+                if chave in bloqueios[loja_id]:
+                    continue
+                livres = _calcular_slots_livres(dia, duracao_servico, regras[loja_id]['capacidade_simultanea'],
+                                                ocupacao[loja_id][dia], modelos[loja_id])
+                candidatos.extend((horario, loja_id) for horario in livres if horario >= minimo)
+            for horario, loja_id in sorted(candidatos)[:limite - len(encontrados)]:
+                encontrados.append({'id_loja': loja_id, 'data': chave, 'horario': horario,
+                                    'data_hora_inicio': f'{chave}T{horario}'})
+            dia += timedelta(days=1)
+        janela_inicio = janela_fim + timedelta(days=1)
+    return encontrados
 
 
 def criar_novo_agendamento(supabase: Client, data: dict):
@@ -121,13 +205,14 @@ def criar_novo_agendamento(supabase: Client, data: dict):
     """
     try:
         # 1. Validação inicial e parsing dos dados vindos do front-end
-        required_fields = ['id_cliente', 'id_pet', 'id_loja', 'id_servico', 'data_hora_inicio']
-        if not all(field in data for field in required_fields):
-            missing = [f for f in required_fields if f not in data]
+        # id_pet é opcional (serviços agendados sem pet cadastrado)
+        required_fields = ['id_cliente', 'id_loja', 'id_servico', 'data_hora_inicio']
+        if not all(data.get(field) is not None for field in required_fields):
+            missing = [f for f in required_fields if data.get(f) is None]
             raise ValueError(f"Dados incompletos. Campos faltando: {', '.join(missing)}")
 
         id_cliente = data['id_cliente']
-        id_pet = int(data['id_pet'])
+        id_pet = int(data['id_pet']) if data.get('id_pet') is not None else None
         loja_id = int(data['id_loja'])
         servico_id = int(data['id_servico'])
         
@@ -135,64 +220,84 @@ def criar_novo_agendamento(supabase: Client, data: dict):
         data_hora_inicio_local_str = data['data_hora_inicio']
         data_hora_inicio_local = datetime.fromisoformat(data_hora_inicio_local_str)
 
-        # 2. Buscar duração e calcular fim
-        servico_res = supabase.table('servicos').select('duracao_media_minutos').eq('id_servico', servico_id).single().execute()
-        duracao = servico_res.data.get('duracao_media_minutos')
+        # 2. Buscar duração (e checar bloqueio do dia e horário da loja, em paralelo) e calcular fim
+        duracao, bloqueado, modelo = em_paralelo(
+            lambda: obter_duracao_servico(supabase, servico_id),
+            lambda: dia_bloqueado(supabase, loja_id, data_hora_inicio_local.date().isoformat()),
+            lambda: horarios_funcionamento.obter_modelo(supabase, loja_id),
+        )
+        if bloqueado:
+            raise ValueError("Não há atendimento nesta loja no dia escolhido.")
         if not duracao:
             duracao = INTERVALO_SLOT_MINUTOS # Fallback
+        if not modelo.permite(data_hora_inicio_local, duracao):
+            raise ValueError("Horário fora do expediente da loja.")
             
         data_hora_fim_local = data_hora_inicio_local + timedelta(minutes=duracao)
 
-        # 3. RE-VERIFICAÇÃO DE DISPONIBILIDADE (Mesma lógica do GET)
-        regra_res = supabase.table('servicos_loja_regras').select('capacidade_simultanea').eq('id_loja', loja_id).eq('id_servico', servico_id).single().execute()
-        capacidade = regra_res.data['capacidade_simultanea']
-
-        # Converte o slot local para UTC para consultar o banco
+        # Converte o slot local para UTC (o banco guarda em UTC)
         inicio_utc = data_hora_inicio_local.astimezone(timezone.utc)
         fim_utc = data_hora_fim_local.astimezone(timezone.utc)
-        
-        inicio_utc_str = inicio_utc.isoformat()
-        fim_utc_str = fim_utc.isoformat()
-
-        # Consulta quantos agendamentos JÁ EXISTEM que conflitam com este novo slot
-        agendamentos_conflitantes_res = supabase.table('agendamentos') \
-            .select('id_agendamento', count='exact') \
-            .eq('id_loja', loja_id) \
-            .lt('data_hora_inicio', fim_utc_str) \
-            .gt('data_hora_fim', inicio_utc_str) \
-            .neq('status', 'cancelado') \
-            .execute()
-        
-        agendamentos_conflitantes = agendamentos_conflitantes_res.count or 0
-
-        if agendamentos_conflitantes >= capacidade:
-            raise ValueError(f"Desculpe, o horário {data_hora_inicio_local.strftime('%H:%M')} foi reservado por outra pessoa.")
 
-        # 4. Inserir no banco (Usando a tabela 'agendamentos')
+        # 3. Verificação de capacidade + INSERT atômicos (uma única chamada ao banco)
         insert_data = {
             'id_cliente': id_cliente,
             'id_pet': id_pet,
             'id_loja': loja_id,
             'id_servico': servico_id,
-            'data_hora_inicio': inicio_utc_str, # Salva em UTC
-            'data_hora_fim': fim_utc_str,       # Salva em UTC
+            'data_hora_inicio': inicio_utc.isoformat(), # Salva em UTC
+            'data_hora_fim': fim_utc.isoformat(),       # Salva em UTC
             'status': 'confirmado', # Ou 'pendente' se você preferir
             'observacoes_cliente': data.get('observacoes_cliente')
         }
+        agendamento = reservar_horario(supabase, insert_data, data_hora_inicio_local.strftime('%H:%M'),
+                                       data_hora_inicio_local.date().isoformat())
 
-        # Executa o INSERT na tabela correta
-        insert_res = supabase.table('agendamentos').insert(insert_data).execute()
-        
-        if insert_res.data:
-            print(f"[Controller] Agendamento inserido com sucesso para cliente {id_cliente}.")
-            return insert_res.data[0]
-        else:
-            raise Exception(f"Erro no Supabase ao salvar: {insert_res.error}")
-
-    except ValueError as ve: # Erros de negócio (ex: slot ocupado)
-        raise ve
+        print(f"[Controller] Agendamento inserido com sucesso para cliente {id_cliente}.")
+        indice_ocupacao.registrar_agendamento(agendamento)
+        estatisticas_controller.registrar_agendamento_novo(agendamento)
+        return agendamento
+
+    except (ValueError, TimeoutError): # Erros de negócio (ex: slot ocupado) e banco lento
+        raise
     except Exception as e:   # Erros inesperados (ex: falha de banco)
         import traceback
         print(f"[Controller] ERRO FATAL ao criar agendamento: {e}")
         traceback.print_exc()
-        raise Exception("Erro interno ao processar agendamento.")
\ No newline at end of file
+        raise Exception("Erro interno ao processar agendamento.")
+
+
+def reservar_horario(supabase: Client, insert_data: dict, horario_label: str,
+                     data_local: Optional[str] = None) -> dict:
+    """
+    Verifica dia bloqueado e capacidade e insere o agendamento em uma única transação, via a
+    função Postgres 'criar_agendamento_atomico' (db/migrations/001 e 004).
+    Evita que duas reservas simultâneas passem pela contagem e lotem o mesmo horário, e que
+    um worker com o cache de dias bloqueados desatualizado aceite um dia recém-fechado.
+    data_local: dia local ('YYYY-MM-DD') do início, o mesmo dos bloqueios.
+    Levanta ValueError (conflito de negócio) se o dia está bloqueado, o horário lotou ou o
+    serviço está inativo.
+    """
+    res = supabase.rpc('criar_agendamento_atomico', {
+        'p_id_cliente': insert_data['id_cliente'],
+        'p_id_pet': insert_data.get('id_pet'),
+        'p_id_loja': insert_data['id_loja'],
+        'p_id_servico': insert_data['id_servico'],
+        'p_data_hora_inicio': insert_data['data_hora_inicio'],
+        'p_data_hora_fim': insert_data['data_hora_fim'],
+        'p_status': insert_data.get('status', 'confirmado'),
+        'p_observacoes_cliente': insert_data.get('observacoes_cliente'),
+        'p_data_local': data_local,
+    }).execute()
+
+    resultado = res.data or {}
+    status = resultado.get('status')
+    if status == 'ok':
+        return resultado['agendamento']
+    if status == 'conflito':
+        raise ValueError(f"Desculpe, o horário {horario_label} foi reservado por outra pessoa.")
+    if status == 'indisponivel':
+        raise ValueError("Este serviço não está disponível nesta loja.")
+    if status == 'bloqueado':
+        raise ValueError("Não há atendimento nesta loja no dia escolhido.")
+    raise Exception(f"Resposta inesperada de criar_agendamento_atomico: {resultado}")
@@ -0,0 +1,121 @@
+# backend/controllers/cms_controller.py
+#
+# Componentes de conteúdo (tabela 'conteudo_cms') com cache em memória por processo.
+# O conteúdo só muda pelo PUT do editor de CMS, que grava no banco e atualiza o cache na
+# mesma hora (write-through). Cada componente tem uma versão: uma leitura que começou antes
+# de um PUT não sobrescreve o valor novo ao terminar.
+#
+# Componentes inexistentes também ficam em cache (como None) para não consultar o banco a
+# cada página que pede uma seção ainda não cadastrada.
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from supabase import Client
+
+from utils.cache import CacheTTL
+
+TTL_CACHE_CMS = float(os.getenv('CACHE_CMS_TTL', '600'))
+TAMANHO_CACHE_CMS = int(os.getenv('CACHE_CMS_TAMANHO', '512'))
+MAX_COMPONENTES_POR_LOTE = 50
+_AUSENTE = object()
+
+cache_cms = CacheTTL('cms', TTL_CACHE_CMS, TAMANHO_CACHE_CMS)
+_versoes: Dict[str, int] = {}
+_geracao = 0  # incrementada quando o cache inteiro é descartado
+_lock_versoes = threading.Lock()
+
+
+def _versao(nome: str) -> tuple:
+    return _geracao, _versoes.get(nome, 0)
+
+
+def _guardar_se_atual(nome: str, versao: tuple, conteudo) -> None:
+    with _lock_versoes:
+        if _versao(nome) == versao:
+            cache_cms.set(nome, conteudo)
+
+
+def _nova_versao(nome: str) -> tuple:
+    with _lock_versoes:
+        _versoes[nome] = _versoes.get(nome, 0) + 1
+        return _versao(nome)
+
+
+# --- Leituras ---
+
+def obter_componentes(supabase: Client, nomes: Iterable[str]) -> Dict[str, Optional[dict]]:
+    """
+    Conteúdo de vários componentes: {nome: conteudo_json ou None}.
+    Os que não estão em cache são buscados juntos, em uma única consulta.
+    """
+    resultado, faltantes = {}, []
+    for nome in dict.fromkeys(nomes):
+        conteudo = cache_cms.get(nome, _AUSENTE)
+        if conteudo is _AUSENTE:
+            faltantes.append(nome)
+        else:
+            resultado[nome] = conteudo
+
+    if faltantes:
+        versoes = {nome: _versao(nome) for nome in faltantes}
+        res = supabase.table('conteudo_cms') \
+            .select('nome_componente, conteudo_json') \
+            .in_('nome_componente', faltantes) \
+            .execute()
+        encontrados = {linha['nome_componente']: linha['conteudo_json'] for linha in (res.data or [])}
+        for nome in faltantes:
+            resultado[nome] = encontrados.get(nome)
+            _guardar_se_atual(nome, versoes[nome], resultado[nome])
+    return resultado
+
+
+def obter_componente(supabase: Client, nome: str) -> Optional[dict]:
+    """Conteúdo de um componente, ou None se não existir."""
+    return obter_componentes(supabase, [nome])[nome]
+
+
+# --- Escrita ---
+
+def salvar_componente(supabase: Client, nome: str, conteudo: dict) -> dict:
+    """Upsert do componente e atualiza o cache. Retorna a linha gravada."""
+    res = supabase.table('conteudo_cms') \
+        .upsert({'nome_componente': nome, 'conteudo_json': conteudo}, on_conflict='nome_componente') \
+        .execute()
+    if not res.data:
+        raise Exception("Nenhum dado retornado após upsert.")
+    linha = res.data[0]
+    versao = _nova_versao(nome)
+    _guardar_se_atual(nome, versao, linha.get('conteudo_json', conteudo))
+    return linha
+
+
+# --- Manutenção ---
+
+def aquecer_cache(supabase: Client) -> int:
+    """Carrega todos os componentes no cache (na subida do worker). Retorna quantos carregou."""
+    geracao, versoes = _geracao, dict(_versoes)
+    res = supabase.table('conteudo_cms').select('nome_componente, conteudo_json').execute()
+    linhas: List[dict] = res.data or []
+    for linha in linhas:
+        nome = linha['nome_componente']
+        _guardar_se_atual(nome, (geracao, versoes.get(nome, 0)), linha['conteudo_json'])
+    print(f"[CMS] Cache aquecido com {len(linhas)} componentes.")
+    return len(linhas)
+
+
+def invalidar(nome: Optional[str] = None) -> int:
+    """Descarta um componente (ou todos) do cache; serão relidos do banco no próximo acesso."""
+    global _geracao
+    if nome is None:
+        with _lock_versoes:
+            _geracao += 1
+        return cache_cms.limpar()
+    _nova_versao(nome)
+    return int(cache_cms.invalidar(nome))
+
+
+def estatisticas() -> dict:
+    return cache_cms.estatisticas()
+
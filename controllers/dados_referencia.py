@@ -0,0 +1,284 @@
+# backend/controllers/dados_referencia.py
+#
+# Dados de referência do agendamento (regras de capacidade, duração dos serviços e dias
+# bloqueados) com cache read-through. Essas tabelas só mudam quando um admin edita em
+# gestao_horarios, por isso as rotas de escrita do admin chamam as funções invalidar_*.
+#
+# Entre workers: as funções invalidar_* só alcançam o processo que atendeu o admin. Os demais
+# leem a versão compartilhada (tabela versoes_cache, incrementada por trigger a cada escrita
+# nessas tabelas e em horarios_funcionamento; db/migrations/005 e 006) no máximo a cada
+# INTERVALO_VERSAO segundos e descartam o cache inteiro quando ela muda (junto com os caches
+# registrados em acompanhar_versao, como o de horários de funcionamento). Leituras que
+# começaram antes de uma invalidação não guardam o resultado (CacheTTL.geracao). A reserva em si não depende do cache: criar_agendamento_atomico
+# confere regra e dia bloqueado dentro da transação (db/migrations/004).
+
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from supabase import Client
+
+from utils.cache import CacheTTL
+
+TTL_CACHE_REFERENCIA = float(os.getenv('CACHE_REFERENCIA_TTL', '300'))
+TAMANHO_CACHE_REFERENCIA = int(os.getenv('CACHE_REFERENCIA_TAMANHO', '4096'))
+# 0 = lê a versão a cada uso do cache
+INTERVALO_VERSAO = float(os.getenv('CACHE_REFERENCIA_VERSAO_SEGUNDOS', '1'))
+ESCOPO_VERSAO = 'referencia_agendamento'
+
+# Chaves: ('regra', loja_id, servico_id) | ('regras_servico', servico_id) | ('duracao', servico_id)
+#         | ('bloqueio', loja_id, 'YYYY-MM-DD') | ('nomes', 'lojas' | 'servicos')
+cache_referencia = CacheTTL('referencia_agendamento', TTL_CACHE_REFERENCIA, TAMANHO_CACHE_REFERENCIA)
+# Caches limpos juntos quando a versão compartilhada muda (acompanhar_versao)
+_caches_versionados: List[CacheTTL] = [cache_referencia]
+
+_versao_banco: Optional[int] = None
+_versao_lida_em = float('-inf')
+_versao_indisponivel = False
+_lock_versao = threading.Lock()
+verificacoes_versao = 0
+trocas_versao = 0
+
+
+# --- Versão entre processos ---
+
+def acompanhar_versao(cache: CacheTTL) -> None:
+    """Inclui outro cache derivado das mesmas tabelas (ex: horários de funcionamento) na troca de versão."""
+    if cache not in _caches_versionados:
+        _caches_versionados.append(cache)
+
+
+def sincronizar_versao(supabase: Client) -> None:
+    """Descarta os caches se a versão do banco mudou desde a última leitura (outro worker/JS do admin)."""
+    global _versao_banco, _versao_lida_em, _versao_indisponivel, verificacoes_versao, trocas_versao
+    if time.monotonic() - _versao_lida_em < INTERVALO_VERSAO:
+        return
+    with _lock_versao:
+        if time.monotonic() - _versao_lida_em < INTERVALO_VERSAO:
+            return
+        try:
+            res = supabase.table('versoes_cache').select('versao').eq('escopo', ESCOPO_VERSAO).maybe_single().execute()
+            versao = res.data.get('versao') if res and res.data else None
+            _versao_indisponivel = False
+        except Exception as e:
+            # Sem a migração 005: segue só com o TTL (e avisa uma vez)
+            if not _versao_indisponivel:
+                print(f"[DadosReferencia] Versão compartilhada indisponível, usando só o TTL: {e}")
+            _versao_indisponivel = True
+            _versao_lida_em = time.monotonic()
+            return
+        _versao_lida_em = time.monotonic()
+        verificacoes_versao += 1
+        if versao != _versao_banco:
+            if _versao_banco is not None:
+                trocas_versao += 1
+            for cache in _caches_versionados:
+                cache.limpar()
+            _versao_banco = versao
+
+
+# --- Leituras (read-through) ---
+
+def obter_regra(supabase: Client, loja_id: int, servico_id: int) -> Optional[dict]:
+    """Regra de capacidade ({'capacidade_simultanea', 'ativo'}) do serviço na loja, ou None."""
+    sincronizar_versao(supabase)
+    def carregar():
+        res = supabase.table('servicos_loja_regras') \
+            .select('capacidade_simultanea, ativo') \
+            .eq('id_loja', loja_id) \
+            .eq('id_servico', servico_id) \
+            .maybe_single() \
+            .execute()
+        return res.data if res else None
+
+    return cache_referencia.obter_ou_carregar(('regra', int(loja_id), int(servico_id)), carregar)
+
+
+def regras_do_servico(supabase: Client, servico_id: int) -> Dict[int, dict]:
+    """Regras ativas do serviço em todas as lojas ({id_loja: regra}), em uma consulta."""
+    sincronizar_versao(supabase)
+    def carregar():
+        res = supabase.table('servicos_loja_regras') \
+            .select('id_loja, capacidade_simultanea, ativo') \
+            .eq('id_servico', servico_id) \
+            .eq('ativo', True) \
+            .execute()
+        return {int(r['id_loja']): r for r in (res.data or [])}
+
+    return cache_referencia.obter_ou_carregar(('regras_servico', int(servico_id)), carregar)
+
+
+def obter_duracao_servico(supabase: Client, servico_id: int) -> Optional[int]:
+    """Duração média (minutos) do serviço, ou None se não cadastrada."""
+    sincronizar_versao(supabase)
+    def carregar():
+        res = supabase.table('servicos') \
+            .select('duracao_media_minutos') \
+            .eq('id_servico', servico_id) \
+            .maybe_single() \
+            .execute()
+        return res.data.get('duracao_media_minutos') if res and res.data else None
+
+    return cache_referencia.obter_ou_carregar(('duracao', int(servico_id)), carregar)
+
+
+def nomes_lojas(supabase: Client) -> Dict[int, str]:
+    """{id_loja: nome_loja} de todas as lojas (tabela pequena, lida inteira)."""
+    sincronizar_versao(supabase)
+    def carregar():
+        res = supabase.table('lojas').select('id_loja, nome_loja').execute()
+        return {int(l['id_loja']): l.get('nome_loja') for l in (res.data or [])}
+
+    return cache_referencia.obter_ou_carregar(('nomes', 'lojas'), carregar)
+
+
+def nomes_servicos(supabase: Client) -> Dict[int, str]:
+    """{id_servico: nome_servico} de todos os serviços."""
+    sincronizar_versao(supabase)
+    def carregar():
+        res = supabase.table('servicos').select('id_servico, nome_servico').execute()
+        return {int(s['id_servico']): s.get('nome_servico') for s in (res.data or [])}
+
+    return cache_referencia.obter_ou_carregar(('nomes', 'servicos'), carregar)
+
+
+def dias_bloqueados(supabase: Client, loja_id: int, data_inicio: date, data_fim: date) -> Set[str]:
+    """
+    Datas ('YYYY-MM-DD') bloqueadas para a loja (ou para todas as lojas) no período.
+    Se todas as datas já estiverem em cache não há consulta; senão o período inteiro é
+    lido em uma única consulta e cada dia é guardado individualmente.
+    """
+    loja_id = int(loja_id)
+    datas = [(data_inicio + timedelta(days=i)).isoformat() for i in range((data_fim - data_inicio).days + 1)]
+    sincronizar_versao(supabase)
+    geracao = cache_referencia.geracao
+
+    bloqueadas = set()
+    for data_str in datas:
+        bloqueado = cache_referencia.get(('bloqueio', loja_id, data_str))
+        if bloqueado is None:
+            break
+        if bloqueado:
+            bloqueadas.add(data_str)
+    else:
+        return bloqueadas
+
+    res = supabase.table('dias_bloqueados') \
+        .select('data_bloqueada') \
+        .gte('data_bloqueada', datas[0]) \
+        .lte('data_bloqueada', datas[-1]) \
+        .or_(f'id_loja.eq.{loja_id},id_loja.is.null') \
+        .execute()
+    bloqueadas = {b['data_bloqueada'] for b in (res.data or [])}
+    for data_str in datas:
+        cache_referencia.set(('bloqueio', loja_id, data_str), data_str in bloqueadas, geracao=geracao)
+    return bloqueadas
+
+
+def dias_bloqueados_lojas(supabase: Client, lojas_ids: Iterable[int], data_inicio: date,
+                          data_fim: date) -> Dict[int, Set[str]]:
+    """
+    Como dias_bloqueados, para várias lojas: as lojas sem o período completo em cache são
+    lidas juntas em uma única consulta (bloqueios delas e os que valem para todas as lojas).
+    """
+    datas = [(data_inicio + timedelta(days=i)).isoformat() for i in range((data_fim - data_inicio).days + 1)]
+    sincronizar_versao(supabase)
+    geracao = cache_referencia.geracao
+    resultado, faltantes = {}, []
+    for loja_id in dict.fromkeys(int(l) for l in lojas_ids):
+        marcados = [cache_referencia.get(('bloqueio', loja_id, data_str)) for data_str in datas]
+        if None in marcados:
+            faltantes.append(loja_id)
+        else:
+            resultado[loja_id] = {data_str for data_str, bloqueado in zip(datas, marcados) if bloqueado}
+    if not faltantes:
+        return resultado
+
+    res = supabase.table('dias_bloqueados') \
+        .select('id_loja, data_bloqueada') \
+        .gte('data_bloqueada', datas[0]) \
+        .lte('data_bloqueada', datas[-1]) \
+        .or_(f"id_loja.in.({','.join(str(l) for l in faltantes)}),id_loja.is.null") \
+        .execute()
+    for loja_id in faltantes:
+        bloqueadas = {b['data_bloqueada'] for b in (res.data or [])
+                      if b.get('id_loja') is None or int(b['id_loja']) == loja_id}
+        for data_str in datas:
+            cache_referencia.set(('bloqueio', loja_id, data_str), data_str in bloqueadas, geracao=geracao)
+        resultado[loja_id] = bloqueadas
+    return resultado
+
+
+def dia_bloqueado(supabase: Client, loja_id: int, data_str: str) -> bool:
+    """True se o dia estiver bloqueado para a loja (ou para todas as lojas)."""
+    dia = datetime.strptime(data_str, '%Y-%m-%d').date()
+    return data_str in dias_bloqueados(supabase, loja_id, dia, dia)
+
+
+# --- Invalidação (chamada pelas rotas de escrita do admin) ---
+
+def invalidar_regra(loja_id: Optional[int] = None, servico_id: Optional[int] = None) -> int:
+    """Remove regras do cache (e as listas por serviço que as contêm). Sem argumentos, remove todas."""
+    return cache_referencia.invalidar_onde(
+        lambda chave: (chave[0] == 'regra'
+                       and (loja_id is None or chave[1] == int(loja_id))
+                       and (servico_id is None or chave[2] == int(servico_id)))
+        or (chave[0] == 'regras_servico' and (servico_id is None or chave[1] == int(servico_id)))
+    )
+
+
+def invalidar_duracao(servico_id: Optional[int] = None) -> int:
+    """Remove durações de serviço do cache. Sem argumentos, remove todas."""
+    return cache_referencia.invalidar_onde(
+        lambda chave: chave[0] == 'duracao' and (servico_id is None or chave[1] == int(servico_id))
+    )
+
+
+def invalidar_bloqueios(data_str: Optional[str] = None, loja_id: Optional[int] = None) -> int:
+    """
+    Remove dias bloqueados do cache. Um bloqueio sem loja (id_loja null) vale para todas
+    as lojas, então chamar sem 'loja_id' invalida a data em todas elas.
+    """
+    return cache_referencia.invalidar_onde(
+        lambda chave: chave[0] == 'bloqueio'
+        and (loja_id is None or chave[1] == int(loja_id))
+        and (data_str is None or chave[2] == data_str)
+    )
+
+
+def invalidar_bloqueios_periodo(data_inicio: date, data_fim: date, lojas_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Como invalidar_bloqueios, para um período inteiro de uma vez (bloqueio em lote).
+    Sem 'lojas_ids' (bloqueio geral), invalida o período em todas as lojas.
+    """
+    inicio, fim = data_inicio.isoformat(), data_fim.isoformat()
+    lojas = {int(l) for l in lojas_ids} if lojas_ids else None
+    return cache_referencia.invalidar_onde(
+        lambda chave: chave[0] == 'bloqueio'
+        and (lojas is None or chave[1] in lojas)
+        and inicio <= chave[2] <= fim
+    )
+
+
+def invalidar_nomes(tabela: Optional[str] = None) -> int:
+    """Remove os nomes de lojas/serviços do cache ('lojas', 'servicos' ou ambos)."""
+    return cache_referencia.invalidar_onde(
+        lambda chave: chave[0] == 'nomes' and (tabela is None or chave[1] == tabela)
+    )
+
+
+def invalidar_tudo() -> int:
+    return cache_referencia.limpar()
+
+
+def estatisticas_cache() -> dict:
+    return {
+        **cache_referencia.estatisticas(),
+        'versao_banco': _versao_banco,
+        'versao_indisponivel': _versao_indisponivel,
+        'verificacoes_versao': verificacoes_versao,
+        'trocas_versao': trocas_versao,
+        'intervalo_versao_segundos': INTERVALO_VERSAO,
+    }
@@ -0,0 +1,221 @@
+# backend/controllers/estatisticas_controller.py
+#
+# Números do Dashboard do admin mantidos em memória por processo, em vez de três COUNT(*)
+# exatos a cada carregamento da página.
+#
+# - Uma recontagem completa (poucas consultas, só contagens e as colunas mínimas) preenche os
+#   contadores na primeira leitura e a cada INTERVALO_RECONTAGEM segundos.
+# - Entre recontagens, as rotas de escrita da API ajustam os contadores no lugar: novo
+#   agendamento, mudança de status, produto inserido/removido.
+# - Escritas feitas fora da API (JS do admin direto no Supabase, cadastro de clientes, outros
+#   workers) aparecem na próxima recontagem. Quando um ajuste não dá para fazer com segurança
+#   (status anterior desconhecido, importação em lote), a store é marcada como desatualizada e
+#   a próxima leitura reconta.
+#
+# "Últimos 30 dias" = agendamentos CRIADOS no período (data_criacao, em UTC): por dia e, por
+# loja, por status.
+
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from supabase import Client
+
+from db import repositorio
+from models.agendamento import STATUS_AGENDAMENTO, AgendamentosColunares
+from .grade_horarios import parse_timestamp
+
+INTERVALO_RECONTAGEM = float(os.getenv('ESTATISTICAS_RECONTAGEM_SEGUNDOS', '300'))
+DIAS_JANELA = 30
+
+
+class EstatisticasDashboard:
+    """Contadores do dashboard. Todas as alterações passam pelo lock da instância."""
+
+    def __init__(self):
+        self.por_status: Dict[str, int] = {s: 0 for s in STATUS_AGENDAMENTO}
+        self.por_loja: Dict[int, Dict[str, int]] = {}
+        self.por_dia: Dict[date, int] = {}
+        # id_agendamento -> (status, id_loja) dos agendamentos da janela, para ajustar por_loja
+        self.janela: Dict[int, Tuple[str, Optional[int]]] = {}
+        self.produtos = 0
+        self.clientes = 0
+        self.recontado_em: Optional[datetime] = None
+        self.desatualizado = True
+        self.alteracoes = 0  # incrementado a cada ajuste; detecta escritas durante a recontagem
+        self.lock = threading.Lock()
+
+    def _somar_status(self, status: str, id_loja, na_janela: bool, delta: int) -> None:
+        self.por_status[status] = self.por_status.get(status, 0) + delta
+        if na_janela and id_loja is not None:
+            loja = self.por_loja.setdefault(id_loja, {s: 0 for s in STATUS_AGENDAMENTO})
+            loja[status] = loja.get(status, 0) + delta
+
+    def to_dict(self, hoje: date) -> dict:
+        inicio = hoje - timedelta(days=DIAS_JANELA - 1)
+        dias = [inicio + timedelta(days=i) for i in range(DIAS_JANELA)]
+        return {
+            'agendamentos': {
+                'por_status': dict(self.por_status),
+                'pendentes': self.por_status.get('pendente', 0),
+                'total': sum(self.por_status.values()),
+            },
+            'ultimos_30_dias': {
+                'inicio': inicio.isoformat(),
+                'fim': hoje.isoformat(),
+                'por_dia': [{'dia': d.isoformat(), 'quantidade': self.por_dia.get(d, 0)} for d in dias],
+                'por_loja': [{'id_loja': loja, **contagens} for loja, contagens in sorted(self.por_loja.items())],
+            },
+            'produtos': self.produtos,
+            'clientes': self.clientes,
+            'recontado_em': self.recontado_em.isoformat() if self.recontado_em else None,
+        }
+
+
+_estatisticas = EstatisticasDashboard()
+_lock_recontagem = threading.Lock()
+recontagens = 0
+
+
+def _hoje() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _dia_criacao(agendamento: dict) -> Optional[date]:
+    valor = agendamento.get('data_criacao')
+    if not valor:
+        return None
+    try:
+        return datetime.fromtimestamp(parse_timestamp(valor), tz=timezone.utc).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _contar(supabase: Client, tabela: str, coluna: str):
+    """SELECT count(*) sem trazer linhas (HEAD com count=exact). Encadeie filtros e chame .execute()."""
+    return supabase.table(tabela).select(coluna, count='exact', head=True)
+
+
+# --- Recontagem completa ---
+
+def recontar(supabase: Client) -> EstatisticasDashboard:
+    """Refaz todos os contadores a partir do banco e troca a store de uma vez."""
+    global _estatisticas, recontagens
+    with _lock_recontagem:
+        alteracoes_antes = _estatisticas.alteracoes
+        nova = EstatisticasDashboard()
+        hoje = _hoje()
+        inicio_janela = datetime.combine(hoje - timedelta(days=DIAS_JANELA - 1), datetime.min.time(), tzinfo=timezone.utc)
+
+        for status in STATUS_AGENDAMENTO:
+            nova.por_status[status] = _contar(supabase, 'agendamentos', 'id_agendamento') \
+                .eq('status', status).execute().count or 0
+        nova.produtos = _contar(supabase, 'produtos', 'id_produto').execute().count or 0
+        nova.clientes = _contar(supabase, 'perfis', 'id').neq('role', 'admin').execute().count or 0
+
+        colunas = AgendamentosColunares(
+            repositorio.listar_agendamentos_criados_desde(supabase, inicio_janela.isoformat()))
+        base = inicio_janela.timestamp()
+        for i, criacao in enumerate(colunas.data_criacao or ()):
+            if criacao != criacao:  # NaN: data_criacao ausente ou inválida
+                continue
+            dia = inicio_janela.date() + timedelta(days=int((criacao - base) // 86400))
+            nova.por_dia[dia] = nova.por_dia.get(dia, 0) + 1
+            status, id_loja = colunas.status_da_linha(i), colunas.id_loja[i]
+            nova.janela[colunas.id_agendamento[i]] = (status, id_loja)
+            if status is not None:
+                loja = nova.por_loja.setdefault(id_loja, {s: 0 for s in STATUS_AGENDAMENTO})
+                loja[status] += 1
+
+        nova.recontado_em = datetime.now(timezone.utc).replace(microsecond=0)
+        # Ajustes feitos enquanto as consultas rodavam podem não estar na contagem nova:
+        # usa a contagem assim mesmo, mas reconta de novo na próxima leitura.
+        nova.desatualizado = _estatisticas.alteracoes != alteracoes_antes
+        _estatisticas = nova
+        recontagens += 1
+        print(f"[Estatisticas] Recontagem: {sum(nova.por_status.values())} agendamentos, "
+              f"{nova.produtos} produtos, {nova.clientes} clientes.")
+        return nova
+
+
+def obter_estatisticas(supabase: Client) -> dict:
+    """Números do dashboard; reconta se a store expirou ou foi marcada como desatualizada."""
+    atual = _estatisticas
+    expirada = atual.recontado_em is None or \
+        (datetime.now(timezone.utc) - atual.recontado_em).total_seconds() >= INTERVALO_RECONTAGEM
+    if expirada or atual.desatualizado:
+        atual = recontar(supabase)
+    with atual.lock:
+        return atual.to_dict(_hoje())
+
+
+# --- Ajustes incrementais (chamados pelas rotas de escrita) ---
+
+def registrar_agendamento_novo(agendamento: dict) -> None:
+    """Agendamento recém-criado pela API."""
+    atual = _estatisticas
+    status = agendamento.get('status')
+    if status not in STATUS_AGENDAMENTO:
+        invalidar()
+        return
+    dia = _dia_criacao(agendamento) or _hoje()
+    with atual.lock:
+        atual.alteracoes += 1
+        id_agendamento = agendamento.get('id_agendamento')
+        if id_agendamento in atual.janela:
+            return  # Já contado (ex: recontagem concorrente)
+        atual.janela[id_agendamento] = (status, agendamento.get('id_loja'))
+        atual.por_dia[dia] = atual.por_dia.get(dia, 0) + 1
+        atual._somar_status(status, agendamento.get('id_loja'), True, +1)
+
+
+def registrar_mudanca_status(agendamento: dict, status_anterior: Optional[str] = None) -> None:
+    """
+    Agendamento cujo status foi alterado. Sem status_anterior, usa o que a store conhece
+    (agendamentos da janela); se não conhece, marca a store para recontagem.
+    """
+    atual = _estatisticas
+    id_agendamento = agendamento.get('id_agendamento')
+    status = agendamento.get('status')
+    with atual.lock:
+        atual.alteracoes += 1
+        conhecido = atual.janela.get(id_agendamento)
+        if status_anterior is None and conhecido:
+            status_anterior = conhecido[0]
+        if status_anterior not in STATUS_AGENDAMENTO or status not in STATUS_AGENDAMENTO:
+            atual.desatualizado = True
+            return
+        if status_anterior == status:
+            return
+        id_loja = agendamento.get('id_loja', conhecido[1] if conhecido else None)
+        atual._somar_status(status_anterior, id_loja, conhecido is not None, -1)
+        atual._somar_status(status, id_loja, conhecido is not None, +1)
+        if conhecido is not None:
+            atual.janela[id_agendamento] = (status, id_loja)
+
+
+def ajustar_produtos(delta: int) -> None:
+    atual = _estatisticas
+    with atual.lock:
+        atual.alteracoes += 1
+        atual.produtos += delta
+
+
+def invalidar() -> None:
+    """Marca os contadores como desatualizados; a próxima leitura reconta do banco."""
+    atual = _estatisticas
+    with atual.lock:
+        atual.alteracoes += 1
+        atual.desatualizado = True
+
+
+def estatisticas() -> dict:
+    atual = _estatisticas
+    return {
+        'recontagens': recontagens,
+        'recontado_em': atual.recontado_em.isoformat() if atual.recontado_em else None,
+        'desatualizado': atual.desatualizado,
+        'agendamentos_na_janela': len(atual.janela),
+        'intervalo_recontagem_segundos': INTERVALO_RECONTAGEM,
+    }
@@ -0,0 +1,92 @@
+# backend/controllers/grade_horarios.py
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time
+from typing import Iterable, List, Tuple
+
+# --- Constantes da Grade ---
+HORA_INICIO_PADRAO = time(9, 0)  # 09:00
+HORA_FIM_PADRAO = time(18, 0)    # 18:00
+INTERVALO_SLOT_MINUTOS = 30      # A "grade" do calendário (slots de 30 em 30 min)
+
+
+def parse_timestamp(valor: str) -> float:
+    """Converte um timestamp ISO do Supabase (UTC, com 'Z' ou offset) em segundos epoch."""
+    return datetime.fromisoformat(valor.replace('Z', '+00:00')).timestamp()
+
+
+def intervalos_de_agendamentos(agendamentos: Iterable[dict]) -> List[Tuple[float, float]]:
+    """
+    Converte as linhas de 'agendamentos' em intervalos (inicio, fim) em segundos epoch.
+    Cada linha é convertida uma única vez; linhas inválidas são ignoradas.
+    """
+    intervalos = []
+    for ag in agendamentos:
+        try:
+            inicio = parse_timestamp(ag['data_hora_inicio'])
+            fim = parse_timestamp(ag['data_hora_fim'])
+        except Exception as e_conv:
+            print(f"[GradeHorarios] Erro ao processar agendamento existente: {e_conv}")
+            continue
+        if fim > inicio:
+            intervalos.append((inicio, fim))
+    return intervalos
+
+
+class LinhaDoTempo:
+    """
+    Eventos de início e fim dos agendamentos de um dia, ordenados.
+    Permite contar quantos agendamentos sobrepõem um intervalo sem percorrer a lista inteira.
+    """
+    __slots__ = ('inicios', 'fins')
+
+    def __init__(self, intervalos: Iterable[Tuple[float, float]] = ()):
+        intervalos = list(intervalos)
+        self.inicios = sorted(inicio for inicio, _ in intervalos)
+        self.fins = sorted(fim for _, fim in intervalos)
+
+    @classmethod
+    def de_agendamentos(cls, agendamentos: Iterable[dict]) -> 'LinhaDoTempo':
+        return cls(intervalos_de_agendamentos(agendamentos))
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def sobreposicoes(self, inicio: float, fim: float) -> int:
+        """
+        Quantidade de agendamentos que sobrepõem [inicio, fim).
+        (InicioA < FimB) e (FimA > InicioB) = (inícios antes de 'fim') - (fins até 'inicio').
+        """
+        return bisect_left(self.inicios, fim) - bisect_right(self.fins, inicio)
+
+    def sobreposicoes_por_slot(self, slots: List[Tuple[float, float]]) -> List[int]:
+        """
+        Varredura (sweep) sobre slots em ordem crescente: como início e fim dos slots só
+        avançam, dois ponteiros sobre os eventos ordenados bastam (O(slots + agendamentos)).
+        """
+        inicios, fins = self.inicios, self.fins
+        total_inicios, total_fins = len(inicios), len(fins)
+        i = j = 0
+        contagens = []
+        for slot_inicio, slot_fim in slots:
+            while i < total_inicios and inicios[i] < slot_fim:
+                i += 1
+            while j < total_fins and fins[j] <= slot_inicio:
+                j += 1
+            contagens.append(i - j)
+        return contagens
+
+
+def livres_na_grade(slots: List[Tuple[str, float, float]], capacidade: int, ocupacao) -> List[str]:
+    """
+    Horários ('HH:MM') da grade cuja ocupação é menor que a capacidade. 'slots' é a grade do
+    dia, (rótulo, inicio_epoch, fim_epoch) em ordem crescente (ModeloSemana.slots, do horário
+    de funcionamento da loja). 'ocupacao' pode ser qualquer estrutura com
+    'sobreposicoes_por_slot' (ex: LinhaDoTempo) ou uma lista crua de agendamentos do Supabase.
+    """
+    if not slots:
+        return []
+    if not hasattr(ocupacao, 'sobreposicoes_por_slot'):
+        ocupacao = LinhaDoTempo.de_agendamentos(ocupacao)
+    contagens = ocupacao.sobreposicoes_por_slot([(inicio, fim) for _, inicio, fim in slots])
+    return [rotulo for (rotulo, _, _), conflitantes in zip(slots, contagens) if conflitantes < capacidade]
@@ -0,0 +1,242 @@
+# backend/controllers/horarios_funcionamento.py
+#
+# Horário de funcionamento das lojas (tabela 'horarios_funcionamento', editada na gestão de
+# horários do admin): abertura, fechamento e pausa por dia da semana (0 = domingo).
+# Cada loja vira um ModeloSemana, compilado uma vez e guardado em cache; a grade de slots de
+# cada (dia da semana, duração do serviço) é montada no primeiro uso e reaproveitada, então
+# por requisição o custo é um get no cache e um get num dict.
+#
+# Lojas sem nenhuma linha na tabela usam o horário padrão da grade (09:00-18:00 todos os
+# dias), como antes. A rota PUT /api/admin/horarios-funcionamento/<id_loja> invalida a loja no
+# worker que a atendeu; os demais (e alterações feitas direto no banco) descartam o cache pela
+# versão compartilhada dos dados de referência (dados_referencia.sincronizar_versao,
+# incrementada por trigger em db/migrations/006), em até CACHE_REFERENCIA_VERSAO_SEGUNDOS.
+
+import os
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from supabase import Client
+
+from utils.cache import CacheTTL
+from . import dados_referencia
+from .grade_horarios import HORA_FIM_PADRAO, HORA_INICIO_PADRAO, INTERVALO_SLOT_MINUTOS
+
+TTL_CACHE_HORARIOS = float(os.getenv('CACHE_HORARIOS_TTL', '600'))
+TAMANHO_CACHE_HORARIOS = int(os.getenv('CACHE_HORARIOS_TAMANHO', '1024'))
+
+_ABERTURA_PADRAO = HORA_INICIO_PADRAO.hour * 60 + HORA_INICIO_PADRAO.minute
+_FECHAMENTO_PADRAO = HORA_FIM_PADRAO.hour * 60 + HORA_FIM_PADRAO.minute
+
+COLUNAS = 'id_loja, dia_semana, ativo, hora_abertura, hora_fechamento, hora_inicio_pausa, hora_fim_pausa'
+
+# Chave: id_loja -> ModeloSemana
+cache_horarios = CacheTTL('horarios_funcionamento', TTL_CACHE_HORARIOS, TAMANHO_CACHE_HORARIOS)
+dados_referencia.acompanhar_versao(cache_horarios)
+
+
+def _minutos(valor) -> Optional[int]:
+    """'HH:MM' ou 'HH:MM:SS' (coluna time do Postgres) -> minutos desde 00:00."""
+    if not valor:
+        return None
+    horas, minutos = str(valor).split(':')[:2]
+    return int(horas) * 60 + int(minutos)
+
+
+def _dia_semana(dia: date) -> int:
+    """Índice da tabela (0 = domingo ... 6 = sábado) a partir do weekday() do Python."""
+    return (dia.weekday() + 1) % 7
+
+
+class Expediente:
+    """Horário de um dia da semana, em minutos desde 00:00; pausa é (inicio, fim) ou None."""
+    __slots__ = ('abertura', 'fechamento', 'pausa')
+
+    def __init__(self, abertura: int, fechamento: int, pausa: Optional[Tuple[int, int]] = None):
+        self.abertura = abertura
+        self.fechamento = fechamento
+        self.pausa = pausa
+
+    @classmethod
+    def de_linha(cls, linha: dict) -> Optional['Expediente']:
+        """Linha de 'horarios_funcionamento' -> Expediente (None se a loja fecha no dia)."""
+        if not linha.get('ativo'):
+            return None
+        abertura = _minutos(linha.get('hora_abertura'))
+        fechamento = _minutos(linha.get('hora_fechamento'))
+        if abertura is None or fechamento is None:  # Dia marcado como aberto sem horários: usa o padrão
+            abertura, fechamento = _ABERTURA_PADRAO, _FECHAMENTO_PADRAO
+        if fechamento <= abertura:
+            return None
+        pausa_inicio, pausa_fim = _minutos(linha.get('hora_inicio_pausa')), _minutos(linha.get('hora_fim_pausa'))
+        pausa = (pausa_inicio, pausa_fim) if pausa_inicio is not None and pausa_fim is not None \
+            and pausa_inicio < pausa_fim else None
+        return cls(abertura, fechamento, pausa)
+
+    def grade(self, duracao: int, intervalo: int) -> Tuple[Tuple[str, int, int], ...]:
+        """Slots (rótulo 'HH:MM', início, fim em minutos) que cabem no expediente e não tocam a pausa."""
+        slots = []
+        for inicio in range(self.abertura, self.fechamento, intervalo):
+            fim = inicio + duracao
+            if fim > self.fechamento:
+                break
+            if self.pausa and inicio < self.pausa[1] and fim > self.pausa[0]:
+                continue
+            slots.append((f'{inicio // 60:02d}:{inicio % 60:02d}', inicio, fim))
+        return tuple(slots)
+
+
+EXPEDIENTE_PADRAO = Expediente(_ABERTURA_PADRAO, _FECHAMENTO_PADRAO)
+
+
+class ModeloSemana:
+    """
+    Semana compilada de uma loja: um Expediente (ou None = fechado) por dia da semana e as
+    grades já montadas por (dia da semana, duração), preenchidas sob demanda.
+    """
+    __slots__ = ('loja_id', 'dias', '_grades', '_rotulos')
+
+    def __init__(self, loja_id: int, dias: Tuple[Optional[Expediente], ...]):
+        self.loja_id = loja_id
+        self.dias = dias
+        self._grades: Dict[Tuple[int, int], tuple] = {}
+        self._rotulos: Dict[Tuple[int, int], frozenset] = {}
+
+    @classmethod
+    def de_linhas(cls, loja_id: int, linhas: List[dict]) -> 'ModeloSemana':
+        if not linhas:  # Loja sem horário cadastrado: padrão em todos os dias
+            return cls(loja_id, (EXPEDIENTE_PADRAO,) * 7)
+        dias = [None] * 7
+        for linha in linhas:
+            dia_semana = linha.get('dia_semana')
+            if dia_semana is not None and 0 <= int(dia_semana) <= 6:
+                dias[int(dia_semana)] = Expediente.de_linha(linha)
+        return cls(loja_id, tuple(dias))
+
+    def grade(self, dia: date, duracao: int) -> tuple:
+        """Grade (rótulo, início, fim em minutos) do dia; vazia se a loja não abre."""
+        chave = (_dia_semana(dia), duracao)
+        grade = self._grades.get(chave)
+        if grade is None:
+            expediente = self.dias[chave[0]]
+            grade = expediente.grade(duracao, INTERVALO_SLOT_MINUTOS) if expediente else ()
+            self._grades[chave] = grade  # Corrida entre threads só recalcula o mesmo valor
+        return grade
+
+    def aberto(self, dia: date) -> bool:
+        return self.dias[_dia_semana(dia)] is not None
+
+    def slots(self, dia: date, duracao: int) -> List[Tuple[str, float, float]]:
+        """Grade do dia com início e fim em segundos epoch (horário local da loja)."""
+        grade = self.grade(dia, duracao)
+        if not grade:
+            return []
+        meia_noite = datetime.combine(dia, time.min).timestamp()
+        if datetime.combine(dia, time(23, 59)).timestamp() - meia_noite == 1439 * 60:
+            return [(rotulo, meia_noite + inicio * 60, meia_noite + fim * 60) for rotulo, inicio, fim in grade]
+        # Dia com mudança de horário de verão: converte slot a slot
+        return [(rotulo,
+                 datetime.combine(dia, time(inicio // 60, inicio % 60)).timestamp(),
+                 datetime.combine(dia, time(inicio // 60, inicio % 60)).timestamp() + (fim - inicio) * 60)
+                for rotulo, inicio, fim in grade]
+
+    def permite(self, inicio_local: datetime, duracao: int) -> bool:
+        """True se 'inicio_local' é um slot da grade do dia (dentro do expediente e fora da pausa)."""
+        chave = (_dia_semana(inicio_local.date()), duracao)
+        rotulos = self._rotulos.get(chave)
+        if rotulos is None:
+            rotulos = frozenset(rotulo for rotulo, _, _ in self.grade(inicio_local.date(), duracao))
+            self._rotulos[chave] = rotulos
+        return inicio_local.second == 0 and inicio_local.strftime('%H:%M') in rotulos
+
+
+# --- Leituras (read-through) ---
+
+def obter_modelo(supabase: Client, loja_id: int) -> ModeloSemana:
+    """Semana compilada da loja (padrão se ela não tiver horários cadastrados)."""
+    loja_id = int(loja_id)
+    dados_referencia.sincronizar_versao(supabase)
+
+    def carregar():
+        res = supabase.table('horarios_funcionamento').select(COLUNAS).eq('id_loja', loja_id).execute()
+        return ModeloSemana.de_linhas(loja_id, res.data or [])
+
+    return cache_horarios.obter_ou_carregar(loja_id, carregar)
+
+
+def obter_modelos(supabase: Client, lojas_ids: Iterable[int]) -> Dict[int, ModeloSemana]:
+    """Semanas de várias lojas; as que faltam no cache vêm juntas em uma consulta."""
+    dados_referencia.sincronizar_versao(supabase)
+    resultado, faltantes = {}, []
+    geracao = cache_horarios.geracao
+    for loja_id in dict.fromkeys(int(l) for l in lojas_ids):
+        modelo = cache_horarios.get(loja_id)
+        if modelo is None:
+            faltantes.append(loja_id)
+        else:
+            resultado[loja_id] = modelo
+    if faltantes:
+        res = supabase.table('horarios_funcionamento').select(COLUNAS).in_('id_loja', faltantes).execute()
+        por_loja = {loja_id: [] for loja_id in faltantes}
+        for linha in res.data or []:
+            por_loja.get(int(linha['id_loja']), []).append(linha)
+        for loja_id, linhas in por_loja.items():
+            resultado[loja_id] = ModeloSemana.de_linhas(loja_id, linhas)
+            cache_horarios.set(loja_id, resultado[loja_id], geracao=geracao)
+    return resultado
+
+
+# --- Escrita ---
+
+def salvar_horarios(supabase: Client, loja_id: int, dias: List[dict]) -> List[dict]:
+    """
+    Valida e grava (upsert por id_loja + dia_semana) o horário da semana da loja e invalida
+    o modelo compilado. Levanta ValueError para dados inválidos.
+    """
+    loja_id = int(loja_id)
+    linhas = []
+    for dia in dias:
+        try:
+            dia_semana = int(dia['dia_semana'])
+            ativo = dia.get('ativo', False)
+            horas = {campo: dia.get(campo) or None
+                     for campo in ('hora_abertura', 'hora_fechamento', 'hora_inicio_pausa', 'hora_fim_pausa')}
+            minutos = {campo: _minutos(valor) for campo, valor in horas.items()}
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Cada dia precisa de 'dia_semana' (0-6) e horários no formato HH:MM.")
+        if not 0 <= dia_semana <= 6:
+            raise ValueError("'dia_semana' deve estar entre 0 (domingo) e 6 (sábado).")
+        if not isinstance(ativo, bool):
+            raise ValueError(f"Dia {dia_semana}: 'ativo' deve ser true ou false.")
+        if ativo:
+            if minutos['hora_abertura'] is None or minutos['hora_fechamento'] is None:
+                raise ValueError(f"Dia {dia_semana}: informe abertura e fechamento.")
+            if minutos['hora_fechamento'] <= minutos['hora_abertura']:
+                raise ValueError(f"Dia {dia_semana}: o fechamento deve ser depois da abertura.")
+            pausa = (minutos['hora_inicio_pausa'], minutos['hora_fim_pausa'])
+            if (pausa[0] is None) != (pausa[1] is None):
+                raise ValueError(f"Dia {dia_semana}: informe início e fim da pausa (ou nenhum dos dois).")
+            if pausa[0] is not None and not minutos['hora_abertura'] <= pausa[0] < pausa[1] <= minutos['hora_fechamento']:
+                raise ValueError(f"Dia {dia_semana}: a pausa deve estar dentro do expediente.")
+        else:
+            horas = dict.fromkeys(horas)
+        linhas.append({'id_loja': loja_id, 'dia_semana': dia_semana, 'ativo': ativo, **horas})
+    if not linhas:
+        raise ValueError("Envie os horários de pelo menos um dia da semana.")
+
+    res = supabase.table('horarios_funcionamento').upsert(linhas, on_conflict='id_loja,dia_semana').execute()
+    invalidar(loja_id)
+    return res.data or []
+
+
+# --- Invalidação e estatísticas ---
+
+def invalidar(loja_id: Optional[int] = None) -> int:
+    """Remove o modelo compilado da loja (ou de todas)."""
+    if loja_id is None:
+        return cache_horarios.limpar()
+    return int(cache_horarios.invalidar(int(loja_id)))
+
+
+def estatisticas() -> dict:
+    return cache_horarios.estatisticas()
@@ -0,0 +1,524 @@
+# backend/controllers/indice_busca.py
+#
+# Busca de produtos com índice invertido em memória (por processo), usado por
+# /api/ecommerce/busca no lugar do or(...fts(portuguese)...) que o busca.js fazia direto
+# no PostgREST.
+#
+# - Texto: nome_produto, marca, tipo_produto e descricao, com pesos por campo. Os termos
+#   são normalizados (minúsculas, sem acento) e reduzidos ao radical (stemmer leve de
+#   português), então "Rações", "racao" e "ração" caem no mesmo termo.
+# - Consulta: todos os termos precisam aparecer (E), como no "termo:* & termo:*" antigo.
+#   Cada termo também casa por prefixo (type-ahead: "petis" encontra "petisco").
+# - Ranking: BM25 sobre frequências ponderadas pelo campo.
+# - Filtros de faceta (tipo_produto, marca, tamanho_medida) e de preço são avaliados sobre
+#   conjuntos de ids (listas de postagem), sem varrer o catálogo.
+# - Facetas com contagens e drill-down (/api/ecommerce/facetas) saem das mesmas listas de ids.
+#
+# O índice é montado na primeira busca com o catálogo inteiro (produto_controller.iterar_produtos)
+# e atualizado no lugar pelo produto_controller (registrar_produtos / remover_produto). Como o admin também grava
+# produtos direto pelo JS, o índice é reconstruído do banco, em segundo plano, a cada
+# INTERVALO_RECONSTRUCAO segundos.
+
+import heapq
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from supabase import Client
+
+INTERVALO_RECONSTRUCAO = float(os.getenv('BUSCA_RECONSTRUCAO_SEGUNDOS', '300'))
+
+PESOS_CAMPOS = {'nome_produto': 3.0, 'marca': 2.0, 'tipo_produto': 2.0, 'descricao': 1.0}
+CAMPOS_FACETA = ('tipo_produto', 'marca', 'tamanho_medida')
+CAMPOS_RESULTADO = ('id_produto', 'nome_produto', 'descricao', 'marca', 'tipo_produto', 'tamanho_medida',
+                    'preco', 'preco_promocional', 'quantidade_estoque', 'url_imagem', 'data_cadastro')
+CAMPOS_PADRAO = ('id_produto', 'nome_produto', 'url_imagem', 'preco', 'preco_promocional',
+                 'marca', 'tipo_produto', 'tamanho_medida')
+ORDENACOES = ('relevancia', 'nome', 'menor_preco', 'maior_preco')
+
+# BM25
+K1 = 1.2
+B = 0.75
+PESO_PREFIXO = 0.8         # termo encontrado só por prefixo vale menos que o termo exato
+MAX_EXPANSOES_PREFIXO = 64  # limita o custo de prefixos muito curtos ("r", "ra")
+
+STOPWORDS = frozenset(
+    'a ao aos as com da das de do dos e em mais na nas no nos o os ou para pela pelo por sem um uma'.split()
+)
+
+_RE_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+# --- Normalização e radical ---
+
+def normalizar(texto) -> str:
+    """Minúsculas e sem acentos ("Ração Cães" -> "racao caes")."""
+    if not texto:
+        return ''
+    texto = str(texto).lower()
+    if texto.isascii():  # Nada para decompor
+        return texto
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def tokenizar(texto) -> List[str]:
+    return [t for t in _RE_TOKEN.findall(normalizar(texto)) if t not in STOPWORDS]
+
+
+_PLURAIS = (('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'), ('ois', 'ol'), ('ns', 'm'), ('res', 'r'))
+_DIMINUTIVOS = ('zinhos', 'zinhas', 'zinho', 'zinha', 'inhos', 'inhas', 'inho', 'inha')
+
+
+def radical(token: str) -> str:
+    """
+    Stemmer leve de português (inspirado no RSLP), aplicado a tokens já normalizados:
+    plural -> diminutivo -> advérbio -> vogal temática. Tokens curtos e números ficam como estão.
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+    # 1. Plural
+    if token.endswith('s') and not token.endswith('ss'):
+        for sufixo, troca in _PLURAIS:
+            if token.endswith(sufixo) and len(token) > len(sufixo):
+                token = token[:-len(sufixo)] + troca
+                break
+        else:
+            token = token[:-1]
+    # 2. Diminutivo
+    for sufixo in _DIMINUTIVOS:
+        if token.endswith(sufixo) and len(token) - len(sufixo) >= 3:
+            token = token[:-len(sufixo)]
+            break
+    # 3. Advérbio
+    if token.endswith('mente') and len(token) > 7:
+        token = token[:-5]
+    # 4. Vogal temática / gênero ("gato", "gata" -> "gat"), preservando "-ao" (racao, algodao)
+    if len(token) > 3 and token[-1] in 'aeo' and not token.endswith('ao'):
+        token = token[:-1]
+    return token
+
+
+def _preco(valor) -> Optional[float]:
+    try:
+        return float(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Índice ---
+
+class IndiceBusca:
+    """Índice invertido do catálogo. Seguro para uso entre threads."""
+
+    def __init__(self, produtos: Iterable[dict] = ()):
+        self.documentos: Dict[int, dict] = {}
+        self.postagens: Dict[str, Dict[int, float]] = {}   # radical -> {id: tf ponderado}
+        self.comprimentos: Dict[int, float] = {}
+        self.chave_nome: Dict[int, str] = {}                # nome normalizado, para ordenação
+        self.soma_comprimentos = 0.0
+        self.facetas: Dict[str, Dict[str, Set[int]]] = {campo: {} for campo in CAMPOS_FACETA}
+        self._termos_doc: Dict[int, Dict[str, float]] = {}
+        self._brutos_doc: Dict[int, Set[str]] = {}
+        self._brutos: Counter = Counter()                   # token normalizado -> nº de produtos
+        self._radical_de: Dict[str, str] = {}
+        self._vocabulario: List[str] = []                   # tokens normalizados, ordenados (prefixo)
+        self._precos: List[tuple] = []                      # (preco, id), ordenado
+        self._normas: Dict[int, float] = {}
+        self._ordenado = True
+        self._lock = threading.RLock()
+        for produto in produtos:
+            self._adicionar(produto)
+
+    def __len__(self):
+        return len(self.documentos)
+
+    # --- Escrita ---
+
+    def _adicionar(self, produto: dict) -> None:
+        id_produto = produto.get('id_produto')
+        if id_produto is None:
+            return
+        if id_produto in self.documentos:
+            self._remover(id_produto)
+
+        termos: Dict[str, float] = {}
+        brutos: Set[str] = set()
+        for campo, peso in PESOS_CAMPOS.items():
+            for token in tokenizar(produto.get(campo)):
+                brutos.add(token)
+                raiz = self._radical_de.get(token)
+                if raiz is None:
+                    raiz = self._radical_de[token] = radical(token)
+                termos[raiz] = termos.get(raiz, 0.0) + peso
+
+        self.documentos[id_produto] = {campo: produto.get(campo) for campo in CAMPOS_RESULTADO}
+        self._termos_doc[id_produto] = termos
+        self._brutos_doc[id_produto] = brutos
+        for raiz, tf in termos.items():
+            self.postagens.setdefault(raiz, {})[id_produto] = tf
+        for token in brutos:
+            self._brutos[token] += 1
+        comprimento = sum(termos.values())
+        self.comprimentos[id_produto] = comprimento
+        self.chave_nome[id_produto] = normalizar(produto.get('nome_produto'))
+        self.soma_comprimentos += comprimento
+        for campo in CAMPOS_FACETA:
+            valor = produto.get(campo)
+            if valor:
+                self.facetas[campo].setdefault(valor, set()).add(id_produto)
+        self._ordenado = False
+
+    def _remover(self, id_produto) -> bool:
+        documento = self.documentos.pop(id_produto, None)
+        if documento is None:
+            return False
+        for raiz in self._termos_doc.pop(id_produto):
+            postagem = self.postagens[raiz]
+            postagem.pop(id_produto, None)
+            if not postagem:
+                del self.postagens[raiz]
+        for token in self._brutos_doc.pop(id_produto):
+            self._brutos[token] -= 1
+            if self._brutos[token] <= 0:
+                del self._brutos[token]
+                self._ordenado = False
+        self.soma_comprimentos -= self.comprimentos.pop(id_produto)
+        del self.chave_nome[id_produto]
+        for campo in CAMPOS_FACETA:
+            ids = self.facetas[campo].get(documento.get(campo))
+            if ids is not None:
+                ids.discard(id_produto)
+                if not ids:
+                    del self.facetas[campo][documento.get(campo)]
+        self._ordenado = False
+        return True
+
+    def adicionar(self, produto: dict) -> None:
+        """Insere ou substitui um produto."""
+        with self._lock:
+            self._adicionar(produto)
+
+    def remover(self, id_produto) -> bool:
+        with self._lock:
+            return self._remover(id_produto)
+
+    def _ordenar(self) -> None:
+        """Recalcula as estruturas derivadas (vocabulário, preços, normas BM25) após escritas."""
+        if self._ordenado:
+            return
+        self._vocabulario = sorted(self._brutos)
+        self._precos = sorted(
+            (preco, id_produto) for id_produto, doc in self.documentos.items()
+            if (preco := _preco(doc.get('preco'))) is not None
+        )
+        # Parte do denominador do BM25 que só depende do produto: K1 * (1 - B + B * |d| / média)
+        media = (self.soma_comprimentos / len(self.documentos)) if self.documentos else 1.0
+        self._normas = {i: K1 * (1 - B + B * comprimento / media) for i, comprimento in self.comprimentos.items()}
+        self._ordenado = True
+
+    # --- Leitura ---
+
+    def _expandir(self, token: str) -> Dict[str, float]:
+        """Radicais que um termo da consulta alcança: {radical: peso} (exato = 1, prefixo = PESO_PREFIXO)."""
+        expansoes = {}
+        inicio = bisect_left(self._vocabulario, token)
+        for bruto in self._vocabulario[inicio:inicio + MAX_EXPANSOES_PREFIXO]:
+            if not bruto.startswith(token):
+                break
+            expansoes[self._radical_de[bruto]] = PESO_PREFIXO
+        exato = radical(token)
+        if exato in self.postagens:
+            expansoes[exato] = 1.0
+        return expansoes
+
+    def _pontuar(self, tokens: List[str], restricao: Optional[Set[int]]) -> Dict[int, float]:
+        """
+        Pontuação BM25 dos produtos que contêm TODOS os termos (e estão em 'restricao', se dada).
+        Cada termo percorre a menor das duas listas: a postagem ou os candidatos que sobraram.
+        """
+        n = len(self.documentos)
+        normas = self._normas
+        candidatos = restricao
+        pontuacoes: Dict[int, float] = {}
+        for token in tokens:
+            melhor: Dict[int, float] = {}
+            for raiz, peso in self._expandir(token).items():
+                postagem = self.postagens[raiz]
+                df = len(postagem)
+                fator = peso * math.log(1 + (n - df + 0.5) / (df + 0.5)) * (K1 + 1)
+                if candidatos is None:
+                    pares = postagem.items()
+                elif len(candidatos) < df:
+                    pares = ((i, postagem[i]) for i in candidatos if i in postagem)
+                else:
+                    pares = ((i, tf) for i, tf in postagem.items() if i in candidatos)
+                for i, tf in pares:
+                    valor = fator * tf / (tf + normas[i])
+                    if valor > melhor.get(i, 0.0):
+                        melhor[i] = valor
+            if not melhor:
+                return {}
+            pontuacoes = {i: pontuacoes.get(i, 0.0) + v for i, v in melhor.items()}
+            candidatos = pontuacoes.keys()
+        return pontuacoes
+
+    def _filtrar_facetas(self, filtros: Dict[str, Iterable[str]]) -> Optional[Set[int]]:
+        """Interseção entre campos da união dos valores de cada campo. None = sem filtro."""
+        candidatos = None
+        for campo, valores in filtros.items():
+            valores = list(valores)
+            if campo not in self.facetas or not valores:
+                continue
+            ids = set().union(*(self.facetas[campo].get(valor, ()) for valor in valores))
+            candidatos = ids if candidatos is None else candidatos & ids
+            if not candidatos:
+                return set()
+        return candidatos
+
+    def _filtrar_preco(self, preco_min: Optional[float], preco_max: Optional[float]) -> Optional[Set[int]]:
+        if preco_min is None and preco_max is None:
+            return None
+        inicio = 0 if preco_min is None else bisect_left(self._precos, (preco_min,))
+        fim = len(self._precos) if preco_max is None else bisect_right(self._precos, (preco_max, float('inf')))
+        return {id_produto for _, id_produto in self._precos[inicio:fim]}
+
+    def _contar_facetas(self, ids) -> Dict[str, Dict[str, int]]:
+        """Contagem por valor de faceta dentro de 'ids' (interseção de conjuntos, em C)."""
+        todos = len(ids) == len(self.documentos)
+        if not todos and not isinstance(ids, (set, frozenset)):
+            ids = set(ids)
+        contagens = {}
+        for campo in CAMPOS_FACETA:
+            por_valor = ((valor, len(membros) if todos else len(membros & ids))
+                         for valor, membros in self.facetas[campo].items())
+            contagens[campo] = dict(sorted(((v, q) for v, q in por_valor if q), key=lambda item: -item[1]))
+        return contagens
+
+    def buscar(self, consulta: str = '', filtros: Optional[Dict[str, Iterable[str]]] = None,
+               preco_min: Optional[float] = None, preco_max: Optional[float] = None,
+               pagina: int = 1, por_pagina: int = 24, campos: Iterable[str] = CAMPOS_PADRAO,
+               ordenar: str = 'relevancia') -> dict:
+        """
+        Busca com filtros e paginação. Retorna:
+            {'total', 'pagina', 'por_pagina', 'resultados': [...], 'facetas': {campo: {valor: qtd}}}
+        As facetas contam os produtos do resultado inteiro (não só da página).
+        """
+        pagina = max(1, pagina)
+        inicio = (pagina - 1) * por_pagina
+        campos = [campo for campo in campos if campo in CAMPOS_RESULTADO] or list(CAMPOS_PADRAO)
+        tokens = list(dict.fromkeys(tokenizar(consulta)))
+
+        with self._lock:
+            self._ordenar()
+            # Filtros primeiro: restringem o conjunto que o BM25 precisa percorrer
+            conjuntos = [c for c in (self._filtrar_facetas(filtros or {}), self._filtrar_preco(preco_min, preco_max))
+                         if c is not None]
+            conjuntos.sort(key=len)
+            restricao = conjuntos[0].intersection(*conjuntos[1:]) if conjuntos else None
+
+            pontuacoes = None
+            if tokens:
+                pontuacoes = self._pontuar(tokens, restricao)
+                ids = pontuacoes.keys()
+            elif restricao is not None:
+                ids = restricao
+            else:
+                ids = self.documentos.keys()
+            total = len(ids)
+
+            docs, nomes = self.documentos, self.chave_nome
+            if ordenar in ('menor_preco', 'maior_preco'):
+                # Produtos sem preço vão para o fim nas duas direções
+                sinal = 1 if ordenar == 'menor_preco' else -1
+                def chave(i):
+                    preco = _preco(docs[i].get('preco'))
+                    return (preco is None, sinal * preco if preco is not None else 0, nomes[i])
+            elif ordenar == 'relevancia' and pontuacoes is not None:
+                def chave(i):
+                    return (-pontuacoes[i], nomes[i])
+            else:
+                chave = nomes.__getitem__
+            # Só a parte até a página pedida precisa estar ordenada
+            necessarios = inicio + por_pagina
+            if necessarios * 4 < total:
+                ordenados = heapq.nsmallest(necessarios, ids, key=chave)
+            else:
+                ordenados = sorted(ids, key=chave)
+
+            resultados = [{campo: docs[i].get(campo) for campo in campos} for i in ordenados[inicio:necessarios]]
+            facetas = self._contar_facetas(ids)
+
+        return {
+            'total': total,
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'resultados': resultados,
+            'facetas': facetas,
+        }
+
+    def agregados_facetas(self, consulta: str = '', filtros: Optional[Dict[str, Iterable[str]]] = None,
+                          preco_min: Optional[float] = None, preco_max: Optional[float] = None) -> dict:
+        """
+        Valores de cada faceta com a quantidade de produtos, para montar os filtros da busca.
+        Drill-down: cada campo é contado com todos os filtros ativos MENOS o dele, para a tela
+        continuar mostrando as alternativas do campo já marcado. Tudo sai de interseções das
+        listas de ids mantidas pelo índice, sem varrer o catálogo.
+        """
+        filtros = {campo: list(valores) for campo, valores in (filtros or {}).items()
+                   if campo in self.facetas and valores}
+        tokens = list(dict.fromkeys(tokenizar(consulta)))
+
+        with self._lock:
+            self._ordenar()
+            base = self._filtrar_preco(preco_min, preco_max)
+            if tokens:
+                base = set(self._pontuar(tokens, base))
+            por_campo = {campo: self._filtrar_facetas({campo: valores}) for campo, valores in filtros.items()}
+
+            def restricao(exceto=None) -> Optional[Set[int]]:
+                conjuntos = [c for campo, c in por_campo.items() if campo != exceto]
+                if base is not None:
+                    conjuntos.append(base)
+                if not conjuntos:
+                    return None
+                conjuntos.sort(key=len)
+                return conjuntos[0].intersection(*conjuntos[1:])
+
+            facetas = {}
+            for campo in CAMPOS_FACETA:
+                ids = restricao(exceto=campo)
+                selecionados = set(filtros.get(campo, ()))
+                valores = []
+                for valor, membros in self.facetas[campo].items():
+                    quantidade = len(membros) if ids is None else len(membros & ids)
+                    if quantidade or valor in selecionados:
+                        valores.append({'valor': valor, 'quantidade': quantidade, 'selecionado': valor in selecionados})
+                valores.sort(key=lambda item: normalizar(item['valor']))
+                facetas[campo] = valores
+
+            ids = restricao()
+            if ids is None:
+                precos = [self._precos[0][0], self._precos[-1][0]] if self._precos else []
+                total = len(self.documentos)
+            else:
+                precos = [p for p in (_preco(self.documentos[i].get('preco')) for i in ids) if p is not None]
+                total = len(ids)
+
+        return {
+            'total': total,
+            'facetas': facetas,
+            'preco': {'min': min(precos), 'max': max(precos)} if precos else {'min': None, 'max': None},
+        }
+
+
+# --- Índice do processo ---
+# Só a primeira construção bloqueia a requisição (ou a subida, com PRECARREGAR_CACHES). Depois,
+# a reconstrução periódica roda numa thread e as buscas seguem no índice atual até a troca; as
+# alterações que chegam durante a reconstrução são reaplicadas no índice novo antes da troca.
+_indice: Optional[IndiceBusca] = None
+_construido_em = 0.0
+_reconstruindo = False
+_pendentes: List[tuple] = []
+_geracao = 0  # muda em invalidar(): uma reconstrução iniciada antes é descartada
+_lock_indice = threading.Lock()
+reconstrucoes = 0
+
+
+def _construir(supabase: Client) -> IndiceBusca:
+    """Índice com o catálogo inteiro, lido página a página (paginação por chave)."""
+    global reconstrucoes
+    from . import produto_controller  # import local: produto_controller importa este módulo
+    inicio = time.perf_counter()
+    indice = IndiceBusca(produto_controller.iterar_produtos(supabase))
+    reconstrucoes += 1
+    print(f"[IndiceBusca] Índice construído com {len(indice)} produtos "
+          f"em {(time.perf_counter() - inicio) * 1000:.1f} ms.")
+    return indice
+
+
+def _reconstruir_em_segundo_plano(supabase: Client, geracao: int) -> None:
+    global _indice, _construido_em, _reconstruindo
+    try:
+        novo = _construir(supabase)
+    except Exception as e:
+        print(f"[IndiceBusca] Falha na reconstrução (mantendo o índice atual): {e}")
+        novo = None
+    with _lock_indice:
+        if novo is not None and geracao == _geracao:
+            for operacao, dados in _pendentes:
+                registrar = novo.adicionar if operacao == 'adicionar' else novo.remover
+                registrar(dados)
+            _indice, _construido_em = novo, time.monotonic()
+        _pendentes.clear()
+        _reconstruindo = False
+
+
+def obter_indice(supabase: Client) -> IndiceBusca:
+    """
+    Índice atual. Constrói do banco na primeira chamada; depois, a cada INTERVALO_RECONSTRUCAO
+    segundos, reconstrói em segundo plano sem bloquear as buscas.
+    """
+    global _indice, _construido_em, _reconstruindo
+    indice = _indice
+    if indice is None:
+        with _lock_indice:
+            if _indice is None:
+                _indice, _construido_em = _construir(supabase), time.monotonic()
+            return _indice
+    if time.monotonic() - _construido_em >= INTERVALO_RECONSTRUCAO and not _reconstruindo:
+        with _lock_indice:
+            if not _reconstruindo and _indice is indice:
+                _reconstruindo = True
+                _pendentes.clear()
+                threading.Thread(target=_reconstruir_em_segundo_plano, args=(supabase, _geracao),
+                                 name='reconstrucao-busca', daemon=True).start()
+    return indice
+
+
+def registrar_produtos(produtos: Iterable[dict]) -> None:
+    """Aplica produtos inseridos/alterados ao índice (se já construído)."""
+    indice = _indice
+    if indice is None:
+        return
+    produtos = list(produtos or ())
+    with _lock_indice:
+        if _reconstruindo:
+            _pendentes.extend(('adicionar', produto) for produto in produtos)
+    for produto in produtos:
+        indice.adicionar(produto)
+
+
+def remover_produto(id_produto) -> None:
+    indice = _indice
+    if indice is None:
+        return
+    with _lock_indice:
+        if _reconstruindo:
+            _pendentes.append(('remover', id_produto))
+    indice.remover(id_produto)
+
+
+def invalidar() -> None:
+    """Força a reconstrução do banco na próxima busca (bloqueante, como na primeira vez)."""
+    global _indice, _geracao
+    with _lock_indice:
+        _indice = None
+        _geracao += 1
+
+
+def estatisticas() -> dict:
+    indice = _indice
+    return {
+        'produtos': len(indice) if indice is not None else 0,
+        'termos': len(indice.postagens) if indice is not None else 0,
+        'reconstruindo': _reconstruindo,
+        'reconstrucoes': reconstrucoes,
+        'intervalo_reconstrucao_segundos': INTERVALO_RECONSTRUCAO,
+    }
@@ -0,0 +1,137 @@
+# backend/controllers/indice_lojas.py
+#
+# Lojas mais próximas de uma coordenada (/api/lojas/proximas), no lugar do geolocator.js
+# que baixava a tabela 'lojas' inteira e calculava a distância de cada uma no navegador.
+#
+# As coordenadas ficam em memória (por processo) como vetores numpy já em radianos, e a
+# distância (haversine) de todas as lojas sai em uma única operação vetorizada; as k
+# menores são separadas com argpartition, sem ordenar a lista inteira.
+#
+# A tabela 'lojas' só muda pelo painel do Supabase, então o índice é recarregado a cada
+# INTERVALO_RECARGA segundos (ou na hora, pelo escopo 'lojas' de /api/admin/cache/invalidar).
+#
+# Com servico_id e data, cada loja retornada traz também o primeiro horário livre do
+# serviço naquele dia (mesmo cálculo de /api/horarios-disponiveis, com os mesmos caches).
+
+import os
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+from supabase import Client
+
+from utils.concorrencia import mapear
+from .agendamento_controller import calcular_horarios_disponiveis
+
+INTERVALO_RECARGA = float(os.getenv('LOJAS_RECARGA_SEGUNDOS', '600'))
+RAIO_TERRA_KM = 6371.0
+K_PADRAO = 3
+K_MAXIMO = 20
+
+
+class IndiceLojas:
+    """Coordenadas das lojas em vetores numpy (radianos), na mesma ordem de 'lojas'."""
+
+    def __init__(self, lojas: List[dict]):
+        self.lojas = [
+            {'id_loja': loja['id_loja'], 'nome_loja': loja.get('nome_loja'),
+             'latitude': float(loja['latitude']), 'longitude': float(loja['longitude'])}
+            for loja in lojas
+            if loja.get('latitude') is not None and loja.get('longitude') is not None
+        ]
+        self.latitudes = np.radians(np.array([loja['latitude'] for loja in self.lojas], dtype=np.float64))
+        self.longitudes = np.radians(np.array([loja['longitude'] for loja in self.lojas], dtype=np.float64))
+        self.cos_latitudes = np.cos(self.latitudes)
+
+    def __len__(self):
+        return len(self.lojas)
+
+    def distancias_km(self, latitude: float, longitude: float) -> np.ndarray:
+        """Distância (haversine) da coordenada até cada loja, em km."""
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        a = np.sin((self.latitudes - lat) / 2) ** 2 + \
+            np.cos(lat) * self.cos_latitudes * np.sin((self.longitudes - lon) / 2) ** 2
+        return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def proximas(self, latitude: float, longitude: float, k: int = K_PADRAO) -> List[dict]:
+        """As k lojas mais próximas, da mais perto para a mais longe, com 'distancia_km'."""
+        if not self.lojas:
+            return []
+        distancias = self.distancias_km(latitude, longitude)
+        k = min(k, len(self.lojas))
+        if k < len(self.lojas):
+            candidatas = np.argpartition(distancias, k - 1)[:k]
+        else:
+            candidatas = np.arange(len(self.lojas))
+        ordem = candidatas[np.argsort(distancias[candidatas], kind='stable')]
+        return [dict(self.lojas[i], distancia_km=round(float(distancias[i]), 2)) for i in ordem]
+
+
+# --- Índice do processo ---
+_indice: Optional[IndiceLojas] = None
+_carregado_em = 0.0
+_lock_indice = threading.Lock()
+recargas = 0
+
+
+def obter_indice(supabase: Client) -> IndiceLojas:
+    """Índice atual; carrega do banco na primeira chamada e a cada INTERVALO_RECARGA segundos."""
+    global _indice, _carregado_em, recargas
+    if _indice is not None and time.monotonic() - _carregado_em < INTERVALO_RECARGA:
+        return _indice
+    with _lock_indice:
+        if _indice is None or time.monotonic() - _carregado_em >= INTERVALO_RECARGA:
+            res = supabase.table('lojas').select('id_loja, nome_loja, latitude, longitude').execute()
+            _indice = IndiceLojas(res.data or [])
+            _carregado_em = time.monotonic()
+            recargas += 1
+            print(f"[IndiceLojas] {len(_indice)} lojas com coordenadas carregadas.")
+    return _indice
+
+
+def lojas_proximas(supabase: Client, latitude: float, longitude: float, k: int = K_PADRAO,
+                   servico_id: Optional[int] = None, data_str: Optional[str] = None) -> dict:
+    """
+    As k lojas mais próximas. Com servico_id e data_str, inclui 'primeiro_horario' de cada
+    loja e 'loja_sugerida' (a mais próxima que tem horário livre no dia).
+    """
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError("Coordenadas fora do intervalo (lat -90..90, lon -180..180).")
+    if not 1 <= k <= K_MAXIMO:
+        raise ValueError(f"'k' deve estar entre 1 e {K_MAXIMO}.")
+    if (servico_id is None) != (data_str is None):
+        raise ValueError("Informe 'servico_id' e 'data' juntos.")
+
+    lojas = obter_indice(supabase).proximas(latitude, longitude, k)
+    resultado = {'lojas': lojas}
+    if servico_id is None:
+        return resultado
+
+    # Uma consulta de disponibilidade por loja, todas em paralelo
+    horarios_por_loja = mapear(
+        lambda loja: calcular_horarios_disponiveis(supabase, loja['id_loja'], servico_id, data_str), lojas
+    )
+    sugerida = None
+    for loja, horarios in zip(lojas, horarios_por_loja):
+        loja['primeiro_horario'] = horarios[0] if horarios else None
+        if sugerida is None and horarios:
+            sugerida = loja['id_loja']
+    resultado['loja_sugerida'] = sugerida
+    return resultado
+
+
+def invalidar() -> None:
+    """Força a recarga da tabela 'lojas' na próxima consulta."""
+    global _indice
+    with _lock_indice:
+        _indice = None
+
+
+def estatisticas() -> dict:
+    indice = _indice
+    return {
+        'lojas': len(indice) if indice is not None else 0,
+        'recargas': recargas,
+        'intervalo_recarga_segundos': INTERVALO_RECARGA,
+    }
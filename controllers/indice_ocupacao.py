@@ -0,0 +1,307 @@
+# backend/controllers/indice_ocupacao.py
+#
+# Índice de ocupação em memória por (id_loja, dia UTC): contadores por célula de 30 minutos,
+# construídos sob demanda a partir de 'agendamentos' e atualizados no lugar quando a API
+# cria um agendamento ou muda um status para/de 'cancelado'.
+#
+# Construção: os agendamentos do período vêm da leitura paginada do repositório, e uma
+# leitura que falha no meio não guarda nada.
+#
+# Reconciliação: cada dia expira após INTERVALO_RECONCILIACAO segundos e é reconstruído
+# do banco no próximo acesso (pega escritas feitas direto pelo JS do admin). invalidar()
+# incrementa a versão da loja e força a reconstrução imediata.
+
+import math
+import os
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from supabase import Client
+
+from db import repositorio
+from models.agendamento import AgendamentosColunares
+from utils.cache import CacheTTL
+from .grade_horarios import INTERVALO_SLOT_MINUTOS, LinhaDoTempo, parse_timestamp
+
+INTERVALO_RECONCILIACAO = float(os.getenv('OCUPACAO_RECONCILIACAO_SEGUNDOS', '60'))
+TAMANHO_INDICE = int(os.getenv('OCUPACAO_TAMANHO_MAXIMO', '2048'))
+
+SEGUNDOS_CELULA = INTERVALO_SLOT_MINUTOS * 60
+CELULAS_POR_DIA = 24 * 60 // INTERVALO_SLOT_MINUTOS
+# Fins depois do último limite do dia caem numa célula extra (nunca liberam um slot do dia)
+CELULA_ALEM_DO_DIA = CELULAS_POR_DIA + 1
+
+
+class OcupacaoDia:
+    """
+    Ocupação de uma loja em um dia (UTC).
+    inicios[c] = agendamentos que começam na célula c; fins[c] = agendamentos cujo fim,
+    arredondado para cima, cai no limite c. Com isso, para slots alinhados à grade:
+        sobreposições(s, e) = #(início < e) - #(fim <= s)
+    sai de somas de prefixo sobre os contadores, sem tocar nos agendamentos.
+    """
+    __slots__ = ('loja_id', 'dia', 'versao', 'inicio_dia', 'inicios', 'fins',
+                 'agendamentos', 'desalinhados', '_lock')
+
+    def __init__(self, loja_id: int, dia: date, versao: int):
+        self.loja_id = loja_id
+        self.dia = dia
+        self.versao = versao
+        self.inicio_dia = datetime.combine(dia, time.min, tzinfo=timezone.utc).timestamp()
+        self.inicios = [0] * (CELULA_ALEM_DO_DIA + 1)
+        self.fins = [0] * (CELULA_ALEM_DO_DIA + 1)
+        self.agendamentos: Dict = {}  # id_agendamento -> (inicio, fim)
+        self.desalinhados = 0         # agendamentos que não começam num limite da grade
+        self._lock = threading.Lock()
+
+    def _celula(self, instante: float) -> float:
+        return (instante - self.inicio_dia) / SEGUNDOS_CELULA
+
+    def _aplicar(self, inicio: float, fim: float, delta: int) -> None:
+        c_inicio = self._celula(inicio)
+        c_fim = math.ceil(self._celula(fim))
+        if c_inicio != int(c_inicio):
+            self.desalinhados += delta
+        self.inicios[min(max(int(c_inicio), 0), CELULA_ALEM_DO_DIA)] += delta
+        self.fins[min(max(c_fim, 0), CELULA_ALEM_DO_DIA)] += delta
+
+    def adicionar(self, id_agendamento, inicio: float, fim: float) -> bool:
+        with self._lock:
+            if id_agendamento in self.agendamentos or fim <= inicio:
+                return False
+            self.agendamentos[id_agendamento] = (inicio, fim)
+            self._aplicar(inicio, fim, +1)
+            return True
+
+    def remover(self, id_agendamento) -> bool:
+        with self._lock:
+            intervalo = self.agendamentos.pop(id_agendamento, None)
+            if intervalo is None:
+                return False
+            self._aplicar(intervalo[0], intervalo[1], -1)
+            return True
+
+    def __len__(self):
+        return len(self.agendamentos)
+
+    def sobreposicoes_por_slot(self, slots: List[Tuple[float, float]]) -> List[int]:
+        """Mesma interface da LinhaDoTempo, usada por grade_horarios.livres_na_grade."""
+        with self._lock:
+            limites = [(self._celula(s), self._celula(e)) for s, e in slots]
+            if self.desalinhados or any(s != int(s) for s, _ in limites):
+                # Fora da grade os contadores não são exatos: usa os intervalos guardados
+                return LinhaDoTempo(self.agendamentos.values()).sobreposicoes_por_slot(slots)
+
+            prefixo_inicios, prefixo_fins = [0], [0]
+            for qtd_inicio, qtd_fim in zip(self.inicios, self.fins):
+                prefixo_inicios.append(prefixo_inicios[-1] + qtd_inicio)
+                prefixo_fins.append(prefixo_fins[-1] + qtd_fim)
+
+        def limitar(celula):
+            return min(max(celula, 0), CELULA_ALEM_DO_DIA + 1)
+
+        contagens = []
+        for s, e in limites:
+            # início < e  <=>  célula_início < ceil(e) (inícios alinhados)
+            comecam_antes = prefixo_inicios[limitar(math.ceil(e))]
+            # fim <= s  <=>  ceil(fim) <= s (s alinhado)
+            terminam_antes = prefixo_fins[limitar(int(s) + 1)]
+            contagens.append(comecam_antes - terminam_antes)
+        return contagens
+
+    def sobreposicoes(self, inicio: float, fim: float) -> int:
+        return self.sobreposicoes_por_slot([(inicio, fim)])[0]
+
+
+# --- Estado do índice (por processo) ---
+_indice = CacheTTL('ocupacao', INTERVALO_RECONCILIACAO, TAMANHO_INDICE)
+_versoes: Dict[int, int] = {}
+_versao_global = 0
+_lock_versoes = threading.Lock()
+reconstrucoes = 0
+
+
+def _versao(loja_id: int) -> int:
+    return _versao_global + _versoes.get(loja_id, 0)
+
+
+def _dia_utc(instante: float) -> date:
+    return datetime.fromtimestamp(instante, tz=timezone.utc).date()
+
+
+def _periodo_utc(data_inicio: date, data_fim: date) -> Tuple[str, str]:
+    return (datetime.combine(data_inicio, time.min, tzinfo=timezone.utc).isoformat(),
+            datetime.combine(data_fim, time.max, tzinfo=timezone.utc).isoformat())
+
+
+def _novos_dias(loja_id: int, data_inicio: date, data_fim: date) -> Dict[date, OcupacaoDia]:
+    versao = _versao(loja_id)
+    return {data_inicio + timedelta(days=i): OcupacaoDia(loja_id, data_inicio + timedelta(days=i), versao)
+            for i in range((data_fim - data_inicio).days + 1)}
+
+
+def _distribuir(por_indice: List[OcupacaoDia], base: float, id_agendamento, inicio: float, fim: float) -> None:
+    """Coloca o agendamento no OcupacaoDia do dia (UTC) em que ele começa, se estiver no período."""
+    indice_dia = int((inicio - base) // 86400)
+    if 0 <= indice_dia < len(por_indice):
+        por_indice[indice_dia].adicionar(id_agendamento, inicio, fim)
+
+
+def _guardar(loja_id: int, dias: Dict[date, OcupacaoDia]) -> None:
+    global reconstrucoes
+    for dia, ocupacao in dias.items():
+        _indice.set((loja_id, dia), ocupacao)
+    reconstrucoes += len(dias)
+
+
+def _avisar_invalidos(colunas: AgendamentosColunares, validos: int) -> None:
+    if validos < len(colunas):
+        print(f"[IndiceOcupacao] {len(colunas) - validos} agendamentos com horários inválidos ignorados.")
+
+
+def _construir(supabase: Client, loja_id: int, data_inicio: date, data_fim: date) -> Dict[date, OcupacaoDia]:
+    """Lê todos os agendamentos do período (leitura paginada) e monta um OcupacaoDia por dia."""
+    dias = _novos_dias(loja_id, data_inicio, data_fim)
+    inicio_utc, fim_utc = _periodo_utc(data_inicio, data_fim)
+    # Forma colunar: timestamps convertidos com cache (se repetem na grade) direto para epoch
+    colunas = AgendamentosColunares(repositorio.listar_agendamentos_ativos(supabase, loja_id, inicio_utc, fim_utc))
+    por_indice = list(dias.values())
+    base = datetime.combine(data_inicio, time.min, tzinfo=timezone.utc).timestamp()
+    validos = 0
+    for id_agendamento, inicio, fim in colunas.intervalos():
+        validos += 1
+        _distribuir(por_indice, base, id_agendamento, inicio, fim)
+    _avisar_invalidos(colunas, validos)
+    _guardar(loja_id, dias)
+    return dias
+
+
+def _construir_lojas(supabase: Client, lojas_ids: List[int], data_inicio: date,
+                     data_fim: date) -> Dict[int, Dict[date, OcupacaoDia]]:
+    """Como _construir, para várias lojas de uma vez: uma única leitura (paginada) para todas."""
+    por_loja = {loja_id: _novos_dias(loja_id, data_inicio, data_fim) for loja_id in lojas_ids}
+    inicio_utc, fim_utc = _periodo_utc(data_inicio, data_fim)
+    colunas = AgendamentosColunares(
+        repositorio.listar_agendamentos_ativos_lojas(supabase, lojas_ids, inicio_utc, fim_utc))
+    por_indice = {loja_id: list(dias.values()) for loja_id, dias in por_loja.items()}
+    base = datetime.combine(data_inicio, time.min, tzinfo=timezone.utc).timestamp()
+    validos = 0
+    for loja_id, id_agendamento, inicio, fim in colunas.intervalos_por_loja():
+        validos += 1
+        if loja_id in por_indice:
+            _distribuir(por_indice[loja_id], base, id_agendamento, inicio, fim)
+    _avisar_invalidos(colunas, validos)
+    for loja_id, dias in por_loja.items():
+        _guardar(loja_id, dias)
+    return por_loja
+
+
+def _valida(ocupacao: Optional[OcupacaoDia], loja_id: int) -> bool:
+    return ocupacao is not None and ocupacao.versao == _versao(loja_id)
+
+
+def obter_ocupacao(supabase: Client, loja_id: int, dia: date) -> OcupacaoDia:
+    """Ocupação da loja no dia, construída sob demanda (e reconstruída se expirada/obsoleta)."""
+    loja_id = int(loja_id)
+    ocupacao = _indice.get((loja_id, dia))
+    if _valida(ocupacao, loja_id):
+        return ocupacao
+    return _construir(supabase, loja_id, dia, dia)[dia]
+
+
+def obter_ocupacao_periodo(supabase: Client, loja_id: int, data_inicio: date, data_fim: date) -> Dict[date, OcupacaoDia]:
+    """Ocupação de cada dia do período; os dias ausentes são carregados em uma única leitura."""
+    loja_id = int(loja_id)
+    resultado, faltantes = {}, []
+    dia = data_inicio
+    while dia <= data_fim:
+        ocupacao = _indice.get((loja_id, dia))
+        if _valida(ocupacao, loja_id):
+            resultado[dia] = ocupacao
+        else:
+            faltantes.append(dia)
+        dia += timedelta(days=1)
+    if faltantes:
+        construidos = _construir(supabase, loja_id, faltantes[0], faltantes[-1])
+        for dia in faltantes:
+            resultado[dia] = construidos[dia]
+    return resultado
+
+
+def obter_ocupacao_lojas(supabase: Client, lojas_ids: Iterable[int], data_inicio: date,
+                         data_fim: date) -> Dict[int, Dict[date, OcupacaoDia]]:
+    """
+    Ocupação de cada loja em cada dia do período. Os pares (loja, dia) ausentes do índice são
+    carregados juntos, em uma leitura cobrindo as lojas e os dias que faltam.
+    """
+    resultado, lojas_faltantes, faltantes = {}, [], []
+    for loja_id in dict.fromkeys(int(l) for l in lojas_ids):
+        resultado[loja_id] = {}
+        dia = data_inicio
+        while dia <= data_fim:
+            ocupacao = _indice.get((loja_id, dia))
+            if _valida(ocupacao, loja_id):
+                resultado[loja_id][dia] = ocupacao
+            else:
+                faltantes.append(dia)
+                if not lojas_faltantes or lojas_faltantes[-1] != loja_id:
+                    lojas_faltantes.append(loja_id)
+            dia += timedelta(days=1)
+    if faltantes:
+        construidos = _construir_lojas(supabase, lojas_faltantes, min(faltantes), max(faltantes))
+        for loja_id in lojas_faltantes:
+            for dia, ocupacao in construidos[loja_id].items():
+                resultado[loja_id].setdefault(dia, ocupacao)
+    return resultado
+
+
+# --- Atualização incremental (chamada pelas rotas de escrita) ---
+
+def _intervalo_do_registro(agendamento: dict):
+    try:
+        return parse_timestamp(agendamento['data_hora_inicio']), parse_timestamp(agendamento['data_hora_fim'])
+    except Exception as e_conv:
+        print(f"[IndiceOcupacao] Agendamento sem horários válidos, invalidando loja: {e_conv}")
+        return None
+
+
+def registrar_agendamento(agendamento: dict) -> None:
+    """Aplica um agendamento recém-inserido (ou alterado) ao índice, se o dia já estiver carregado."""
+    loja_id = agendamento.get('id_loja')
+    if loja_id is None:
+        return
+    loja_id = int(loja_id)
+    intervalo = _intervalo_do_registro(agendamento)
+    if intervalo is None:
+        invalidar(loja_id)
+        return
+    ocupacao = _indice.get((loja_id, _dia_utc(intervalo[0])))
+    if not _valida(ocupacao, loja_id):
+        return  # Será construído do banco no próximo acesso
+    if agendamento.get('status') == 'cancelado':
+        ocupacao.remover(agendamento.get('id_agendamento'))
+    else:
+        ocupacao.adicionar(agendamento.get('id_agendamento'), *intervalo)
+
+
+def registrar_agendamentos(agendamentos: Iterable[dict]) -> None:
+    for agendamento in agendamentos:
+        registrar_agendamento(agendamento)
+
+
+def invalidar(loja_id: Optional[int] = None) -> None:
+    """Marca a ocupação da loja (ou de todas) como obsoleta; será reconstruída no próximo acesso."""
+    global _versao_global
+    with _lock_versoes:
+        if loja_id is None:
+            _versao_global += 1
+        else:
+            _versoes[int(loja_id)] = _versoes.get(int(loja_id), 0) + 1
+
+
+def estatisticas() -> dict:
+    dados = _indice.estatisticas()
+    dados['reconstrucoes'] = reconstrucoes
+    dados['intervalo_reconciliacao_segundos'] = INTERVALO_RECONCILIACAO
+    return dados
@@ -0,0 +1,409 @@
+# backend/controllers/indice_recomendacao.py
+#
+# Recomendação por conteúdo: "produtos semelhantes" (/api/ecommerce/produtos/<id>/similares)
+# e a lista personalizada a partir dos favoritos (/api/ecommerce/recomendados?favoritos=...).
+#
+# Cada produto vira um vetor numpy com blocos de atributos, cada bloco normalizado (L2) e
+# multiplicado pela raiz do seu peso, então o produto escalar entre dois vetores é a soma
+# ponderada das similaridades de cosseno de cada bloco:
+#   - texto:   TF-IDF (tf sublinear) dos radicais de nome_produto (peso 2) e descricao,
+#              com a mesma tokenização/radical da busca (indice_busca)
+#   - tipo_produto, marca, tamanho_medida: um valor por produto (igual = 1, diferente = 0)
+#   - faixa de preço: faixas geométricas do preço efetivo (promocional, se houver); a faixa
+#              vizinha conta pela metade
+# Só entram como coluna os termos presentes em 2 ou mais produtos: um termo de um produto só
+# não contribui para nenhum produto escalar (a norma do bloco é calculada com eles, então o
+# cosseno continua exato) e a matriz fica bem mais estreita.
+#
+# Os K_VIZINHOS mais semelhantes de cada produto são calculados em lote (multiplicação de
+# matrizes por blocos de linhas + argpartition) e guardados em dois arrays (ids e notas). Por
+# requisição, "semelhantes" é uma leitura da linha do produto (O(k)) e a lista personalizada
+# soma as listas dos favoritos (O(favoritos x k)).
+#
+# Alterações do catálogo (produto_controller / produto_lote) entram de forma incremental:
+# o vetor do produto é recalculado, a sua lista sai de um produto matriz-vetor e ele é
+# inserido nas listas em que passou a caber; só as linhas que já o tinham como vizinho são
+# recalculadas por inteiro. O vocabulário e o IDF ficam fixos até a próxima reconstrução
+# completa, feita quando as alterações passam de FRACAO_RECONSTRUCAO do catálogo ou a cada
+# INTERVALO_RECONSTRUCAO segundos (o admin também grava produtos direto pelo JS). A construção
+# lê o catálogo inteiro página a página (produto_controller.iterar_produtos).
+
+import math
+import os
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from supabase import Client
+
+from .indice_busca import normalizar, radical, tokenizar
+
+INTERVALO_RECONSTRUCAO = float(os.getenv('RECOMENDACAO_RECONSTRUCAO_SEGUNDOS', '1800'))
+FRACAO_RECONSTRUCAO = float(os.getenv('RECOMENDACAO_FRACAO_RECONSTRUCAO', '0.1'))
+K_VIZINHOS = int(os.getenv('RECOMENDACAO_K', '20'))
+FAVORITOS_MAXIMO = 50
+BLOCO_LINHAS = 512  # linhas por multiplicação no cálculo em lote (limita a memória a BLOCO x N)
+
+PESOS_BLOCOS = {'texto': 0.45, 'tipo_produto': 0.25, 'marca': 0.15, 'tamanho_medida': 0.05, 'preco': 0.10}
+PESOS_TEXTO = {'nome_produto': 2.0, 'descricao': 1.0}
+RAZAO_FAIXA_PRECO = 1.5  # cada faixa de preço vai até 1,5x a anterior
+
+CAMPOS_CARTAO = ('id_produto', 'nome_produto', 'url_imagem', 'preco', 'preco_promocional',
+                 'marca', 'tipo_produto', 'tamanho_medida')
+
+
+_radical = lru_cache(maxsize=65536)(radical)  # o mesmo token se repete em muitos produtos
+
+
+def _termos(produto: dict) -> Dict[str, float]:
+    """{radical: frequência ponderada pelo campo} do texto do produto."""
+    termos: Dict[str, float] = {}
+    for campo, peso in PESOS_TEXTO.items():
+        for token in tokenizar(produto.get(campo)):
+            raiz = _radical(token)
+            termos[raiz] = termos.get(raiz, 0.0) + peso
+    return termos
+
+
+def _faixa_preco(produto: dict) -> Optional[int]:
+    preco = produto.get('preco_promocional') or produto.get('preco')
+    try:
+        preco = float(preco)
+    except (TypeError, ValueError):
+        return None
+    return int(math.floor(math.log(preco) / math.log(RAZAO_FAIXA_PRECO))) if preco > 0 else None
+
+
+def _atributos(produto: dict) -> Dict[str, str]:
+    """Colunas categóricas do produto ({'marca': 'marca:premier', ...})."""
+    atributos = {}
+    for campo in ('tipo_produto', 'marca', 'tamanho_medida'):
+        valor = normalizar(produto.get(campo)).strip()
+        if valor:
+            atributos[campo] = f'{campo}:{valor}'
+    return atributos
+
+
+class IndiceRecomendacao:
+    """Vetores do catálogo e os k vizinhos de cada produto. Seguro para uso entre threads."""
+
+    def __init__(self, produtos: Iterable[dict] = (), k: int = K_VIZINHOS):
+        produtos = [p for p in produtos if p.get('id_produto') is not None]
+        self.k = k
+        self.documentos: Dict[int, dict] = {}
+        self.linha_de: Dict[int, int] = {}
+        self.alteracoes = 0
+        self._lock = threading.RLock()
+
+        # Vocabulário e IDF (fixos até a próxima reconstrução)
+        termos = [_termos(p) for p in produtos]
+        df = Counter(raiz for t in termos for raiz in t)
+        n = len(produtos)
+        self.idf = {raiz: math.log((1 + n) / (1 + quantos)) + 1 for raiz, quantos in df.items()}
+        self.idf_termo_novo = math.log(1 + n) + 1  # termo que não existia na construção (df = 0)
+        colunas = [raiz for raiz, quantos in df.items() if quantos >= 2]
+        categoricas = Counter(valor for p in produtos for valor in _atributos(p).values())
+        colunas += [valor for valor, quantos in categoricas.items() if quantos >= 2]
+        faixas = sorted({f for f in map(_faixa_preco, produtos) if f is not None})
+        colunas += [f'faixa:{f}' for f in range(faixas[0] - 1, faixas[-1] + 2)] if faixas else []
+        self.colunas = {nome: i for i, nome in enumerate(colunas)}
+
+        capacidade = max(16, n + n // 4)
+        self.ids = np.full(capacidade, -1, dtype=np.int64)          # linha -> id_produto (-1 = livre)
+        self.matriz = np.zeros((capacidade, len(colunas)), dtype=np.float32)
+        self.vizinhos = np.full((capacidade, k), -1, dtype=np.int32)  # linha -> linhas vizinhas
+        self.notas = np.zeros((capacidade, k), dtype=np.float32)
+        self.n = 0
+        for produto, t in zip(produtos, termos):
+            self._gravar_linha(self._nova_linha(produto['id_produto']), produto, t)
+        self._calcular_vizinhos(np.arange(self.n))
+
+    def __len__(self):
+        return len(self.linha_de)
+
+    # --- Vetores ---
+
+    def _vetor(self, produto: dict, termos: Optional[Dict[str, float]] = None) -> np.ndarray:
+        vetor = np.zeros(len(self.colunas), dtype=np.float32)
+        termos = _termos(produto) if termos is None else termos
+        pesos = {raiz: (1 + math.log(tf)) * self.idf.get(raiz, self.idf_termo_novo)
+                 for raiz, tf in termos.items()}
+        norma = math.sqrt(sum(p * p for p in pesos.values()))
+        if norma:
+            escala = math.sqrt(PESOS_BLOCOS['texto']) / norma
+            for raiz, peso in pesos.items():
+                coluna = self.colunas.get(raiz)
+                if coluna is not None:
+                    vetor[coluna] = peso * escala
+        for campo, valor in _atributos(produto).items():
+            coluna = self.colunas.get(valor)
+            if coluna is not None:
+                vetor[coluna] = math.sqrt(PESOS_BLOCOS[campo])
+        faixa = _faixa_preco(produto)
+        if faixa is not None:
+            vizinhas = {faixa: 1.0, faixa - 1: 0.5, faixa + 1: 0.5}
+            escala = math.sqrt(PESOS_BLOCOS['preco'] / 1.5)  # norma de (1, 0.5, 0.5) = sqrt(1.5)
+            for f, peso in vizinhas.items():
+                coluna = self.colunas.get(f'faixa:{f}')
+                if coluna is not None:
+                    vetor[coluna] = peso * escala
+        return vetor
+
+    def _nova_linha(self, id_produto: int) -> int:
+        if self.n == len(self.ids):
+            capacidade = len(self.ids) * 2
+            self.ids = np.concatenate([self.ids, np.full(capacidade - self.n, -1, dtype=np.int64)])
+            self.matriz = np.vstack([self.matriz, np.zeros((capacidade - self.n, self.matriz.shape[1]), np.float32)])
+            self.vizinhos = np.vstack([self.vizinhos, np.full((capacidade - self.n, self.k), -1, np.int32)])
+            self.notas = np.vstack([self.notas, np.zeros((capacidade - self.n, self.k), np.float32)])
+        linha = self.n
+        self.n += 1
+        self.ids[linha] = id_produto
+        self.linha_de[id_produto] = linha
+        return linha
+
+    def _gravar_linha(self, linha: int, produto: dict, termos: Optional[Dict[str, float]] = None) -> None:
+        self.matriz[linha] = self._vetor(produto, termos)
+        self.documentos[int(produto['id_produto'])] = {campo: produto.get(campo) for campo in CAMPOS_CARTAO}
+
+    # --- Vizinhos ---
+
+    def _top_k(self, similaridades: np.ndarray, linhas: np.ndarray) -> None:
+        """Grava os k maiores de cada linha de 'similaridades' (len(linhas) x n) em vizinhos/notas."""
+        similaridades[np.arange(len(linhas)), linhas] = -np.inf  # o próprio produto
+        similaridades[:, self.ids[:self.n] < 0] = -np.inf          # linhas removidas
+        k = min(self.k, self.n)
+        if k < self.n:
+            candidatos = np.argpartition(-similaridades, k - 1, axis=1)[:, :k]
+        else:
+            candidatos = np.broadcast_to(np.arange(self.n), (len(linhas), self.n))
+        notas = np.take_along_axis(similaridades, candidatos, axis=1)
+        ordem = np.argsort(-notas, axis=1, kind='stable')
+        candidatos = np.take_along_axis(candidatos, ordem, axis=1)
+        notas = np.take_along_axis(notas, ordem, axis=1)
+        validos = notas > 0  # sem nada em comum não é recomendação
+        self.vizinhos[linhas] = -1
+        self.notas[linhas] = 0
+        self.vizinhos[linhas, :k] = np.where(validos, candidatos, -1)
+        self.notas[linhas, :k] = np.where(validos, notas, 0)
+
+    def _calcular_vizinhos(self, linhas: np.ndarray) -> None:
+        """Recalcula por inteiro as listas das 'linhas', em blocos de BLOCO_LINHAS."""
+        todas = self.matriz[:self.n].T
+        for inicio in range(0, len(linhas), BLOCO_LINHAS):
+            bloco = linhas[inicio:inicio + BLOCO_LINHAS]
+            self._top_k(self.matriz[bloco] @ todas, bloco)
+
+    def _linhas_que_apontam(self, linha: int) -> np.ndarray:
+        return np.nonzero((self.vizinhos[:self.n] == linha).any(axis=1))[0]
+
+    def _atualizar(self, produto: dict) -> None:
+        id_produto = int(produto['id_produto'])
+        linha = self.linha_de.get(id_produto)
+        if linha is None:
+            linha = self._nova_linha(id_produto)
+        self._gravar_linha(linha, produto)
+        self.alteracoes += 1
+
+        # Quem já tinha o produto como vizinho pode ter mudado de ordem ou perdido o lugar
+        afetadas = self._linhas_que_apontam(linha)
+        similaridades = self.matriz[:self.n] @ self.matriz[linha]
+        self._top_k(similaridades[np.newaxis, :].copy(), np.array([linha]))
+        if len(afetadas):
+            self._calcular_vizinhos(afetadas)
+
+        # Entra nas listas em que supera o último colocado (ou que têm vaga)
+        piso = np.where(self.vizinhos[:self.n, -1] < 0, 0, self.notas[:self.n, -1])
+        entram = similaridades > piso
+        entram[linha] = False
+        entram[afetadas] = False
+        entram &= self.ids[:self.n] >= 0
+        linhas = np.nonzero(entram)[0]
+        if len(linhas):
+            self.vizinhos[linhas, -1] = linha
+            self.notas[linhas, -1] = similaridades[linhas]
+            ordem = np.argsort(-np.where(self.vizinhos[linhas] < 0, -np.inf, self.notas[linhas]), axis=1, kind='stable')
+            self.vizinhos[linhas] = np.take_along_axis(self.vizinhos[linhas], ordem, axis=1)
+            self.notas[linhas] = np.take_along_axis(self.notas[linhas], ordem, axis=1)
+
+    def _remover(self, id_produto: int) -> bool:
+        linha = self.linha_de.pop(int(id_produto), None)
+        if linha is None:
+            return False
+        del self.documentos[int(id_produto)]
+        self.ids[linha] = -1
+        self.matriz[linha] = 0
+        self.vizinhos[linha] = -1
+        self.notas[linha] = 0
+        self.alteracoes += 1
+        afetadas = self._linhas_que_apontam(linha)
+        if len(afetadas):
+            self._calcular_vizinhos(afetadas)
+        return True
+
+    def atualizar(self, produtos: Iterable[dict]) -> None:
+        """Insere ou substitui produtos (vetor, lista própria e listas dos outros)."""
+        with self._lock:
+            for produto in produtos:
+                if produto.get('id_produto') is not None:
+                    self._atualizar(produto)
+
+    def remover(self, id_produto) -> bool:
+        with self._lock:
+            return self._remover(id_produto)
+
+    # --- Leitura ---
+
+    def _cartao(self, linha: int, nota: float) -> dict:
+        return dict(self.documentos[int(self.ids[linha])], similaridade=round(float(nota), 4))
+
+    def similares(self, id_produto: int, limite: int = 8) -> Optional[List[dict]]:
+        """Os 'limite' produtos mais semelhantes (None se o produto não estiver no índice)."""
+        with self._lock:
+            linha = self.linha_de.get(int(id_produto))
+            if linha is None:
+                return None
+            return [self._cartao(v, nota) for v, nota in zip(self.vizinhos[linha, :limite], self.notas[linha, :limite])
+                    if v >= 0]
+
+    def personalizados(self, favoritos: Iterable, limite: int = 8) -> List[dict]:
+        """
+        Soma das listas de vizinhos dos favoritos (um produto próximo de vários favoritos sobe),
+        sem os próprios favoritos. Favoritos fora do catálogo são ignorados.
+        """
+        with self._lock:
+            linhas = [self.linha_de[f] for f in dict.fromkeys(favoritos) if f in self.linha_de][:FAVORITOS_MAXIMO]
+            excluir = set(linhas)
+            pontuacoes: Dict[int, float] = {}
+            for linha in linhas:
+                for v, nota in zip(self.vizinhos[linha].tolist(), self.notas[linha].tolist()):
+                    if v >= 0 and v not in excluir:
+                        pontuacoes[v] = pontuacoes.get(v, 0.0) + nota
+            melhores = sorted(pontuacoes.items(), key=lambda item: -item[1])[:limite]
+            return [self._cartao(v, nota / len(linhas)) for v, nota in melhores]
+
+
+# --- Índice do processo ---
+# Só a primeira construção bloqueia a requisição (ou a subida, com PRECARREGAR_CACHES). Depois,
+# a reconstrução roda numa thread e as leituras seguem no índice atual até a troca; as
+# alterações que chegam durante a reconstrução são reaplicadas no índice novo antes da troca.
+_indice: Optional[IndiceRecomendacao] = None
+_construido_em = 0.0
+_reconstruindo = False
+_pendentes: List[tuple] = []
+_geracao = 0  # muda em invalidar(): uma reconstrução iniciada antes é descartada
+_lock_indice = threading.Lock()
+reconstrucoes = 0
+
+
+def _limite_alteracoes(indice: IndiceRecomendacao) -> float:
+    return max(10, FRACAO_RECONSTRUCAO * len(indice))
+
+
+def _desatualizado(indice: IndiceRecomendacao) -> bool:
+    return (time.monotonic() - _construido_em >= INTERVALO_RECONSTRUCAO
+            or indice.alteracoes > _limite_alteracoes(indice))
+
+
+def _construir(supabase: Client) -> IndiceRecomendacao:
+    """Índice com o catálogo inteiro, lido página a página (paginação por chave)."""
+    global reconstrucoes
+    from . import produto_controller  # import local: produto_controller importa este módulo
+    inicio = time.perf_counter()
+    indice = IndiceRecomendacao(produto_controller.iterar_produtos(supabase))
+    reconstrucoes += 1
+    print(f"[IndiceRecomendacao] {len(indice)} produtos, {len(indice.colunas)} colunas, "
+          f"k={indice.k}, em {(time.perf_counter() - inicio) * 1000:.1f} ms.")
+    return indice
+
+
+def _reconstruir_em_segundo_plano(supabase: Client, geracao: int) -> None:
+    global _indice, _construido_em, _reconstruindo
+    try:
+        novo = _construir(supabase)
+    except Exception as e:
+        print(f"[IndiceRecomendacao] Falha na reconstrução (mantendo o índice atual): {e}")
+        novo = None
+    with _lock_indice:
+        if novo is not None and geracao == _geracao:
+            for operacao, dados in _pendentes:
+                novo.atualizar(dados) if operacao == 'atualizar' else novo.remover(dados)
+            novo.alteracoes = 0
+            _indice, _construido_em = novo, time.monotonic()
+        _pendentes.clear()
+        _reconstruindo = False
+
+
+def obter_indice(supabase: Client) -> IndiceRecomendacao:
+    """
+    Índice atual. Constrói do banco na primeira chamada; depois, reconstrói em segundo plano a
+    cada INTERVALO_RECONSTRUCAO segundos ou quando as alterações incrementais passam de
+    FRACAO_RECONSTRUCAO do catálogo.
+    """
+    global _indice, _construido_em, _reconstruindo
+    indice = _indice
+    if indice is None:
+        with _lock_indice:
+            if _indice is None:
+                _indice, _construido_em = _construir(supabase), time.monotonic()
+            return _indice
+    if _desatualizado(indice) and not _reconstruindo:
+        with _lock_indice:
+            if not _reconstruindo and _indice is indice:
+                _reconstruindo = True
+                _pendentes.clear()
+                threading.Thread(target=_reconstruir_em_segundo_plano, args=(supabase, _geracao),
+                                 name='reconstrucao-recomendacao', daemon=True).start()
+    return indice
+
+
+def registrar_produtos(produtos: Iterable[dict]) -> None:
+    """
+    Aplica produtos inseridos/alterados ao índice (se já construído). Um lote grande (importação)
+    que passaria do limite de alterações não é aplicado um a um: só conta como alteração e a
+    próxima leitura dispara a reconstrução.
+    """
+    indice, produtos = _indice, list(produtos or ())
+    if indice is None or not produtos:
+        return
+    with _lock_indice:
+        if _reconstruindo:
+            _pendentes.append(('atualizar', produtos))
+    if indice.alteracoes + len(produtos) > _limite_alteracoes(indice):
+        indice.alteracoes += len(produtos)
+    else:
+        indice.atualizar(produtos)
+
+
+def remover_produto(id_produto) -> None:
+    indice = _indice
+    if indice is None:
+        return
+    with _lock_indice:
+        if _reconstruindo:
+            _pendentes.append(('remover', id_produto))
+    indice.remover(id_produto)
+
+
+def invalidar() -> None:
+    """Força a reconstrução do banco no próximo uso (bloqueante, como na primeira vez)."""
+    global _indice, _geracao
+    with _lock_indice:
+        _indice = None
+        _geracao += 1
+
+
+def estatisticas() -> dict:
+    indice = _indice
+    return {
+        'produtos': len(indice) if indice is not None else 0,
+        'colunas': len(indice.colunas) if indice is not None else 0,
+        'k': K_VIZINHOS,
+        'alteracoes_incrementais': indice.alteracoes if indice is not None else 0,
+        'reconstruindo': _reconstruindo,
+        'reconstrucoes': reconstrucoes,
+        'intervalo_reconstrucao_segundos': INTERVALO_RECONSTRUCAO,
+    }
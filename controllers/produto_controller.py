@@ -1,21 +1,112 @@
 # backend/controllers/produto_controller.py
 
+import base64
+import json
+from typing import Iterator, List, Optional
+
 from supabase import Client
 
+from db import repositorio
+from . import estatisticas_controller, indice_busca, indice_recomendacao, recomendacao_controller
+
+def notificar_alteracao_catalogo():
+    """Descarta o feed da Home em cache."""
+    recomendacao_controller.invalidar_feed_home()
+
 def listar_produtos(supabase: Client):
     """Lista todos os produtos para o Painel ADM."""
     try:
-        res = supabase.table('produtos').select('*').order('nome_produto').execute()
-        return res.data
+        return repositorio.listar_produtos(supabase)
     except Exception as e:
         print(f"[ProdutoController] Erro ao listar produtos: {e}")
         raise
 
+# --- Listagem paginada por chave (nome_produto, id_produto) ---
+CAMPOS_PRODUTO = ('id_produto', 'nome_produto', 'descricao', 'marca', 'tipo_produto', 'tamanho_medida',
+                  'preco', 'preco_promocional', 'quantidade_estoque', 'url_imagem', 'data_cadastro')
+LIMITE_PAGINA_PADRAO = 50
+LIMITE_PAGINA_MAXIMO = 500
+TAMANHO_PAGINA_STREAM = 200
+
+def codificar_cursor(produto: dict) -> str:
+    """Cursor opaco com a chave do último produto da página."""
+    chave = json.dumps([produto['nome_produto'], produto['id_produto']], ensure_ascii=False)
+    return base64.urlsafe_b64encode(chave.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor: str) -> tuple:
+    """Inverso de codificar_cursor. ValueError se o cursor for inválido."""
+    try:
+        chave = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8'))
+        nome, id_produto = chave
+        return str(nome), int(id_produto)
+    except Exception:
+        raise ValueError("Cursor inválido.")
+
+def validar_campos(campos: Optional[List[str]]) -> List[str]:
+    """Campos pedidos (ou todos), sempre com a chave do cursor. ValueError para campo desconhecido."""
+    if not campos:
+        return list(CAMPOS_PRODUTO)
+    desconhecidos = [campo for campo in campos if campo not in CAMPOS_PRODUTO]
+    if desconhecidos:
+        raise ValueError(f"Campos inválidos: {', '.join(desconhecidos)}.")
+    return list(dict.fromkeys(['id_produto', 'nome_produto', *campos]))
+
+def listar_produtos_pagina(supabase: Client, limite: int = LIMITE_PAGINA_PADRAO, cursor: Optional[str] = None,
+                           campos: Optional[List[str]] = None) -> dict:
+    """
+    Uma página da listagem do Painel ADM: {'produtos': [...], 'proximo_cursor': str ou None}.
+    Lê limite + 1 linhas para saber se existe próxima página sem uma consulta de contagem.
+    """
+    limite = min(max(1, limite), LIMITE_PAGINA_MAXIMO)
+    colunas = validar_campos(campos)
+    apos = decodificar_cursor(cursor) if cursor else None
+    try:
+        linhas = repositorio.listar_produtos_pagina(supabase, colunas, limite + 1, apos)
+    except Exception as e:
+        print(f"[ProdutoController] Erro ao listar página de produtos: {e}")
+        raise
+    tem_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+    return {
+        'produtos': linhas,
+        'proximo_cursor': codificar_cursor(linhas[-1]) if tem_mais else None,
+    }
+
+def iterar_produtos(supabase: Client, campos: Optional[List[str]] = None, cursor: Optional[str] = None,
+                    tamanho_pagina: int = TAMANHO_PAGINA_STREAM) -> Iterator[dict]:
+    """
+    Percorre o catálogo página a página (por chave: nome_produto, id_produto); só uma página
+    fica em memória por vez. Quem precisa do catálogo inteiro usa esta função: o PostgREST
+    corta cada resposta em 1000 linhas sem avisar.
+    """
+    colunas = validar_campos(campos)
+    apos = decodificar_cursor(cursor) if cursor else None
+    while True:
+        linhas = repositorio.listar_produtos_pagina(supabase, colunas, tamanho_pagina, apos)
+        yield from linhas
+        if len(linhas) < tamanho_pagina:
+            return
+        apos = (linhas[-1]['nome_produto'], linhas[-1]['id_produto'])
+
+def stream_produtos(supabase: Client, formato: str = 'ndjson', campos: Optional[List[str]] = None,
+                    cursor: Optional[str] = None) -> Iterator[str]:
+    """Pedaços de texto para uma resposta em streaming: NDJSON (uma linha por produto) ou array JSON."""
+    if formato == 'ndjson':
+        for produto in iterar_produtos(supabase, campos, cursor):
+            yield json.dumps(produto, ensure_ascii=False) + '\n'
+        return
+    yield '['
+    separador = ''
+    for produto in iterar_produtos(supabase, campos, cursor):
+        yield separador + json.dumps(produto, ensure_ascii=False)
+        separador = ','
+    yield ']'
+
 def buscar_produto_por_id(supabase: Client, produto_id: int):
     """Busca um produto pelo ID (para edição e consulta)."""
     try:
         res = supabase.table('produtos').select('*').eq('id_produto', produto_id).maybe_single().execute()
-        return res.data
+        return res.data if res else None  # maybe_single().execute() devolve None sem linhas
     except Exception as e:
         print(f"[ProdutoController] Erro ao buscar produto ID {produto_id}: {e}")
         raise
@@ -24,6 +115,10 @@ def inserir_produto(supabase: Client, dados: dict):
     """Insere um novo produto."""
     try:
         res = supabase.table('produtos').insert(dados).execute()
+        indice_busca.registrar_produtos(res.data)
+        indice_recomendacao.registrar_produtos(res.data)
+        estatisticas_controller.ajustar_produtos(len(res.data or []))
+        notificar_alteracao_catalogo()
         return res.data
     except Exception as e:
         print(f"[ProdutoController] Erro ao inserir produto: {e}")
@@ -34,6 +129,9 @@ def atualizar_produto(supabase: Client, produto_id: int, dados: dict):
     try:
         dados.pop('id_produto', None)
         res = supabase.table('produtos').update(dados).eq('id_produto', produto_id).execute()
+        indice_busca.registrar_produtos(res.data)
+        indice_recomendacao.registrar_produtos(res.data)
+        notificar_alteracao_catalogo()
         return res.data
     except Exception as e:
         print(f"[ProdutoController] Erro ao atualizar produto ID {produto_id}: {e}")
@@ -42,7 +140,11 @@ def atualizar_produto(supabase: Client, produto_id: int, dados: dict):
 def deletar_produto(supabase: Client, produto_id: int):
     """Deleta um produto pelo ID."""
     try:
-        supabase.table('produtos').delete().eq('id_produto', produto_id).execute()
+        res = supabase.table('produtos').delete().eq('id_produto', produto_id).execute()
+        indice_busca.remover_produto(produto_id)
+        indice_recomendacao.remover_produto(produto_id)
+        estatisticas_controller.ajustar_produtos(-len(res.data or []))
+        notificar_alteracao_catalogo()
         return True
     except Exception as e:
         print(f"[ProdutoController] Erro ao deletar produto ID {produto_id}: {e}")
@@ -0,0 +1,302 @@
+# backend/controllers/produto_lote.py
+#
+# Importação e exportação do catálogo em lote (listas de preço de fornecedor).
+#
+# Importação (CSV ou NDJSON): o arquivo é lido como stream, linha a linha; cada linha é
+# validada e vai para um lote. Quando o lote enche (TAMANHO_LOTE), é gravado com um único
+# upsert em 'id_produto' (linhas sem id viram um insert). Só um lote fica em memória, e um
+# arquivo de N linhas custa ~N / TAMANHO_LOTE chamadas ao banco.
+#
+# - Linhas COM id_produto atualizam só as colunas enviadas (preço, estoque...). O id deve ser
+#   de um produto existente (conferido por lote, numa consulta): ids novos explícitos não
+#   avançam a sequência do Postgres e colidiriam com os próximos inserts, então viram erro.
+# - Linhas SEM id_produto são produtos novos e precisam de nome_produto e preco.
+# - Se um lote falhar no banco, ele é regravado linha a linha só para apontar quais linhas
+#   têm problema; as demais do lote são gravadas normalmente.
+# - Se o stream falhar no meio (conexão caiu, CSV malformado), a importação para ali: o que
+#   já foi validado é gravado e o relatório diz em que linha parou ('interrompida').
+#
+# Exportação: mesmo formato, gerado página a página (produto_controller.iterar_produtos).
+
+import codecs
+import csv
+import io
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from supabase import Client
+
+from . import estatisticas_controller, indice_busca, indice_recomendacao, produto_controller
+
+TAMANHO_LOTE = int(os.getenv('IMPORTACAO_TAMANHO_LOTE', '500'))
+TAMANHO_LOTE_MAXIMO = 1000
+MAX_ERROS_REPORTADOS = 1000
+
+CAMPOS_IMPORTACAO = tuple(c for c in produto_controller.CAMPOS_PRODUTO if c != 'data_cadastro')
+CAMPOS_OBRIGATORIOS_NOVO = ('nome_produto', 'preco')
+
+
+# --- Leitura do arquivo (stream) ---
+# Cada linha física é decodificada sozinha: um byte fora do UTF-8 vira erro daquela linha no
+# relatório (as demais seguem), em vez de um UnicodeDecodeError no meio do stream.
+
+ERRO_CODIFICACAO = "Codificação inválida na linha {} (salve o arquivo em UTF-8)."
+
+
+def _linhas_utf8(fluxo, invalidas: set) -> Iterator[str]:
+    """Linhas do stream binário decodificadas; as inválidas entram em 'invalidas' (nº da linha)."""
+    for numero, bruta in enumerate(fluxo, start=1):
+        if numero == 1 and bruta.startswith(codecs.BOM_UTF8):
+            bruta = bruta[len(codecs.BOM_UTF8):]
+        try:
+            yield bruta.decode('utf-8')
+        except UnicodeDecodeError:
+            invalidas.add(numero)
+            yield bruta.decode('utf-8', errors='replace')
+
+
+def ler_csv(fluxo, delimitador: str = ',') -> Iterator[Tuple[int, dict]]:
+    """(nº da linha, dados) de um CSV com cabeçalho. Células vazias = coluna não enviada."""
+    invalidas = set()
+    leitor = csv.DictReader(_linhas_utf8(fluxo, invalidas), delimiter=delimitador)
+    if not leitor.fieldnames:
+        raise ValueError("Arquivo CSV vazio ou sem cabeçalho.")
+    if invalidas:
+        raise ValueError(ERRO_CODIFICACAO.format(min(invalidas)))
+    desconhecidas = [c for c in leitor.fieldnames if c and c.strip() not in CAMPOS_IMPORTACAO]
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas no cabeçalho: {', '.join(desconhecidas)}.")
+    ultima = leitor.line_num
+    for linha in leitor:
+        # Um registro pode ocupar várias linhas físicas (campo entre aspas com quebra de linha)
+        ruins = [n for n in range(ultima + 1, leitor.line_num + 1) if n in invalidas]
+        ultima = leitor.line_num
+        if ruins:
+            yield leitor.line_num, ValueError(ERRO_CODIFICACAO.format(ruins[0]))
+            continue
+        yield leitor.line_num, {k.strip(): v for k, v in linha.items() if k and v not in (None, '')}
+
+
+def ler_ndjson(fluxo) -> Iterator[Tuple[int, object]]:
+    """(nº da linha, objeto JSON ou a exceção de parse). Linhas em branco são ignoradas."""
+    invalidas = set()
+    for numero, bruta in enumerate(_linhas_utf8(fluxo, invalidas), start=1):
+        if numero in invalidas:
+            yield numero, ValueError(ERRO_CODIFICACAO.format(numero))
+            continue
+        if not bruta.strip():
+            continue
+        try:
+            yield numero, json.loads(bruta)
+        except json.JSONDecodeError as e:
+            yield numero, ValueError(f"JSON inválido: {e.msg}.")
+
+
+# --- Validação ---
+
+def _numero(valor, campo: str, inteiro: bool = False):
+    if isinstance(valor, str):
+        valor = valor.strip().replace('R$', '').strip()
+        if ',' in valor:
+            valor = valor.replace('.', '').replace(',', '.')  # "1.234,56" -> "1234.56"
+    try:
+        numero = int(valor) if inteiro else float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{campo}' deve ser {'inteiro' if inteiro else 'numérico'}.")
+    if inteiro and isinstance(valor, float) and valor != numero:
+        raise ValueError(f"'{campo}' deve ser inteiro.")
+    if numero < 0:
+        raise ValueError(f"'{campo}' não pode ser negativo.")
+    return numero
+
+
+def validar_linha(dados) -> dict:
+    """Normaliza uma linha para gravação. ValueError com a mensagem para o relatório."""
+    if isinstance(dados, Exception):
+        raise dados
+    if not isinstance(dados, dict):
+        raise ValueError("Cada linha deve ser um objeto JSON.")
+    desconhecidos = [c for c in dados if c not in CAMPOS_IMPORTACAO]
+    if desconhecidos:
+        raise ValueError(f"Campos desconhecidos: {', '.join(desconhecidos)}.")
+
+    produto = {}
+    for campo, valor in dados.items():
+        if valor is None:
+            if campo in ('id_produto', *CAMPOS_OBRIGATORIOS_NOVO):
+                raise ValueError(f"'{campo}' não pode ser nulo.")
+            produto[campo] = None
+        elif campo == 'id_produto' or campo == 'quantidade_estoque':
+            produto[campo] = _numero(valor, campo, inteiro=True)
+        elif campo in ('preco', 'preco_promocional'):
+            produto[campo] = round(_numero(valor, campo), 2)
+        else:
+            produto[campo] = str(valor).strip()
+
+    if 'id_produto' not in produto:
+        faltando = [c for c in CAMPOS_OBRIGATORIOS_NOVO if c not in produto]
+        if faltando:
+            raise ValueError(f"Produto novo (sem id_produto) precisa de: {', '.join(faltando)}.")
+    elif len(produto) == 1:
+        raise ValueError("Linha só com id_produto: nada para atualizar.")
+    if produto.get('nome_produto') == '':
+        raise ValueError("'nome_produto' não pode ser vazio.")
+    preco, promocional = produto.get('preco'), produto.get('preco_promocional')
+    if preco is not None and promocional is not None and promocional >= preco:
+        raise ValueError("'preco_promocional' deve ser menor que 'preco'.")
+    return produto
+
+
+# --- Gravação em lote ---
+
+class RelatorioImportacao:
+    """Contadores e erros por linha (limitados a MAX_ERROS_REPORTADOS para manter a memória fixa)."""
+
+    def __init__(self):
+        self.processadas = 0
+        self.gravadas = 0
+        self.lotes = 0
+        self.chamadas_banco = 0
+        self.erros: List[dict] = []
+        self.total_erros = 0
+        self.interrompida: Optional[dict] = None
+
+    def erro(self, linha: int, mensagem: str) -> None:
+        self.total_erros += 1
+        if len(self.erros) < MAX_ERROS_REPORTADOS:
+            self.erros.append({'linha': linha, 'erro': mensagem})
+
+    def to_dict(self) -> dict:
+        return {
+            'processadas': self.processadas,
+            'gravadas': self.gravadas,
+            'com_erro': self.total_erros,
+            'lotes': self.lotes,
+            'chamadas_banco': self.chamadas_banco,
+            'erros': self.erros,
+            'erros_omitidos': self.total_erros - len(self.erros),
+            'interrompida': self.interrompida,
+        }
+
+
+def _gravar(supabase: Client, linhas: List[dict]) -> List[dict]:
+    """
+    Um upsert (ou insert, sem id) para linhas com o MESMO conjunto de colunas. Misturar colunas
+    num upsert faria o PostgREST preencher as ausentes com o default e sobrescrever o banco.
+    """
+    tabela = supabase.table('produtos')
+    if 'id_produto' in linhas[0]:
+        res = tabela.upsert(linhas, on_conflict='id_produto', default_to_null=False).execute()
+    else:
+        res = tabela.insert(linhas, default_to_null=False).execute()
+    return res.data or []
+
+
+def _ids_existentes(supabase: Client, ids: List[int]) -> set:
+    res = supabase.table('produtos').select('id_produto').in_('id_produto', ids).execute()
+    return {linha['id_produto'] for linha in (res.data or [])}
+
+
+def _gravar_lote(supabase: Client, lote: List[Tuple[int, dict]], relatorio: RelatorioImportacao) -> None:
+    ids = list({produto['id_produto'] for _, produto in lote if 'id_produto' in produto})
+    if ids:
+        relatorio.chamadas_banco += 1
+        existentes = _ids_existentes(supabase, ids)
+        for numero, produto in lote:
+            if 'id_produto' in produto and produto['id_produto'] not in existentes:
+                relatorio.erro(numero, f"Produto {produto['id_produto']} não existe "
+                                       f"(produtos novos vão sem id_produto).")
+        lote = [(n, p) for n, p in lote if 'id_produto' not in p or p['id_produto'] in existentes]
+
+    grupos: Dict[frozenset, List[Tuple[int, dict]]] = {}
+    for numero, produto in lote:
+        grupos.setdefault(frozenset(produto), []).append((numero, produto))
+
+    relatorio.lotes += 1
+    for grupo in grupos.values():
+        relatorio.chamadas_banco += 1
+        try:
+            gravados = _gravar(supabase, [produto for _, produto in grupo])
+            relatorio.gravadas += len(grupo)
+            indice_busca.registrar_produtos(gravados)
+            indice_recomendacao.registrar_produtos(gravados)
+            continue
+        except Exception as e:
+            print(f"[ProdutoLote] Lote com erro ({e}); regravando linha a linha para identificar.")
+
+        for numero, produto in grupo:
+            relatorio.chamadas_banco += 1
+            try:
+                gravados = _gravar(supabase, [produto])
+                indice_busca.registrar_produtos(gravados)
+                indice_recomendacao.registrar_produtos(gravados)
+                relatorio.gravadas += 1
+            except Exception as e:
+                relatorio.erro(numero, f"Erro do banco: {getattr(e, 'message', None) or e}")
+
+
+def importar(supabase: Client, linhas: Iterable[Tuple[int, object]], tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    """
+    Valida e grava as linhas em lotes. Retorna o relatório (contagens e erros por linha).
+    Um erro de leitura antes da primeira linha (cabeçalho, arquivo vazio) é levantado; depois
+    dela, a importação para, grava o lote pendente e o relatório traz 'interrompida'.
+    """
+    tamanho_lote = min(max(1, tamanho_lote), TAMANHO_LOTE_MAXIMO)
+    relatorio = RelatorioImportacao()
+    lote: List[Tuple[int, dict]] = []
+    linhas, numero = iter(linhas), 0
+    try:
+        while True:
+            try:
+                numero, dados = next(linhas)
+            except StopIteration:
+                break
+            except Exception as e:
+                if not relatorio.processadas:
+                    raise  # Cabeçalho/arquivo inválido: nada foi gravado, vira erro da requisição
+                print(f"[ProdutoLote] Leitura interrompida depois da linha {numero}: {e}")
+                relatorio.interrompida = {'apos_linha': numero, 'erro': f"Leitura interrompida: {e}"}
+                break
+            relatorio.processadas += 1
+            try:
+                lote.append((numero, validar_linha(dados)))
+            except ValueError as e:
+                relatorio.erro(numero, str(e))
+                continue
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(supabase, lote, relatorio)
+                lote = []
+        if lote:
+            _gravar_lote(supabase, lote, relatorio)
+    finally:
+        if relatorio.gravadas:
+            produto_controller.notificar_alteracao_catalogo()
+            # O upsert não diz quantas linhas eram novas: o total de produtos é recontado
+            estatisticas_controller.invalidar()
+    print(f"[ProdutoLote] Importação: {relatorio.processadas} linhas, {relatorio.gravadas} gravadas, "
+          f"{relatorio.total_erros} com erro, {relatorio.chamadas_banco} chamadas ao banco.")
+    return relatorio.to_dict()
+
+
+# --- Exportação (stream) ---
+
+def exportar(supabase: Client, formato: str = 'csv', campos: Optional[List[str]] = None,
+             delimitador: str = ',') -> Iterator[str]:
+    """Catálogo em CSV (com cabeçalho) ou NDJSON, página a página. Por padrão, as colunas importáveis."""
+    campos = campos or list(CAMPOS_IMPORTACAO)
+    if formato == 'ndjson':
+        yield from produto_controller.stream_produtos(supabase, 'ndjson', campos)
+        return
+
+    colunas = produto_controller.validar_campos(campos)
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=colunas, delimiter=delimitador, extrasaction='ignore')
+    escritor.writeheader()
+    for produto in produto_controller.iterar_produtos(supabase, campos):
+        escritor.writerow(produto)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
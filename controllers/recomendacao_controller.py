@@ -1,13 +1,21 @@
 # backend/controllers/recomendacao_controller.py
 
+import os
+import threading
+
 from supabase import Client
 
+from utils.cache import CacheTTL
+from utils.concorrencia import mapear
+
+TTL_FEED_HOME = float(os.getenv('CACHE_HOME_TTL', '60'))
+
 def buscar_ofertas(supabase: Client):
     """Busca produtos com preço promocional para a Home."""
     try:
         res = supabase.table('produtos') \
             .select('id_produto, nome_produto, url_imagem, preco, preco_promocional, data_cadastro') \
-            .not_eq('preco_promocional', None) \
+            .not_.is_('preco_promocional', 'null') \
             .order('data_cadastro', desc=True) \
             .limit(8) \
             .execute()
@@ -40,4 +48,57 @@ def buscar_mais_vendidos(supabase: Client, limite: int = 12):
         return res.data
     except Exception as e:
         print(f"[RecomendacaoController] Erro ao buscar mais vendidos: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+# --- Feed agregado da Home ---
+
+# Seção -> consulta. Seções que apontam para a mesma consulta (recomendados/novidades)
+# são buscadas uma vez só.
+SECOES_HOME = {
+    'ofertas': ('ofertas',),
+    'novidades': ('novidades', 8),
+    'mais_vendidos': ('mais_vendidos', 12),
+    'recomendados': ('novidades', 8),
+}
+
+_CONSULTAS_HOME = {
+    'ofertas': lambda supabase: buscar_ofertas(supabase),
+    'novidades': lambda supabase, limite: buscar_novidades(supabase, limite),
+    'mais_vendidos': lambda supabase, limite: buscar_mais_vendidos(supabase, limite),
+}
+
+cache_home = CacheTTL('feed_home', TTL_FEED_HOME, 1)
+_versao_catalogo = 0
+_lock_feed = threading.Lock()
+
+
+def montar_feed_home(supabase: Client) -> dict:
+    """Todas as seções da Home em um payload, com as consultas distintas feitas em paralelo."""
+    feed = cache_home.get('home')
+    if feed is not None:
+        return feed
+
+    # Uma única thread recarrega; as demais esperam e reaproveitam o resultado
+    with _lock_feed:
+        feed = cache_home.get('home')
+        if feed is not None:
+            return feed
+        versao = _versao_catalogo
+
+        consultas = list(dict.fromkeys(SECOES_HOME.values()))
+        dados = mapear(lambda consulta: _CONSULTAS_HOME[consulta[0]](supabase, *consulta[1:]), consultas)
+        resultados = dict(zip(consultas, dados))
+
+        feed = {secao: resultados[consulta] for secao, consulta in SECOES_HOME.items()}
+        # Se o catálogo mudou durante a busca, entrega o resultado sem guardar (pode estar obsoleto)
+        if versao == _versao_catalogo:
+            cache_home.set('home', feed)
+        return feed
+
+
+def invalidar_feed_home() -> None:
+    """Chamado pelo produto_controller após inserir/atualizar/deletar produtos."""
+    global _versao_catalogo
+    _versao_catalogo += 1
+    cache_home.limpar()
@@ -0,0 +1,92 @@
+# backend/db/cliente.py
+#
+# Cliente Supabase do processo, criado no primeiro uso (e não no import do app).
+#
+# - Cada worker do gunicorn cria o seu cliente ao atender a primeira requisição; com
+#   preload_app o processo mestre pode até usar um cliente (para aquecer os caches antes do
+#   fork), mas o filho nunca herda esse cliente: as conexões HTTP abertas pelo pai não podem
+#   ser compartilhadas entre processos. O descarte acontece no hook os.register_at_fork e,
+#   explicitamente, no post_fork do gunicorn.conf.py.
+# - As rotas usam o proxy 'supabase' como se fosse o Client: cada acesso resolve o cliente
+#   atual do processo. 'if not supabase' continua valendo para "banco indisponível".
+# - definir_supabase() troca o cliente do processo (testes, benchmarks, stubs).
+# - O cliente é envolvido por utils/metricas.py, que mede cada execute() (rota /metrics).
+#
+# Configuração (.env): SUPABASE_URL e SUPABASE_KEY.
+
+import os
+import threading
+
+from werkzeug.local import LocalProxy
+
+from utils.metricas import instrumentar_cliente
+
+_cliente = None
+_inicializado = False
+_lock = threading.Lock()
+_herdados = []  # clientes do processo pai, mantidos vivos no filho (ver descartar_apos_fork)
+
+
+def _criar_cliente():
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        print("ERRO CRÍTICO: Variáveis SUPABASE_URL e SUPABASE_KEY não definidas no arquivo .env")
+        return None
+    try:
+        from supabase import create_client
+        cliente = create_client(url, key)
+        print(f"[DB-Cliente] Cliente Supabase inicializado (pid {os.getpid()}).")
+        return instrumentar_cliente(cliente)
+    except Exception as e:
+        print(f"ERRO CRÍTICO ao inicializar Supabase: {e}")
+        return None
+
+
+def obter_supabase():
+    """Cliente Supabase do processo (None se não configurado ou se a criação falhou)."""
+    global _cliente, _inicializado
+    if not _inicializado:
+        with _lock:
+            if not _inicializado:
+                _cliente = _criar_cliente()
+                _inicializado = True
+    return _cliente
+
+
+def definir_supabase(cliente) -> None:
+    """Usa 'cliente' como o cliente do processo (None força nova criação no próximo uso)."""
+    global _cliente, _inicializado
+    with _lock:
+        _cliente = instrumentar_cliente(cliente)
+        _inicializado = cliente is not None
+
+
+def aquecer_importacoes() -> None:
+    """
+    No processo mestre (preload), antes do fork: cria e descarta um cliente, o que carrega os
+    módulos que supabase/httpx só importam na criação (a maior parte do custo dela). Nenhuma
+    conexão é aberta; os workers herdam os módulos e criam o próprio cliente bem mais rápido.
+    """
+    if _criar_cliente() is not None:
+        print("[DB-Cliente] Módulos do cliente carregados antes do fork.")
+
+
+def descartar_apos_fork() -> None:
+    """No processo filho: esquece o cliente herdado do pai (será recriado no primeiro uso)."""
+    global _cliente, _inicializado, _lock
+    # A referência é guardada, não liberada: destruir o cliente aqui fecharia (com TLS
+    # close_notify) conexões que o processo pai continua usando.
+    if _cliente is not None:
+        _herdados.append(_cliente)
+    _cliente = None
+    _inicializado = False
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=descartar_apos_fork)
+
+
+# Proxy usado pelas rotas: 'supabase.table(...)', 'if not supabase', passar para os controllers
+supabase = LocalProxy(obter_supabase)
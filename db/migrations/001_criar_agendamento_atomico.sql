@@ -0,0 +1,74 @@
+-- db/migrations/001_criar_agendamento_atomico.sql
+--
+-- Reserva atômica: verifica a capacidade e insere o agendamento na MESMA transação.
+-- Antes, o backend fazia "conta conflitos" e depois "insere" em chamadas separadas, e dois
+-- clientes simultâneos podiam passar pela contagem e lotar o mesmo horário.
+--
+-- Um advisory lock por loja (liberado automaticamente no fim da transação) serializa apenas
+-- as reservas da mesma loja. O lock é por loja, e não por dia, porque serviços longos (hotel,
+-- day care) atravessam a meia-noite e conflitam com reservas de outro dia.
+--
+-- Chamado pelo backend via: supabase.rpc('criar_agendamento_atomico', {...}).execute()
+-- Retorno (jsonb):
+--   {"status": "ok", "agendamento": {...linha inserida...}}
+--   {"status": "conflito", "conflitos": N, "capacidade": C}
+--   {"status": "indisponivel"}   -- sem regra ou regra inativa para o serviço na loja
+
+create index if not exists idx_agendamentos_loja_inicio
+    on agendamentos (id_loja, data_hora_inicio)
+    where status <> 'cancelado';
+
+create or replace function criar_agendamento_atomico(
+    p_id_cliente uuid,
+    p_id_pet bigint,
+    p_id_loja bigint,
+    p_id_servico bigint,
+    p_data_hora_inicio timestamptz,
+    p_data_hora_fim timestamptz,
+    p_status text default 'confirmado',
+    p_observacoes_cliente text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_capacidade integer;
+    v_ativo boolean;
+    v_conflitos integer;
+    v_agendamento agendamentos%rowtype;
+begin
+    -- 1. Serializa as reservas da loja (namespace fixo + id da loja)
+    perform pg_advisory_xact_lock(hashtext('criar_agendamento_atomico'), p_id_loja::integer);
+
+    -- 2. Regra de capacidade (lida dentro da transação, nunca do cache)
+    select capacidade_simultanea, ativo
+      into v_capacidade, v_ativo
+      from servicos_loja_regras
+     where id_loja = p_id_loja
+       and id_servico = p_id_servico;
+
+    if not found or not coalesce(v_ativo, false) then
+        return jsonb_build_object('status', 'indisponivel');
+    end if;
+
+    -- 3. Conflitos: (InicioA < FimB) e (FimA > InicioB)
+    select count(*)
+      into v_conflitos
+      from agendamentos
+     where id_loja = p_id_loja
+       and data_hora_inicio < p_data_hora_fim
+       and data_hora_fim > p_data_hora_inicio
+       and status <> 'cancelado';
+
+    if v_conflitos >= v_capacidade then
+        return jsonb_build_object('status', 'conflito', 'conflitos', v_conflitos, 'capacidade', v_capacidade);
+    end if;
+
+    -- 4. Insere
+    insert into agendamentos (id_cliente, id_pet, id_loja, id_servico, data_hora_inicio, data_hora_fim, status, observacoes_cliente)
+    values (p_id_cliente, p_id_pet, p_id_loja, p_id_servico, p_data_hora_inicio, p_data_hora_fim, p_status, p_observacoes_cliente)
+    returning * into v_agendamento;
+
+    return jsonb_build_object('status', 'ok', 'agendamento', to_jsonb(v_agendamento));
+end;
+$$;
@@ -0,0 +1,21 @@
+-- db/migrations/002_indices_listagem_agendamentos.sql
+--
+-- Índices da listagem do admin (GET /api/admin/agendamentos), paginada por chave em
+-- (data_hora_inicio desc, id_agendamento desc). Com o índice na mesma ordem, cada página é
+-- uma leitura de 'limite' entradas a partir do cursor, em qualquer ponto do histórico,
+-- sem OFFSET nem ordenação em memória.
+--
+-- Um índice por filtro usado na tela (loja, status, serviço) mais o da listagem sem filtro;
+-- o filtro de período usa a própria coluna de ordenação.
+
+create index if not exists idx_agendamentos_listagem
+    on agendamentos (data_hora_inicio desc, id_agendamento desc);
+
+create index if not exists idx_agendamentos_listagem_loja
+    on agendamentos (id_loja, data_hora_inicio desc, id_agendamento desc);
+
+create index if not exists idx_agendamentos_listagem_status
+    on agendamentos (status, data_hora_inicio desc, id_agendamento desc);
+
+create index if not exists idx_agendamentos_listagem_servico
+    on agendamentos (id_servico, data_hora_inicio desc, id_agendamento desc);
@@ -0,0 +1,108 @@
+-- db/migrations/003_operacoes_em_lote.sql
+--
+-- Operações em lote do admin (controllers/agenda_lote.py). Cada função é UMA instrução SQL
+-- sobre o conjunto inteiro, em vez de um update/insert por linha vindo do navegador, e
+-- devolve o resultado de cada item para a tela mostrar o que aconteceu com cada um.
+--
+-- Chamadas pelo backend via supabase.rpc('<função>', {...}).execute()
+
+
+-- Troca o status de vários agendamentos.
+--   p_status_origem: se informado, só altera os que estão em um desses status
+--                    (ex.: confirmar apenas os 'pendente' da lista).
+-- Retorno (jsonb, um item por id pedido, na ordem recebida):
+--   [{"id_agendamento": 1, "resultado": "atualizado" | "inalterado" | "ignorado" | "nao_encontrado",
+--     "status_anterior": "pendente", "status": "confirmado",
+--     "id_loja": 2, "data_hora_inicio": "...", "data_hora_fim": "..."}, ...]
+--   inalterado = já estava no status pedido; ignorado = status atual fora de p_status_origem.
+
+create or replace function atualizar_status_agendamentos(
+    p_ids bigint[],
+    p_status text,
+    p_status_origem text[] default null
+)
+returns jsonb
+language sql
+as $$
+    with pedidos as (
+        select id, ordem from unnest(p_ids) with ordinality as p(id, ordem)
+    ),
+    atuais as (
+        select a.id_agendamento, a.status
+          from agendamentos a
+         where a.id_agendamento = any(p_ids)
+           for update
+    ),
+    alterados as (
+        update agendamentos a
+           set status = p_status
+          from atuais
+         where a.id_agendamento = atuais.id_agendamento
+           and atuais.status is distinct from p_status
+           and (p_status_origem is null or atuais.status = any(p_status_origem))
+        returning a.id_agendamento, a.id_loja, a.data_hora_inicio, a.data_hora_fim, a.status
+    )
+    select coalesce(jsonb_agg(jsonb_build_object(
+               'id_agendamento', pedidos.id,
+               'resultado', case
+                   when atuais.id_agendamento is null then 'nao_encontrado'
+                   when alterados.id_agendamento is not null then 'atualizado'
+                   when atuais.status = p_status then 'inalterado'
+                   else 'ignorado'
+               end,
+               'status_anterior', atuais.status,
+               'status', coalesce(alterados.status, atuais.status),
+               'id_loja', alterados.id_loja,
+               'data_hora_inicio', alterados.data_hora_inicio,
+               'data_hora_fim', alterados.data_hora_fim
+           ) order by pedidos.ordem), '[]'::jsonb)
+      from pedidos
+      left join atuais on atuais.id_agendamento = pedidos.id
+      left join alterados on alterados.id_agendamento = pedidos.id;
+$$;
+
+
+-- Bloqueia um período (p_data_inicio..p_data_fim, inclusivo) em várias lojas.
+--   p_lojas null = bloqueio geral (id_loja null, vale para todas as lojas).
+-- O "not exists" cobre o bloqueio geral (NULLs não colidem no UNIQUE); o "on conflict" cobre
+-- um bloqueio igual criado ao mesmo tempo por outra requisição.
+-- Retorno (jsonb, um item por loja x dia):
+--   [{"id_loja": 1, "data_bloqueada": "2025-12-24", "resultado": "bloqueado" | "ja_bloqueado",
+--     "id_bloqueio": 10}, ...]
+
+create or replace function bloquear_periodo(
+    p_lojas bigint[],
+    p_data_inicio date,
+    p_data_fim date,
+    p_motivo text default null
+)
+returns jsonb
+language sql
+as $$
+    with pedidos as (
+        select l.id_loja, d.dia::date as data_bloqueada
+          from unnest(coalesce(p_lojas, array[null]::bigint[])) as l(id_loja)
+         cross join generate_series(p_data_inicio, p_data_fim, interval '1 day') as d(dia)
+    ),
+    inseridos as (
+        insert into dias_bloqueados (id_loja, data_bloqueada, motivo)
+        select p.id_loja, p.data_bloqueada, p_motivo
+          from pedidos p
+         where not exists (
+               select 1 from dias_bloqueados b
+                where b.data_bloqueada = p.data_bloqueada
+                  and b.id_loja is not distinct from p.id_loja)
+        on conflict do nothing
+        returning id_bloqueio, id_loja, data_bloqueada
+    )
+    select coalesce(jsonb_agg(jsonb_build_object(
+               'id_loja', pedidos.id_loja,
+               'data_bloqueada', pedidos.data_bloqueada,
+               'resultado', case when inseridos.id_bloqueio is null then 'ja_bloqueado' else 'bloqueado' end,
+               'id_bloqueio', inseridos.id_bloqueio
+           ) order by pedidos.id_loja, pedidos.data_bloqueada), '[]'::jsonb)
+      from pedidos
+      left join inseridos
+        on inseridos.data_bloqueada = pedidos.data_bloqueada
+       and inseridos.id_loja is not distinct from pedidos.id_loja;
+$$;
@@ -0,0 +1,79 @@
+-- db/migrations/004_agendamento_dia_bloqueado.sql
+--
+-- criar_agendamento_atomico passa a recusar dias bloqueados (dias_bloqueados), lidos dentro
+-- da transação. Antes, só o backend checava o bloqueio, e pelo cache de dados de referência
+-- do processo: outro worker (ou o mesmo, antes da invalidação) ainda aceitava reservas num
+-- dia que o admin acabou de fechar.
+--
+-- p_data_local: o dia local ('YYYY-MM-DD') escolhido pelo cliente, o mesmo que o bloqueio
+-- usa. Sem ele, vale o dia de p_data_hora_inicio no fuso da sessão.
+-- Retorno: os mesmos de 001, mais
+--   {"status": "bloqueado"}      -- dia bloqueado para a loja (ou para todas as lojas)
+
+drop function if exists criar_agendamento_atomico(uuid, bigint, bigint, bigint, timestamptz, timestamptz, text, text);
+
+create or replace function criar_agendamento_atomico(
+    p_id_cliente uuid,
+    p_id_pet bigint,
+    p_id_loja bigint,
+    p_id_servico bigint,
+    p_data_hora_inicio timestamptz,
+    p_data_hora_fim timestamptz,
+    p_status text default 'confirmado',
+    p_observacoes_cliente text default null,
+    p_data_local date default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_capacidade integer;
+    v_ativo boolean;
+    v_conflitos integer;
+    v_agendamento agendamentos%rowtype;
+begin
+    -- 1. Serializa as reservas da loja (namespace fixo + id da loja)
+    perform pg_advisory_xact_lock(hashtext('criar_agendamento_atomico'), p_id_loja::integer);
+
+    -- 2. Dia bloqueado (lido dentro da transação, nunca do cache)
+    if exists (
+        select 1
+          from dias_bloqueados
+         where data_bloqueada = coalesce(p_data_local, p_data_hora_inicio::date)
+           and (id_loja = p_id_loja or id_loja is null)
+    ) then
+        return jsonb_build_object('status', 'bloqueado');
+    end if;
+
+    -- 3. Regra de capacidade (lida dentro da transação, nunca do cache)
+    select capacidade_simultanea, ativo
+      into v_capacidade, v_ativo
+      from servicos_loja_regras
+     where id_loja = p_id_loja
+       and id_servico = p_id_servico;
+
+    if not found or not coalesce(v_ativo, false) then
+        return jsonb_build_object('status', 'indisponivel');
+    end if;
+
+    -- 4. Conflitos: (InicioA < FimB) e (FimA > InicioB)
+    select count(*)
+      into v_conflitos
+      from agendamentos
+     where id_loja = p_id_loja
+       and data_hora_inicio < p_data_hora_fim
+       and data_hora_fim > p_data_hora_inicio
+       and status <> 'cancelado';
+
+    if v_conflitos >= v_capacidade then
+        return jsonb_build_object('status', 'conflito', 'conflitos', v_conflitos, 'capacidade', v_capacidade);
+    end if;
+
+    -- 5. Insere
+    insert into agendamentos (id_cliente, id_pet, id_loja, id_servico, data_hora_inicio, data_hora_fim, status, observacoes_cliente)
+    values (p_id_cliente, p_id_pet, p_id_loja, p_id_servico, p_data_hora_inicio, p_data_hora_fim, p_status, p_observacoes_cliente)
+    returning * into v_agendamento;
+
+    return jsonb_build_object('status', 'ok', 'agendamento', to_jsonb(v_agendamento));
+end;
+$$;
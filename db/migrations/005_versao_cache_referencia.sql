@@ -0,0 +1,51 @@
+-- db/migrations/005_versao_cache_referencia.sql
+--
+-- Versão dos dados de referência do agendamento, compartilhada por todos os workers.
+-- Cada worker guarda regras, durações, dias bloqueados e nomes em cache próprio
+-- (controllers/dados_referencia.py); a invalidação das rotas do admin só alcança o worker que
+-- atendeu a requisição. Com esta tabela, qualquer escrita nessas tabelas (pela API, pelo JS
+-- do admin direto no Supabase ou pelo SQL editor) incrementa a versão por trigger, e cada
+-- worker que lê uma versão diferente da sua descarta o cache inteiro.
+--
+-- Lida pelo backend via: supabase.table('versoes_cache').select('versao').eq('escopo', ...)
+
+create table if not exists versoes_cache (
+    escopo text primary key,
+    versao bigint not null default 0,
+    alterado_em timestamptz not null default now()
+);
+
+insert into versoes_cache (escopo) values ('referencia_agendamento') on conflict do nothing;
+
+-- Um incremento por instrução (não por linha): um bloqueio de período em lote conta uma vez.
+create or replace function incrementar_versao_cache()
+returns trigger
+language plpgsql
+as $$
+begin
+    update versoes_cache
+       set versao = versao + 1, alterado_em = now()
+     where escopo = tg_argv[0];
+    return null;
+end;
+$$;
+
+drop trigger if exists versao_referencia on dias_bloqueados;
+create trigger versao_referencia
+    after insert or update or delete on dias_bloqueados
+    for each statement execute function incrementar_versao_cache('referencia_agendamento');
+
+drop trigger if exists versao_referencia on servicos_loja_regras;
+create trigger versao_referencia
+    after insert or update or delete on servicos_loja_regras
+    for each statement execute function incrementar_versao_cache('referencia_agendamento');
+
+drop trigger if exists versao_referencia on servicos;
+create trigger versao_referencia
+    after insert or update or delete on servicos
+    for each statement execute function incrementar_versao_cache('referencia_agendamento');
+
+drop trigger if exists versao_referencia on lojas;
+create trigger versao_referencia
+    after insert or update or delete on lojas
+    for each statement execute function incrementar_versao_cache('referencia_agendamento');
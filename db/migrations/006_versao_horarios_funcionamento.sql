@@ -0,0 +1,13 @@
+-- db/migrations/006_versao_horarios_funcionamento.sql
+--
+-- Horários de funcionamento entram na versão compartilhada de 005: cada worker guarda a
+-- semana compilada de cada loja (controllers/horarios_funcionamento.py), e a grade de slots
+-- e a checagem de horário da reserva leem esse cache. Sem o trigger, só o worker que atendeu
+-- o PUT do admin via a mudança antes do TTL.
+--
+-- Requer 005 (versoes_cache e incrementar_versao_cache).
+
+drop trigger if exists versao_referencia on horarios_funcionamento;
+create trigger versao_referencia
+    after insert or update or delete on horarios_funcionamento
+    for each statement execute function incrementar_versao_cache('referencia_agendamento');
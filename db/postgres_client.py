@@ -0,0 +1,347 @@
+# backend/db/postgres_client.py
+#
+# Acesso direto ao Postgres (sem passar pelo PostgREST) com pool de conexões persistentes.
+# Expõe as mesmas funções de db/supabase_client.py; o primeiro parâmetro é o pool em vez do
+# Client do Supabase. A escolha do backend é feita em db/repositorio.py (DB_BACKEND).
+#
+# Configuração (.env):
+#   DATABASE_URL                 DSN do Postgres (ex: a "connection string" do Supabase)
+#   PG_POOL_MIN / PG_POOL_MAX    tamanho do pool (padrão 1 / 10)
+#   PG_POOL_TIMEOUT              segundos esperando uma conexão livre (padrão 5)
+#   PG_STATEMENT_TIMEOUT_MS      statement_timeout de cada conexão (padrão 5000)
+#   PG_HEALTHCHECK_SEGUNDOS      conexões ociosas há mais tempo que isso são testadas antes do uso (padrão 30)
+
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+
+from models.pet import Pet
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+PG_POOL_MIN = int(os.getenv('PG_POOL_MIN', '1'))
+PG_POOL_MAX = int(os.getenv('PG_POOL_MAX', '10'))
+PG_POOL_TIMEOUT = float(os.getenv('PG_POOL_TIMEOUT', '5'))
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv('PG_STATEMENT_TIMEOUT_MS', '5000'))
+PG_HEALTHCHECK_SEGUNDOS = float(os.getenv('PG_HEALTHCHECK_SEGUNDOS', '30'))
+
+
+class PoolPostgres:
+    """
+    ThreadedConnectionPool com espera limitada por conexão livre, statement_timeout e
+    verificação de saúde (SELECT 1) de conexões que ficaram ociosas.
+    """
+
+    def __init__(self, dsn: str, minimo: int = PG_POOL_MIN, maximo: int = PG_POOL_MAX,
+                 timeout_segundos: float = PG_POOL_TIMEOUT, statement_timeout_ms: int = PG_STATEMENT_TIMEOUT_MS,
+                 healthcheck_segundos: float = PG_HEALTHCHECK_SEGUNDOS):
+        self.maximo = maximo
+        self.timeout_segundos = timeout_segundos
+        self.healthcheck_segundos = healthcheck_segundos
+        self._pool = pg_pool.ThreadedConnectionPool(
+            minimo, maximo, dsn,
+            options=f'-c statement_timeout={statement_timeout_ms}',
+            application_name='chateau_du_pet',
+        )
+        self._vagas = threading.BoundedSemaphore(maximo)
+        self._ultimo_uso = {}
+        self.conexoes_descartadas = 0
+
+    def _saudavel(self, conn) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - self._ultimo_uso.get(id(conn), 0) < self.healthcheck_segundos:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _obter(self):
+        if not self._vagas.acquire(timeout=self.timeout_segundos):
+            raise TimeoutError(f"Nenhuma conexão livre no pool após {self.timeout_segundos}s.")
+        try:
+            # Na pior hipótese todas as conexões do pool caíram: tenta cada uma e depois abre nova
+            for _ in range(self.maximo + 1):
+                conn = self._pool.getconn()
+                if self._saudavel(conn):
+                    return conn
+                self._ultimo_uso.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                self.conexoes_descartadas += 1
+            raise psycopg2.OperationalError("Não foi possível obter uma conexão saudável do pool.")
+        except Exception:
+            self._vagas.release()
+            raise
+
+    def _devolver(self, conn, com_erro: bool = False) -> None:
+        try:
+            descartar = bool(conn.closed)
+            if not descartar and com_erro:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    descartar = True
+            if descartar:
+                self._ultimo_uso.pop(id(conn), None)
+                self.conexoes_descartadas += 1
+            else:
+                self._ultimo_uso[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=descartar)
+        finally:
+            self._vagas.release()
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão do pool; commit ao final, rollback em caso de erro."""
+        conn = self._obter()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            self._devolver(conn, com_erro=True)
+            raise
+        else:
+            self._devolver(conn)
+
+    def consultar(self, sql: str, params=None) -> List[dict]:
+        """Executa o SQL e devolve as linhas como dicionários no mesmo formato do PostgREST."""
+        with self.conexao() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(sql, params)
+                linhas = cur.fetchall() if cur.description else []
+        return [_normalizar_linha(linha) for linha in linhas]
+
+    def verificar_saude(self) -> dict:
+        inicio = time.perf_counter()
+        try:
+            self.consultar('SELECT 1 AS ok')
+            return {'status': 'OK', 'latencia_ms': round((time.perf_counter() - inicio) * 1000, 2),
+                    'conexoes_descartadas': self.conexoes_descartadas}
+        except Exception as e:
+            return {'status': f'FALHA - {e}', 'conexoes_descartadas': self.conexoes_descartadas}
+
+    def fechar(self) -> None:
+        self._pool.closeall()
+
+
+def _normalizar_valor(valor):
+    # PostgREST devolve JSON: datas em ISO, numeric como número e uuid como texto
+    if isinstance(valor, datetime) and valor.microsecond:
+        # O Postgres corta os zeros finais da fração ('...:00.5+00:00', não '.500000')
+        base, fracao = valor.isoformat().split('.', 1)
+        return f'{base}.{fracao[:6].rstrip("0")}{fracao[6:]}'
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, UUID):
+        return str(valor)
+    return valor
+
+
+def _normalizar_linha(linha) -> dict:
+    return {coluna: _normalizar_valor(valor) for coluna, valor in linha.items()}
+
+
+# --- Pool padrão do processo (criado sob demanda) ---
+_pool_padrao: Optional[PoolPostgres] = None
+_lock_pool = threading.Lock()
+
+
+def obter_pool() -> PoolPostgres:
+    global _pool_padrao
+    if _pool_padrao is None:
+        with _lock_pool:
+            if _pool_padrao is None:
+                if not DATABASE_URL:
+                    raise RuntimeError("DATABASE_URL não definida no .env (necessária para DB_BACKEND=postgres).")
+                _pool_padrao = PoolPostgres(DATABASE_URL)
+                print(f"[DB-Postgres] Pool criado (min={PG_POOL_MIN}, max={PG_POOL_MAX}).")
+    return _pool_padrao
+
+
+def fechar_pool() -> None:
+    global _pool_padrao
+    with _lock_pool:
+        if _pool_padrao is not None:
+            _pool_padrao.fechar()
+            _pool_padrao = None
+
+
+_pools_herdados: List[PoolPostgres] = []
+
+
+def _descartar_pool_apos_fork() -> None:
+    # No filho, as conexões herdadas pertencem ao pai: só esquecemos o pool. Fechar (ou deixar
+    # o GC destruir as conexões) mandaria o Terminate do protocolo e encerraria as sessões do
+    # pai no servidor, então a referência fica guardada. Um pool novo é criado no primeiro uso.
+    global _pool_padrao, _lock_pool
+    if _pool_padrao is not None:
+        _pools_herdados.append(_pool_padrao)
+    _pool_padrao = None
+    _lock_pool = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descartar_pool_apos_fork)
+
+
+# --- Consultas (mesma interface de db/supabase_client.py) ---
+
+SQL_AGENDAMENTOS_ATIVOS = """
+    SELECT id_agendamento, data_hora_inicio, data_hora_fim
+      FROM agendamentos
+     WHERE id_loja = %(loja_id)s
+       AND data_hora_inicio >= %(inicio)s
+       AND data_hora_inicio <= %(fim)s
+       AND status <> 'cancelado'
+"""
+
+SQL_AGENDAMENTOS_ATIVOS_LOJAS = """
+    SELECT id_agendamento, id_loja, data_hora_inicio, data_hora_fim
+      FROM agendamentos
+     WHERE id_loja = ANY(%(lojas)s)
+       AND data_hora_inicio >= %(inicio)s
+       AND data_hora_inicio <= %(fim)s
+       AND status <> 'cancelado'
+"""
+
+SQL_AGENDAMENTOS_CRIADOS_DESDE = """
+    SELECT id_agendamento, id_loja, status, data_criacao
+      FROM agendamentos
+     WHERE data_criacao >= %(inicio)s
+"""
+
+SQL_LISTAR_PRODUTOS = "SELECT * FROM produtos ORDER BY nome_produto"
+
+SQL_PET_POR_ID = "SELECT * FROM pets WHERE id_pet = %(pet_id)s"
+
+SQL_PETS_POR_TUTOR = "SELECT * FROM pets WHERE id_tutor = %(tutor_id)s ORDER BY nome_pet"
+
+
+def listar_agendamentos_ativos(pool: PoolPostgres, loja_id: int, inicio_utc: str, fim_utc: str) -> List[dict]:
+    """Agendamentos não cancelados da loja que começam entre inicio_utc e fim_utc."""
+    return pool.consultar(SQL_AGENDAMENTOS_ATIVOS, {'loja_id': loja_id, 'inicio': inicio_utc, 'fim': fim_utc})
+
+
+def listar_agendamentos_ativos_lojas(pool: PoolPostgres, lojas_ids: List[int], inicio_utc: str, fim_utc: str) -> List[dict]:
+    """Agendamentos não cancelados de várias lojas no período, em uma consulta."""
+    return pool.consultar(SQL_AGENDAMENTOS_ATIVOS_LOJAS,
+                          {'lojas': [int(l) for l in lojas_ids], 'inicio': inicio_utc, 'fim': fim_utc})
+
+
+def listar_agendamentos_criados_desde(pool: PoolPostgres, inicio_utc: str) -> List[dict]:
+    """Agendamentos criados a partir de inicio_utc (id, loja, status e data_criacao)."""
+    return pool.consultar(SQL_AGENDAMENTOS_CRIADOS_DESDE, {'inicio': inicio_utc})
+
+
+def listar_agendamentos_pagina(pool: PoolPostgres, colunas: List[str], filtros: dict, limite: int,
+                               apos: Optional[tuple] = None) -> List[dict]:
+    """Página de agendamentos por chave (data_hora_inicio, id_agendamento) decrescente."""
+    condicoes, params = [], {'limite': limite}
+    if filtros.get('id_loja') is not None:
+        condicoes.append(sql.SQL("id_loja = %(id_loja)s"))
+        params['id_loja'] = filtros['id_loja']
+    if filtros.get('id_servico') is not None:
+        condicoes.append(sql.SQL("id_servico = %(id_servico)s"))
+        params['id_servico'] = filtros['id_servico']
+    if filtros.get('status'):
+        condicoes.append(sql.SQL("status = ANY(%(status)s)"))
+        params['status'] = list(filtros['status'])
+    if filtros.get('inicio_utc'):
+        condicoes.append(sql.SQL("data_hora_inicio >= %(inicio_utc)s"))
+        params['inicio_utc'] = filtros['inicio_utc']
+    if filtros.get('fim_utc'):
+        condicoes.append(sql.SQL("data_hora_inicio < %(fim_utc)s"))
+        params['fim_utc'] = filtros['fim_utc']
+    if apos is not None:
+        condicoes.append(sql.SQL("(data_hora_inicio, id_agendamento) < (%(apos_inicio)s, %(apos_id)s)"))
+        params['apos_inicio'], params['apos_id'] = apos[0], int(apos[1])
+    consulta = sql.SQL("SELECT {} FROM agendamentos {} ORDER BY data_hora_inicio DESC, id_agendamento DESC "
+                       "LIMIT %(limite)s").format(
+        sql.SQL(', ').join(sql.Identifier(coluna) for coluna in colunas),
+        sql.SQL('WHERE ') + sql.SQL(' AND ').join(condicoes) if condicoes else sql.SQL(''),
+    )
+    return pool.consultar(consulta, params)
+
+
+def listar_produtos(pool: PoolPostgres) -> List[dict]:
+    """Lista todos os produtos (ordenados por nome)."""
+    return pool.consultar(SQL_LISTAR_PRODUTOS)
+
+
+def listar_produtos_pagina(pool: PoolPostgres, colunas: List[str], limite: int,
+                           apos: Optional[tuple] = None) -> List[dict]:
+    """Página de produtos por chave (nome_produto, id_produto), com comparação de linha do Postgres."""
+    selecao = sql.SQL(', ').join(sql.Identifier(coluna) for coluna in colunas)
+    if apos is None:
+        consulta = sql.SQL("SELECT {} FROM produtos ORDER BY nome_produto, id_produto LIMIT %(limite)s").format(selecao)
+        params = {'limite': limite}
+    else:
+        consulta = sql.SQL(
+            "SELECT {} FROM produtos WHERE (nome_produto, id_produto) > (%(nome)s, %(id)s) "
+            "ORDER BY nome_produto, id_produto LIMIT %(limite)s"
+        ).format(selecao)
+        params = {'nome': apos[0], 'id': apos[1], 'limite': limite}
+    return pool.consultar(consulta, params)
+
+
+def get_pet_by_id(pool: PoolPostgres, pet_id: int):
+    """Busca um Pet na tabela 'pets' pelo ID."""
+    try:
+        linhas = pool.consultar(SQL_PET_POR_ID, {'pet_id': pet_id})
+        return Pet.from_supabase(linhas[0]) if linhas else None
+    except Exception as e:
+        print(f"[DB-Postgres] Erro ao buscar pet ID {pet_id}: {e}")
+        traceback.print_exc()
+        return None
+
+
+def listar_linhas_pets_por_tutor(pool: PoolPostgres, tutor_id: UUID) -> List[dict]:
+    """Linhas de 'pets' do tutor (todas as colunas), ordenadas pelo nome."""
+    try:
+        return pool.consultar(SQL_PETS_POR_TUTOR, {'tutor_id': str(tutor_id)})
+    except Exception as e:
+        print(f"[DB-Postgres] Erro ao listar pets do tutor {tutor_id}: {e}")
+        traceback.print_exc()
+        raise
+
+
+def listar_pets_por_tutor(pool: PoolPostgres, tutor_id: UUID) -> List[Pet]:
+    """Lista todos os pets de um tutor específico."""
+    return Pet.lista_de_supabase(listar_linhas_pets_por_tutor(pool, tutor_id))
+
+
+def inserir_linha_pet(pool: PoolPostgres, dados: dict) -> List[dict]:
+    """Insere uma linha em 'pets' com as colunas recebidas; devolve as linhas gravadas."""
+    try:
+        # Os nomes das colunas vêm do corpo da requisição: sempre como identificadores citados
+        consulta = sql.SQL("INSERT INTO pets ({}) VALUES ({}) RETURNING *").format(
+            sql.SQL(', ').join(sql.Identifier(coluna) for coluna in dados),
+            sql.SQL(', ').join(sql.Placeholder() for _ in dados),
+        )
+        return pool.consultar(consulta, list(dados.values()))
+    except Exception as e:
+        print(f"[DB-Postgres] Erro ao salvar novo pet: {e}")
+        traceback.print_exc()
+        raise
+
+
+def salvar_novo_pet(pool: PoolPostgres, pet_data: Pet):
+    """Insere um novo pet na tabela 'pets'."""
+    linhas = inserir_linha_pet(pool, pet_data.to_dict())
+    return Pet.from_supabase(linhas[0]) if linhas else None
@@ -0,0 +1,95 @@
+# backend/db/repositorio.py
+#
+# Escolhe o backend de dados das leituras mais frequentes (disponibilidade, listagem de
+# produtos, pets) pela variável DB_BACKEND:
+#   supabase (padrão) -> db/supabase_client.py, HTTP/PostgREST usando o Client recebido
+#   postgres          -> db/postgres_client.py, SQL direto sobre o pool de conexões
+# As duas implementações têm as mesmas funções; aqui só repassamos a chamada.
+
+import os
+from typing import List, Optional
+from uuid import UUID
+
+from supabase import Client
+
+from . import supabase_client
+
+DB_BACKEND = os.getenv('DB_BACKEND', 'supabase').lower()
+if DB_BACKEND not in ('supabase', 'postgres'):
+    print(f"[Repositorio] DB_BACKEND '{DB_BACKEND}' desconhecido. Usando 'supabase'.")
+    DB_BACKEND = 'supabase'
+
+
+def _backend(supabase: Client):
+    """Retorna (módulo, cliente) do backend configurado."""
+    if DB_BACKEND == 'postgres':
+        from . import postgres_client
+        return postgres_client, postgres_client.obter_pool()
+    return supabase_client, supabase
+
+
+def listar_agendamentos_ativos(supabase: Client, loja_id: int, inicio_utc: str, fim_utc: str) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_agendamentos_ativos(cliente, loja_id, inicio_utc, fim_utc)
+
+
+def listar_agendamentos_ativos_lojas(supabase: Client, lojas_ids: List[int], inicio_utc: str, fim_utc: str) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_agendamentos_ativos_lojas(cliente, lojas_ids, inicio_utc, fim_utc)
+
+
+def listar_agendamentos_criados_desde(supabase: Client, inicio_utc: str) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_agendamentos_criados_desde(cliente, inicio_utc)
+
+
+def listar_agendamentos_pagina(supabase: Client, colunas: List[str], filtros: dict, limite: int,
+                               apos: Optional[tuple] = None) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_agendamentos_pagina(cliente, colunas, filtros, limite, apos)
+
+
+def listar_produtos(supabase: Client) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_produtos(cliente)
+
+
+def listar_produtos_pagina(supabase: Client, colunas: List[str], limite: int, apos: Optional[tuple] = None) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_produtos_pagina(cliente, colunas, limite, apos)
+
+
+def get_pet_by_id(supabase: Client, pet_id: int):
+    modulo, cliente = _backend(supabase)
+    return modulo.get_pet_by_id(cliente, pet_id)
+
+
+def listar_pets_por_tutor(supabase: Client, tutor_id: UUID):
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_pets_por_tutor(cliente, tutor_id)
+
+
+def listar_linhas_pets_por_tutor(supabase: Client, tutor_id: UUID) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.listar_linhas_pets_por_tutor(cliente, tutor_id)
+
+
+def inserir_linha_pet(supabase: Client, dados: dict) -> List[dict]:
+    modulo, cliente = _backend(supabase)
+    return modulo.inserir_linha_pet(cliente, dados)
+
+
+def salvar_novo_pet(supabase: Client, pet_data):
+    modulo, cliente = _backend(supabase)
+    return modulo.salvar_novo_pet(cliente, pet_data)
+
+
+def verificar_saude() -> dict:
+    """Estado do backend direto (só faz sentido com DB_BACKEND=postgres)."""
+    if DB_BACKEND != 'postgres':
+        return {'backend': DB_BACKEND}
+    from . import postgres_client
+    try:
+        return {'backend': DB_BACKEND, **postgres_client.obter_pool().verificar_saude()}
+    except Exception as e:
+        return {'backend': DB_BACKEND, 'status': f'FALHA - {e}'}
@@ -6,14 +6,17 @@ from uuid import UUID
 import traceback
 
 # Importa os Models que criamos
-from ..models.pet import Pet 
-from ..models.agendamento import Agendamento 
+from models.pet import Pet 
+from models.agendamento import Agendamento 
+
+# Linhas por página nas leituras em lote (o PostgREST do Supabase devolve no máximo 1000)
+PAGINA_AGENDAMENTOS = 1000
 
 def get_pet_by_id(supabase: Client, pet_id: int):
     """Busca um Pet na tabela 'pets' pelo ID."""
     try:
         res = supabase.table('pets').select('*').eq('id_pet', pet_id).maybe_single().execute()
-        if res.data:
+        if res and res.data:
             return Pet.from_supabase(res.data)
         return None
     except Exception as e:
@@ -21,31 +24,131 @@ def get_pet_by_id(supabase: Client, pet_id: int):
         traceback.print_exc()
         return None
 
-def listar_pets_por_tutor(supabase: Client, tutor_id: UUID) -> List[Pet]:
-    """Lista todos os pets de um tutor específico."""
+def listar_linhas_pets_por_tutor(supabase: Client, tutor_id: UUID) -> List[dict]:
+    """Linhas de 'pets' do tutor (todas as colunas), ordenadas pelo nome."""
     try:
         res = supabase.table('pets').select('*').eq('id_tutor', str(tutor_id)).order('nome_pet').execute()
-        if res.data:
-            return [Pet.from_supabase(data) for data in res.data]
-        return []
+        return res.data or []
     except Exception as e:
         print(f"[DB-Pet] Erro ao listar pets do tutor {tutor_id}: {e}")
         traceback.print_exc()
-        return []
+        raise
 
-def salvar_novo_pet(supabase: Client, pet_data: Pet):
-    """Insere um novo pet na tabela 'pets'."""
+def listar_pets_por_tutor(supabase: Client, tutor_id: UUID) -> List[Pet]:
+    """Lista todos os pets de um tutor específico."""
+    return Pet.lista_de_supabase(listar_linhas_pets_por_tutor(supabase, tutor_id))
+
+def inserir_linha_pet(supabase: Client, dados: dict) -> List[dict]:
+    """Insere uma linha em 'pets' com as colunas recebidas; devolve as linhas gravadas."""
     try:
-        dados_dict = pet_data.to_dict()
-        res = supabase.table('pets').insert(dados_dict).select('*').single().execute()
-        
-        if hasattr(res, 'error') and res.error:
-            raise Exception(f"Erro Supabase: {res.error.message}")
-        
-        if res.data:
-            return Pet.from_supabase(res.data)
-        return None
+        # O insert já devolve as linhas gravadas (Prefer: return=representation)
+        res = supabase.table('pets').insert(dados).execute()
+        return res.data or []
     except Exception as e:
         print(f"[DB-Pet] Erro ao salvar novo pet: {e}")
         traceback.print_exc()
-        raise
\ No newline at end of file
+        raise
+
+def salvar_novo_pet(supabase: Client, pet_data: Pet):
+    """Insere um novo pet na tabela 'pets'."""
+    linhas = inserir_linha_pet(supabase, pet_data.to_dict())
+    return Pet.from_supabase(linhas[0]) if linhas else None
+
+
+def _agendamentos_paginados(montar_consulta) -> List[dict]:
+    """
+    Todas as linhas de uma consulta a 'agendamentos', em páginas de PAGINA_AGENDAMENTOS por
+    chave (id_agendamento > último lido): o PostgREST corta a resposta em 1000 linhas sem
+    avisar, e a paginação por offset pularia linhas se um status mudar entre as páginas.
+    montar_consulta() devolve a consulta já filtrada, com 'id_agendamento' no select.
+    """
+    linhas = []
+    while True:
+        consulta = montar_consulta()
+        if linhas:
+            consulta = consulta.gt('id_agendamento', linhas[-1]['id_agendamento'])
+        res = consulta.order('id_agendamento').limit(PAGINA_AGENDAMENTOS).execute()
+        pagina = res.data or []
+        linhas.extend(pagina)
+        if len(pagina) < PAGINA_AGENDAMENTOS:
+            return linhas
+
+
+def listar_agendamentos_ativos(supabase: Client, loja_id: int, inicio_utc: str, fim_utc: str) -> List[dict]:
+    """Agendamentos não cancelados da loja que começam entre inicio_utc e fim_utc (paginado)."""
+    return _agendamentos_paginados(lambda: supabase.table('agendamentos')
+                                   .select('id_agendamento, data_hora_inicio, data_hora_fim')
+                                   .eq('id_loja', loja_id)
+                                   .gte('data_hora_inicio', inicio_utc)
+                                   .lte('data_hora_inicio', fim_utc)
+                                   .neq('status', 'cancelado'))
+
+
+def listar_agendamentos_ativos_lojas(supabase: Client, lojas_ids: List[int], inicio_utc: str, fim_utc: str) -> List[dict]:
+    """Agendamentos não cancelados de várias lojas no período, em uma consulta (paginado)."""
+    return _agendamentos_paginados(lambda: supabase.table('agendamentos')
+                                   .select('id_agendamento, id_loja, data_hora_inicio, data_hora_fim')
+                                   .in_('id_loja', lojas_ids)
+                                   .gte('data_hora_inicio', inicio_utc)
+                                   .lte('data_hora_inicio', fim_utc)
+                                   .neq('status', 'cancelado'))
+
+
+def listar_agendamentos_criados_desde(supabase: Client, inicio_utc: str) -> List[dict]:
+    """Agendamentos criados a partir de inicio_utc (id, loja, status e data_criacao; paginado)."""
+    return _agendamentos_paginados(lambda: supabase.table('agendamentos')
+                                   .select('id_agendamento, id_loja, status, data_criacao')
+                                   .gte('data_criacao', inicio_utc))
+
+
+def listar_agendamentos_pagina(supabase: Client, colunas: List[str], filtros: dict, limite: int,
+                               apos: Optional[tuple] = None) -> List[dict]:
+    """
+    Uma página de agendamentos em ordem (data_hora_inicio desc, id_agendamento desc), começando
+    depois da chave 'apos' = (data_hora_inicio, id_agendamento).
+    filtros: id_loja, id_servico, status (lista), inicio_utc (>=), fim_utc (<); todos opcionais.
+    """
+    consulta = supabase.table('agendamentos').select(', '.join(colunas))
+    if filtros.get('id_loja') is not None:
+        consulta = consulta.eq('id_loja', filtros['id_loja'])
+    if filtros.get('id_servico') is not None:
+        consulta = consulta.eq('id_servico', filtros['id_servico'])
+    if filtros.get('status'):
+        consulta = consulta.in_('status', filtros['status'])
+    if filtros.get('inicio_utc'):
+        consulta = consulta.gte('data_hora_inicio', filtros['inicio_utc'])
+    if filtros.get('fim_utc'):
+        consulta = consulta.lt('data_hora_inicio', filtros['fim_utc'])
+    if apos is not None:
+        inicio, id_agendamento = _literal_postgrest(apos[0]), int(apos[1])
+        consulta = consulta.or_(f'data_hora_inicio.lt.{inicio},'
+                                f'and(data_hora_inicio.eq.{inicio},id_agendamento.lt.{id_agendamento})')
+    res = consulta.order('data_hora_inicio', desc=True).order('id_agendamento', desc=True).limit(limite).execute()
+    return res.data or []
+
+
+def listar_produtos(supabase: Client) -> List[dict]:
+    """Lista todos os produtos (ordenados por nome)."""
+    res = supabase.table('produtos').select('*').order('nome_produto').execute()
+    return res.data or []
+
+
+def _literal_postgrest(valor) -> str:
+    """Valor entre aspas para filtros or=(...) do PostgREST (vírgulas, parênteses e aspas no nome)."""
+    return '"' + str(valor).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def listar_produtos_pagina(supabase: Client, colunas: List[str], limite: int,
+                           apos: Optional[tuple] = None) -> List[dict]:
+    """
+    Uma página de produtos em ordem (nome_produto, id_produto), começando depois da chave
+    'apos' = (nome_produto, id_produto). Paginação por chave: custo constante em qualquer página.
+    """
+    consulta = supabase.table('produtos').select(', '.join(colunas))
+    if apos is not None:
+        nome, id_produto = apos
+        nome = _literal_postgrest(nome)
+        consulta = consulta.or_(f'nome_produto.gt.{nome},and(nome_produto.eq.{nome},id_produto.gt.{int(id_produto)})')
+    res = consulta.order('nome_produto').order('id_produto').limit(limite).execute()
+    return res.data or []
+
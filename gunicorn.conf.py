@@ -0,0 +1,44 @@
+# gunicorn.conf.py
+#
+# Uso (a partir da raiz do projeto):
+#     gunicorn -c gunicorn.conf.py
+#
+# Variáveis de ambiente:
+#   PORT                  porta (padrão 8000)
+#   WEB_CONCURRENCY       número de workers (padrão 2 * CPUs + 1)
+#   GUNICORN_THREADS      threads por worker (padrão 4)
+#   GUNICORN_PRELOAD      1 = importa e monta o app uma vez no mestre, antes do fork (padrão 1)
+#   PRECARREGAR_CACHES    (também no .env) caches carregados na subida: cms, busca, lojas,
+#                         home ou tudo. Com preload, são carregados uma vez no mestre e
+#                         compartilhados pelos workers
+
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'app:create_app()'
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+
+def when_ready(server):
+    # Com preload, o mestre já importou o app. Carrega também os módulos que o cliente
+    # Supabase só importa na criação e congela tudo na geração permanente do GC: as coletas
+    # nos workers não tocam mais nesses objetos, e as páginas de memória herdadas continuam
+    # compartilhadas em vez de serem copiadas.
+    if preload_app:
+        from db import cliente
+        cliente.aquecer_importacoes()
+        gc.freeze()
+        server.log.info("Objetos do mestre congelados para o GC (%d).", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    # O cliente Supabase, o pool Postgres e o pool de threads de consultas do mestre não são
+    # herdados: cada worker cria os seus no primeiro uso. (Os mesmos descartes rodam via
+    # os.register_at_fork; aqui ficam explícitos e registrados no log.)
+    from db import cliente
+    cliente.descartar_apos_fork()
+    server.log.info("Worker %s pronto (cliente do banco será criado no primeiro uso).", worker.pid)
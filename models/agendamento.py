@@ -1,14 +1,27 @@
 # backend/models/agendamento.py
 
+import math
+from array import array
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID
 
+from .conversores import data_hora, data_hora_sem_cache, epoch, epoch_sem_cache, uuid
+
+STATUS_AGENDAMENTO = ('pendente', 'confirmado', 'finalizado', 'cancelado')
+CODIGO_STATUS = {status: codigo for codigo, status in enumerate(STATUS_AGENDAMENTO)}
+CODIGO_STATUS_DESCONHECIDO = 255
+
+
 class Agendamento:
     """
     Representa um registro de agendamento na tabela 'agendamentos'.
     Usa tipos nativos do Python para clareza e tipagem (typing).
+    Com __slots__ (sem __dict__ por instância): listas grandes ocupam bem menos memória.
     """
+    __slots__ = ('id_agendamento', 'id_cliente', 'id_pet', 'id_loja', 'id_servico', 'data_hora_inicio',
+                 'data_hora_fim', 'status', 'observacoes_cliente', 'data_criacao')
+
     def __init__(self,
                  id_agendamento: Optional[int],
                  id_cliente: UUID,
@@ -20,7 +33,7 @@ class Agendamento:
                  status: str = 'pendente',
                  observacoes_cliente: Optional[str] = None,
                  data_criacao: Optional[datetime] = None):
-        
+
         self.id_agendamento = id_agendamento
         self.id_cliente = id_cliente
         self.id_pet = id_pet
@@ -35,19 +48,41 @@ class Agendamento:
     @classmethod
     def from_supabase(cls, data: dict):
         """Cria um objeto Agendamento a partir de um dicionário retornado pelo Supabase."""
+        # Timestamps e UUIDs passam pelo cache de models/conversores.py
         return cls(
             id_agendamento=data.get('id_agendamento'),
-            id_cliente=UUID(data['id_cliente']), # Converte string UUID para objeto UUID
+            id_cliente=uuid(data['id_cliente']),
             id_pet=data.get('id_pet'),
             id_loja=data['id_loja'],
             id_servico=data['id_servico'],
-            data_hora_inicio=datetime.fromisoformat(data['data_hora_inicio'].replace('Z', '+00:00')),
-            data_hora_fim=datetime.fromisoformat(data['data_hora_fim'].replace('Z', '+00:00')),
+            data_hora_inicio=data_hora(data['data_hora_inicio']),
+            data_hora_fim=data_hora(data['data_hora_fim']),
             status=data['status'],
             observacoes_cliente=data.get('observacoes_cliente'),
-            data_criacao=datetime.fromisoformat(data['data_criacao'].replace('Z', '+00:00')) if data.get('data_criacao') else None
+            data_criacao=data_hora_sem_cache(data['data_criacao']) if data.get('data_criacao') else None
         )
 
+    @classmethod
+    def lista_de_supabase(cls, linhas: Iterable[dict]) -> List['Agendamento']:
+        """Decodifica um lote de linhas do PostgREST (sem chamar __init__ por linha)."""
+        novo, conv_uuid, conv_data = object.__new__, uuid, data_hora
+        agendamentos = []
+        for data in linhas:
+            ag = novo(cls)
+            ag.id_agendamento = data.get('id_agendamento')
+            ag.id_cliente = conv_uuid(data['id_cliente'])
+            ag.id_pet = data.get('id_pet')
+            ag.id_loja = data['id_loja']
+            ag.id_servico = data['id_servico']
+            ag.data_hora_inicio = conv_data(data['data_hora_inicio'])
+            ag.data_hora_fim = conv_data(data['data_hora_fim'])
+            ag.status = data['status']
+            ag.observacoes_cliente = data.get('observacoes_cliente')
+            criacao = data.get('data_criacao')
+            ag.data_criacao = data_hora_sem_cache(criacao) if criacao else None
+            agendamentos.append(ag)
+        return agendamentos
+
     def to_dict(self) -> dict:
         """Converte o objeto para um dicionário, adequado para inserção no banco de dados."""
         return {
@@ -62,4 +97,68 @@ class Agendamento:
         }
 
     def __repr__(self):
-        return f"<Agendamento ID={self.id_agendamento} | Cliente={self.id_cliente} | Data={self.data_hora_inicio.strftime('%Y-%m-%d %H:%M')}>"
\ No newline at end of file
+        return f"<Agendamento ID={self.id_agendamento} | Cliente={self.id_cliente} | Data={self.data_hora_inicio.strftime('%Y-%m-%d %H:%M')}>"
+
+
+def _epoch_ou_nan(valor, conversor=epoch) -> float:
+    if not valor:
+        return math.nan
+    try:
+        return conversor(valor)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class AgendamentosColunares:
+    """
+    Forma colunar para listas grandes (ocupação, relatórios): uma coluna por campo em vez de
+    um objeto por linha. Ids em array('q'), timestamps em array('d') como epoch (NaN quando
+    ausente/inválido) e status como um byte por linha (índice em STATUS_AGENDAMENTO).
+    Colunas que não vieram no select ficam None. data_criacao (quase sempre única) não passa
+    pelo cache de conversão.
+    """
+    __slots__ = ('tamanho', 'id_agendamento', 'id_loja', 'id_servico',
+                 'data_hora_inicio', 'data_hora_fim', 'data_criacao', 'status')
+
+    COLUNAS_INTEIRAS = ('id_agendamento', 'id_loja', 'id_servico')
+    COLUNAS_TEMPO = ('data_hora_inicio', 'data_hora_fim', 'data_criacao')
+
+    def __init__(self, linhas: Iterable[dict]):
+        linhas = linhas if isinstance(linhas, list) else list(linhas)
+        self.tamanho = len(linhas)
+        # Sem linhas, todas as colunas existem (vazias): o consumidor não precisa tratar None
+        presentes = linhas[0].keys() if linhas else self.COLUNAS_INTEIRAS + self.COLUNAS_TEMPO + ('status',)
+        for coluna in self.COLUNAS_INTEIRAS:
+            valores = array('q', [-1 if linha.get(coluna) is None else linha[coluna] for linha in linhas]) \
+                if coluna in presentes else None
+            setattr(self, coluna, valores)
+        for coluna in self.COLUNAS_TEMPO:
+            conversor = epoch_sem_cache if coluna == 'data_criacao' else epoch
+            valores = array('d', [_epoch_ou_nan(linha.get(coluna), conversor) for linha in linhas]) \
+                if coluna in presentes else None
+            setattr(self, coluna, valores)
+        self.status = bytes(CODIGO_STATUS.get(linha.get('status'), CODIGO_STATUS_DESCONHECIDO) for linha in linhas) \
+            if 'status' in presentes else None
+
+    def __len__(self):
+        return self.tamanho
+
+    def intervalos(self) -> Iterator[Tuple[int, float, float]]:
+        """(id_agendamento, inicio, fim) em epoch, pulando linhas com horário inválido."""
+        for id_agendamento, inicio, fim in zip(self.id_agendamento, self.data_hora_inicio, self.data_hora_fim):
+            if inicio == inicio and fim == fim:  # NaN != NaN
+                yield id_agendamento, inicio, fim
+
+    def intervalos_por_loja(self) -> Iterator[Tuple[int, int, float, float]]:
+        """(id_loja, id_agendamento, inicio, fim), para consultas que trazem várias lojas."""
+        for id_loja, id_agendamento, inicio, fim in zip(self.id_loja, self.id_agendamento,
+                                                        self.data_hora_inicio, self.data_hora_fim):
+            if inicio == inicio and fim == fim:
+                yield id_loja, id_agendamento, inicio, fim
+
+    def status_da_linha(self, indice: int) -> Optional[str]:
+        codigo = self.status[indice]
+        return STATUS_AGENDAMENTO[codigo] if codigo < len(STATUS_AGENDAMENTO) else None
+
+    def contar_por_status(self) -> dict:
+        return {status: self.status.count(codigo) for status, codigo in CODIGO_STATUS.items()}
@@ -0,0 +1,37 @@
+# backend/models/conversores.py
+#
+# Conversão dos valores que o PostgREST devolve como texto (timestamps ISO e UUIDs) para
+# tipos Python, com cache. Numa listagem os mesmos valores se repetem muito (horários
+# alinhados à grade de 30 min, o mesmo cliente/tutor em várias linhas), e datetime e UUID
+# são imutáveis, então a mesma instância pode ser compartilhada entre os objetos.
+
+from datetime import datetime
+from functools import lru_cache
+from uuid import UUID
+
+TAMANHO_CACHE_CONVERSAO = 8192
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_CONVERSAO)
+def data_hora(valor: str) -> datetime:
+    """Timestamp ISO do Supabase (com 'Z' ou offset) -> datetime com fuso."""
+    return datetime.fromisoformat(valor.replace('Z', '+00:00'))
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_CONVERSAO)
+def epoch(valor: str) -> float:
+    """Timestamp ISO do Supabase -> segundos epoch (mesmo resultado de grade_horarios.parse_timestamp)."""
+    return datetime.fromisoformat(valor.replace('Z', '+00:00')).timestamp()
+
+
+# Para valores que quase nunca se repetem (ex: data_criacao) e só ocupariam o cache
+data_hora_sem_cache = data_hora.__wrapped__
+
+
+def epoch_sem_cache(valor: str) -> float:
+    return data_hora_sem_cache(valor).timestamp()
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_CONVERSAO)
+def uuid(valor) -> UUID:
+    return valor if isinstance(valor, UUID) else UUID(valor)
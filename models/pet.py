@@ -1,13 +1,18 @@
 # backend/models/pet.py
 
-from typing import Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
 
+from .conversores import uuid
+
 class Pet:
     """
     Representa um animal de estimação na tabela 'pets'.
     Reflete as colunas que criamos: id_pet, id_tutor, nome_pet, raca, porte, etc.
+    Com __slots__ (sem __dict__ por instância), como o Agendamento.
     """
+    __slots__ = ('id_pet', 'id_tutor', 'nome_pet', 'especie', 'raca', 'porte', 'data_nascimento', 'observacoes')
+
     def __init__(self,
                  id_pet: Optional[int],
                  id_tutor: UUID,
@@ -17,7 +22,7 @@ class Pet:
                  porte: Optional[str] = None,
                  data_nascimento: Optional[str] = None, # Usando string para datas simples
                  observacoes: Optional[str] = None):
-        
+
         self.id_pet = id_pet
         self.id_tutor = id_tutor
         self.nome_pet = nome_pet
@@ -32,7 +37,7 @@ class Pet:
         """Cria um objeto Pet a partir de um dicionário retornado pelo Supabase."""
         return cls(
             id_pet=data.get('id_pet'),
-            id_tutor=UUID(data['id_tutor']),
+            id_tutor=uuid(data['id_tutor']), # UUID com cache (models/conversores.py)
             nome_pet=data['nome_pet'],
             especie=data['especie'],
             raca=data['raca'],
@@ -41,6 +46,24 @@ class Pet:
             observacoes=data.get('observacoes')
         )
 
+    @classmethod
+    def lista_de_supabase(cls, linhas: Iterable[dict]) -> List['Pet']:
+        """Decodifica um lote de linhas do PostgREST (sem chamar __init__ por linha)."""
+        novo, conv_uuid = object.__new__, uuid
+        pets = []
+        for data in linhas:
+            pet = novo(cls)
+            pet.id_pet = data.get('id_pet')
+            pet.id_tutor = conv_uuid(data['id_tutor'])
+            pet.nome_pet = data['nome_pet']
+            pet.especie = data['especie']
+            pet.raca = data['raca']
+            pet.porte = data.get('porte')
+            pet.data_nascimento = data.get('data_nascimento')
+            pet.observacoes = data.get('observacoes')
+            pets.append(pet)
+        return pets
+
     def to_dict(self) -> dict:
         """Converte o objeto para um dicionário para inserção/atualização no banco de dados."""
         return {
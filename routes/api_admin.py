@@ -1,10 +1,17 @@
 # backend/routes/api_admin.py
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from http import HTTPStatus
-from ..app import supabase
-from ..controllers import produto_controller
-# Importe outros controllers de administração conforme forem criados (ex: horario_controller)
+from datetime import datetime
+import traceback
+
+from controllers import (
+    admin_agendamento_controller, agenda_lote, cms_controller, dados_referencia, estatisticas_controller, horarios_funcionamento, indice_busca, indice_lojas, indice_recomendacao,
+    indice_ocupacao, produto_controller, produto_lote, recomendacao_controller,
+)
+from db.cliente import supabase
+from models.agendamento import STATUS_AGENDAMENTO
+from utils import concorrencia
 
 # Define o Blueprint para as rotas administrativas
 api_admin = Blueprint('api_admin', __name__, url_prefix='/api/admin')
@@ -13,26 +20,19 @@ api_admin = Blueprint('api_admin', __name__, url_prefix='/api/admin')
 # Você precisaria de um decorador aqui para garantir que SÓ ADMINs acessem.
 # Por enquanto, deixamos aberto para facilitar o teste.
 
-# --- ROTA: Produtos (Listar/Inserir) ---
-@api_admin.route('/produtos', methods=['GET', 'POST'])
+# --- ROTA: Produtos (Inserir) ---
+# A listagem (GET /produtos, paginada) fica junto da importação/exportação, mais abaixo.
+@api_admin.route('/produtos', methods=['POST'])
 def produtos_admin():
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
-    
-    if request.method == 'GET':
-        try:
-            produtos = produto_controller.listar_produtos(supabase)
-            return jsonify(produtos), HTTPStatus.OK
-        except Exception:
-            return jsonify({"error": "Falha ao listar produtos."}), HTTPStatus.INTERNAL_SERVER_ERROR
-    
-    if request.method == 'POST':
-        dados = request.get_json()
-        if not dados: return jsonify({"error": "Corpo JSON vazio."}), HTTPStatus.BAD_REQUEST
-        try:
-            produto_inserido = produto_controller.inserir_produto(supabase, dados)
-            return jsonify(produto_inserido), HTTPStatus.CREATED
-        except Exception:
-            return jsonify({"error": "Falha ao inserir produto."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+    dados = request.get_json()
+    if not dados: return jsonify({"error": "Corpo JSON vazio."}), HTTPStatus.BAD_REQUEST
+    try:
+        produto_inserido = produto_controller.inserir_produto(supabase, dados)
+        return jsonify(produto_inserido), HTTPStatus.CREATED
+    except Exception:
+        return jsonify({"error": "Falha ao inserir produto."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 # --- ROTA: Produtos (Buscar/Atualizar/Deletar por ID) ---
 @api_admin.route('/produtos/<int:produto_id>', methods=['GET', 'PUT', 'DELETE'])
@@ -62,4 +62,408 @@ def produto_por_id_admin(produto_id):
             produto_controller.deletar_produto(supabase, produto_id)
             return jsonify({"message": "Produto deletado com sucesso."}), HTTPStatus.NO_CONTENT
         except Exception:
-            return jsonify({"error": "Falha ao deletar produto."}), HTTPStatus.INTERNAL_SERVER_ERROR
\ No newline at end of file
+            return jsonify({"error": "Falha ao deletar produto."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+# --- ROTAS ADMIN DE HORÁRIOS (ESCRITA + INVALIDAÇÃO DO CACHE) ---
+# As regras de capacidade e os dias bloqueados ficam em cache (controllers/dados_referencia.py).
+# Alterações feitas por estas rotas invalidam o cache na hora, sem esperar o TTL.
+@api_admin.route('/regras/<int:id_regra>', methods=['PUT'])
+def update_capacity_rule(id_regra):
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Sem corpo JSON para atualização."}), HTTPStatus.BAD_REQUEST
+    try:
+        dados_update = {}
+        if data.get('capacidade_simultanea') is not None:
+            dados_update['capacidade_simultanea'] = int(data['capacidade_simultanea'])
+            if dados_update['capacidade_simultanea'] < 0:
+                raise ValueError("Capacidade não pode ser negativa.")
+        if data.get('ativo') is not None:
+            if not isinstance(data['ativo'], bool):
+                raise ValueError("'ativo' deve ser true ou false.")
+            dados_update['ativo'] = data['ativo']
+        if not dados_update:
+            raise ValueError("Informe 'capacidade_simultanea' e/ou 'ativo'.")
+    except (TypeError, ValueError) as ve:
+        return jsonify({"error": str(ve)}), HTTPStatus.BAD_REQUEST
+    try:
+        res = supabase.table('servicos_loja_regras').update(dados_update).eq('id_regra', id_regra).execute()
+        if not res.data:
+            return jsonify({"error": "Regra não encontrada."}), HTTPStatus.NOT_FOUND
+        regra = res.data[0]
+        dados_referencia.invalidar_regra(regra.get('id_loja'), regra.get('id_servico'))
+        return jsonify({"message": "Regra atualizada!", "regra": regra}), HTTPStatus.OK
+    except Exception as e:
+        print(f"Erro ao atualizar regra {id_regra}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao atualizar regra."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/dias-bloqueados', methods=['POST'])
+def block_day():
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Sem corpo JSON."}), HTTPStatus.BAD_REQUEST
+    try:
+        data_bloqueada = datetime.strptime(data.get('data_bloqueada') or '', '%Y-%m-%d').date().isoformat()
+        id_loja = int(data['id_loja']) if data.get('id_loja') not in (None, '', 'ALL') else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "Parâmetros inválidos. Use data_bloqueada=YYYY-MM-DD e id_loja numérico ou nulo."}), HTTPStatus.BAD_REQUEST
+    try:
+        res = supabase.table('dias_bloqueados').insert({'data_bloqueada': data_bloqueada, 'id_loja': id_loja, 'motivo': data.get('motivo')}).execute()
+        dados_referencia.invalidar_bloqueios(data_bloqueada, id_loja)
+        return jsonify({"message": "Dia bloqueado!", "bloqueio": res.data[0] if res.data else None}), HTTPStatus.CREATED
+    except Exception as e:
+        if getattr(e, 'code', None) == '23505':
+            return jsonify({"error": "Este dia já está bloqueado para esta loja."}), HTTPStatus.CONFLICT
+        print(f"Erro ao bloquear dia {data_bloqueada}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao bloquear dia."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/dias-bloqueados/<int:id_bloqueio>', methods=['DELETE'])
+def unblock_day(id_bloqueio):
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        res = supabase.table('dias_bloqueados').delete().eq('id_bloqueio', id_bloqueio).execute()
+        if not res.data:
+            return jsonify({"error": "Bloqueio não encontrado."}), HTTPStatus.NOT_FOUND
+        bloqueio = res.data[0]
+        dados_referencia.invalidar_bloqueios(bloqueio.get('data_bloqueada'), bloqueio.get('id_loja'))
+        return jsonify({"message": "Dia desbloqueado!"}), HTTPStatus.OK
+    except Exception as e:
+        print(f"Erro ao desbloquear dia {id_bloqueio}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao desbloquear dia."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/dias-bloqueados/lote', methods=['POST'])
+def block_period():
+    """
+    Bloqueia um período em várias lojas de uma vez.
+        {"data_inicio": "YYYY-MM-DD", "data_fim": "YYYY-MM-DD", "lojas": [1, 2] | null, "motivo": "..."}
+    Sem 'lojas' (ou vazio), cria bloqueios gerais. Retorna o resultado por loja x dia.
+    """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "Envie um objeto JSON."}), HTTPStatus.BAD_REQUEST
+    try:
+        relatorio = agenda_lote.bloquear_periodo(
+            supabase, data.get('data_inicio'), data.get('data_fim'), data.get('lojas'), data.get('motivo'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        print(f"[API_ADMIN] Erro ao bloquear período: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao bloquear período."}), HTTPStatus.INTERNAL_SERVER_ERROR
+    return jsonify(relatorio), HTTPStatus.OK
+
+@api_admin.route('/horarios-funcionamento/<int:id_loja>', methods=['PUT'])
+def save_opening_hours(id_loja):
+    """ Body: lista de dias [{dia_semana, ativo, hora_abertura, hora_fechamento, hora_inicio_pausa, hora_fim_pausa}]. """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json()
+    if not isinstance(data, list):
+        return jsonify({"error": "Envie a lista de dias da semana."}), HTTPStatus.BAD_REQUEST
+    try:
+        horarios = horarios_funcionamento.salvar_horarios(supabase, id_loja, data)
+        return jsonify({"message": "Horários salvos!", "horarios": horarios}), HTTPStatus.OK
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        print(f"Erro ao salvar horários da loja {id_loja}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao salvar horários."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/agendamentos', methods=['GET'])
+def list_appointments_admin():
+    """
+    Listagem do Painel ADM, do mais recente para o mais antigo, paginada por chave.
+        ?loja_id=1&servico_id=2&status=pendente,confirmado&inicio=YYYY-MM-DD&fim=YYYY-MM-DD
+        &limit=50&cursor=<proximo_cursor>&formato=completo|compacto
+    """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        filtros = admin_agendamento_controller.montar_filtros(
+            id_loja=request.args.get('loja_id'),
+            id_servico=request.args.get('servico_id'),
+            status=[s.strip().lower() for valor in request.args.getlist('status') for s in valor.split(',') if s.strip()],
+            inicio=request.args.get('inicio'),
+            fim=request.args.get('fim'),
+        )
+        try:
+            limite = int(request.args.get('limit', admin_agendamento_controller.LIMITE_PAGINA_PADRAO))
+        except ValueError:
+            raise ValueError("Parâmetro 'limit' inválido.")
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            admin_agendamento_controller.decodificar_cursor(cursor)
+        formato = request.args.get('formato', 'completo')
+        if formato not in admin_agendamento_controller.FORMATOS:
+            raise ValueError(f"Formato inválido. Use: {', '.join(admin_agendamento_controller.FORMATOS)}.")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    try:
+        pagina = admin_agendamento_controller.listar_agendamentos_pagina(supabase, filtros, limite, cursor, formato)
+        return jsonify(pagina), HTTPStatus.OK
+    except TimeoutError as te:
+        print(f"[API_ADMIN] Timeout ao listar agendamentos: {te}")
+        return jsonify({"error": "O banco de dados demorou para responder. Tente novamente."}), HTTPStatus.SERVICE_UNAVAILABLE
+    except Exception as e:
+        print(f"[API_ADMIN] Erro ao listar agendamentos: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao listar agendamentos."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/agendamentos/<int:id_agendamento>/status', methods=['PUT'])
+def update_appointment_status(id_agendamento):
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json(silent=True)
+    status = data.get('status') if isinstance(data, dict) else None
+    status = status.strip().lower() if isinstance(status, str) else None
+    if status not in STATUS_AGENDAMENTO:
+        return jsonify({"error": f"Status inválido. Use: {', '.join(STATUS_AGENDAMENTO)}."}), HTTPStatus.BAD_REQUEST
+    try:
+        res = supabase.table('agendamentos').update({'status': status}).eq('id_agendamento', id_agendamento).execute()
+        if not res.data:
+            return jsonify({"error": "Agendamento não encontrado."}), HTTPStatus.NOT_FOUND
+        agendamento = res.data[0]
+        indice_ocupacao.registrar_agendamento(agendamento)
+        estatisticas_controller.registrar_mudanca_status(agendamento)
+        return jsonify({"message": "Status atualizado!", "agendamento": agendamento}), HTTPStatus.OK
+    except Exception as e:
+        print(f"Erro ao atualizar status do agendamento {id_agendamento}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao atualizar status."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/agendamentos/status', methods=['POST'])
+def update_appointments_status_bulk():
+    """
+    Troca o status de vários agendamentos de uma vez, por lista de ids ou pelos filtros da listagem.
+        {"status": "confirmado", "ids": [1, 2, 3]}
+        {"status": "confirmado", "filtros": {"loja_id": 1, "inicio": "YYYY-MM-DD", "fim": "YYYY-MM-DD"},
+         "status_origem": ["pendente"]}
+    Retorna o resultado por agendamento (atualizado, inalterado, ignorado, nao_encontrado).
+    """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "Envie um objeto JSON."}), HTTPStatus.BAD_REQUEST
+    try:
+        status_origem = data.get('status_origem')
+        if isinstance(status_origem, str):
+            status_origem = [s for s in status_origem.split(',') if s.strip()]
+        if data.get('ids') is not None:
+            if not isinstance(data['ids'], list):
+                raise ValueError("'ids' deve ser uma lista de ids numéricos.")
+            ids = data['ids']
+        elif isinstance(data.get('filtros'), dict):
+            filtros = data['filtros']
+            status_filtro = filtros.get('status') or []
+            if isinstance(status_filtro, str):
+                status_filtro = status_filtro.split(',')
+            if not isinstance(status_filtro, list) or not all(isinstance(s, str) for s in status_filtro):
+                raise ValueError("'filtros.status' deve ser uma lista de status.")
+            ids = agenda_lote.ids_por_filtro(supabase, admin_agendamento_controller.montar_filtros(
+                id_loja=filtros.get('loja_id'),
+                id_servico=filtros.get('servico_id'),
+                status=[s.strip().lower() for s in status_filtro if s.strip()],
+                inicio=filtros.get('inicio'),
+                fim=filtros.get('fim'),
+            ))
+        else:
+            raise ValueError("Envie 'ids' (lista) ou 'filtros'.")
+        relatorio = agenda_lote.atualizar_status(supabase, ids, data.get('status'), status_origem)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        print(f"[API_ADMIN] Erro na troca de status em lote: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao atualizar status."}), HTTPStatus.INTERNAL_SERVER_ERROR
+    return jsonify(relatorio), HTTPStatus.OK
+
+@api_admin.route('/cache/invalidar', methods=['POST'])
+def invalidate_reference_cache():
+    """ Invalidação manual, para alterações feitas fora destas rotas (ex: painel do Supabase). """
+    data = request.get_json(silent=True) or {}
+    escopo = data.get('escopo', 'tudo')
+    try:
+        if escopo == 'regras':
+            removidos = dados_referencia.invalidar_regra(data.get('id_loja'), data.get('id_servico'))
+        elif escopo == 'servicos':
+            removidos = dados_referencia.invalidar_duracao(data.get('id_servico')) + dados_referencia.invalidar_nomes('servicos')
+        elif escopo == 'bloqueios':
+            removidos = dados_referencia.invalidar_bloqueios(data.get('data'), data.get('id_loja'))
+        elif escopo == 'ocupacao':
+            indice_ocupacao.invalidar(data.get('id_loja'))
+            removidos = None
+        elif escopo == 'horarios':
+            removidos = horarios_funcionamento.invalidar(data.get('id_loja'))
+        elif escopo == 'home':
+            recomendacao_controller.invalidar_feed_home()
+            removidos = None
+        elif escopo == 'cms':
+            removidos = cms_controller.invalidar(data.get('nome_componente'))
+        elif escopo == 'busca':
+            indice_busca.invalidar()
+            removidos = None
+        elif escopo == 'recomendacoes':
+            indice_recomendacao.invalidar()
+            removidos = None
+        elif escopo == 'estatisticas':
+            estatisticas_controller.invalidar()
+            removidos = None
+        elif escopo == 'lojas':
+            indice_lojas.invalidar()
+            removidos = dados_referencia.invalidar_nomes('lojas')
+        elif escopo == 'clientes':
+            removidos = admin_agendamento_controller.invalidar_nomes()
+        elif escopo == 'tudo':
+            removidos = dados_referencia.invalidar_tudo()
+            horarios_funcionamento.invalidar()
+            admin_agendamento_controller.invalidar_nomes()
+            estatisticas_controller.invalidar()
+            indice_lojas.invalidar()
+            indice_ocupacao.invalidar()
+            recomendacao_controller.invalidar_feed_home()
+            cms_controller.invalidar()
+            indice_busca.invalidar()
+            indice_recomendacao.invalidar()
+        else:
+            return jsonify({"error": "Escopo inválido. Use 'regras', 'servicos', 'bloqueios', 'ocupacao', 'horarios', 'home', 'cms', 'busca', 'recomendacoes', 'estatisticas', 'lojas', 'clientes' ou 'tudo'."}), HTTPStatus.BAD_REQUEST
+    except (TypeError, ValueError):
+        return jsonify({"error": "Parâmetros inválidos."}), HTTPStatus.BAD_REQUEST
+    return jsonify({"escopo": escopo, "removidos": removidos}), HTTPStatus.OK
+
+@api_admin.route('/cache/estatisticas', methods=['GET'])
+def reference_cache_stats():
+    return jsonify({
+        "referencia": dados_referencia.estatisticas_cache(),
+        "ocupacao": indice_ocupacao.estatisticas(),
+        "horarios": horarios_funcionamento.estatisticas(),
+        "nomes_agenda": admin_agendamento_controller.estatisticas(),
+        "home": recomendacao_controller.cache_home.estatisticas(),
+        "cms": cms_controller.estatisticas(),
+        "busca": indice_busca.estatisticas(),
+        "recomendacoes": indice_recomendacao.estatisticas(),
+        "estatisticas": estatisticas_controller.estatisticas(),
+        "lojas": indice_lojas.estatisticas(),
+        "concorrencia": concorrencia.estatisticas(),
+    }), HTTPStatus.OK
+
+@api_admin.route('/estatisticas', methods=['GET'])
+def get_dashboard_stats():
+    """ Números do Dashboard do admin (contadores em memória, recontados periodicamente). """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        return jsonify(estatisticas_controller.obter_estatisticas(supabase)), HTTPStatus.OK
+    except Exception as e:
+        print(f"[API_ADMIN] Erro ao calcular estatísticas do dashboard: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao carregar estatísticas."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/produtos', methods=['GET'])
+def list_products_admin():
+    """
+    Listagem do Painel ADM paginada por chave (nome_produto, id_produto).
+        ?limit=50&cursor=<proximo_cursor>&fields=id_produto,nome_produto,preco
+        ?stream=ndjson | ?stream=json  -> catálogo inteiro, enviado conforme as páginas chegam do banco
+    """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    campos = [c.strip() for c in request.args.get('fields', '').split(',') if c.strip()]
+    cursor = request.args.get('cursor') or None
+    formato = request.args.get('stream')
+    try:
+        limite = int(request.args.get('limit', produto_controller.LIMITE_PAGINA_PADRAO))
+    except ValueError:
+        return jsonify({"error": "Parâmetro 'limit' inválido."}), HTTPStatus.BAD_REQUEST
+    try:
+        # Valida antes de começar a responder (num stream, o status 200 já teria sido enviado)
+        produto_controller.validar_campos(campos)
+        if cursor:
+            produto_controller.decodificar_cursor(cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+
+    if formato:
+        if formato not in ('ndjson', 'json'):
+            return jsonify({"error": "Use stream=ndjson ou stream=json."}), HTTPStatus.BAD_REQUEST
+        mimetype = 'application/x-ndjson' if formato == 'ndjson' else 'application/json'
+        pedacos = produto_controller.stream_produtos(supabase, formato, campos, cursor)
+        return Response(stream_with_context(pedacos), mimetype=mimetype)
+
+    try:
+        return jsonify(produto_controller.listar_produtos_pagina(supabase, limite, cursor, campos)), HTTPStatus.OK
+    except Exception as e:
+        print(f"[API_ADMIN] Erro ao listar produtos: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao listar produtos."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_admin.route('/produtos/importar', methods=['POST'])
+def import_products():
+    """
+    Importação em lote (CSV ou NDJSON), lida como stream. O arquivo vai no corpo da requisição
+    ou como multipart no campo 'arquivo'.
+        ?formato=csv|ndjson (ou pelo Content-Type / extensão)  &lote=500  &delimitador=;
+    Retorna contagens, os erros por linha e, se a leitura parou no meio, onde ('interrompida').
+    """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+
+    arquivo = request.files.get('arquivo')
+    fluxo = arquivo.stream if arquivo else request.stream
+    nome = (arquivo.filename or '') if arquivo else ''
+    tipo = (arquivo.mimetype if arquivo else request.mimetype) or ''
+    formato = request.args.get('formato') or ('ndjson' if 'ndjson' in tipo or nome.endswith(('.ndjson', '.jsonl')) else 'csv')
+    if formato not in ('csv', 'ndjson'):
+        return jsonify({"error": "Use formato=csv ou formato=ndjson."}), HTTPStatus.BAD_REQUEST
+    try:
+        lote = int(request.args.get('lote', produto_lote.TAMANHO_LOTE))
+    except ValueError:
+        return jsonify({"error": "Parâmetro 'lote' inválido."}), HTTPStatus.BAD_REQUEST
+    delimitador = request.args.get('delimitador', ',')
+    if len(delimitador) != 1:
+        return jsonify({"error": "O delimitador deve ter um caractere."}), HTTPStatus.BAD_REQUEST
+
+    try:
+        linhas = produto_lote.ler_ndjson(fluxo) if formato == 'ndjson' else produto_lote.ler_csv(fluxo, delimitador)
+        relatorio = produto_lote.importar(supabase, linhas, lote)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        print(f"[API_ADMIN] Erro na importação de produtos: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha na importação."}), HTTPStatus.INTERNAL_SERVER_ERROR
+    return jsonify(relatorio), HTTPStatus.OK
+
+@api_admin.route('/produtos/exportar', methods=['GET'])
+def export_products():
+    """ Exporta o catálogo (CSV ou NDJSON) em stream. ?formato=csv|ndjson&fields=...&delimitador=; """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    formato = request.args.get('formato', 'csv')
+    if formato not in ('csv', 'ndjson'):
+        return jsonify({"error": "Use formato=csv ou formato=ndjson."}), HTTPStatus.BAD_REQUEST
+    campos = [c.strip() for c in request.args.get('fields', '').split(',') if c.strip()]
+    delimitador = request.args.get('delimitador', ',')
+    try:
+        produto_controller.validar_campos(campos)
+        if len(delimitador) != 1:
+            raise ValueError("O delimitador deve ter um caractere.")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+
+    pedacos = produto_lote.exportar(supabase, formato, campos, delimitador)
+    mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    resposta = Response(stream_with_context(pedacos), mimetype=mimetype)
+    resposta.headers['Content-Disposition'] = f'attachment; filename=produtos.{formato}'
+    return resposta
@@ -1,63 +1,137 @@
 from flask import Blueprint, jsonify, request
 from http import HTTPStatus
+from datetime import datetime
+import traceback
 # Importa as funções que corrigimos do controller
-from ..controllers.agendamento_controller import calcular_horarios_disponiveis, criar_novo_agendamento
-# Importa o objeto Supabase (assumindo que ele é inicializado no app.py)
-from ..app import supabase 
+from controllers.agendamento_controller import (
+    calcular_disponibilidade_periodo, calcular_horarios_disponiveis, criar_novo_agendamento,
+    encontrar_proximos_horarios,
+)
+# Cliente Supabase do processo (criado no primeiro uso, ver db/cliente.py)
+from db.cliente import supabase
 
 api_agendamento = Blueprint('api_agendamento', __name__, url_prefix='/api')
 
+ERRO_TIMEOUT = "O banco de dados demorou para responder. Tente novamente."
+
 # --- ROTA: Horários Disponíveis (GET) ---
 @api_agendamento.route('/horarios-disponiveis', methods=['GET'])
-def horarios_disponiveis():
+def get_available_slots():
     """ Rota para buscar horários disponíveis. """
     if not supabase:
-         return jsonify({"error": "Erro interno: Conexão com banco de dados indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+        return jsonify({"error": "Erro interno: Conexão com banco de dados indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
 
     try:
         # Validação dos parâmetros
-        loja_id = int(request.args.get('loja_id'))
-        servico_id = int(request.args.get('servico_id'))
+        loja_id_str = request.args.get('loja_id')
+        servico_id_str = request.args.get('servico_id')
         data_str = request.args.get('data')
-        
-        if not all([loja_id, servico_id, data_str]):
-            return jsonify({"error": "Parâmetros incompletos (loja_id, servico_id, data)."}), HTTPStatus.BAD_REQUEST
+        if not loja_id_str or not servico_id_str or not data_str:
+            raise ValueError("Parâmetros 'loja_id', 'servico_id' e 'data' são obrigatórios.")
+        loja_id = int(loja_id_str)
+        servico_id = int(servico_id_str)
+        datetime.strptime(data_str, '%Y-%m-%d')
+    except (TypeError, ValueError) as e:
+        print(f"Erro nos parâmetros recebidos: {e}")
+        return jsonify({"error": "Parâmetros inválidos."}), HTTPStatus.BAD_REQUEST
 
+    try:
         horarios = calcular_horarios_disponiveis(supabase, loja_id, servico_id, data_str)
-        
         return jsonify(horarios), HTTPStatus.OK
-
-    except ValueError as e:
-        # Captura erro de data inválida ou parsing
-        return jsonify({"error": f"Parâmetros inválidos: {e}"}), HTTPStatus.BAD_REQUEST
+    except TimeoutError as te:
+        print(f"TIMEOUT /api/horarios-disponiveis: {te}")
+        return jsonify({"error": ERRO_TIMEOUT}), HTTPStatus.SERVICE_UNAVAILABLE
     except Exception as e:
-        print(f"ERRO em /horarios-disponiveis: {e}")
+        print(f"ERRO GERAL /api/horarios-disponiveis: {e}")
+        traceback.print_exc()
         return jsonify({"error": "Erro interno ao calcular horários."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 
+# --- ROTA: Disponibilidade por Período (calendário mensal) ---
+@api_agendamento.route('/horarios-disponiveis/periodo', methods=['GET'])
+def get_available_slots_period():
+    if not supabase:
+        return jsonify({"error": "Erro interno: Conexão com banco de dados indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        loja_id_str = request.args.get('loja_id')
+        servico_id_str = request.args.get('servico_id')
+        inicio_str = request.args.get('inicio')
+        fim_str = request.args.get('fim')
+        if not loja_id_str or not servico_id_str or not inicio_str or not fim_str:
+            raise ValueError("Parâmetros 'loja_id', 'servico_id', 'inicio' e 'fim' são obrigatórios.")
+        loja_id = int(loja_id_str)
+        servico_id = int(servico_id_str)
+    except (TypeError, ValueError) as e:
+        print(f"Erro nos parâmetros recebidos: {e}")
+        return jsonify({"error": "Parâmetros inválidos."}), HTTPStatus.BAD_REQUEST
+    try:
+        dias = calcular_disponibilidade_periodo(supabase, loja_id, servico_id, inicio_str, fim_str)
+        return jsonify({"inicio": inicio_str, "fim": fim_str, "dias": dias}), HTTPStatus.OK
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), HTTPStatus.BAD_REQUEST
+    except TimeoutError as te:
+        print(f"TIMEOUT /api/horarios-disponiveis/periodo: {te}")
+        return jsonify({"error": ERRO_TIMEOUT}), HTTPStatus.SERVICE_UNAVAILABLE
+    except Exception as e:
+        print(f"ERRO GERAL /api/horarios-disponiveis/periodo: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Erro interno ao calcular horários do período."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+# --- ROTA: Próximos Horários Livres (várias lojas e dias) ---
+@api_agendamento.route('/agendamento/proximo-horario', methods=['GET'])
+def get_next_slots():
+    """ ?servico_id=1&lojas=1,2&a_partir_de=YYYY-MM-DD[THH:MM]&limite=5&dias=14 """
+    if not supabase:
+        return jsonify({"error": "Erro interno: Conexão com banco de dados indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        servico_id_str = request.args.get('servico_id')
+        if not servico_id_str:
+            raise ValueError("Parâmetro 'servico_id' é obrigatório.")
+        servico_id = int(servico_id_str)
+        lojas = [int(v) for valor in request.args.getlist('lojas') for v in valor.split(',') if v.strip()]
+        limite = int(request.args.get('limite', 5))
+        dias = int(request.args.get('dias', 14))
+    except (TypeError, ValueError) as e:
+        print(f"Erro nos parâmetros recebidos: {e}")
+        return jsonify({"error": "Parâmetros inválidos."}), HTTPStatus.BAD_REQUEST
+    try:
+        horarios = encontrar_proximos_horarios(supabase, servico_id, lojas, request.args.get('a_partir_de'),
+                                               limite, dias)
+        return jsonify({"servico_id": servico_id, "horarios": horarios}), HTTPStatus.OK
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), HTTPStatus.BAD_REQUEST
+    except TimeoutError as te:
+        print(f"TIMEOUT /api/agendamento/proximo-horario: {te}")
+        return jsonify({"error": ERRO_TIMEOUT}), HTTPStatus.SERVICE_UNAVAILABLE
+    except Exception as e:
+        print(f"ERRO GERAL /api/agendamento/proximo-horario: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Erro interno ao buscar o próximo horário."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
 # --- ROTA: Criar Agendamento (POST) ---
 @api_agendamento.route('/agendar', methods=['POST'])
-def agendar():
+def create_appointment():
     """ Rota para criar um novo agendamento. """
     if not supabase:
-         return jsonify({"error": "Erro interno: Conexão com banco de dados indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
-         
+        return jsonify({"error": "Erro DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+
     data = request.get_json()
     if not data:
-        return jsonify({"error": "Requisição sem corpo JSON."}), HTTPStatus.BAD_REQUEST
+        return jsonify({"error": "Sem corpo JSON."}), HTTPStatus.BAD_REQUEST
 
     try:
-        agendamento_criado = criar_novo_agendamento(supabase, data)
-        
-        return jsonify({
-            "message": "Agendamento criado com sucesso!", 
-            "agendamento": agendamento_criado
-        }), HTTPStatus.CREATED
-
-    except ValueError as e:
+        agendamento = criar_novo_agendamento(supabase, data)
+        return jsonify({"message": "Agendamento criado!", "agendamento": agendamento}), HTTPStatus.CREATED
+    except ValueError as ve:
         # Erro de negócio (ex: slot ocupado, dados faltando)
-        return jsonify({"error": str(e)}), HTTPStatus.CONFLICT # 409 Conflict é bom para slot ocupado
+        print(f"Erro Validação/Conflito: {ve}")
+        return jsonify({"error": str(ve)}), HTTPStatus.CONFLICT # 409 Conflict é bom para slot ocupado
+    except TimeoutError as te:
+        print(f"TIMEOUT /api/agendar: {te}")
+        return jsonify({"error": ERRO_TIMEOUT}), HTTPStatus.SERVICE_UNAVAILABLE
     except Exception as e:
         # Erros internos, DB, etc.
-        print(f"ERRO em /agendar: {e}")
-        return jsonify({"error": "Erro interno ao processar agendamento."}), HTTPStatus.INTERNAL_SERVER_ERROR
\ No newline at end of file
+        print(f"ERRO GERAL /api/agendar: {e}")
+        return jsonify({"error": "Erro interno ao agendar."}), HTTPStatus.INTERNAL_SERVER_ERROR
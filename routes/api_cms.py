@@ -0,0 +1,64 @@
+# backend/routes/api_cms.py
+
+from flask import Blueprint, jsonify, request
+from http import HTTPStatus
+import traceback
+
+from controllers import cms_controller
+from db.cliente import supabase
+from utils.http_cache import cache_http
+
+# Componentes de conteúdo editados pelo CMS do admin (banner, rodapé, ...)
+api_cms = Blueprint('api_cms', __name__, url_prefix='/api/cms')
+
+
+@api_cms.route('/componente/<string:nome_componente>', methods=['GET'])
+@cache_http(max_age=300, stale_while_revalidate=3600)
+def get_cms_component(nome_componente):
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        conteudo = cms_controller.obter_componente(supabase, nome_componente)
+        if conteudo is not None:
+            return jsonify(conteudo), HTTPStatus.OK
+        return jsonify({}), HTTPStatus.NOT_FOUND # Retorna 404 se não encontrar
+    except Exception as e:
+        print(f"Erro ao buscar componente CMS '{nome_componente}': {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao buscar conteúdo CMS."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+@api_cms.route('/componentes', methods=['GET'])
+@cache_http(max_age=300, stale_while_revalidate=3600)
+def get_cms_components():
+    """ Vários componentes em uma requisição: ?nomes=banner,rodape,... -> {nome: conteudo ou null} """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    nomes = [nome.strip() for nome in request.args.get('nomes', '').split(',') if nome.strip()]
+    if not nomes:
+        return jsonify({"error": "Parâmetro 'nomes' é obrigatório (ex: ?nomes=banner,rodape)."}), HTTPStatus.BAD_REQUEST
+    if len(nomes) > cms_controller.MAX_COMPONENTES_POR_LOTE:
+        return jsonify({"error": f"Máximo de {cms_controller.MAX_COMPONENTES_POR_LOTE} componentes por requisição."}), HTTPStatus.BAD_REQUEST
+    try:
+        return jsonify(cms_controller.obter_componentes(supabase, nomes)), HTTPStatus.OK
+    except Exception as e:
+        print(f"Erro ao buscar componentes CMS {nomes}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao buscar conteúdo CMS."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+@api_cms.route('/componente/<string:nome_componente>', methods=['PUT'])
+def update_cms_component(nome_componente):
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Sem corpo JSON para atualização."}), HTTPStatus.BAD_REQUEST
+    try:
+        # Tenta atualizar (se existir) ou inserir (se não existir); o cache é atualizado junto
+        linha = cms_controller.salvar_componente(supabase, nome_componente, data)
+        return jsonify({"message": f"Componente '{nome_componente}' atualizado com sucesso!", "data": linha}), HTTPStatus.OK
+    except Exception as e:
+        print(f"Erro ao atualizar componente CMS '{nome_componente}': {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao atualizar conteúdo CMS."}), HTTPStatus.INTERNAL_SERVER_ERROR
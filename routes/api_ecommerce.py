@@ -1,15 +1,18 @@
 # backend/routes/api_ecommerce.py
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from http import HTTPStatus
-from ..app import supabase
-from ..controllers import recomendacao_controller
-from ..controllers import produto_controller 
+import traceback
+
+from controllers import indice_busca, indice_recomendacao, produto_controller, recomendacao_controller
+from db.cliente import supabase
+from utils.http_cache import cache_http
 
 api_ecommerce = Blueprint('api_ecommerce', __name__, url_prefix='/api/ecommerce')
 
 # --- Rotas de Consulta (Home) ---
 @api_ecommerce.route('/ofertas', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=300)
 def get_ofertas():
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
     try:
@@ -19,6 +22,7 @@ def get_ofertas():
         return jsonify({"error": "Falha ao carregar ofertas."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @api_ecommerce.route('/novidades', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=300)
 def get_novidades():
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
     try:
@@ -28,6 +32,7 @@ def get_novidades():
         return jsonify({"error": "Falha ao carregar novidades."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @api_ecommerce.route('/mais-vendidos', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=300)
 def get_mais_vendidos():
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
     try:
@@ -36,17 +41,60 @@ def get_mais_vendidos():
     except Exception:
         return jsonify({"error": "Falha ao carregar mais vendidos."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
+def _limite_recomendacao():
+    """?limit= (padrão 8, no máximo K_VIZINHOS). ValueError se inválido."""
+    limite = int(request.args.get('limit', 8))
+    if not 1 <= limite <= indice_recomendacao.K_VIZINHOS:
+        raise ValueError
+    return limite
+
 @api_ecommerce.route('/recomendados', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=300)
 def get_recomendados():
+    """
+    ?favoritos=1,2,3  -> produtos semelhantes aos favoritos (índice de recomendação)
+    sem favoritos (ou nenhum no catálogo) -> novidades, como antes
+    """
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
     try:
-        recomendados = recomendacao_controller.buscar_novidades(supabase, limite=8)
+        limite = _limite_recomendacao()
+        favoritos = [int(f) for f in _lista_parametro('favoritos')]
+    except ValueError:
+        return jsonify({"error": f"Use favoritos=1,2,3 e limit entre 1 e {indice_recomendacao.K_VIZINHOS}."}), HTTPStatus.BAD_REQUEST
+    try:
+        recomendados = []
+        if favoritos:
+            recomendados = indice_recomendacao.obter_indice(supabase).personalizados(favoritos, limite)
+        if not recomendados:
+            recomendados = recomendacao_controller.buscar_novidades(supabase, limite=limite)
         return jsonify(recomendados), HTTPStatus.OK
-    except Exception:
+    except Exception as e:
+        print(f"[API_ECOMMERCE] Erro ao montar recomendados: {e}")
+        traceback.print_exc()
         return jsonify({"error": "Falha ao carregar recomendados."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
+@api_ecommerce.route('/produtos/<int:produto_id>/similares', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=600)
+def get_produtos_similares(produto_id):
+    """Produtos mais semelhantes (texto, categoria, marca, medida e faixa de preço). ?limit=8"""
+    if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        limite = _limite_recomendacao()
+    except ValueError:
+        return jsonify({"error": f"'limit' deve estar entre 1 e {indice_recomendacao.K_VIZINHOS}."}), HTTPStatus.BAD_REQUEST
+    try:
+        similares = indice_recomendacao.obter_indice(supabase).similares(produto_id, limite)
+        if similares is None:
+            return jsonify({"error": "Produto não encontrado."}), HTTPStatus.NOT_FOUND
+        return jsonify(similares), HTTPStatus.OK
+    except Exception as e:
+        print(f"[API_ECOMMERCE] Erro ao buscar similares do produto {produto_id}: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao buscar produtos semelhantes."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
 # --- Rota: Produtos por ID (Detalhe da Página de Produto) ---
 @api_ecommerce.route('/produtos/<int:produto_id>', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=600)
 def get_produto_por_id(produto_id):
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
     try:
@@ -55,4 +103,82 @@ def get_produto_por_id(produto_id):
              return jsonify({"error": "Produto não encontrado."}), HTTPStatus.NOT_FOUND
         return jsonify(produto), HTTPStatus.OK
     except Exception:
-        return jsonify({"error": "Falha ao buscar produto."}), HTTPStatus.INTERNAL_SERVER_ERROR
\ No newline at end of file
+        return jsonify({"error": "Falha ao buscar produto."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+# --- Rota: Feed agregado da Home (todas as seções em uma requisição) ---
+@api_ecommerce.route('/home', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=300)
+def get_home_feed():
+    if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        return jsonify(recomendacao_controller.montar_feed_home(supabase)), HTTPStatus.OK
+    except Exception as e:
+        print(f"[API_ECOMMERCE] Erro ao montar feed da home: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao carregar a home."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+# --- Rotas: Busca e Facetas (índice em memória, controllers/indice_busca.py) ---
+def _lista_parametro(nome):
+    """ Valores de um parâmetro repetido e/ou separado por vírgula (?marca=A&marca=B ou ?marca=A,B). """
+    return [v.strip() for valor in request.args.getlist(nome) for v in valor.split(',') if v.strip()]
+
+def _filtros_busca():
+    """ Texto, facetas e faixa de preço da query string (ValueError se o preço for inválido). """
+    return {
+        'consulta': request.args.get('q', ''),
+        'filtros': {campo: _lista_parametro(campo) for campo in indice_busca.CAMPOS_FACETA},
+        'preco_min': float(request.args['preco_min']) if request.args.get('preco_min') else None,
+        'preco_max': float(request.args['preco_max']) if request.args.get('preco_max') else None,
+    }
+
+@api_ecommerce.route('/busca', methods=['GET'])
+@cache_http(max_age=30, stale_while_revalidate=120)
+def search_products():
+    """
+    Busca no catálogo. Parâmetros (todos opcionais):
+        q, tipo_produto, marca, tamanho_medida (vários valores separados por vírgula),
+        preco_min, preco_max, pagina, por_pagina (máx. 100), campos, ordenar
+    """
+    if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        filtros = _filtros_busca()
+        pagina = max(1, int(request.args.get('pagina', 1)))
+        por_pagina = min(max(1, int(request.args.get('por_pagina', 24))), 100)
+    except ValueError:
+        return jsonify({"error": "Parâmetros numéricos inválidos."}), HTTPStatus.BAD_REQUEST
+    ordenar = request.args.get('ordenar', 'relevancia')
+    if ordenar not in indice_busca.ORDENACOES:
+        return jsonify({"error": f"Ordenação inválida. Use: {', '.join(indice_busca.ORDENACOES)}."}), HTTPStatus.BAD_REQUEST
+
+    try:
+        resultado = indice_busca.obter_indice(supabase).buscar(
+            **filtros,
+            pagina=pagina,
+            por_pagina=por_pagina,
+            campos=_lista_parametro('campos') or indice_busca.CAMPOS_PADRAO,
+            ordenar=ordenar,
+        )
+        return jsonify(resultado), HTTPStatus.OK
+    except Exception as e:
+        print(f"[API_ECOMMERCE] Erro na busca: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao realizar a busca."}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_ecommerce.route('/facetas', methods=['GET'])
+@cache_http(max_age=60, stale_while_revalidate=300)
+def get_search_facets():
+    """
+    Valores distintos de tipo_produto, marca e tamanho_medida com contagens, e faixa de preço.
+    Aceita os mesmos filtros da busca; cada campo é contado sem o próprio filtro (drill-down).
+    """
+    if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        filtros = _filtros_busca()
+    except ValueError:
+        return jsonify({"error": "Parâmetros numéricos inválidos."}), HTTPStatus.BAD_REQUEST
+    try:
+        return jsonify(indice_busca.obter_indice(supabase).agregados_facetas(**filtros)), HTTPStatus.OK
+    except Exception as e:
+        print(f"[API_ECOMMERCE] Erro ao calcular facetas: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Falha ao carregar filtros."}), HTTPStatus.INTERNAL_SERVER_ERROR
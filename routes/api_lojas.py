@@ -0,0 +1,37 @@
+# backend/routes/api_lojas.py
+
+from flask import Blueprint, jsonify, request
+from http import HTTPStatus
+import traceback
+
+from controllers import indice_lojas
+from db.cliente import supabase
+
+api_lojas = Blueprint('api_lojas', __name__, url_prefix='/api/lojas')
+
+
+# --- ROTA: Lojas mais próximas ---
+@api_lojas.route('/proximas', methods=['GET'])
+def get_nearest_stores():
+    """
+    ?lat=-23.56&lon=-46.60&k=3                          -> k lojas mais próximas, com distancia_km
+    ?lat=..&lon=..&servico_id=1&data=2025-11-20          -> + primeiro horário livre de cada loja
+    """
+    if not supabase:
+        return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
+    try:
+        latitude = float(request.args['lat'])
+        longitude = float(request.args['lon'])
+        k = int(request.args.get('k', indice_lojas.K_PADRAO))
+        servico_id = int(request.args['servico_id']) if request.args.get('servico_id') else None
+        data_str = request.args.get('data') or None
+    except (KeyError, ValueError):
+        return jsonify({"error": "Parâmetros inválidos. Use lat, lon (numéricos) e k, servico_id (inteiros)."}), HTTPStatus.BAD_REQUEST
+    try:
+        return jsonify(indice_lojas.lojas_proximas(supabase, latitude, longitude, k, servico_id, data_str)), HTTPStatus.OK
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        print(f"ERRO GERAL /api/lojas/proximas: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Erro interno ao buscar lojas próximas."}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -0,0 +1,16 @@
+# backend/routes/api_metricas.py
+
+from flask import Blueprint, Response, jsonify
+from http import HTTPStatus
+
+from utils import metricas
+
+# Métricas do processo para o Prometheus (utils/metricas.py)
+api_metricas = Blueprint('api_metricas', __name__)
+
+
+@api_metricas.route('/metrics', methods=['GET'])
+def get_metrics():
+    if not metricas.METRICAS_ATIVAS:
+        return jsonify({"error": "Métricas desativadas (METRICAS_ATIVAS=0)."}), HTTPStatus.NOT_FOUND
+    return Response(metricas.texto_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
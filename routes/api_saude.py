@@ -0,0 +1,19 @@
+# backend/routes/api_saude.py
+
+from flask import Blueprint, jsonify
+from http import HTTPStatus
+
+from db import repositorio
+from db.cliente import supabase
+
+api_saude = Blueprint('api_saude', __name__, url_prefix='/api')
+
+
+# --- ROTA DE TESTE (Health Check) ---
+@api_saude.route('/', methods=['GET'])
+def health_check():
+    banco_direto = repositorio.verificar_saude()
+    if supabase:
+        return jsonify({"status": "API Funcionando", "supabase_connection": "OK", "db_backend": banco_direto}), HTTPStatus.OK
+    else:
+        return jsonify({"status": "API Funcionando", "supabase_connection": "FALHA - Verifique .env", "db_backend": banco_direto}), HTTPStatus.SERVICE_UNAVAILABLE
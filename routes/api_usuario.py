@@ -2,7 +2,9 @@
 
 from flask import Blueprint, jsonify, request
 from http import HTTPStatus
-from ..app import supabase
+from uuid import UUID
+from db import repositorio
+from db.cliente import supabase
 
 # Define o Blueprint para rotas do usuário (acesso restrito)
 api_usuario = Blueprint('api_usuario', __name__, url_prefix='/api/usuario')
@@ -11,7 +13,11 @@ api_usuario = Blueprint('api_usuario', __name__, url_prefix='/api/usuario')
 # mas no contexto do Supabase, o frontend lida com a autenticação e envia o token
 # de sessão nas chamadas. Aqui no backend, apenas expomos o endpoint CRUD.
 
+CAMPOS_OBRIGATORIOS_PET = ('id_tutor', 'nome_pet', 'especie', 'raca')
+
 # --- ROTA: CRUD de Pets ---
+# Leitura e cadastro passam pelo repositório (DB_BACKEND: Supabase ou Postgres direto) e
+# devolvem as linhas de 'pets' como estão no banco (todas as colunas, não só as do model Pet).
 @api_usuario.route('/pets', methods=['GET', 'POST'])
 def pets_usuario():
     if not supabase: return jsonify({"error": "DB indisponível."}), HTTPStatus.SERVICE_UNAVAILABLE
@@ -24,18 +30,29 @@ def pets_usuario():
         cliente_id = request.args.get('cliente_id') # Exemplo: /api/usuario/pets?cliente_id=UUID_AQUI
         if not cliente_id: return jsonify({"error": "ID do cliente é obrigatório."}), HTTPStatus.BAD_REQUEST
         try:
-            res = supabase.table('pets').select('*').eq('id_tutor', cliente_id).order('nome_pet').execute()
-            return jsonify(res.data), HTTPStatus.OK
+            tutor_id = UUID(cliente_id)
+        except ValueError:
+            return jsonify({"error": "ID do cliente inválido."}), HTTPStatus.BAD_REQUEST
+        try:
+            return jsonify(repositorio.listar_linhas_pets_por_tutor(supabase, tutor_id)), HTTPStatus.OK
         except Exception:
             return jsonify({"error": "Falha ao listar pets."}), HTTPStatus.INTERNAL_SERVER_ERROR
 
     if request.method == 'POST':
         dados = request.get_json()
         if not dados: return jsonify({"error": "Corpo JSON vazio."}), HTTPStatus.BAD_REQUEST
-        # Assumindo que 'id_tutor' está no corpo dos dados (dados['id_tutor'])
+        if not isinstance(dados, dict): return jsonify({"error": "Envie um objeto JSON."}), HTTPStatus.BAD_REQUEST
+        faltando = [campo for campo in CAMPOS_OBRIGATORIOS_PET if not dados.get(campo)]
+        if faltando:
+            return jsonify({"error": f"Campos faltando: {', '.join(faltando)}"}), HTTPStatus.BAD_REQUEST
+        try:
+            UUID(str(dados['id_tutor']))
+        except ValueError:
+            return jsonify({"error": "ID do tutor inválido."}), HTTPStatus.BAD_REQUEST
+        # id_pet vem da sequência do banco; as demais colunas seguem como enviadas
+        dados = {coluna: valor for coluna, valor in dados.items() if coluna != 'id_pet'}
         try:
-            res = supabase.table('pets').insert(dados).execute()
-            return jsonify(res.data), HTTPStatus.CREATED
+            return jsonify(repositorio.inserir_linha_pet(supabase, dados)), HTTPStatus.CREATED
         except Exception:
             return jsonify({"error": "Falha ao inserir pet."}), HTTPStatus.INTERNAL_SERVER_ERROR
             
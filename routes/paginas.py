@@ -0,0 +1,61 @@
+# backend/routes/paginas.py
+#
+# Páginas HTML. Registradas direto no app (sem prefixo de blueprint) para que os templates
+# continuem usando url_for('home'), url_for('busca'), etc.
+
+from flask import Flask, redirect, render_template, url_for
+
+# (rota, endpoint, template) — Flask procura os templates em 'templates/'
+PAGINAS = [
+    ('/home', 'home', 'home.html'),
+
+    # Páginas Raiz
+    ('/busca', 'busca', 'busca.html'),
+    ('/produto_detalhe', 'produto_detalhe', 'produto_detalhe.html'),
+    ('/produtos', 'produtos', 'produtos.html'),
+
+    # Páginas Admin
+    ('/admin/cms_editor', 'admin_cms_editor', 'admin/cms_editor.html'),
+    ('/admin/dashboard', 'admin_dashboard', 'admin/dashboard.html'),
+    ('/admin/gestao_agendamentos', 'admin_gestao_agendamentos', 'admin/gestao_agendamentos.html'),
+    ('/admin/gestao_horarios', 'admin_gestao_horarios', 'admin/gestao_horarios.html'),
+    ('/admin/gestao_produtos', 'admin_gestao_produtos', 'admin/gestao_produtos.html'),
+
+    # Páginas Institucionais
+    ('/institucional/avaliacoes', 'institucional_avaliacoes', 'paginas_institucionais/avaliacoes.html'),
+    ('/institucional/contatos', 'institucional_contatos', 'paginas_institucionais/contatos.html'),
+    ('/institucional/lojas', 'institucional_lojas', 'paginas_institucionais/lojas.html'),
+    ('/institucional/sobre', 'institucional_sobre', 'paginas_institucionais/sobre.html'),
+
+    # Páginas de Serviços
+    ('/servicos/agendamento-fluxo', 'servicos_agendamento_fluxo', 'servicos/agendamento-fluxo.html'),
+    ('/servicos/day_care', 'servicos_day_care', 'servicos/day_care.html'),
+    ('/servicos/hotel', 'servicos_hotel', 'servicos/hotel.html'),
+    ('/servicos', 'servicos', 'servicos/servicos.html'),
+    ('/servicos/veterinaria', 'servicos_veterinaria', 'servicos/veterinaria.html'),
+
+    # Páginas de Usuário
+    ('/usuario/criar_conta', 'usuario_criar_conta', 'usuario/criar_conta.html'),
+    ('/usuario/favorito', 'usuario_favorito', 'usuario/favorito.html'),
+    ('/usuario/login', 'usuario_login', 'usuario/login.html'),
+    ('/usuario/meus_agendamentos', 'usuario_meus_agendamentos', 'usuario/meus_agendamentos.html'),
+    ('/usuario/meus_pets', 'usuario_meus_pets', 'usuario/meus_pets.html'),
+    ('/usuario/perfil', 'usuario_perfil', 'usuario/perfil.html'),
+    ('/usuario/redefinir_senha', 'usuario_redefinir_senha', 'usuario/redefinir_senha.html'),
+]
+
+
+def _pagina(template: str):
+    def view():
+        return render_template(template)
+    return view
+
+
+def index():
+    return redirect(url_for('home'))
+
+
+def registrar_paginas(app: Flask) -> None:
+    app.add_url_rule('/', 'index', index)
+    for rota, endpoint, template in PAGINAS:
+        app.add_url_rule(rota, endpoint, _pagina(template))
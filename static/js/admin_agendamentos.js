@@ -2,6 +2,8 @@
 // VERSÃO FINAL: Segurança Desativada + Imports Corretos + Realtime
 
 import { supabase } from './supabaseClient.js'; 
+// NOTA: A API está fixada para 127.0.0.1. Isso só funciona localmente.
+const API_ADMIN_URL = 'http://127.0.0.1:5000/api/admin';
 // DESATIVADO: import { checkAdminAuth } from './admin_auth.js'; 
 
 // ... (Todas as suas funções: formatDateTime, getStatusBadge, createAppointmentRowHtml, etc. continuam aqui) ...
@@ -27,13 +29,15 @@ function getStatusBadge(status) {
     }
 }
 function createAppointmentRowHtml(ag) {
-    const nomeCliente = ag.perfis?.nome_completo || 'Cliente não encontrado';
-    const nomePet = ag.pets?.nome_pet || 'Pet não encontrado';
-    const nomeServico = ag.servicos?.nome_servico || 'Serviço não encontrado';
-    const nomeLoja = ag.lojas?.nome_loja || 'Loja não encontrada';
+    // Nomes vêm prontos da API (nome_*); o Realtime ainda usa os joins do Supabase
+    const nomeCliente = ag.nome_cliente || ag.perfis?.nome_completo || 'Cliente não encontrado';
+    const nomePet = ag.nome_pet || ag.pets?.nome_pet || 'Pet não encontrado';
+    const nomeServico = ag.nome_servico || ag.servicos?.nome_servico || 'Serviço não encontrado';
+    const nomeLoja = ag.nome_loja || ag.lojas?.nome_loja || 'Loja não encontrada';
 
     return `
         <tr id="appointment-row-${ag.id_agendamento}">
+            <td><input type="checkbox" class="form-check-input appointment-select" data-id="${ag.id_agendamento}" ${selecionados.has(String(ag.id_agendamento)) ? 'checked' : ''}></td>
             <td>${nomeCliente}</td>
             <td>${nomePet}</td>
             <td>${nomeServico}</td>
@@ -48,8 +52,68 @@ function createAppointmentRowHtml(ag) {
         </tr>`;
 }
 
+// --- AÇÕES EM LOTE ---
+// Os agendamentos marcados vão todos em uma requisição (POST /agendamentos/status); a API
+// devolve o resultado de cada um e só as linhas alteradas são redesenhadas.
+function atualizarSelecao() {
+    const contador = document.getElementById('bulk-selected-count');
+    const botao = document.getElementById('bulk-status-apply');
+    if (contador) contador.textContent = selecionados.size;
+    if (botao) botao.disabled = selecionados.size === 0;
+}
+
+async function applyBulkStatus() {
+    const status = document.getElementById('bulk-status-select')?.value;
+    if (!status || selecionados.size === 0) return;
+    if (!confirm(`Alterar o status de ${selecionados.size} agendamento(s) para "${status}"?`)) return;
+    const botao = document.getElementById('bulk-status-apply');
+    botao.disabled = true;
+    try {
+        const response = await fetch(`${API_ADMIN_URL}/agendamentos/status`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ status, ids: [...selecionados].map(Number) })
+        });
+        const result = await response.json();
+        if (!response.ok) { throw new Error(result.error || `Erro ${response.status} do servidor.`); }
+        result.itens.forEach(item => {
+            if (item.resultado === 'atualizado') {
+                replaceAppointmentRow({ id_agendamento: item.id_agendamento, status: item.status });
+            }
+        });
+        selecionados.clear();
+        document.querySelectorAll('.appointment-select, #select-all-appointments').forEach(cb => { cb.checked = false; });
+        const { atualizado = 0, inalterado = 0, nao_encontrado = 0 } = result.resumo;
+        alert(`${atualizado} atualizado(s), ${inalterado} já estavam com esse status, ${nao_encontrado} não encontrado(s).`);
+    } catch (error) {
+        alert(`Erro ao alterar status em lote: ${error.message}`);
+    } finally {
+        atualizarSelecao();
+    }
+}
+
 // --- LÓGICA PRINCIPAL ---
-async function loadAndDisplayAppointments() {
+// A lista vem da API paginada (50 por vez, do mais recente ao mais antigo); "Carregar mais"
+// busca a página seguinte pelo cursor. Os agendamentos carregados ficam em memória por id.
+const TAMANHO_PAGINA = 50;
+let proximoCursor = null;
+const agendamentosCarregados = new Map();
+const selecionados = new Set();
+
+function atualizarBotaoCarregarMais() {
+    let botao = document.getElementById('load-more-appointments');
+    if (!botao) {
+        const tabela = document.getElementById('appointments-table-body')?.closest('.table-responsive');
+        if (!tabela) return;
+        tabela.insertAdjacentHTML('afterend',
+            '<div class="text-center my-3"><button id="load-more-appointments" class="btn btn-outline-primary">Carregar mais</button></div>');
+        botao = document.getElementById('load-more-appointments');
+        botao.addEventListener('click', () => loadAndDisplayAppointments(true));
+    }
+    botao.parentElement.style.display = proximoCursor ? 'block' : 'none';
+}
+
+async function loadAndDisplayAppointments(proximaPagina = false) {
     const tableBody = document.getElementById('appointments-table-body');
     const loadingRow = document.getElementById('loading-row-appointments');
     const noAppointmentsRow = document.getElementById('no-appointments-row');
@@ -57,30 +121,59 @@ async function loadAndDisplayAppointments() {
     if (!tableBody || !loadingRow || !noAppointmentsRow) { return; }
     loadingRow.style.display = 'table-row';
     noAppointmentsRow.style.display = 'none';
-    const existingRows = tableBody.querySelectorAll("tr:not(#loading-row-appointments):not(#no-appointments-row)");
-    existingRows.forEach(row => row.remove());
+    if (!proximaPagina) {
+        proximoCursor = null;
+        agendamentosCarregados.clear();
+        selecionados.clear();
+        atualizarSelecao();
+        const existingRows = tableBody.querySelectorAll("tr:not(#loading-row-appointments):not(#no-appointments-row)");
+        existingRows.forEach(row => row.remove());
+    }
     try {
-        let { data: agendamentos, error } = await supabase
-            .from('agendamentos')
-            .select(`*, perfis(nome_completo), pets(nome_pet), servicos(nome_servico), lojas(nome_loja)`)
-            .order('data_hora_inicio', { ascending: false }); 
-        if (error) { throw error; }
+        const params = new URLSearchParams({ limit: TAMANHO_PAGINA });
+        if (proximaPagina && proximoCursor) params.set('cursor', proximoCursor);
+        const response = await fetch(`${API_ADMIN_URL}/agendamentos?${params}`);
+        const result = await response.json();
+        if (!response.ok) { throw new Error(result.error || `Erro ${response.status} do servidor.`); }
+        proximoCursor = result.proximo_cursor;
         loadingRow.style.display = 'none';
-        if (agendamentos && agendamentos.length > 0) {
-            agendamentos.forEach(ag => {
-                const rowHtml = createAppointmentRowHtml(ag); 
-                tableBody.insertAdjacentHTML('beforeend', rowHtml);
-            });
-        } else {
+        result.agendamentos.forEach(ag => {
+            agendamentosCarregados.set(String(ag.id_agendamento), ag);
+            tableBody.insertAdjacentHTML('beforeend', createAppointmentRowHtml(ag));
+        });
+        if (agendamentosCarregados.size === 0) {
             noAppointmentsRow.style.display = 'table-row';
         }
+        atualizarBotaoCarregarMais();
     } catch (error) {
         console.error('Erro ao carregar agendamentos:', error.message);
         loadingRow.style.display = 'none';
-        tableBody.innerHTML = `<tr><td colspan="8" class="text-center text-danger">Erro ao carregar: ${error.message}</td></tr>`;
+        tableBody.insertAdjacentHTML('beforeend', `<tr><td colspan="8" class="text-center text-danger">Erro ao carregar: ${error.message}</td></tr>`);
     }
 }
+
+/** Troca só a linha do agendamento alterado (sem recarregar a lista) */
+function replaceAppointmentRow(agendamento) {
+    const id = String(agendamento.id_agendamento);
+    const atualizado = { ...(agendamentosCarregados.get(id) || {}), ...agendamento };
+    agendamentosCarregados.set(id, atualizado);
+    const row = document.getElementById(`appointment-row-${id}`);
+    if (row) row.outerHTML = createAppointmentRowHtml(atualizado);
+}
 // --- FUNÇÕES PARA AÇÕES ---
+// Mudanças de status passam pelo backend para manter o índice de ocupação (disponibilidade) em dia
+async function updateAppointmentStatus(appointmentId, status) {
+    const response = await fetch(`${API_ADMIN_URL}/agendamentos/${appointmentId}/status`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ status })
+    });
+    if (!response.ok) {
+        const result = await response.json();
+        throw new Error(result.error || `Erro ${response.status} do servidor.`);
+    }
+    return response.json();
+}
 async function showAppointmentDetails(appointmentId) {
     const modalBody = document.getElementById('appointmentDetailModalBody');
     if(!modalBody) return;
@@ -108,10 +201,9 @@ async function changeAppointmentStatus(appointmentId) {
     const newStatus = prompt(`Digite o novo status (Ex: confirmado, finalizado, cancelado):`);
      if (newStatus && ['confirmado', 'finalizado', 'cancelado', 'pendente'].includes(newStatus.toLowerCase())) {
          try {
-             const { error } = await supabase.from('agendamentos').update({ status: newStatus.toLowerCase() }).eq('id_agendamento', appointmentId);
-             if (error) throw error;
+             const result = await updateAppointmentStatus(appointmentId, newStatus.toLowerCase());
+             replaceAppointmentRow(result.agendamento);
              alert('Status atualizado!');
-             loadAndDisplayAppointments(); // Recarrega a lista
          } catch (error) {
              alert(`Erro ao atualizar status: ${error.message}`);
          }
@@ -122,10 +214,9 @@ async function changeAppointmentStatus(appointmentId) {
 async function cancelAppointment(appointmentId) {
     if (confirm(`Tem certeza que deseja CANCELAR o agendamento ID ${appointmentId}?`)) {
          try {
-             const { error } = await supabase.from('agendamentos').update({ status: 'cancelado' }).eq('id_agendamento', appointmentId);
-             if (error) throw error;
+             const result = await updateAppointmentStatus(appointmentId, 'cancelado');
+             replaceAppointmentRow(result.agendamento);
              alert('Agendamento cancelado.');
-             loadAndDisplayAppointments(); // Recarrega a lista
          } catch (error) {
              alert(`Erro ao cancelar: ${error.message}`);
          }
@@ -214,6 +305,21 @@ document.addEventListener('DOMContentLoaded', async () => {
         }
     });
 
+    document.addEventListener('change', (event) => {
+        const target = event.target;
+        if (target.classList.contains('appointment-select')) {
+            if (target.checked) selecionados.add(target.dataset.id); else selecionados.delete(target.dataset.id);
+            atualizarSelecao();
+        } else if (target.id === 'select-all-appointments') {
+            document.querySelectorAll('.appointment-select').forEach(cb => {
+                cb.checked = target.checked;
+                if (target.checked) selecionados.add(cb.dataset.id); else selecionados.delete(cb.dataset.id);
+            });
+            atualizarSelecao();
+        }
+    });
+    document.getElementById('bulk-status-apply')?.addEventListener('click', applyBulkStatus);
+
     // 4. Inicia o "ouvinte" de Realtime
     listenForNewAppointments();
 });
\ No newline at end of file
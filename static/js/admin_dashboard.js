@@ -2,39 +2,26 @@
 // VERSÃO COM ESTATÍSTICAS REAIS
 // SEGURANÇA DESATIVADO PARA TESTE
 
-import { supabase } from './supabaseClient.js';
 // DESATIVADO: import { checkAdminAuth } from './admin_auth.js'; 
 
+// Números servidos pela API (contadores em memória no backend), em vez de 3 contagens no Supabase
+const API_ESTATISTICAS_URL = 'http://127.0.0.1:5000/api/admin/estatisticas';
+
 // Função para buscar e exibir os números
 async function loadDashboardStats() {
     console.log("Buscando estatísticas do dashboard...");
 
     try {
-        // 1. Buscar Agendamentos Pendentes
-        const { count: pendingCount, error: pendingError } = await supabase
-            .from('agendamentos')
-            .select('id_agendamento', { count: 'exact', head: true }) 
-            .eq('status', 'pendente');
-
-        if (pendingError) throw pendingError;
-        document.getElementById('stat-pending-count').textContent = pendingCount !== null ? pendingCount : 0;
-
-        // 2. Buscar Total de Produtos
-        const { count: productCount, error: productError } = await supabase
-            .from('produtos')
-            .select('id_produto', { count: 'exact', head: true });
-        
-        if (productError) throw productError;
-        document.getElementById('stat-product-count').textContent = productCount !== null ? productCount : 0;
-
-        // 3. Buscar Total de Clientes (perfis que NÃO são 'admin')
-        const { count: customerCount, error: customerError } = await supabase
-            .from('perfis')
-            .select('id', { count: 'exact', head: true })
-            .neq('role', 'admin'); // 'neq' = Not Equal (Diferente de)
-
-        if (customerError) throw customerError;
-        document.getElementById('stat-customer-count').textContent = customerCount !== null ? customerCount : 0;
+        const response = await fetch(API_ESTATISTICAS_URL);
+        const stats = await response.json();
+        if (!response.ok) throw new Error(stats.error || `HTTP ${response.status}`);
+
+        // 1. Agendamentos Pendentes
+        document.getElementById('stat-pending-count').textContent = stats.agendamentos.pendentes;
+        // 2. Total de Produtos
+        document.getElementById('stat-product-count').textContent = stats.produtos;
+        // 3. Total de Clientes (perfis que NÃO são 'admin')
+        document.getElementById('stat-customer-count').textContent = stats.clientes;
 
     } catch (error) {
         console.error("Erro ao carregar estatísticas:", error.message);
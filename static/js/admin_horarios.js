@@ -24,6 +24,10 @@ const saveHorariosButton = document.getElementById('saveHorariosButton');
 const loadingHorariosSpinner = document.getElementById('loading-horarios-spinner');
 const diasDaSemana = ["Domingo", "Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira", "Sábado"];
 
+// Escritas de bloqueio/capacidade passam pelo backend, que invalida o cache de disponibilidade
+// NOTA: A API está fixada para 127.0.0.1. Isso só funciona localmente.
+const API_ADMIN_URL = 'http://127.0.0.1:5000/api/admin';
+
 let storesData = [];
 let servicesData = []; 
 let currentLojaIdHorarios = null;
@@ -83,22 +87,28 @@ async function blockDay(event) {
     const storeSelect = document.getElementById('block-store');
     const reasonInput = document.getElementById('block-reason');
     const button = blockDayForm.querySelector('button[type="submit"]');
+    // Período opcional (campo "até"); várias lojas se o select for múltiplo. Tudo vai em uma requisição.
+    const dateEndInput = document.getElementById('block-date-end');
     const date = dateInput.value;
-    const storeId = storeSelect.value === 'ALL' ? null : parseInt(storeSelect.value);
+    const dateEnd = dateEndInput?.value || date;
+    const storeIds = [...storeSelect.selectedOptions].map(opt => opt.value);
+    const lojas = storeIds.includes('ALL') ? null : storeIds.map(id => parseInt(id));
     const reason = reasonInput.value.trim() || null;
     if (!date) { alert('Selecione uma data.'); return; }
     button.disabled = true;
     button.textContent = 'Bloqueando...';
     try {
-        const { error } = await supabase.from('dias_bloqueados').insert([{ data_bloqueada: date, id_loja: storeId, motivo: reason }]);
-        if (error) {
-            if (error.code === '23505') { alert(`Erro: Este dia já está bloqueado para esta loja.`); }
-            else { throw error; }
-        } else {
-            alert(`Dia bloqueado com sucesso!`);
-            blockDayForm.reset(); 
-            loadBlockedDays(); 
-        }
+        const response = await fetch(`${API_ADMIN_URL}/dias-bloqueados/lote`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ data_inicio: date, data_fim: dateEnd, lojas, motivo: reason })
+        });
+        const result = await response.json();
+        if (!response.ok) { throw new Error(result.error || `Erro ${response.status} do servidor.`); }
+        const { bloqueado = 0, ja_bloqueado = 0 } = result.resumo;
+        alert(ja_bloqueado ? `${bloqueado} dia(s) bloqueado(s); ${ja_bloqueado} já estava(m) bloqueado(s).` : `${bloqueado} dia(s) bloqueado(s) com sucesso!`);
+        blockDayForm.reset(); 
+        loadBlockedDays(); 
     } catch (error) {
         alert(`Erro ao bloquear dia: ${error.message}`);
     } finally {
@@ -109,8 +119,11 @@ async function blockDay(event) {
 async function unblockDay(blockId) {
     if (confirm('Tem certeza que deseja desbloquear este dia?')) {
         try {
-            const { error } = await supabase.from('dias_bloqueados').delete().eq('id_bloqueio', blockId);
-            if (error) throw error;
+            const response = await fetch(`${API_ADMIN_URL}/dias-bloqueados/${blockId}`, { method: 'DELETE' });
+            if (!response.ok) {
+                const result = await response.json();
+                throw new Error(result.error || `Erro ${response.status} do servidor.`);
+            }
             alert('Dia desbloqueado!');
             loadBlockedDays(); 
         } catch (error) {
@@ -178,8 +191,15 @@ async function saveCapacityChange(ruleId, newCapacity, newStatus) {
     const originalIcon = '<i class="bi bi-check-lg"></i>';
     if(saveButton){ saveButton.innerHTML = '<span class="spinner-border spinner-border-sm"></span>'; saveButton.disabled = true; }
     try {
-        const { error } = await supabase.from('servicos_loja_regras').update(dataToUpdate).eq('id_regra', ruleId);
-        if (error) throw error;
+        const response = await fetch(`${API_ADMIN_URL}/regras/${ruleId}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(dataToUpdate)
+        });
+        if (!response.ok) {
+            const result = await response.json();
+            throw new Error(result.error || `Erro ${response.status} do servidor.`);
+        }
         if(saveButton){
              saveButton.innerHTML = '<i class="bi bi-check-circle-fill text-success"></i>'; 
              setTimeout(() => { saveButton.innerHTML = originalIcon; saveButton.disabled = true; }, 1500);
@@ -292,12 +312,17 @@ async function saveHorarios(event) {
             });
         }
 
-        // Upsert: Insere se não existir, atualiza se já existir (baseado no onConflict)
-        const { error } = await supabase
-            .from('horarios_funcionamento')
-            .upsert(upsertData, { onConflict: 'id_loja, dia_semana' }); // Usa a chave única
-
-        if (error) throw error;
+        // Upsert pela API (chave única id_loja + dia_semana): o backend valida e
+        // invalida a grade de horários compilada da loja
+        const response = await fetch(`${API_ADMIN_URL}/horarios-funcionamento/${currentLojaIdHorarios}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(upsertData)
+        });
+        if (!response.ok) {
+            const result = await response.json().catch(() => ({}));
+            throw new Error(result.error || `Erro ${response.status} do servidor.`);
+        }
 
         alert('Horários de funcionamento salvos com sucesso!');
 
@@ -5,6 +5,7 @@ import { supabase } from './supabaseClient.js';
 // DESATIVADO: import { checkAdminAuth } from './admin_auth.js'; 
 
 // --- VARIÁVEIS GLOBAIS ---
+const API_ADMIN_URL = 'http://127.0.0.1:5000/api/admin';
 let productModalInstance; 
 const productModalElement = document.getElementById('productModal');
 const productForm = document.getElementById('productForm');
@@ -63,18 +64,31 @@ async function loadAndDisplayProducts() {
     const existingRows = tableBody.querySelectorAll("tr:not(#loading-row):not(#no-products-row)");
     existingRows.forEach(row => row.remove());
     try {
-        let { data: produtos, error } = await supabase
-            .from('produtos')
-            .select('*') // Pega tudo
-            .order('nome_produto', { ascending: true });
-        if (error) { throw error; }
+        // Stream NDJSON: as linhas são desenhadas conforme as páginas chegam do backend
+        const response = await fetch(`${API_ADMIN_URL}/produtos?stream=ndjson&fields=nome_produto,preco,quantidade_estoque`);
+        if (!response.ok || !response.body) { throw new Error(`Erro ${response.status}`); }
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        let total = 0;
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            const rowsHtml = lines.filter(Boolean).map(line => createProductRowHtml(JSON.parse(line))).join('');
+            if (rowsHtml) {
+                loadingRow.style.display = 'none';
+                tableBody.insertAdjacentHTML('beforeend', rowsHtml);
+                total += lines.filter(Boolean).length;
+            }
+        }
+        if (buffer.trim()) {
+            tableBody.insertAdjacentHTML('beforeend', createProductRowHtml(JSON.parse(buffer)));
+            total += 1;
+        }
         loadingRow.style.display = 'none';
-        if (produtos && produtos.length > 0) {
-            produtos.forEach(produto => {
-                const rowHtml = createProductRowHtml(produto); // Usa a nova função
-                tableBody.insertAdjacentHTML('beforeend', rowHtml);
-            });
-        } else {
+        if (total === 0) {
             noProductsRow.style.display = 'table-row';
         }
     } catch (error) {
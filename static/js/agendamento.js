@@ -261,6 +261,34 @@ function renderCalendar() {
         if (date < new Date(today.setHours(0,0,0,0))) { classes += " disabled"; } else { classes += " available"; }
         calendarGrid.innerHTML += `<div class="${classes}" data-date="${dateStr}" onclick="selectDate(this.dataset.date)">${day}</div>`;
     }
+    markUnavailableDays(year, month, daysInMonth);
+}
+
+/** Busca a disponibilidade do mês inteiro em uma única chamada e desabilita os dias lotados/bloqueados */
+async function markUnavailableDays(year, month, daysInMonth) {
+    if (!appointmentData.loja_id || !appointmentData.servico_id) return;
+    const monthStr = String(month + 1).padStart(2, '0');
+    const inicio = `${year}-${monthStr}-01`;
+    const fim = `${year}-${monthStr}-${String(daysInMonth).padStart(2, '0')}`;
+    try {
+        const response = await fetch(`http://127.0.0.1:5000/api/horarios-disponiveis/periodo?loja_id=${appointmentData.loja_id}&servico_id=${appointmentData.servico_id}&inicio=${inicio}&fim=${fim}`);
+        if (!response.ok) return;
+        const { dias } = await response.json();
+        // Ignora a resposta se o usuário já mudou de mês enquanto a requisição estava em andamento
+        if (currentCalendarDate.getFullYear() !== year || currentCalendarDate.getMonth() !== month) return;
+        Object.entries(dias || {}).forEach(([dateStr, info]) => {
+            const dayEl = calendarGrid.querySelector(`.calendar-day[data-date="${dateStr}"]`);
+            if (dayEl && !info.disponivel && dayEl.classList.contains('available')) {
+                dayEl.classList.remove('available');
+                dayEl.classList.add('disabled');
+                dayEl.removeAttribute('onclick');
+                dayEl.title = 'Sem horários disponíveis';
+            }
+        });
+    } catch (error) {
+        // Sem a disponibilidade mensal o calendário continua funcionando dia a dia
+        console.warn("Não foi possível carregar a disponibilidade do mês:", error);
+    }
 }
 
 function changeMonth(offset) {
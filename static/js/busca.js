@@ -1,7 +1,5 @@
 // static/js/busca.js (VERSÃO CORRETA - SEM MUDANÇAS)
 
-import { supabase } from './supabaseClient.js';
-
 // --- ELEMENTOS DO DOM (Apenas os que existem nesta página) ---
 const resultsContainer = document.getElementById('search-results-container');
 const searchTermDisplay = document.getElementById('search-term-display');
@@ -122,35 +120,32 @@ function createProductCard(produto) {
 // LÓGICA DE BUSCA E FILTROS (Específica desta página)
 // ==========================================================================
 
-async function populateFilters() {
-    try {
-        const { data: produtos, error } = await supabase
-            .from('produtos')
-            .select('tipo_produto, marca, tamanho_medida');
+const API_FACETAS_URL = 'http://127.0.0.1:5000/api/ecommerce/facetas';
 
-        if (error) {
-            console.error("Erro ao buscar filtros (Verifique RLS):", error);
-            throw error;
-        }
+function renderFacetOptions(container, valores, column, prefix) {
+    if (!container) return;
+    container.innerHTML = valores.map(({ valor, quantidade, selecionado }) => `
+        <div class="form-check"><input class="form-check-input filter-checkbox" type="checkbox" value="${valor}" id="${prefix}-${valor}" data-column="${column}" ${selecionado ? 'checked' : ''}>
+        <label class="form-check-label" for="${prefix}-${valor}">${valor} <span class="text-muted small">(${quantidade})</span></label></div>
+    `).join('');
+}
 
-        const categorias = [...new Set(produtos.map(p => p.tipo_produto).filter(Boolean))].sort();
-        const marcas = [...new Set(produtos.map(p => p.marca).filter(Boolean))].sort();
-        const tamanhos = [...new Set(produtos.map(p => p.tamanho_medida).filter(Boolean))].sort();
-        
-        if(categoryFiltersContainer) categoryFiltersContainer.innerHTML = categorias.map(c => `
-            <div class="form-check"><input class="form-check-input filter-checkbox" type="checkbox" value="${c}" id="cat-${c}" data-column="tipo_produto">
-            <label class="form-check-label" for="cat-${c}">${c}</label></div>
-        `).join('');
+async function populateFilters() {
+    // Valores distintos com contagens, já considerando os filtros marcados (drill-down)
+    const searchTerm = new URLSearchParams(window.location.search).get('q') || '';
+    try {
+        const response = await fetch(`${API_FACETAS_URL}?${buildSearchParams(searchTerm)}`);
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || `Erro ${response.status}`);
 
-        if(brandFiltersContainer) brandFiltersContainer.innerHTML = marcas.map(m => `
-            <div class="form-check"><input class="form-check-input filter-checkbox" type="checkbox" value="${m}" id="brand-${m}" data-column="marca">
-            <label class="form-check-label" for="brand-${m}">${m}</label></div>
-        `).join('');
+        renderFacetOptions(categoryFiltersContainer, data.facetas.tipo_produto, 'tipo_produto', 'cat');
+        renderFacetOptions(brandFiltersContainer, data.facetas.marca, 'marca', 'brand');
+        renderFacetOptions(tamanhoFiltersContainer, data.facetas.tamanho_medida, 'tamanho_medida', 'size');
 
-        if(tamanhoFiltersContainer) tamanhoFiltersContainer.innerHTML = tamanhos.map(t => `
-            <div class="form-check"><input class="form-check-input filter-checkbox" type="checkbox" value="${t}" id="size-${t}" data-column="tamanho_medida">
-            <label class="form-check-label" for="size-${t}">${t}</label></div>
-        `).join('');
+        const priceMin = document.getElementById('price-min');
+        const priceMax = document.getElementById('price-max');
+        if (priceMin && data.preco.min !== null) priceMin.placeholder = Math.floor(data.preco.min);
+        if (priceMax && data.preco.max !== null) priceMax.placeholder = Math.ceil(data.preco.max);
 
     } catch (error) {
         console.error("Erro ao popular filtros:", error.message);
@@ -158,81 +153,64 @@ async function populateFilters() {
     }
 }
 
-async function performSearch() {
+const API_BUSCA_URL = 'http://127.0.0.1:5000/api/ecommerce/busca';
+const RESULTADOS_POR_PAGINA = 24;
+let paginaAtual = 1;
+
+function buildSearchParams(searchTerm, page = 1) {
+    const params = new URLSearchParams({ q: searchTerm, pagina: page, por_pagina: RESULTADOS_POR_PAGINA });
+    const precoMin = parseFloat(document.getElementById('price-min')?.value);
+    const precoMax = parseFloat(document.getElementById('price-max')?.value);
+    if (!isNaN(precoMin)) params.set('preco_min', precoMin);
+    if (!isNaN(precoMax)) params.set('preco_max', precoMax);
+
+    document.querySelectorAll('.filter-checkbox:checked').forEach(checkbox => {
+        params.append(checkbox.dataset.column, checkbox.value);
+    });
+    return params;
+}
+
+function renderLoadMore(total) {
+    document.getElementById('load-more-results')?.remove();
+    if (paginaAtual * RESULTADOS_POR_PAGINA >= total) return;
+    resultsContainer.insertAdjacentHTML('afterend', `
+        <div id="load-more-results" class="text-center my-4">
+            <button class="btn btn-outline-secondary">Carregar mais resultados</button>
+        </div>`);
+    document.querySelector('#load-more-results button').addEventListener('click', () => performSearch(paginaAtual + 1));
+}
+
+async function performSearch(page = 1) {
     const urlParams = new URLSearchParams(window.location.search);
     const searchTerm = urlParams.get('q') || '';
 
-    if (!resultsContainer || !supabase) return;
+    if (!resultsContainer) return;
 
     if(searchTermDisplay) searchTermDisplay.textContent = searchTerm;
     if(searchInputBar) searchInputBar.value = searchTerm;
-    resultsContainer.innerHTML = '<div class="col-12 text-center py-5"><div class="spinner-border text-primary" role="status"></div></div>';
-    if(resultsCount) resultsCount.textContent = 'Buscando...';
-
-    const currentActiveFilters = {
-        'tipo_produto': [],
-        'marca': [],
-        'tamanho_medida': [],
-        'preco_min': parseFloat(document.getElementById('price-min')?.value) || null,
-        'preco_max': parseFloat(document.getElementById('price-max')?.value) || null
-    };
-
-    document.querySelectorAll('.filter-checkbox:checked').forEach(checkbox => {
-        const column = checkbox.dataset.column;
-        if (currentActiveFilters.hasOwnProperty(column)) {
-            currentActiveFilters[column].push(checkbox.value);
-        }
-    });
-    
-    let query = supabase.from('produtos').select('*');
-    
-    if (searchTerm) {
-        const formattedSearchTerm = searchTerm.trim().split(/\s+/)
-            .filter(Boolean)
-            .map(t => `${t}:*`)
-            .join(' & ');
-
-        query = query.or(
-            `nome_produto.fts(portuguese).${formattedSearchTerm},` +
-            `descricao.fts(portuguese).${formattedSearchTerm},` +
-            `marca.fts(portuguese).${formattedSearchTerm},` +
-            `tipo_produto.fts(portuguese).${formattedSearchTerm}`
-        );
-    }
-    
-    if (currentActiveFilters.tipo_produto.length > 0) {
-        query = query.in('tipo_produto', currentActiveFilters.tipo_produto);
-    }
-    if (currentActiveFilters.marca.length > 0) {
-        query = query.in('marca', currentActiveFilters.marca);
-    }
-    if (currentActiveFilters.tamanho_medida.length > 0) {
-        query = query.in('tamanho_medida', currentActiveFilters.tamanho_medida); 
-    }
-    if (currentActiveFilters.preco_min !== null) {
-        query = query.gte('preco', currentActiveFilters.preco_min);
+    if (page === 1) {
+        resultsContainer.innerHTML = '<div class="col-12 text-center py-5"><div class="spinner-border text-primary" role="status"></div></div>';
+        if(resultsCount) resultsCount.textContent = 'Buscando...';
     }
-    if (currentActiveFilters.preco_max !== null) {
-        query = query.lte('preco', currentActiveFilters.preco_max);
-    }
-    
-    query = query.order('nome_produto', { ascending: true });
 
     try {
-        const { data: produtos, error } = await query;
-        if (error) {
-             console.error("Erro na busca Supabase (Verifique RLS):", error);
-             throw new Error(error.message);
-        }
-
-        if (produtos && produtos.length > 0) {
-            resultsContainer.innerHTML = produtos.map(produto => `<div class="col">${createProductCard(produto)}</div>`).join('');
-            if(resultsCount) resultsCount.textContent = `${produtos.length} resultados encontrados.`;
+        // Busca no índice do backend: texto, facetas e preço, paginado
+        const response = await fetch(`${API_BUSCA_URL}?${buildSearchParams(searchTerm, page)}`);
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || `Erro ${response.status}`);
+
+        paginaAtual = page;
+        const cards = data.resultados.map(produto => `<div class="col">${createProductCard(produto)}</div>`).join('');
+        if (data.total > 0) {
+            if (page === 1) resultsContainer.innerHTML = cards;
+            else resultsContainer.insertAdjacentHTML('beforeend', cards);
+            if(resultsCount) resultsCount.textContent = `${data.total} resultados encontrados.`;
             updateFavoriteButtons();
         } else {
             resultsContainer.innerHTML = '<div class="col-12 text-center py-5"><h3>Nenhum resultado encontrado para esta busca.</h3></div>';
             if(resultsCount) resultsCount.textContent = '0 resultados encontrados.';
         }
+        renderLoadMore(data.total);
     } catch (error) {
         console.error("Erro ao realizar pesquisa:", error);
         resultsContainer.innerHTML = `<div class="col-12 text-center py-5"><h3 class="text-danger">Erro ao carregar resultados: ${error.message}</h3></div>`;
@@ -248,12 +226,14 @@ document.addEventListener('DOMContentLoaded', () => {
     filtersContainer?.addEventListener('change', (e) => {
         if (e.target.classList.contains('filter-checkbox')) {
             performSearch();
+            populateFilters();
         }
     });
 
     document.getElementById('apply-price-filter')?.addEventListener('click', (e) => {
         e.preventDefault();
         performSearch();
+        populateFilters();
     });
 
     document.body.addEventListener('click', (event) => {
@@ -1,10 +1,10 @@
 // js/geolocator.js
 
-// CAMINHO DE IMPORT CORRIGIDO
-import { supabase } from './supabaseClient.js';
+// Lojas mais próximas calculadas no backend (índice espacial em memória)
+const API_LOJAS_PROXIMAS_URL = 'http://127.0.0.1:5000/api/lojas/proximas';
 
 // --- DEFINIÇÃO DAS LOJAS ---
-// Esta lista agora é um FALLBACK, caso o Supabase falhe.
+// Esta lista é um FALLBACK, caso a API falhe.
 let UNIDADES = [
     { id_loja: 1, nome_loja: 'Mooca', coords: { lat: -23.5670, lon: -46.5997 } },
     { id_loja: 2, nome_loja: 'Tatuapé', coords: { lat: -23.5420, lon: -46.5610 } },
@@ -13,49 +13,7 @@ let UNIDADES = [
 ];
 export const CHATEAU_SELECTED_STORE_KEY = 'chateau_selected_store';
 
-/**
- * =========================================================================
- * NOVA FUNÇÃO: Tenta carregar as lojas do Supabase.
- * Se falhar, usa a lista de fallback acima.
- * =========================================================================
- */
-async function loadStoresFromSupabase() {
-    try {
-        // ======================================================
-        // == CORREÇÃO 1 AQUI ==
-        // Trocado 'lat' e 'lon' pelos nomes corretos (ex: 'latitude', 'longitude')
-        // ======================================================
-        const { data, error } = await supabase
-            .from('lojas')
-            .select('id_loja, nome_loja, latitude, longitude'); // <-- CORRIGIDO
-
-        if (error) throw error;
-
-        if (data && data.length > 0) {
-            // Mapeia os dados do Supabase para o formato que o script espera
-            UNIDADES = data
-                .filter(store => store.latitude && store.longitude) // Garante que a loja tenha coordenadas
-                .map(store => ({
-                    id_loja: store.id_loja,
-                    nome_loja: store.nome_loja,
-                    // ======================================================
-                    // == CORREÇÃO 2 AQUI ==
-                    // Trocado 'store.lat' e 'store.lon'
-                    // ======================================================
-                    coords: { lat: store.latitude, lon: store.longitude } // <-- CORRIGIDO
-                }));
-            console.log("Geolocator: Lojas carregadas com sucesso do Supabase.");
-        } else {
-            console.warn("Geolocator: Nenhuma loja encontrada no Supabase (ou sem coords), usando lista de fallback.");
-        }
-    } catch (error) {
-        console.error("Geolocator: Erro ao carregar lojas do Supabase. Usando fallback.", error.message);
-        // Em caso de erro, a lista 'UNIDADES' de fallback já está definida.
-    }
-}
-
-
-// --- FUNÇÕES AUXILIARES DE CÁLCULO GEOGRÁFICO (Haversine) ---
+// --- FUNÇÕES AUXILIARES DE CÁLCULO GEOGRÁFICO (Haversine, só para o fallback) ---
 function getDistance(lat1, lon1, lat2, lon2) {
     const R = 6371;
     const dLat = (lat2 - lat1) * (Math.PI / 180);
@@ -96,7 +54,7 @@ function loadInitialStore() {
     return false;
 }
 
-function findNearestStore(userLat, userLon) {
+function findNearestStoreFallback(userLat, userLon) {
     let nearestStore = null;
     let minDistance = Infinity;
 
@@ -113,27 +71,34 @@ function findNearestStore(userLat, userLon) {
     }
 }
 
+async function findNearestStore(userLat, userLon) {
+    try {
+        const response = await fetch(`${API_LOJAS_PROXIMAS_URL}?lat=${userLat}&lon=${userLon}&k=1`);
+        const result = await response.json();
+        if (!response.ok) throw new Error(result.error || `HTTP ${response.status}`);
+
+        const nearest = result.lojas[0];
+        if (!nearest) throw new Error("Nenhuma loja com coordenadas cadastradas.");
+        setSelectedStore(nearest.id_loja, nearest.nome_loja, nearest.distancia_km);
+    } catch (error) {
+        console.error("Geolocator: Erro ao buscar loja mais próxima na API. Usando fallback.", error.message);
+        findNearestStoreFallback(userLat, userLon);
+    }
+}
+
 
 // --- FUNÇÃO PRINCIPAL DE GEOLOCALIZAÇÃO ---
-/**
- * =========================================================================
- * FUNÇÃO MODIFICADA: Agora é 'async' para esperar o Supabase
- * =========================================================================
- */
 export async function initGeolocation() {
-    // 1. PRIMEIRO, carrega a lista de lojas (do DB ou fallback)
-    await loadStoresFromSupabase();
-
     const locationSpan = document.getElementById('unidade-proxima');
     
-    // 2. Tenta carregar do LocalStorage (se já foi salvo)
+    // 1. Tenta carregar do LocalStorage (se já foi salvo)
     if (loadInitialStore()) {
         return; 
     }
 
     if (locationSpan) locationSpan.textContent = "Buscando localização (Aguarde permissão)...";
 
-    // 3. Tenta obter a localização via navegador
+    // 2. Tenta obter a localização via navegador (a loja mais próxima vem da API)
     if (navigator.geolocation) {
         navigator.geolocation.getCurrentPosition(
             (position) => {
@@ -150,7 +115,7 @@ export async function initGeolocation() {
             { enableHighAccuracy: false, timeout: 5000, maximumAge: 0 }
         );
     } else {
-        // 4. Navegador não suporta - Define padrão (primeira loja da lista)
+        // 3. Navegador não suporta - Define padrão (primeira loja da lista)
         if (locationSpan) locationSpan.textContent = `📍 Geolocalização não suportada. Usando ${UNIDADES[0].nome_loja} (Padrão)`;
         setSelectedStore(UNIDADES[0].id_loja, UNIDADES[0].nome_loja, null);
     }
@@ -3,6 +3,9 @@
 import { supabase } from './supabaseClient.js'; 
 import { CHATEAU_SELECTED_STORE_KEY } from './geolocator.js'; 
 
+// NOTA: A API está fixada para 127.0.0.1. Isso só funciona localmente.
+const API_ECOMMERCE_URL = 'http://127.0.0.1:5000/api/ecommerce';
+
 // ====================================================================
 // == CORREÇÃO 1: VERIFICAÇÃO DE LOGIN (ADICIONADO) ==
 // ====================================================================
@@ -322,11 +325,13 @@ function initProductLoading() {
         .order('data_cadastro', { descending: true })
         .limit(8);
     
-    const recomendadosQueryFn = (sb, storeId) => sb.from('produtos')
-        .select('*')
-        .eq('id_loja', storeId) 
-        .order('data_cadastro', { ascending: false })
-        .limit(8);
+    // Recomendados: semelhantes aos favoritos do cliente (sem favoritos, a API devolve as novidades)
+    const recomendadosQueryFn = async () => {
+        const favoritos = getFavorites().slice(-50).join(',');
+        const response = await fetch(`${API_ECOMMERCE_URL}/recomendados?limit=8${favoritos ? `&favoritos=${favoritos}` : ''}`);
+        const result = await response.json();
+        return response.ok ? { data: result, error: null } : { data: null, error: new Error(result.error || `Erro ${response.status}`) };
+    };
         
     const novidadesQueryFn = (sb, storeId) => sb.from('produtos')
         .select('*')
@@ -5,6 +5,9 @@ import { supabase } from './supabaseClient.js';
 // Importa as funções de favoritos para o botão de coração
 import { getFavorites, toggleFavorite } from './home.js';
 
+// NOTA: A API está fixada para 127.0.0.1. Isso só funciona localmente.
+const API_ECOMMERCE_URL = 'http://127.0.0.1:5000/api/ecommerce';
+
 function formatPrice(price) { 
     if (typeof price !== 'number') return 'Preço a consultar'; 
     return price.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' }); 
@@ -125,7 +128,7 @@ async function loadProductDetails() {
         
         // 4. Carrega a disponibilidade e os produtos relacionados
         loadStoreAvailability(productId);
-        loadRelatedProducts(produto.tipo_produto, produto.id_produto);
+        loadRelatedProducts(produto.id_produto);
         
         // 5. Adiciona o listener para o botão de favorito
         document.querySelector('.btn-favorite').addEventListener('click', (event) => {
@@ -174,16 +177,17 @@ async function loadStoreAvailability(productId) {
 // ======================================================
 // FUNÇÃO: Buscar Produtos Relacionados (do código antigo)
 // ======================================================
-async function loadRelatedProducts(tipo_produto, currentProductId) {
+// Produtos semelhantes pré-calculados no backend (texto, categoria, marca, medida e faixa de preço)
+async function loadRelatedProducts(currentProductId) {
     const container = document.getElementById('related-products-container');
-    if (!tipo_produto) { if(container) container.style.display = 'none'; return; }
-    
-    const { data: related, error } = await supabase
-        .from('produtos')
-        .select('*')
-        .eq('tipo_produto', tipo_produto)
-        .not('id_produto', 'eq', currentProductId)
-        .limit(4);
+    if (!container) return;
+
+    let related = null, error = null;
+    try {
+        const response = await fetch(`${API_ECOMMERCE_URL}/produtos/${currentProductId}/similares?limit=4`);
+        related = await response.json();
+        if (!response.ok) error = new Error(related.error);
+    } catch (e) { error = e; }
         
     if (error || !related || related.length === 0) { 
         if(container) container.innerHTML = '<p class="text-muted">Nenhum produto relacionado encontrado.</p>'; 
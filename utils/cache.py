@@ -0,0 +1,118 @@
+# backend/utils/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    """
+    Cache em memória (por processo) com expiração por tempo (TTL) e limite de tamanho (LRU).
+    Seguro para uso entre threads. Guarda também valores None (ex: "sem regra cadastrada").
+
+    'geracao' muda a cada invalidação: uma leitura do banco que começou antes dela passa a
+    geração que viu para set(), e o valor (possivelmente antigo) não é guardado.
+    """
+
+    def __init__(self, nome: str, ttl_segundos: float = 300, tamanho_maximo: int = 1024):
+        self.nome = nome
+        self.ttl_segundos = ttl_segundos
+        self.tamanho_maximo = tamanho_maximo
+        self._dados: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirados = 0
+        self.removidos_lru = 0
+        self.invalidacoes = 0
+        self.descartados = 0
+        self.geracao = 0
+
+    def get(self, chave: Hashable, padrao: Any = None) -> Any:
+        """Retorna o valor em cache ou 'padrao' se ausente/expirado."""
+        with self._lock:
+            item = self._dados.get(chave, _AUSENTE)
+            if item is _AUSENTE:
+                self.misses += 1
+                return padrao
+            valor, expira_em = item
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                self.expirados += 1
+                self.misses += 1
+                return padrao
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def set(self, chave: Hashable, valor: Any, ttl_segundos: Optional[float] = None,
+            geracao: Optional[int] = None) -> None:
+        """Guarda o valor; com 'geracao', só se não houve invalidação desde que ela foi lida."""
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        with self._lock:
+            if geracao is not None and geracao != self.geracao:
+                self.descartados += 1
+                return
+            self._dados[chave] = (valor, time.monotonic() + ttl)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+                self.removidos_lru += 1
+
+    def obter_ou_carregar(self, chave: Hashable, carregador: Callable[[], Any]) -> Any:
+        """Read-through: devolve o valor em cache ou chama 'carregador' e guarda o resultado."""
+        geracao = self.geracao
+        valor = self.get(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = carregador()
+            self.set(chave, valor, geracao=geracao)
+        return valor
+
+    def invalidar(self, chave: Hashable) -> bool:
+        with self._lock:
+            self.geracao += 1
+            if self._dados.pop(chave, _AUSENTE) is _AUSENTE:
+                return False
+            self.invalidacoes += 1
+            return True
+
+    def invalidar_onde(self, criterio: Callable[[Hashable], bool]) -> int:
+        """Remove todas as chaves que satisfazem 'criterio'. Retorna quantas foram removidas."""
+        with self._lock:
+            self.geracao += 1
+            chaves = [chave for chave in self._dados if criterio(chave)]
+            for chave in chaves:
+                del self._dados[chave]
+            self.invalidacoes += len(chaves)
+            return len(chaves)
+
+    def limpar(self) -> int:
+        with self._lock:
+            self.geracao += 1
+            total = len(self._dados)
+            self._dados.clear()
+            self.invalidacoes += total
+            return total
+
+    def __len__(self):
+        return len(self._dados)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'nome': self.nome,
+                'tamanho': len(self._dados),
+                'tamanho_maximo': self.tamanho_maximo,
+                'ttl_segundos': self.ttl_segundos,
+                'hits': self.hits,
+                'misses': self.misses,
+                'taxa_acerto': round(self.hits / consultas, 4) if consultas else None,
+                'expirados': self.expirados,
+                'removidos_lru': self.removidos_lru,
+                'invalidacoes': self.invalidacoes,
+                'descartados': self.descartados,
+            }
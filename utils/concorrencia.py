@@ -0,0 +1,110 @@
+# backend/utils/concorrencia.py
+#
+# Consultas independentes de um mesmo handler em paralelo, num pool de threads compartilhado
+# e limitado (CONSULTAS_MAX_THREADS por processo):
+#
+#   bloqueado, regra = em_paralelo(
+#       lambda: dia_bloqueado(supabase, loja_id, data_str),
+#       lambda: obter_regra(supabase, loja_id, servico_id),
+#   )
+#
+# - Os resultados voltam na ordem das tarefas. Se alguma falhar, a exceção dela é relançada
+#   no handler (as tarefas que ainda não começaram são canceladas).
+# - Se o conjunto não terminar em 'timeout' segundos, levanta TimeoutError. Threads já em
+#   execução não são interrompidas (a chamada HTTP tem o próprio timeout); o resultado delas
+#   é descartado.
+# - Dentro de uma tarefa do pool, em_paralelo roda em série: tarefas esperando outras tarefas
+#   no mesmo pool limitado poderiam travar todas as threads.
+# - O pool é criado no primeiro uso e recriado no processo filho após um fork (workers do
+#   gunicorn com preload), onde as threads do pai não existem.
+
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+MAX_THREADS = int(os.getenv('CONSULTAS_MAX_THREADS', '16'))
+TIMEOUT_PADRAO = float(os.getenv('CONSULTAS_TIMEOUT_SEGUNDOS', '15'))
+
+T = TypeVar('T')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_local = threading.local()
+tarefas_executadas = 0
+timeouts = 0
+
+
+def _marcar_thread_do_pool() -> None:
+    _local.no_pool = True
+
+
+def _obter_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix='consultas',
+                                               initializer=_marcar_thread_do_pool)
+    return _executor
+
+
+def _descartar_executor_apos_fork() -> None:
+    global _executor, _lock
+    _executor = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descartar_executor_apos_fork)
+
+
+def em_paralelo(*tarefas: Callable[[], T], timeout: Optional[float] = None) -> List[T]:
+    """Executa as tarefas (funções sem argumentos) ao mesmo tempo; retorna os resultados em ordem."""
+    global tarefas_executadas, timeouts
+    if len(tarefas) <= 1 or getattr(_local, 'no_pool', False):
+        return [tarefa() for tarefa in tarefas]
+
+    timeout = TIMEOUT_PADRAO if timeout is None else timeout
+    executor = _obter_executor()
+    futuros = [executor.submit(tarefa) for tarefa in tarefas]
+    tarefas_executadas += len(futuros)
+    concluidos, pendentes = wait(futuros, timeout=timeout, return_when=FIRST_EXCEPTION)
+
+    for futuro in futuros:
+        if futuro in concluidos and futuro.exception() is not None:
+            for pendente in pendentes:
+                pendente.cancel()
+            raise futuro.exception()
+    if pendentes:
+        for pendente in pendentes:
+            pendente.cancel()
+        timeouts += 1
+        raise TimeoutError(f"{len(pendentes)} de {len(futuros)} consultas não terminaram em {timeout:g}s.")
+    return [futuro.result() for futuro in futuros]
+
+
+def mapear(funcao: Callable[..., T], itens: Iterable, timeout: Optional[float] = None) -> List[T]:
+    """[funcao(item) for item in itens], com as chamadas em paralelo."""
+    return em_paralelo(*(lambda item=item: funcao(item) for item in itens), timeout=timeout)
+
+
+@contextmanager
+def em_serie():
+    """Desliga o paralelismo na thread atual (depuração e comparação nos benchmarks)."""
+    anterior = getattr(_local, 'no_pool', False)
+    _local.no_pool = True
+    try:
+        yield
+    finally:
+        _local.no_pool = anterior
+
+
+def estatisticas() -> dict:
+    return {
+        'max_threads': MAX_THREADS,
+        'timeout_padrao_segundos': TIMEOUT_PADRAO,
+        'tarefas_executadas': tarefas_executadas,
+        'timeouts': timeouts,
+    }
@@ -0,0 +1,50 @@
+# backend/utils/http_cache.py
+#
+# Cabeçalhos de cache HTTP para as rotas GET de leitura (catálogo, CMS).
+#
+#   @cache_http(max_age=60, stale_while_revalidate=300)
+#   def get_ofertas(): ...
+#
+# - ETag forte = hash SHA-256 do corpo da resposta. Muda sozinho quando o dado muda, e é o
+#   mesmo em todos os workers (não depende de estado do processo).
+# - Sem Last-Modified: não há um instante de alteração confiável entre workers (nem para
+#   escritas feitas direto pelo JS do admin), e um If-Modified-Since com data antiga
+#   devolveria 304 para um dado que mudou. A revalidação é só pelo ETag.
+# - If-None-Match é tratado pelo make_conditional do Werkzeug, que devolve 304 sem corpo.
+# - Só respostas 200 de GET/HEAD recebem os cabeçalhos; erros nunca são cacheados.
+
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+
+
+def etag_conteudo(corpo: bytes) -> str:
+    return hashlib.sha256(corpo).hexdigest()[:32]
+
+
+def politica_cache_control(max_age: int, stale_while_revalidate: int = 0, privado: bool = False) -> str:
+    partes = ['private' if privado else 'public', f'max-age={max_age}']
+    if stale_while_revalidate:
+        partes.append(f'stale-while-revalidate={stale_while_revalidate}')
+    return ', '.join(partes)
+
+
+def aplicar_cabecalhos(resposta, max_age: int = 60, stale_while_revalidate: int = 0, privado: bool = False):
+    """Define ETag e Cache-Control e responde 304 se o cliente já tem a versão."""
+    if request.method not in ('GET', 'HEAD') or resposta.status_code != 200:
+        return resposta
+    resposta.set_etag(etag_conteudo(resposta.get_data()))
+    resposta.headers['Cache-Control'] = politica_cache_control(max_age, stale_while_revalidate, privado)
+    return resposta.make_conditional(request)
+
+
+def cache_http(max_age: int = 60, stale_while_revalidate: int = 0, privado: bool = False):
+    """Decorador de rota: aplica aplicar_cabecalhos à resposta da view."""
+    def decorador(view):
+        @wraps(view)
+        def envolvida(*args, **kwargs):
+            resposta = make_response(view(*args, **kwargs))
+            return aplicar_cabecalhos(resposta, max_age, stale_while_revalidate, privado)
+        return envolvida
+    return decorador
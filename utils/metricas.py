@@ -0,0 +1,336 @@
+# backend/utils/metricas.py
+#
+# Métricas do processo no formato texto do Prometheus (rota GET /metrics):
+#
+#   chateau_http_requisicao_duracao_segundos{rota, metodo}       histograma
+#   chateau_http_requisicoes_total{rota, metodo, status}         contador
+#   chateau_db_consulta_duracao_segundos{tabela, operacao}       histograma (cada execute())
+#   chateau_db_linhas_total{tabela, operacao}                    contador (linhas devolvidas)
+#   chateau_db_erros_total{tabela, operacao}                     contador
+#   chateau_db_consultas_lentas_total{tabela, operacao}          contador
+#
+# - 'rota' é o padrão registrado no Flask (/api/ecommerce/produtos/<int:produto_id>), não a
+#   URL, para a quantidade de séries não crescer com ids. Chamadas .rpc('nome') aparecem com
+#   tabela="rpc:nome" e operacao="rpc".
+# - Agregação por thread: cada thread escreve só no próprio fragmento (sem lock no caminho
+#   da requisição); a rota /metrics soma os fragmentos de todas as threads na leitura. Quando
+#   uma thread termina (ex: threads de requisição do servidor de desenvolvimento), o fragmento
+#   dela é somado ao total das encerradas e sai da lista: a lista não cresce com as threads.
+# - As consultas são medidas por um proxy em volta do Client (instrumentar_cliente), aplicado
+#   em db/cliente.py. Consultas acima de CONSULTA_LENTA_MS vão para o log com os filtros usados.
+# - Cada worker do gunicorn tem os próprios números (cada scrape vê o worker que atendeu).
+#
+# Configuração (.env):
+#   METRICAS_ATIVAS      0 desliga a coleta e a rota /metrics (padrão 1)
+#   CONSULTA_LENTA_MS    limite do log de consultas lentas, em ms (padrão 500; 0 desliga o log)
+
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+METRICAS_ATIVAS = os.getenv('METRICAS_ATIVAS', '1') == '1'
+CONSULTA_LENTA_MS = float(os.getenv('CONSULTA_LENTA_MS', '500'))
+PREFIXO = 'chateau'
+
+# Limites dos baldes (segundos), do acerto de cache local até o timeout das consultas
+BALDES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+AJUDA = {
+    'http_requisicao_duracao_segundos': ('histogram', 'Duração das requisições HTTP por rota.'),
+    'http_requisicoes_total': ('counter', 'Requisições HTTP por rota, método e status.'),
+    'db_consulta_duracao_segundos': ('histogram', 'Duração de cada execute() no Supabase.'),
+    'db_linhas_total': ('counter', 'Linhas devolvidas pelo Supabase.'),
+    'db_erros_total': ('counter', 'Consultas ao Supabase que levantaram exceção.'),
+    'db_consultas_lentas_total': ('counter', 'Consultas acima de CONSULTA_LENTA_MS.'),
+}
+
+LABELS = {
+    'http_requisicao_duracao_segundos': ('rota', 'metodo'),
+    'http_requisicoes_total': ('rota', 'metodo', 'status'),
+    'db_consulta_duracao_segundos': ('tabela', 'operacao'),
+    'db_linhas_total': ('tabela', 'operacao'),
+    'db_erros_total': ('tabela', 'operacao'),
+    'db_consultas_lentas_total': ('tabela', 'operacao'),
+}
+
+
+# --- Agregação por thread ---
+
+class _Fragmento:
+    """Números de uma thread. Só a própria thread escreve; a leitura copia."""
+    __slots__ = ('histogramas', 'contadores')
+
+    def __init__(self):
+        # (métrica, labels) -> [contagem por balde..., contagem acima do último, soma]
+        self.histogramas: Dict[Tuple[str, tuple], List[float]] = {}
+        self.contadores: Dict[Tuple[str, tuple], float] = {}
+
+
+_local = threading.local()
+_fragmentos: List[_Fragmento] = []
+_encerrados = _Fragmento()  # soma dos fragmentos de threads que já terminaram
+# Registro/encerramento de threads e leitura. RLock: o encerramento roda quando o dono é
+# coletado, o que pode acontecer na mesma thread que já está segurando o lock.
+_lock_fragmentos = threading.RLock()
+
+
+class _Dono:
+    """Fica no threading.local da thread; é coletado quando ela termina."""
+    __slots__ = ('__weakref__',)
+
+
+def _somar_em(destino: _Fragmento, fragmento: _Fragmento) -> None:
+    # list(d.items()) copia o dict de uma vez (a thread dona pode estar inserindo chaves)
+    for chave, baldes in list(fragmento.histogramas.items()):
+        total = destino.histogramas.get(chave)
+        if total is None:
+            destino.histogramas[chave] = list(baldes)
+        else:
+            for i, valor in enumerate(baldes):
+                total[i] += valor
+    for chave, valor in list(fragmento.contadores.items()):
+        destino.contadores[chave] = destino.contadores.get(chave, 0) + valor
+
+
+def _encerrar(fragmento: _Fragmento) -> None:
+    with _lock_fragmentos:
+        # Fora da lista: fragmento de antes do fork (já descartado) ou de um zerar() anterior
+        if not any(f is fragmento for f in _fragmentos):
+            return
+        _fragmentos.remove(fragmento)
+        _somar_em(_encerrados, fragmento)
+
+
+def _fragmento() -> _Fragmento:
+    fragmento = getattr(_local, 'fragmento', None)
+    if fragmento is None:
+        fragmento = _Fragmento()
+        dono = _Dono()
+        weakref.finalize(dono, _encerrar, fragmento)
+        with _lock_fragmentos:
+            _fragmentos.append(fragmento)
+        _local.dono = dono
+        _local.fragmento = fragmento
+    return fragmento
+
+
+def _descartar_apos_fork() -> None:
+    # No worker, os números herdados do mestre (ex: consultas do pré-carregamento) não valem
+    global _fragmentos, _encerrados, _lock_fragmentos, _local
+    _fragmentos = []
+    _encerrados = _Fragmento()
+    _lock_fragmentos = threading.RLock()
+    _local = threading.local()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descartar_apos_fork)
+
+
+def observar(metrica: str, labels: tuple, valor: float) -> None:
+    """Registra 'valor' (segundos) no histograma 'metrica' com os valores de label dados."""
+    histogramas = _fragmento().histogramas
+    chave = (metrica, labels)
+    baldes = histogramas.get(chave)
+    if baldes is None:
+        baldes = histogramas[chave] = [0] * (len(BALDES) + 1) + [0.0]
+    baldes[bisect_left(BALDES, valor)] += 1
+    baldes[-1] += valor
+
+
+def incrementar(metrica: str, labels: tuple, valor: float = 1) -> None:
+    contadores = _fragmento().contadores
+    chave = (metrica, labels)
+    contadores[chave] = contadores.get(chave, 0) + valor
+
+
+def zerar() -> None:
+    """Zera todos os números (benchmarks)."""
+    with _lock_fragmentos:
+        for fragmento in _fragmentos:
+            fragmento.histogramas.clear()
+            fragmento.contadores.clear()
+        _encerrados.histogramas.clear()
+        _encerrados.contadores.clear()
+
+
+# --- Leitura ---
+
+def _somar() -> Tuple[dict, dict]:
+    soma = _Fragmento()
+    with _lock_fragmentos:
+        # Cópia consistente: um fragmento não pode estar na lista e já somado em _encerrados
+        _somar_em(soma, _encerrados)
+        fragmentos = list(_fragmentos)
+    for fragmento in fragmentos:
+        _somar_em(soma, fragmento)
+    return soma.histogramas, soma.contadores
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(metrica: str, valores: tuple, extra: str = '') -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(LABELS[metrica], valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+def texto_prometheus() -> str:
+    """Todas as métricas no formato de exposição texto do Prometheus (versão 0.0.4)."""
+    histogramas, contadores = _somar()
+    linhas = []
+    for metrica, (tipo, ajuda) in AJUDA.items():
+        nome = f'{PREFIXO}_{metrica}'
+        linhas.append(f'# HELP {nome} {ajuda}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        if tipo == 'histogram':
+            for (m, valores), baldes in sorted(histogramas.items()):
+                if m != metrica:
+                    continue
+                acumulado = 0
+                for limite, quantidade in zip(BALDES, baldes):
+                    acumulado += quantidade
+                    le = f'le="{limite:g}"'
+                    linhas.append(f'{nome}_bucket{_labels(metrica, valores, le)} {acumulado}')
+                acumulado += baldes[len(BALDES)]
+                le = 'le="+Inf"'
+                linhas.append(f'{nome}_bucket{_labels(metrica, valores, le)} {acumulado}')
+                linhas.append(f'{nome}_sum{_labels(metrica, valores)} {_numero(baldes[-1])}')
+                linhas.append(f'{nome}_count{_labels(metrica, valores)} {acumulado}')
+        else:
+            for (m, valores), valor in sorted(contadores.items()):
+                if m == metrica:
+                    linhas.append(f'{nome}{_labels(metrica, valores)} {_numero(valor)}')
+    return '\n'.join(linhas) + '\n'
+
+
+# --- Requisições HTTP (hooks do Flask) ---
+
+def instrumentar_app(app) -> None:
+    """Mede cada requisição do app (chamado em create_app)."""
+    if not METRICAS_ATIVAS:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.inicio_requisicao = time.perf_counter()
+
+    @app.after_request
+    def _registrar_requisicao(resposta):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None:
+            # Em respostas em stream, mede até o handler devolver a resposta (não o envio)
+            rota = request.url_rule.rule if request.url_rule is not None else '<sem_rota>'
+            observar('http_requisicao_duracao_segundos', (rota, request.method), time.perf_counter() - inicio)
+            incrementar('http_requisicoes_total', (rota, request.method, resposta.status_code))
+        return resposta
+
+
+# --- Consultas ao Supabase (proxy em volta do Client) ---
+
+OPERACOES = ('select', 'insert', 'update', 'upsert', 'delete')
+
+
+def _contar_linhas(resposta) -> int:
+    dados = getattr(resposta, 'data', None)
+    if isinstance(dados, list):
+        return len(dados)
+    return 0 if dados is None else 1
+
+
+def _resumir(valor, limite: int = 80) -> str:
+    texto = repr(valor)
+    return texto if len(texto) <= limite else texto[:limite] + '...'  # ex: payload de insert em lote
+
+
+def _descrever(passos: list) -> str:
+    return '.'.join(f"{nome}({', '.join(_resumir(a) for a in args)})" for nome, args in passos)
+
+
+class _ConsultaInstrumentada:
+    """
+    Envolve um builder do PostgREST: repassa os métodos encadeados (select, eq, order...) e
+    mede o execute(). Guarda os passos só para o log de consultas lentas. Como os próprios
+    builders, é reaproveitado ao longo do encadeamento (cada passo troca o builder interno).
+    """
+    __slots__ = ('_builder', '_tabela', '_operacao', '_passos')
+
+    def __init__(self, builder, tabela: str, operacao: str = None, passos: list = None):
+        self._builder = builder
+        self._tabela = tabela
+        self._operacao = operacao
+        self._passos = passos if passos is not None else []
+
+    def _seguir(self, resultado, nome: str, args: tuple):
+        if not hasattr(resultado, 'execute'):
+            return resultado
+        self._builder = resultado
+        self._passos.append((nome, args))
+        if self._operacao is None and nome in OPERACOES:
+            self._operacao = nome
+        return self
+
+    def __getattr__(self, nome):
+        atributo = getattr(self._builder, nome)
+        if not callable(atributo):
+            return self._seguir(atributo, nome, ())  # ex: .not_
+
+        def chamada(*args, **kwargs):
+            return self._seguir(atributo(*args, **kwargs), nome, args)
+        return chamada
+
+    def execute(self):
+        labels = (self._tabela, self._operacao or 'select')
+        inicio = time.perf_counter()
+        try:
+            resposta = self._builder.execute()
+        except Exception:
+            incrementar('db_erros_total', labels)
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            observar('db_consulta_duracao_segundos', labels, duracao)
+        incrementar('db_linhas_total', labels, _contar_linhas(resposta))
+        if CONSULTA_LENTA_MS and duracao * 1000 >= CONSULTA_LENTA_MS:
+            incrementar('db_consultas_lentas_total', labels)
+            print(f"[Metricas] Consulta lenta ({duracao * 1000:.0f} ms, {_contar_linhas(resposta)} linhas): "
+                  f"{self._tabela}.{_descrever(self._passos)}")
+        return resposta
+
+
+class ClienteInstrumentado:
+    """Client do Supabase com table()/rpc() medidos; o resto (auth, storage...) é repassado."""
+
+    def __init__(self, cliente):
+        self._cliente = cliente
+
+    def table(self, nome: str):
+        return _ConsultaInstrumentada(self._cliente.table(nome), nome)
+
+    def from_(self, nome: str):
+        return self.table(nome)
+
+    def rpc(self, nome: str, parametros: dict = None, *args, **kwargs):
+        builder = self._cliente.rpc(nome, parametros or {}, *args, **kwargs)
+        return _ConsultaInstrumentada(builder, f'rpc:{nome}', 'rpc', [('rpc', (nome,))])
+
+    def __getattr__(self, nome):
+        return getattr(self._cliente, nome)
+
+
+def instrumentar_cliente(cliente):
+    """Envolve o Client para medir as consultas (devolve o próprio cliente se desativado)."""
+    if not METRICAS_ATIVAS or cliente is None or isinstance(cliente, ClienteInstrumentado):
+        return cliente
+    return ClienteInstrumentado(cliente)